@@ -0,0 +1,35 @@
+# flake8: noqa
+
+"""add data retention indexes
+Revision ID: 8d2c4a91b7e3
+Revises: 1e58cb567f44
+Create Date: 2025-05-12 10:00:12.417203
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic
+revision = "8d2c4a91b7e3"
+down_revision = "1e58cb567f44"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "questions_assistant_id_created_at_idx",
+        "questions",
+        ["assistant_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "app_runs_app_id_created_at_idx",
+        "app_runs",
+        ["app_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("app_runs_app_id_created_at_idx", table_name="app_runs")
+    op.drop_index("questions_assistant_id_created_at_idx", table_name="questions")
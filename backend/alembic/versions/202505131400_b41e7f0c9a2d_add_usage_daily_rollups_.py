@@ -0,0 +1,95 @@
+# flake8: noqa
+
+"""add usage daily rollups
+Revision ID: b41e7f0c9a2d
+Revises: 8d2c4a91b7e3
+Create Date: 2025-05-13 14:00:41.903114
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = "b41e7f0c9a2d"
+down_revision = "8d2c4a91b7e3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usage_daily_rollups",
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("input_tokens", sa.BigInteger(), nullable=False),
+        sa.Column("output_tokens", sa.BigInteger(), nullable=False),
+        sa.Column("request_count", sa.BigInteger(), nullable=False),
+        sa.Column("tenant_id", sa.UUID(), nullable=False),
+        sa.Column("completion_model_id", sa.UUID(), nullable=True),
+        sa.Column("assistant_id", sa.UUID(), nullable=True),
+        sa.Column("app_id", sa.UUID(), nullable=True),
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["completion_model_id"], ["completion_models.id"], ondelete="SET NULL"
+        ),
+        sa.ForeignKeyConstraint(["assistant_id"], ["assistants.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["app_id"], ["apps.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "usage_daily_rollups_tenant_id_day_idx",
+        "usage_daily_rollups",
+        ["tenant_id", "day"],
+        unique=False,
+    )
+    op.create_index(
+        "usage_daily_rollups_source_day_idx",
+        "usage_daily_rollups",
+        ["source", "day"],
+        unique=False,
+    )
+
+    op.create_table(
+        "usage_rollup_watermarks",
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("rolled_up_until", sa.Date(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("source"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("usage_rollup_watermarks")
+    op.drop_index("usage_daily_rollups_source_day_idx", table_name="usage_daily_rollups")
+    op.drop_index("usage_daily_rollups_tenant_id_day_idx", table_name="usage_daily_rollups")
+    op.drop_table("usage_daily_rollups")
@@ -0,0 +1,137 @@
+# flake8: noqa
+
+"""add storage usage counters
+Revision ID: 5f3a9c2e1d84
+Revises: b41e7f0c9a2d
+Create Date: 2025-05-14 10:00:08.113452
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = "5f3a9c2e1d84"
+down_revision = "b41e7f0c9a2d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "storage_usage_counters",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("owner_id", sa.UUID(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("scope", "owner_id"),
+    )
+    op.create_table(
+        "storage_usage_deltas",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("tenant_id", sa.UUID(), nullable=False),
+        sa.Column("size_delta", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "storage_usage_deltas_user_id_idx", "storage_usage_deltas", ["user_id"], unique=False
+    )
+    op.create_index(
+        "storage_usage_deltas_tenant_id_idx",
+        "storage_usage_deltas",
+        ["tenant_id"],
+        unique=False,
+    )
+
+    # Record every change of info blob sizes in the same transaction,
+    # including the ones caused by cascading deletes
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION record_info_blob_size_delta()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND COALESCE(OLD.size, 0) <> 0 THEN
+                IF TG_OP = 'DELETE'
+                    OR NEW.size IS DISTINCT FROM OLD.size
+                    OR NEW.user_id IS DISTINCT FROM OLD.user_id
+                    OR NEW.tenant_id IS DISTINCT FROM OLD.tenant_id
+                THEN
+                    INSERT INTO storage_usage_deltas (user_id, tenant_id, size_delta)
+                    VALUES (OLD.user_id, OLD.tenant_id, -OLD.size);
+                END IF;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') AND COALESCE(NEW.size, 0) <> 0 THEN
+                IF TG_OP = 'INSERT'
+                    OR NEW.size IS DISTINCT FROM OLD.size
+                    OR NEW.user_id IS DISTINCT FROM OLD.user_id
+                    OR NEW.tenant_id IS DISTINCT FROM OLD.tenant_id
+                THEN
+                    INSERT INTO storage_usage_deltas (user_id, tenant_id, size_delta)
+                    VALUES (NEW.user_id, NEW.tenant_id, NEW.size);
+                END IF;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER info_blobs_storage_usage
+            AFTER INSERT OR UPDATE OR DELETE
+            ON info_blobs
+            FOR EACH ROW
+        EXECUTE PROCEDURE record_info_blob_size_delta();
+        """
+    )
+
+    # Backfill the counters from the current info blobs
+    op.execute(
+        """
+        INSERT INTO storage_usage_counters (scope, owner_id, size)
+        SELECT 'user', user_id, COALESCE(SUM(size), 0) FROM info_blobs GROUP BY user_id
+        UNION ALL
+        SELECT 'tenant', tenant_id, COALESCE(SUM(size), 0) FROM info_blobs GROUP BY tenant_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS info_blobs_storage_usage ON info_blobs")
+    op.execute("DROP FUNCTION IF EXISTS record_info_blob_size_delta()")
+    op.drop_index("storage_usage_deltas_tenant_id_idx", table_name="storage_usage_deltas")
+    op.drop_index("storage_usage_deltas_user_id_idx", table_name="storage_usage_deltas")
+    op.drop_table("storage_usage_deltas")
+    op.drop_table("storage_usage_counters")
@@ -0,0 +1,28 @@
+# flake8: noqa
+
+"""add info blob crawl metadata
+Revision ID: c7e2d95a4b10
+Revises: 5f3a9c2e1d84
+Create Date: 2025-05-15 10:00:41.529817
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "c7e2d95a4b10"
+down_revision = "5f3a9c2e1d84"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("info_blobs", sa.Column("content_hash", sa.String(), nullable=True))
+    op.add_column("info_blobs", sa.Column("etag", sa.String(), nullable=True))
+    op.add_column("info_blobs", sa.Column("last_modified", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("info_blobs", "last_modified")
+    op.drop_column("info_blobs", "etag")
+    op.drop_column("info_blobs", "content_hash")
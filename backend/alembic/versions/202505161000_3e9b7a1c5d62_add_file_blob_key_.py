@@ -0,0 +1,26 @@
+# flake8: noqa
+
+"""add file blob key
+Revision ID: 3e9b7a1c5d62
+Revises: c7e2d95a4b10
+Create Date: 2025-05-16 10:00:12.361904
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "3e9b7a1c5d62"
+down_revision = "c7e2d95a4b10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("files", sa.Column("blob_key", sa.String(), nullable=True))
+    op.create_index(op.f("ix_files_blob_key"), "files", ["blob_key"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_files_blob_key"), table_name="files")
+    op.drop_column("files", "blob_key")
@@ -0,0 +1,34 @@
+# flake8: noqa
+
+"""add info blob content keys
+Revision ID: 9a4f2c6e8b13
+Revises: 3e9b7a1c5d62
+Create Date: 2025-05-17 10:00:27.813062
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "9a4f2c6e8b13"
+down_revision = "3e9b7a1c5d62"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("info_blobs", sa.Column("extraction_key", sa.String(), nullable=True))
+    op.add_column("info_blobs", sa.Column("embedding_key", sa.String(), nullable=True))
+    op.create_index(
+        op.f("ix_info_blobs_extraction_key"), "info_blobs", ["extraction_key"], unique=False
+    )
+    op.create_index(
+        op.f("ix_info_blobs_embedding_key"), "info_blobs", ["embedding_key"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_info_blobs_embedding_key"), table_name="info_blobs")
+    op.drop_index(op.f("ix_info_blobs_extraction_key"), table_name="info_blobs")
+    op.drop_column("info_blobs", "embedding_key")
+    op.drop_column("info_blobs", "extraction_key")
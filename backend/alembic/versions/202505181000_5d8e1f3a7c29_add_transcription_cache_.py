@@ -0,0 +1,48 @@
+# flake8: noqa
+
+"""add transcription cache
+Revision ID: 5d8e1f3a7c29
+Revises: 9a4f2c6e8b13
+Create Date: 2025-05-18 10:00:41.734518
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = "5d8e1f3a7c29"
+down_revision = "9a4f2c6e8b13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transcription_cache",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("checksum", sa.String(), nullable=False),
+        sa.Column("transcription_model_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["transcription_model_id"], ["transcription_models.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("tenant_id", "checksum", "transcription_model_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("transcription_cache")
@@ -0,0 +1,27 @@
+# flake8: noqa
+
+"""add question cached tokens
+Revision ID: 7b2e4d9f1a36
+Revises: 5d8e1f3a7c29
+Create Date: 2025-05-19 10:00:27.518342
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "7b2e4d9f1a36"
+down_revision = "5d8e1f3a7c29"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "questions",
+        sa.Column("num_tokens_cached", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("questions", "num_tokens_cached")
@@ -0,0 +1,72 @@
+# flake8: noqa
+
+"""add answer cache
+Revision ID: 3c9d5a1e7f48
+Revises: 7b2e4d9f1a36
+Create Date: 2025-05-20 10:00:13.905127
+"""
+
+from alembic import op
+import pgvector
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = "3c9d5a1e7f48"
+down_revision = "7b2e4d9f1a36"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "assistants",
+        sa.Column(
+            "answer_cache_enabled", sa.Boolean(), server_default="false", nullable=False
+        ),
+    )
+    op.create_table(
+        "answer_cache",
+        sa.Column("cache_key", sa.String(), nullable=False),
+        sa.Column("embedding", pgvector.sqlalchemy.Vector(), nullable=False),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("assistant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("question_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["assistant_id"], ["assistants.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "answer_cache_assistant_id_cache_key_idx",
+        "answer_cache",
+        ["assistant_id", "cache_key"],
+    )
+    op.create_index(
+        op.f("ix_answer_cache_question_id"), "answer_cache", ["question_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_answer_cache_question_id"), table_name="answer_cache")
+    op.drop_index("answer_cache_assistant_id_cache_key_idx", table_name="answer_cache")
+    op.drop_table("answer_cache")
+    op.drop_column("assistants", "answer_cache_enabled")
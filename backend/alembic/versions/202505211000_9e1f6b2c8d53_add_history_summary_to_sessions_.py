@@ -0,0 +1,35 @@
+# flake8: noqa
+
+"""add history summary to sessions
+Revision ID: 9e1f6b2c8d53
+Revises: 3c9d5a1e7f48
+Create Date: 2025-05-21 10:00:41.218306
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "9e1f6b2c8d53"
+down_revision = "3c9d5a1e7f48"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("sessions", sa.Column("history_summary", sa.String(), nullable=True))
+    op.add_column(
+        "sessions", sa.Column("history_summary_tokens", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "sessions",
+        sa.Column(
+            "history_summarized_until", sa.TIMESTAMP(timezone=True), nullable=True
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sessions", "history_summarized_until")
+    op.drop_column("sessions", "history_summary_tokens")
+    op.drop_column("sessions", "history_summary")
@@ -0,0 +1,26 @@
+# flake8: noqa
+
+"""add tokens per minute to completion models
+Revision ID: 4a7c2e9b5f16
+Revises: 9e1f6b2c8d53
+Create Date: 2025-05-22 10:00:27.640193
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "4a7c2e9b5f16"
+down_revision = "9e1f6b2c8d53"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "completion_models", sa.Column("tokens_per_minute", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("completion_models", "tokens_per_minute")
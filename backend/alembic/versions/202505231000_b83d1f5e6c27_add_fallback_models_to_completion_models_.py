@@ -0,0 +1,27 @@
+# flake8: noqa
+
+"""add fallback models to completion models
+Revision ID: b83d1f5e6c27
+Revises: 4a7c2e9b5f16
+Create Date: 2025-05-23 10:00:52.384716
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "b83d1f5e6c27"
+down_revision = "4a7c2e9b5f16"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "completion_models",
+        sa.Column("fallback_models", sa.ARRAY(sa.String()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("completion_models", "fallback_models")
@@ -0,0 +1,85 @@
+# flake8: noqa
+
+"""add usage rollup stale days
+Revision ID: d5e8a3f17c92
+Revises: b83d1f5e6c27
+Create Date: 2025-05-24 10:00:17.529841
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "d5e8a3f17c92"
+down_revision = "b83d1f5e6c27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usage_rollup_stale_days",
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("source", "day"),
+    )
+
+    # Mark the rolled up days that rows are deleted from, including by
+    # cascading deletes, once per statement so that batch deletes stay cheap
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION mark_usage_rollup_stale_days()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            INSERT INTO usage_rollup_stale_days (source, day)
+            SELECT DISTINCT TG_ARGV[0], date(timezone('UTC', deleted_rows.created_at))
+            FROM deleted_rows
+            JOIN usage_rollup_watermarks AS watermarks ON watermarks.source = TG_ARGV[0]
+            WHERE date(timezone('UTC', deleted_rows.created_at)) < watermarks.rolled_up_until
+            ON CONFLICT DO NOTHING;
+
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER questions_usage_rollup_stale_days
+            AFTER DELETE
+            ON questions
+            REFERENCING OLD TABLE AS deleted_rows
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE mark_usage_rollup_stale_days('questions');
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER app_runs_usage_rollup_stale_days
+            AFTER DELETE
+            ON app_runs
+            REFERENCING OLD TABLE AS deleted_rows
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE mark_usage_rollup_stale_days('app_runs');
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS app_runs_usage_rollup_stale_days ON app_runs")
+    op.execute("DROP TRIGGER IF EXISTS questions_usage_rollup_stale_days ON questions")
+    op.execute("DROP FUNCTION IF EXISTS mark_usage_rollup_stale_days()")
+    op.drop_table("usage_rollup_stale_days")
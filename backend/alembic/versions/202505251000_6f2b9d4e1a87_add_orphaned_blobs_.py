@@ -0,0 +1,72 @@
+# flake8: noqa
+
+"""add orphaned blobs
+Revision ID: 6f2b9d4e1a87
+Revises: d5e8a3f17c92
+Create Date: 2025-05-25 10:00:42.118305
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "6f2b9d4e1a87"
+down_revision = "d5e8a3f17c92"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "orphaned_blobs",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+    # Queue the blobs of deleted files, including files deleted by cascades
+    # from users and tenants, once per statement so that batch deletes stay cheap
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION queue_orphaned_blobs()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            INSERT INTO orphaned_blobs (key)
+            SELECT DISTINCT deleted_rows.blob_key
+            FROM deleted_rows
+            WHERE deleted_rows.blob_key IS NOT NULL
+            ON CONFLICT DO NOTHING;
+
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER files_queue_orphaned_blobs
+            AFTER DELETE
+            ON files
+            REFERENCING OLD TABLE AS deleted_rows
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE queue_orphaned_blobs();
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS files_queue_orphaned_blobs ON files")
+    op.execute("DROP FUNCTION IF EXISTS queue_orphaned_blobs()")
+    op.drop_table("orphaned_blobs")
@@ -0,0 +1,68 @@
+# flake8: noqa
+
+"""add downscaled blob key to files
+Revision ID: 8a4c1f7e3b29
+Revises: 6f2b9d4e1a87
+Create Date: 2025-05-26 10:00:08.431927
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "8a4c1f7e3b29"
+down_revision = "6f2b9d4e1a87"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("files", sa.Column("downscaled_blob_key", sa.String(), nullable=True))
+    op.create_index(
+        op.f("ix_files_downscaled_blob_key"), "files", ["downscaled_blob_key"], unique=False
+    )
+
+    # Queue the downscaled images of deleted files as well
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION queue_orphaned_blobs()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            INSERT INTO orphaned_blobs (key)
+            SELECT DISTINCT keys.key
+            FROM deleted_rows
+            CROSS JOIN LATERAL (
+                VALUES (deleted_rows.blob_key), (deleted_rows.downscaled_blob_key)
+            ) AS keys (key)
+            WHERE keys.key IS NOT NULL
+            ON CONFLICT DO NOTHING;
+
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION queue_orphaned_blobs()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            INSERT INTO orphaned_blobs (key)
+            SELECT DISTINCT deleted_rows.blob_key
+            FROM deleted_rows
+            WHERE deleted_rows.blob_key IS NOT NULL
+            ON CONFLICT DO NOTHING;
+
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+
+    op.drop_index(op.f("ix_files_downscaled_blob_key"), table_name="files")
+    op.drop_column("files", "downscaled_blob_key")
@@ -0,0 +1,27 @@
+# flake8: noqa
+
+"""add last crawled at to info blobs
+Revision ID: 3c7e5a9d2f46
+Revises: 8a4c1f7e3b29
+Create Date: 2025-05-27 10:00:04.915302
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "3c7e5a9d2f46"
+down_revision = "8a4c1f7e3b29"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "info_blobs",
+        sa.Column("last_crawled_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("info_blobs", "last_crawled_at")
@@ -0,0 +1,78 @@
+# flake8: noqa
+
+"""mark usage rollup stale days on update
+Revision ID: 9e1b6d4c8a53
+Revises: 3c7e5a9d2f46
+Create Date: 2025-05-28 10:00:11.284617
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "9e1b6d4c8a53"
+down_revision = "3c7e5a9d2f46"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Mark the rolled up days of rows that are changed, such as app runs whose
+    # token counts are filled in after their day was closed, or rows whose
+    # model is set to null when it is deleted. Only touching updated_at does
+    # not change the rollups.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION mark_usage_rollup_stale_days_on_update()
+            RETURNS TRIGGER AS
+        $$
+        BEGIN
+            INSERT INTO usage_rollup_stale_days (source, day)
+            SELECT DISTINCT TG_ARGV[0], changed.day
+            FROM old_rows
+            JOIN new_rows ON new_rows.id = old_rows.id
+            CROSS JOIN LATERAL (
+                VALUES
+                    (date(timezone('UTC', old_rows.created_at))),
+                    (date(timezone('UTC', new_rows.created_at)))
+            ) AS changed (day)
+            JOIN usage_rollup_watermarks AS watermarks ON watermarks.source = TG_ARGV[0]
+            WHERE changed.day < watermarks.rolled_up_until
+            AND to_jsonb(old_rows) - 'updated_at' IS DISTINCT FROM to_jsonb(new_rows) - 'updated_at'
+            ON CONFLICT DO NOTHING;
+
+            RETURN NULL;
+        END;
+        $$ language 'plpgsql';
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER questions_usage_rollup_stale_days_on_update
+            AFTER UPDATE
+            ON questions
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE mark_usage_rollup_stale_days_on_update('questions');
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER app_runs_usage_rollup_stale_days_on_update
+            AFTER UPDATE
+            ON app_runs
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT
+        EXECUTE PROCEDURE mark_usage_rollup_stale_days_on_update('app_runs');
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TRIGGER IF EXISTS app_runs_usage_rollup_stale_days_on_update ON app_runs"
+    )
+    op.execute(
+        "DROP TRIGGER IF EXISTS questions_usage_rollup_stale_days_on_update ON questions"
+    )
+    op.execute("DROP FUNCTION IF EXISTS mark_usage_rollup_stale_days_on_update()")
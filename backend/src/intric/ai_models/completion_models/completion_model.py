@@ -47,12 +47,16 @@ class FunctionCall:
 @dataclass
 class Completion:
     reasoning_token_count: Optional[int] = 0
+    # Input tokens read from the provider's prompt cache
+    cached_token_count: Optional[int] = 0
     text: Optional[str] = None
     reference_chunks: Optional[list[InfoBlobChunkInDBWithScore]] = None
     tool_call: Optional[FunctionCall] = None
     image_data: Optional[bytes] = None
     response_type: Optional[ResponseType] = None
     generated_file: Optional[File] = None
+    # Set on the events sent while waiting in the queue of the model
+    queue_position: Optional[int] = None
     stop: bool = False
 
 
@@ -73,6 +77,8 @@ class CompletionModelBase(BaseModel):
     vision: bool
     reasoning: bool
     base_url: Optional[str] = None
+    tokens_per_minute: Optional[int] = None
+    fallback_models: Optional[list[str]] = None
 
 
 class CompletionModelCreate(CompletionModelBase):
@@ -122,6 +128,8 @@ class CompletionModelPublic(CompletionModel):
             vision=completion_model.vision,
             reasoning=completion_model.reasoning,
             base_url=completion_model.base_url,
+            tokens_per_minute=completion_model.tokens_per_minute,
+            fallback_models=completion_model.fallback_models,
             is_org_enabled=completion_model.is_org_enabled,
             is_org_default=completion_model.is_org_default,
             can_access=completion_model.can_access,
@@ -155,6 +163,8 @@ class Context(BaseModel):
     input: str
     token_count: int = 0
     prompt: str = ""
+    # The start of `prompt` that is the same on every request, and can be cached
+    cacheable_prompt: str = ""
     messages: list[Message] = []
     images: list[File] = []
     function_definitions: list[FunctionDefinition] = []
@@ -1,6 +1,6 @@
 # MIT License
 
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 
 from pydantic import AliasPath, BaseModel, Field
@@ -57,3 +57,9 @@ class ConversationInsightRequest(BaseModel):
 class ConversationInsightResponse(BaseModel):
     total_conversations: int
     total_questions: int
+
+
+class ConversationCounts(BaseModel):
+    conversations: int
+    questions: int
+    day: Optional[date] = None
@@ -8,6 +8,7 @@ import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from intric.analysis.analysis import ConversationCounts
 from intric.database.tables.assistant_table import Assistants
 from intric.database.tables.group_chats_table import GroupChatsTable
 from intric.database.tables.info_blobs_table import InfoBlobs
@@ -17,8 +18,14 @@ from intric.database.tables.questions_table import (
     QuestionsFiles,
 )
 from intric.database.tables.sessions_table import Sessions
+from intric.database.tables.usage_rollups_table import (
+    UsageDailyRollups,
+    UsageRollupWatermarks,
+)
 from intric.database.tables.users_table import Users
 from intric.sessions.session import SessionInDB
+from intric.token_usage.domain.token_usage_models import UsageSource
+from intric.token_usage.infrastructure.usage_rollup_repo import start_of_day
 
 
 class AnalysisRepository:
@@ -48,7 +55,170 @@ class AnalysisRepository:
         return await self._get_count(Sessions, tenant_id=tenant_id)
 
     async def get_question_count(self, tenant_id: UUID = None):
-        return await self._get_count(Questions, tenant_id=tenant_id)
+        """Count the questions, of the tenant if given.
+
+        Questions are counted by the tenant they were asked in, like in the
+        token usage, so the questions of services, that have no session, are
+        included. Deleted questions are not counted.
+        """
+        if tenant_id is None:
+            return await self._get_count(Questions)
+
+        rolled_up_until = await self.session.scalar(
+            sa.select(UsageRollupWatermarks.rolled_up_until).where(
+                UsageRollupWatermarks.source == UsageSource.QUESTIONS.value
+            )
+        )
+
+        recent_stmt = (
+            sa.select(sa.func.count())
+            .select_from(Questions)
+            .where(Questions.tenant_id == tenant_id)
+        )
+
+        if rolled_up_until is None:
+            return await self.session.scalar(recent_stmt)
+
+        # Whole days are counted from the usage rollups, so only the
+        # questions asked since the last rollup are counted row by row
+        rolled_up_count = await self.session.scalar(
+            sa.select(sa.func.coalesce(sa.func.sum(UsageDailyRollups.request_count), 0))
+            .where(UsageDailyRollups.source == UsageSource.QUESTIONS.value)
+            .where(UsageDailyRollups.tenant_id == tenant_id)
+            .where(UsageDailyRollups.day < rolled_up_until)
+        )
+        recent_count = await self.session.scalar(
+            recent_stmt.where(Questions.created_at >= start_of_day(rolled_up_until))
+        )
+
+        return rolled_up_count + recent_count
+
+    async def _get_conversation_counts(
+        self,
+        session_filter: sa.ColumnElement[bool],
+        from_date: datetime = None,
+        to_date: datetime = None,
+        group_by_day: bool = False,
+    ) -> list[ConversationCounts]:
+        day = sa.cast(Sessions.created_at, sa.Date)
+
+        stmt = (
+            sa.select(
+                sa.func.count(sa.distinct(Sessions.id)),
+                sa.func.count(Questions.id),
+            )
+            .select_from(Sessions)
+            .outerjoin(Questions, Questions.session_id == Sessions.id)
+            .where(session_filter)
+        )
+
+        if from_date is not None:
+            stmt = stmt.where(Sessions.created_at >= from_date)
+
+        if to_date is not None:
+            stmt = stmt.where(Sessions.created_at <= to_date)
+
+        if group_by_day:
+            stmt = stmt.add_columns(day).group_by(day).order_by(day)
+
+        rows = await self.session.execute(stmt)
+
+        return [
+            ConversationCounts(
+                conversations=row[0],
+                questions=row[1],
+                day=row[2] if group_by_day else None,
+            )
+            for row in rows
+        ]
+
+    async def get_assistant_conversation_counts(
+        self,
+        assistant_id: UUID,
+        from_date: datetime = None,
+        to_date: datetime = None,
+        group_by_day: bool = False,
+    ) -> list[ConversationCounts]:
+        return await self._get_conversation_counts(
+            Sessions.assistant_id == assistant_id,
+            from_date=from_date,
+            to_date=to_date,
+            group_by_day=group_by_day,
+        )
+
+    async def get_group_chat_conversation_counts(
+        self,
+        group_chat_id: UUID,
+        from_date: datetime = None,
+        to_date: datetime = None,
+        group_by_day: bool = False,
+    ) -> list[ConversationCounts]:
+        return await self._get_conversation_counts(
+            Sessions.group_chat_id == group_chat_id,
+            from_date=from_date,
+            to_date=to_date,
+            group_by_day=group_by_day,
+        )
+
+    async def _get_question_texts(
+        self,
+        session_filter: sa.ColumnElement[bool],
+        from_date: datetime = None,
+        to_date: datetime = None,
+        include_followups: bool = False,
+    ) -> list[str]:
+        stmt = (
+            sa.select(Questions.question, Questions.created_at)
+            .join(Sessions, Questions.session_id == Sessions.id)
+            .where(session_filter)
+        )
+
+        if from_date is not None:
+            stmt = stmt.where(Sessions.created_at >= from_date)
+
+        if to_date is not None:
+            stmt = stmt.where(Sessions.created_at <= to_date)
+
+        if not include_followups:
+            # Only the first question of every session
+            stmt = stmt.distinct(Questions.session_id).order_by(
+                Questions.session_id, Questions.created_at
+            )
+
+        subquery = stmt.subquery()
+        questions = await self.session.scalars(
+            sa.select(subquery.c.question).order_by(subquery.c.created_at)
+        )
+
+        return list(questions)
+
+    async def get_assistant_question_texts_since(
+        self,
+        assistant_id: UUID,
+        from_date: datetime = None,
+        to_date: datetime = None,
+        include_followups: bool = False,
+    ) -> list[str]:
+        return await self._get_question_texts(
+            Sessions.assistant_id == assistant_id,
+            from_date=from_date,
+            to_date=to_date,
+            include_followups=include_followups,
+        )
+
+    async def get_group_chat_question_texts_since(
+        self,
+        group_chat_id: UUID,
+        from_date: datetime = None,
+        to_date: datetime = None,
+        include_followups: bool = False,
+    ) -> list[str]:
+        return await self._get_question_texts(
+            Sessions.group_chat_id == group_chat_id,
+            from_date=from_date,
+            to_date=to_date,
+            include_followups=include_followups,
+        )
 
     async def get_assistant_sessions_since(
         self,
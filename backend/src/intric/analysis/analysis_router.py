@@ -146,6 +146,10 @@ async def ask_question_about_questions(
 
         async def event_stream():
             async for chunk in ai_response.completion:
+                # Skip the events sent while queued for the model
+                if chunk.text is None:
+                    continue
+
                 yield AnalysisAnswer(answer=chunk.text).model_dump_json()
 
         return EventSourceResponse(event_stream())
@@ -212,6 +216,10 @@ async def ask_unified_questions_about_questions(
 
         async def event_stream():
             async for chunk in ai_response.completion:
+                # Skip the events sent while queued for the model
+                if chunk.text is None:
+                    continue
+
                 yield AnalysisAnswer(answer=chunk.text).model_dump_json()
 
         return EventSourceResponse(event_stream())
@@ -5,9 +5,9 @@ from uuid import UUID
 
 from intric.analysis.analysis import ConversationInsightResponse, Counts
 from intric.analysis.analysis_repo import AnalysisRepository
+from intric.analysis.question_analyzer import QuestionAnalyzer
 from intric.assistants.assistant_service import AssistantService
 from intric.completion_models.infrastructure.completion_service import CompletionService
-from intric.completion_models.infrastructure.static_prompts import ANALYSIS_PROMPT
 from intric.group_chat.application.group_chat_service import GroupChatService
 from intric.main.exceptions import BadRequestException, UnauthorizedException
 from intric.main.logging import get_logger
@@ -44,6 +44,7 @@ class AnalysisService:
         self.session_service = session_service
         self.group_chat_service = group_chat_service
         self.completion_service = completion_service
+        self.question_analyzer = QuestionAnalyzer(completion_service=completion_service)
 
     @validate_permissions(Permission.INSIGHTS)
     async def get_tenant_counts(self):
@@ -178,23 +179,21 @@ class AnalysisService:
         include_followup: bool = False,
     ):
         assistant, _ = await self.assistant_service.get_assistant(assistant_id)
+        if assistant.space_id is not None:
+            await self._check_space_permissions(assistant.space_id)
 
-        questions = await self.get_questions_since(
+        questions = await self.repo.get_assistant_question_texts_since(
             assistant_id=assistant_id,
             from_date=from_date,
             to_date=to_date,
             include_followups=include_followup,
         )
 
-        days = (to_date - from_date).days
-        prompt = ANALYSIS_PROMPT.format(days=days)
-        questions_string = "\n".join(f'"""{question.question}"""' for question in questions)
-        prompt = f"{prompt}\n\n{questions_string}"
-
-        ai_response = await assistant.get_response(
+        ai_response = await self.question_analyzer.analyze(
+            assistant=assistant,
             question=question,
-            completion_service=self.completion_service,
-            prompt=prompt,
+            questions=questions,
+            days=(to_date - from_date).days,
             stream=stream,
         )
 
@@ -238,7 +237,10 @@ class AnalysisService:
         if assistant_id:
             await self._check_insight_access(assistant_id=assistant_id)
             assistant, _ = await self.assistant_service.get_assistant(assistant_id)
-            questions = await self.get_questions_since(
+            if assistant.space_id is not None:
+                await self._check_space_permissions(assistant.space_id)
+
+            questions = await self.repo.get_assistant_question_texts_since(
                 assistant_id=assistant_id,
                 from_date=from_date,
                 to_date=to_date,
@@ -258,24 +260,19 @@ class AnalysisService:
             model_to_use = group_chat.assistants[0].assistant
 
             # Get questions for the group chat
-            questions = await self.get_questions_from_group_chat(
+            questions = await self.repo.get_group_chat_question_texts_since(
                 group_chat_id=group_chat_id,
                 from_date=from_date,
                 to_date=to_date,
                 include_followups=include_followup,
             )
 
-        # Format the questions to pass to the LLM
-        days = (to_date - from_date).days
-        prompt = ANALYSIS_PROMPT.format(days=days)
-        questions_string = "\n".join(f'"""{question.question}"""' for question in questions)
-        prompt = f"{prompt}\n\n{questions_string}"
-
-        # Get the AI response
-        ai_response = await model_to_use.get_response(
-            completion_service=self.completion_service,
+        # Get the AI response, summarizing the questions in batches if needed
+        ai_response = await self.question_analyzer.analyze(
+            assistant=model_to_use,
             question=question,
-            prompt=prompt,
+            questions=questions,
+            days=(to_date - from_date).days,
             stream=stream,
         )
 
@@ -427,42 +424,24 @@ class AnalysisService:
         elif group_chat_id:
             await self._check_insight_access(group_chat_id=group_chat_id)
 
-        sessions = []
+        if not (start_time and end_time):
+            end_time = datetime.now()
+            start_time = end_time - timedelta(days=30)
+
         if assistant_id:
-            if start_time and end_time:
-                sessions = await self.repo.get_assistant_sessions_since(
-                    assistant_id=assistant_id,
-                    from_date=start_time,
-                    to_date=end_time,
-                )
-            else:
-                today = datetime.now()
-                last_month = today - timedelta(days=30)
-                sessions = await self.repo.get_assistant_sessions_since(
-                    assistant_id=assistant_id,
-                    from_date=last_month,
-                    to_date=today,
-                )
+            counts = await self.repo.get_assistant_conversation_counts(
+                assistant_id=assistant_id,
+                from_date=start_time,
+                to_date=end_time,
+            )
         else:
-            if start_time and end_time:
-                sessions = await self.repo.get_group_chat_sessions_since(
-                    group_chat_id=group_chat_id,
-                    from_date=start_time,
-                    to_date=end_time,
-                )
-            else:
-                today = datetime.now()
-                last_month = today - timedelta(days=30)
-                sessions = await self.repo.get_group_chat_sessions_since(
-                    group_chat_id=group_chat_id,
-                    from_date=last_month,
-                    to_date=today,
-                )
-
-        # count total questions
-        total_questions = sum(len(session.questions) for session in sessions)
+            counts = await self.repo.get_group_chat_conversation_counts(
+                group_chat_id=group_chat_id,
+                from_date=start_time,
+                to_date=end_time,
+            )
 
         return ConversationInsightResponse(
-            total_conversations=len(sessions),
-            total_questions=total_questions,
+            total_conversations=sum(count.conversations for count in counts),
+            total_questions=sum(count.questions for count in counts),
         )
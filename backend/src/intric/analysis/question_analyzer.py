@@ -0,0 +1,199 @@
+import asyncio
+import re
+from typing import TYPE_CHECKING
+
+from intric.completion_models.infrastructure.context_builder import count_tokens
+from intric.completion_models.infrastructure.static_prompts import (
+    ANALYSIS_MAP_PROMPT,
+    ANALYSIS_PROMPT,
+    ANALYSIS_REDUCE_PROMPT,
+)
+from intric.main.exceptions import NoModelSelectedException, QueryException
+from intric.main.logging import get_logger
+
+if TYPE_CHECKING:
+    from intric.ai_models.completion_models.completion_model import (
+        CompletionModelResponse,
+    )
+    from intric.assistants.assistant import Assistant
+    from intric.completion_models.infrastructure.completion_service import (
+        CompletionService,
+    )
+
+logger = get_logger(__name__)
+
+# Share of the model context that the questions (or summaries) in one request may use
+BATCH_CONTEXT_SHARE = 0.5
+MAX_CONCURRENT_REQUESTS = 5
+
+
+def _normalize(question: str):
+    return re.sub(r"\s+", " ", question).strip().casefold()
+
+
+class QuestionAnalyzer:
+    """
+    Answers a question about the questions asked to an assistant.
+
+    If all questions fit in the context of the model they are sent in one request.
+    Otherwise the questions are split into batches that are summarized concurrently
+    (map), and the summaries are combined into the final answer (reduce).
+    """
+
+    def __init__(
+        self,
+        completion_service: "CompletionService",
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+    ):
+        self.completion_service = completion_service
+        self.max_concurrent_requests = max_concurrent_requests
+
+    @staticmethod
+    def deduplicate(questions: list[str]) -> list[tuple[str, int]]:
+        """Group identical questions, keeping the order they were first asked in."""
+        counts: dict[str, list] = {}
+
+        for question in questions:
+            key = _normalize(question)
+            if not key:
+                continue
+
+            if key in counts:
+                counts[key][1] += 1
+            else:
+                counts[key] = [question.strip(), 1]
+
+        return [(question, count) for question, count in counts.values()]
+
+    @staticmethod
+    def _format_question(question: str, count: int):
+        if count > 1:
+            return f'"""{question}""" (asked {count} times)'
+
+        return f'"""{question}"""'
+
+    @staticmethod
+    def _split_into_batches(texts: list[str], max_tokens: int) -> list[list[str]]:
+        batches = []
+        batch = []
+        batch_tokens = 0
+
+        for text in texts:
+            tokens = count_tokens(text)
+
+            if batch and batch_tokens + tokens > max_tokens:
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+
+            batch.append(text)
+            batch_tokens += tokens
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    @staticmethod
+    def _batch_budget(assistant: "Assistant") -> int:
+        """Tokens that the questions (or summaries) in one request may use.
+
+        The attachments of the assistant are sent with every request.
+        """
+        attachment_tokens = sum(
+            count_tokens(attachment.text)
+            for attachment in assistant.attachments
+            if getattr(attachment, "text", None)
+        )
+        max_tokens = (
+            int(assistant.completion_model.token_limit * BATCH_CONTEXT_SHARE)
+            - attachment_tokens
+        )
+
+        if max_tokens <= 0:
+            raise QueryException(
+                "The attachments of the assistant leave no room for the questions"
+            )
+
+        return max_tokens
+
+    async def _summarize_batches(
+        self,
+        assistant: "Assistant",
+        question: str,
+        prompt: str,
+        batches: list[list[str]],
+    ) -> list[str]:
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def _summarize(batch: list[str]):
+            async with semaphore:
+                response = await assistant.get_response(
+                    question=question,
+                    completion_service=self.completion_service,
+                    prompt="{}\n\n{}".format(prompt, "\n".join(batch)),
+                    stream=False,
+                )
+
+            return f'"""{response.completion.text}"""'
+
+        return await asyncio.gather(*[_summarize(batch) for batch in batches])
+
+    async def analyze(
+        self,
+        assistant: "Assistant",
+        question: str,
+        questions: list[str],
+        days: int,
+        stream: bool = False,
+    ) -> "CompletionModelResponse":
+        texts = [
+            self._format_question(text, count)
+            for text, count in self.deduplicate(questions)
+        ]
+        prompt = ANALYSIS_PROMPT.format(days=days)
+
+        if assistant.completion_model is None:
+            raise NoModelSelectedException()
+
+        if texts:
+            max_tokens = self._batch_budget(assistant)
+            batches = self._split_into_batches(texts, max_tokens=max_tokens)
+
+            if len(batches) > 1:
+                logger.debug(f"Summarizing {len(texts)} questions in {len(batches)} batches")
+
+                texts = await self._summarize_batches(
+                    assistant=assistant,
+                    question=question,
+                    prompt=ANALYSIS_MAP_PROMPT.format(days=days),
+                    batches=batches,
+                )
+                prompt = ANALYSIS_REDUCE_PROMPT.format(days=days)
+
+                # Keep combining summaries until they fit in one request
+                batches = self._split_into_batches(texts, max_tokens=max_tokens)
+                while len(batches) > 1:
+                    texts = await self._summarize_batches(
+                        assistant=assistant,
+                        question=question,
+                        prompt=prompt,
+                        batches=batches,
+                    )
+                    num_batches = len(batches)
+                    batches = self._split_into_batches(texts, max_tokens=max_tokens)
+
+                    if len(batches) >= num_batches:
+                        raise QueryException(
+                            "The questions could not be summarized to fit in the context "
+                            "of the model"
+                        )
+
+        texts_string = "\n".join(texts)
+
+        return await assistant.get_response(
+            question=question,
+            completion_service=self.completion_service,
+            prompt=f"{prompt}\n\n{texts_string}",
+            stream=stream,
+        )
@@ -21,7 +21,7 @@ class AppRunRepository:
             selectinload(AppRuns.user),
             selectinload(AppRuns.input_files)
             .selectinload(AppRunsFiles.file)
-            .options(defer(Files.blob)),
+            .options(defer(Files.legacy_blob)),
             selectinload(AppRuns.job),
         ]
 
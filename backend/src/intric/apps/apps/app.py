@@ -251,9 +251,7 @@ class App:
 
         audio_files = [file for file in files if AudioMimeTypes.has_value(file.mimetype)]
 
-        transcriptions = [
-            await transcriber.transcribe(file, self.transcription_model) for file in audio_files
-        ]
+        transcriptions = await transcriber.transcribe_files(audio_files, self.transcription_model)
 
         text_files = [file for file in files if TextMimeTypes.has_value(file.mimetype)]
 
@@ -0,0 +1,149 @@
+"""Reuse of answers to the first question of new sessions.
+
+Published assistants get many near-identical first questions. When an
+assistant has the answer cache enabled, the answer to a question is reused for
+later questions whose embeddings are similar enough. Answers are only reused
+while everything else they depend on is the same: the prompt, the model and
+its settings, the attachments and the content of the knowledge.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional
+
+from intric.info_blobs.content_cache import hash_text
+from intric.main.config import get_settings
+from intric.main.exceptions import NotFoundException
+from intric.main.logging import get_logger
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from intric.assistants.answer_cache_repo import AnswerCacheRepository, CachedAnswer
+    from intric.assistants.assistant import Assistant
+    from intric.embedding_models.domain.embedding_model import EmbeddingModel
+    from intric.embedding_models.infrastructure.create_embeddings_service import (
+        CreateEmbeddingsService,
+    )
+    from intric.info_blobs.info_blob_repo import InfoBlobRepository
+    from intric.spaces.space import Space
+    from intric.users.user import UserInDB
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class AnswerCacheLookup:
+    assistant_id: "UUID"
+    cache_key: str
+    embedding: list[float]
+    cached: Optional["CachedAnswer"]
+
+
+class AnswerCacheService:
+    def __init__(
+        self,
+        user: "UserInDB",
+        answer_cache_repo: "AnswerCacheRepository",
+        info_blob_repo: "InfoBlobRepository",
+        create_embeddings_service: "CreateEmbeddingsService",
+    ):
+        self.user = user
+        self.answer_cache_repo = answer_cache_repo
+        self.info_blob_repo = info_blob_repo
+        self.create_embeddings_service = create_embeddings_service
+
+    @staticmethod
+    def _get_embedding_model(
+        assistant: "Assistant", space: "Space"
+    ) -> Optional["EmbeddingModel"]:
+        knowledge = [
+            *assistant.websites,
+            *assistant.collections,
+            *assistant.integration_knowledge_list,
+        ]
+        if knowledge:
+            return knowledge[0].embedding_model
+
+        try:
+            return space.get_latest_embedding_model()
+        except NotFoundException:
+            return None
+
+    async def _get_cache_key(
+        self, assistant: "Assistant", embedding_model: "EmbeddingModel", version: int
+    ) -> str:
+        knowledge_stamp = await self.info_blob_repo.get_content_stamp(
+            group_ids=[collection.id for collection in assistant.collections],
+            website_ids=[website.id for website in assistant.websites],
+            integration_knowledge_ids=[
+                knowledge.id for knowledge in assistant.integration_knowledge_list
+            ],
+        )
+        scope = {
+            "prompt": hash_text(assistant.get_prompt_text()),
+            "completion_model_id": assistant.completion_model.id,
+            "completion_model_kwargs": assistant.completion_model_kwargs.model_dump(),
+            "attachment_ids": sorted(attachment.id for attachment in assistant.attachments),
+            "embedding_model_id": embedding_model.id,
+            "knowledge": knowledge_stamp,
+            "version": version,
+        }
+
+        return hash_text(json.dumps(scope, sort_keys=True, default=str))
+
+    async def lookup(
+        self, question: str, assistant: "Assistant", space: "Space", version: int
+    ) -> Optional[AnswerCacheLookup]:
+        """Find a cached answer to the question.
+
+        Returns None if the question can not be cached, otherwise the lookup,
+        with `cached` set on a hit. On a miss the lookup is passed to `add`
+        with the question that is answered.
+        """
+        embedding_model = self._get_embedding_model(assistant, space)
+        if embedding_model is None:
+            return None
+
+        cache_key = await self._get_cache_key(assistant, embedding_model, version)
+
+        try:
+            embedding = await self.create_embeddings_service.get_embedding_for_query(
+                model=embedding_model, query=question
+            )
+        except Exception as e:
+            logger.warning(f"Could not embed the question for the answer cache: {e}")
+            return None
+
+        cached = await self.answer_cache_repo.find(
+            assistant_id=assistant.id,
+            cache_key=cache_key,
+            embedding=list(embedding),
+            max_distance=1 - get_settings().answer_cache_similarity_threshold,
+            created_after=self._expired_before(),
+        )
+
+        return AnswerCacheLookup(
+            assistant_id=assistant.id,
+            cache_key=cache_key,
+            embedding=list(embedding),
+            cached=cached,
+        )
+
+    async def add(self, lookup: AnswerCacheLookup, question_id: "UUID"):
+        await self.answer_cache_repo.delete_created_before(
+            assistant_id=lookup.assistant_id, created_before=self._expired_before()
+        )
+        await self.answer_cache_repo.add(
+            tenant_id=self.user.tenant_id,
+            assistant_id=lookup.assistant_id,
+            cache_key=lookup.cache_key,
+            embedding=lookup.embedding,
+            question_id=question_id,
+        )
+
+    @staticmethod
+    def _expired_before() -> datetime:
+        max_age = timedelta(hours=get_settings().answer_cache_max_age_hours)
+        return datetime.now(timezone.utc) - max_age
@@ -0,0 +1,109 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+from uuid import UUID
+
+import sqlalchemy as sa
+from pydantic import BaseModel
+from sqlalchemy.orm import selectinload
+
+from intric.database.tables.answer_cache_table import AnswerCache
+from intric.database.tables.collections_table import CollectionsTable
+from intric.database.tables.info_blobs_table import InfoBlobs
+from intric.database.tables.questions_table import InfoBlobReferences, Questions
+from intric.info_blobs.info_blob import InfoBlobInDB, InfoBlobInDBWithScore
+
+if TYPE_CHECKING:
+    from intric.database.database import AsyncSession
+
+
+class CachedAnswer(BaseModel):
+    question_id: UUID
+    answer: str
+    info_blobs: list[InfoBlobInDBWithScore]
+
+
+class AnswerCacheRepository:
+    """Answers of assistants by the embedding of the question they answered."""
+
+    def __init__(self, session: "AsyncSession"):
+        self.session = session
+
+    async def _get_references(self, question_id: UUID) -> list[InfoBlobInDBWithScore]:
+        stmt = (
+            sa.select(InfoBlobs, InfoBlobReferences.similarity_score)
+            .join(InfoBlobReferences, InfoBlobReferences.info_blob_id == InfoBlobs.id)
+            .where(InfoBlobReferences.question_id == question_id)
+            .order_by(InfoBlobReferences.order, InfoBlobReferences.similarity_score.desc())
+            .options(
+                selectinload(InfoBlobs.group).selectinload(CollectionsTable.embedding_model),
+                selectinload(InfoBlobs.website),
+            )
+        )
+        rows = await self.session.execute(stmt)
+
+        return [
+            InfoBlobInDBWithScore(
+                **InfoBlobInDB.model_validate(info_blob).model_dump(), score=score
+            )
+            for info_blob, score in rows
+        ]
+
+    async def find(
+        self,
+        *,
+        assistant_id: UUID,
+        cache_key: str,
+        embedding: list[float],
+        max_distance: float,
+        created_after: datetime,
+    ) -> Optional[CachedAnswer]:
+        distance = AnswerCache.embedding.cosine_distance(embedding)
+        stmt = (
+            sa.select(Questions.id, Questions.answer)
+            .join(AnswerCache, AnswerCache.question_id == Questions.id)
+            .where(
+                AnswerCache.assistant_id == assistant_id,
+                AnswerCache.cache_key == cache_key,
+                AnswerCache.created_at > created_after,
+                distance <= max_distance,
+            )
+            .order_by(distance)
+            .limit(1)
+        )
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
+            return None
+
+        question_id, answer = row
+        return CachedAnswer(
+            question_id=question_id,
+            answer=answer,
+            info_blobs=await self._get_references(question_id),
+        )
+
+    async def add(
+        self,
+        *,
+        tenant_id: UUID,
+        assistant_id: UUID,
+        cache_key: str,
+        embedding: list[float],
+        question_id: UUID,
+    ):
+        stmt = sa.insert(AnswerCache).values(
+            tenant_id=tenant_id,
+            assistant_id=assistant_id,
+            cache_key=cache_key,
+            embedding=embedding,
+            question_id=question_id,
+        )
+
+        await self.session.execute(stmt)
+
+    async def delete_created_before(self, *, assistant_id: UUID, created_before: datetime):
+        stmt = sa.delete(AnswerCache).where(
+            AnswerCache.assistant_id == assistant_id,
+            AnswerCache.created_at <= created_before,
+        )
+
+        await self.session.execute(stmt)
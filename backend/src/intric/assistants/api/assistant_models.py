@@ -118,6 +118,13 @@ class AssistantUpdatePublic(AssistantCreatePublic):
             "appropriate permissions can see all sessions for this assistant."
         ),
     )
+    answer_cache_enabled: Optional[bool] = Field(
+        default=None,
+        description=(
+            "Whether answers to the first question of new sessions are reused "
+            "for sufficiently similar questions."
+        ),
+    )
     data_retention_days: Optional[int] = None
     metadata_json: Optional[dict] = Field(
         default=NOT_PROVIDED,
@@ -216,6 +223,13 @@ class AssistantPublic(InDB, ResourcePermissionsMixin):
             "appropriate permissions can see all sessions for this assistant."
         ),
     )
+    answer_cache_enabled: bool = Field(
+        default=False,
+        description=(
+            "Whether answers to the first question of new sessions are reused "
+            "for sufficiently similar questions."
+        ),
+    )
     data_retention_days: Optional[int] = Field(
         default=None,
         description="Number of days to retain data for this assistant",
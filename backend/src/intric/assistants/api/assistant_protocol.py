@@ -128,10 +128,17 @@ def to_sse_response(chunk: Completion, session_id: "UUID"):
         )
 
     if chunk.response_type == ResponseType.INTRIC_EVENT:
-        data = SSEIntricEvent(
-            session_id=session_id,
-            intric_event_type=IntricEventType.GENERATING_IMAGE,
-        )
+        if chunk.queue_position is not None:
+            data = SSEIntricEvent(
+                session_id=session_id,
+                intric_event_type=IntricEventType.QUEUED,
+                queue_position=chunk.queue_position,
+            )
+        else:
+            data = SSEIntricEvent(
+                session_id=session_id,
+                intric_event_type=IntricEventType.GENERATING_IMAGE,
+            )
 
     return ServerSentEvent(data.model_dump_json(), event=chunk.response_type.value)
 
@@ -156,6 +156,7 @@ async def update_assistant(
         integration_knowledge_ids=integration_knowledge_ids,
         description=description,
         insight_enabled=assistant.insight_enabled,
+        answer_cache_enabled=assistant.answer_cache_enabled,
         data_retention_days=assistant.data_retention_days,
         metadata_json=metadata_json,
     )
@@ -30,6 +30,7 @@ if TYPE_CHECKING:
     from intric.integration.domain.entities.integration_knowledge import (
         IntegrationKnowledge,
     )
+    from intric.services.service import DatastoreResult
     from intric.templates.assistant_template.assistant_template import AssistantTemplate
     from intric.websites.domain.website import Website
 
@@ -65,6 +66,7 @@ class Assistant(Entity):
         insight_enabled: bool = False,
         data_retention_days: Optional[int] = None,
         metadata_json: Optional[dict] = {},
+        answer_cache_enabled: bool = False,
     ):
         super().__init__(id=id, created_at=created_at, updated_at=updated_at)
 
@@ -87,6 +89,7 @@ class Assistant(Entity):
         self.tool_assistants = tool_assistants or []
         self.description = description
         self.insight_enabled = insight_enabled
+        self.answer_cache_enabled = answer_cache_enabled
         self.data_retention_days = data_retention_days
         self.type = AssistantType.DEFAULT_ASSISTANT if is_default else AssistantType.ASSISTANT
         self._metadata_json = metadata_json
@@ -222,6 +225,7 @@ class Assistant(Entity):
         insight_enabled: bool | None = None,
         data_retention_days: Union[int, None, NotProvided] = NOT_PROVIDED,
         metadata_json: Union[dict, None, NotProvided] = NOT_PROVIDED,
+        answer_cache_enabled: bool | None = None,
     ):
         if name is not None:
             self.name = name
@@ -255,6 +259,9 @@ class Assistant(Entity):
         if insight_enabled is not None:
             self.insight_enabled = insight_enabled
 
+        if answer_cache_enabled is not None:
+            self.answer_cache_enabled = answer_cache_enabled
+
         if data_retention_days is not NOT_PROVIDED:
             self.data_retention_days = data_retention_days
 
@@ -295,6 +302,26 @@ class Assistant(Entity):
             model_kwargs=model_kwargs,
         )
 
+    async def get_references(
+        self,
+        question: str,
+        references_service: "ReferencesService",
+        session: Optional["SessionInDB"] = None,
+        version: int = 1,
+    ) -> "DatastoreResult":
+        # Fill half the context
+        num_chunks = self.completion_model.token_limit // 200 // 2 if version == 2 else 30
+
+        return await references_service.get_references(
+            question=question,
+            session=session,
+            collections=self.collections,
+            websites=self.websites,
+            integration_knowledge_list=self.integration_knowledge_list,
+            num_chunks=num_chunks,
+            version=version,
+        )
+
     async def ask(
         self,
         question: str,
@@ -305,6 +332,7 @@ class Assistant(Entity):
         stream: bool = False,
         version: int = 1,
         web_search_results: list["WebSearchResult"] = [],
+        datastore_result: Optional["DatastoreResult"] = None,
     ):
         if any([file.file_type == FileType.IMAGE for file in files]):
             if not self.completion_model.vision:
@@ -312,18 +340,13 @@ class Assistant(Entity):
                     f"Completion model {self.completion_model.name} do not support vision."
                 )
 
-        # Fill half the context
-        num_chunks = self.completion_model.token_limit // 200 // 2 if version == 2 else 30
-
-        datastore_result = await references_service.get_references(
-            question=question,
-            session=session,
-            collections=self.collections,
-            websites=self.websites,
-            integration_knowledge_list=self.integration_knowledge_list,
-            num_chunks=num_chunks,
-            version=version,
-        )
+        if datastore_result is None:
+            datastore_result = await self.get_references(
+                question=question,
+                references_service=references_service,
+                session=session,
+                version=version,
+            )
 
         response = await completion_service.get_response(
             model=self.completion_model,
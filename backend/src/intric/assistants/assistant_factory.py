@@ -133,6 +133,7 @@ class AssistantFactory:
             is_default=assistant_in_db.is_default,
             description=assistant_in_db.description,
             insight_enabled=assistant_in_db.insight_enabled,
+            answer_cache_enabled=assistant_in_db.answer_cache_enabled,
         )
 
     def create_space_assistant_from_db(
@@ -210,6 +211,7 @@ class AssistantFactory:
             is_default=assistant_in_db.is_default,
             description=assistant_in_db.description,
             insight_enabled=assistant_in_db.insight_enabled,
+            answer_cache_enabled=assistant_in_db.answer_cache_enabled,
             data_retention_days=assistant_in_db.data_retention_days,
             metadata_json=assistant_in_db.metadata_json,
         )
@@ -335,6 +335,7 @@ class AssistantRepository:
                 description=assistant.description,
                 type=assistant.type,
                 insight_enabled=assistant.insight_enabled,
+                answer_cache_enabled=assistant.answer_cache_enabled,
                 data_retention_days=assistant.data_retention_days,
                 metadata_json=assistant.metadata_json,
             )
@@ -1,9 +1,12 @@
+import asyncio
 import re
+import time
 from datetime import datetime
-from typing import TYPE_CHECKING, Optional, Union
+from typing import TYPE_CHECKING, Awaitable, Optional, TypeVar, Union
 from uuid import UUID
 
 from intric.ai_models.completion_models.completion_model import (
+    Completion,
     ModelKwargs,
     ResponseType,
 )
@@ -16,6 +19,7 @@ from intric.completion_models.infrastructure.context_builder import count_tokens
 from intric.completion_models.infrastructure.web_search import WebSearch
 from intric.files.file_service import FileService
 from intric.main.exceptions import BadRequestException, UnauthorizedException
+from intric.main.logging import get_logger
 from intric.main.models import NOT_PROVIDED, NotProvided
 from intric.prompts.api.prompt_models import PromptCreate
 from intric.prompts.prompt import Prompt
@@ -41,6 +45,8 @@ if TYPE_CHECKING:
         CompletionModel,
         CompletionModelResponse,
     )
+    from intric.assistants.answer_cache import AnswerCacheLookup, AnswerCacheService
+    from intric.assistants.answer_cache_repo import CachedAnswer
     from intric.assistants.references import ReferencesService
     from intric.completion_models.application import CompletionModelCRUDService
     from intric.completion_models.infrastructure.completion_service import (
@@ -50,7 +56,10 @@ if TYPE_CHECKING:
         WebSearchResult,
     )
     from intric.files.file_models import File
-    from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
+    from intric.info_blobs.info_blob import (
+        InfoBlobChunkInDBWithScore,
+        InfoBlobInDBWithScore,
+    )
     from intric.integration.domain.repositories.integration_knowledge_repo import (
         IntegrationKnowledgeRepository,
     )
@@ -61,6 +70,10 @@ if TYPE_CHECKING:
     from intric.spaces.space import Space
     from intric.spaces.space_repo import SpaceRepository
 
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
 AT_TAG_PATTERN = r"<intric-at-tag: @[^>]+>"
 REFERENCE_PATTERN = r'<inref id="([0-9a-f]{8})"/>'  # noqa
 
@@ -89,6 +102,35 @@ def get_references(
     return [blob for blob in blobs if blob is not None]
 
 
+async def _replay_answer(
+    answer: str, info_blobs: list["InfoBlobInDBWithScore"], version: int
+):
+    """Stream a cached answer word by word, like a completion."""
+    response_string = ""
+    for text in re.findall(r"\s*\S+\s*", answer):
+        response_string = f"{response_string}{text}"
+        yield Completion(
+            text=text,
+            response_type=ResponseType.TEXT,
+            reference_chunks=get_references(
+                response_string=response_string, info_blobs=info_blobs, version=version
+            ),
+        )
+
+
+async def _gather_or_cancel(*awaitables: Awaitable):
+    """Like asyncio.gather, but if one fails the others are cancelled and
+    awaited, so that none is left using the database session."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
 class AssistantService:
     def __init__(
         self,
@@ -109,6 +151,7 @@ class AssistantService:
         integration_knowledge_repo: "IntegrationKnowledgeRepository",
         completion_service: "CompletionService",
         references_service: "ReferencesService",
+        answer_cache_service: "AnswerCacheService",
     ):
         self.repo = repo
         self.space_repo = space_repo
@@ -127,9 +170,10 @@ class AssistantService:
         self.integration_knowledge_repo = integration_knowledge_repo
         self.completion_service = completion_service
         self.references_service = references_service
+        self.answer_cache_service = answer_cache_service
 
     @property
-    async def web_search(self):
+    def web_search(self):
         return WebSearch()
 
     def validate_space_assistant(self, space: "Space", assistant: Assistant):
@@ -278,6 +322,7 @@ class AssistantService:
         insight_enabled: Optional[bool] = None,
         data_retention_days: Union[int, None, NotProvided] = NOT_PROVIDED,
         metadata_json: Union[dict, None, NotProvided] = NOT_PROVIDED,
+        answer_cache_enabled: Optional[bool] = None,
     ):
         if logging_enabled:
             validate_permission(self.user, Permission.ADMIN)
@@ -336,6 +381,7 @@ class AssistantService:
             insight_enabled=insight_enabled,
             data_retention_days=data_retention_days,
             metadata_json=metadata_json,
+            answer_cache_enabled=answer_cache_enabled,
         )
 
         self.validate_space_assistant(space=space, assistant=assistant)
@@ -418,23 +464,25 @@ class AssistantService:
         datastore_result: "DatastoreResult",
         question: str,
         files: list["File"],
-        completion_model: "CompletionModel",
         session: "SessionInDB",
         stream: bool,
         assistant_id: UUID,
         version: int = 1,
         web_search_results: list["WebSearchResult"] = [],
         assistant_selector_tokens: int = 0,
+        answer_cache_lookup: Optional["AnswerCacheLookup"] = None,
     ):
         if stream:
 
             async def response_stream():
                 reasoning_token_count = 0
+                cached_token_count = 0
                 response_string = ""
                 generated_files = []
 
                 async for chunk in response.completion:
-                    reasoning_token_count = chunk.reasoning_token_count
+                    reasoning_token_count = chunk.reasoning_token_count or reasoning_token_count
+                    cached_token_count = chunk.cached_token_count or cached_token_count
 
                     if chunk.response_type == ResponseType.TEXT:
                         response_string = f"{response_string}{chunk.text}"
@@ -463,13 +511,16 @@ class AssistantService:
                     get_id_func=lambda chunk: chunk.info_blob_id,
                 )
                 total_response_tokens = count_tokens(response_string) + reasoning_token_count
-                await self.session_service.add_question_to_session(
+                question_in_db = await self.session_service.add_question_to_session(
                     question=question,
                     answer=response_string,
                     num_tokens_question=response.total_token_count + assistant_selector_tokens,
                     num_tokens_answer=total_response_tokens,
+                    num_tokens_cached=cached_token_count,
                     session=session,
-                    completion_model=completion_model,
+                    # The model that answered, which is a fallback if the
+                    # assistant's model could not be used
+                    completion_model=response.model,
                     info_blob_chunks=reference_chunks,
                     files=files,
                     generated_files=generated_files,
@@ -478,15 +529,22 @@ class AssistantService:
                     web_search_results=web_search_results,
                 )
 
+                if answer_cache_lookup is not None and response_string and not generated_files:
+                    await self.answer_cache_service.add(
+                        answer_cache_lookup, question_id=question_in_db.id
+                    )
+
             return response_stream()
         else:
             reasoning_token_count = 0
+            cached_token_count = 0
             final_answer = ""
             generated_files = []
 
             if response.completion is not None:
                 answer = response.completion
                 reasoning_token_count = answer.reasoning_token_count
+                cached_token_count = answer.cached_token_count
                 final_answer = answer.text
 
             reference_chunks = get_references(
@@ -496,20 +554,26 @@ class AssistantService:
                 get_id_func=lambda chunk: chunk.info_blob_id,
             )
             total_response_tokens = count_tokens(final_answer) + reasoning_token_count
-            await self.session_service.add_question_to_session(
+            question_in_db = await self.session_service.add_question_to_session(
                 question=question,
                 answer=final_answer,
                 num_tokens_question=response.total_token_count + assistant_selector_tokens,
                 num_tokens_answer=total_response_tokens,
+                num_tokens_cached=cached_token_count,
                 files=files,
                 generated_files=generated_files,
-                completion_model=completion_model,
+                completion_model=response.model,
                 info_blob_chunks=reference_chunks,
                 session=session,
                 logging_details=response.extended_logging,
                 assistant_id=assistant_id,
             )
 
+            if answer_cache_lookup is not None and final_answer:
+                await self.answer_cache_service.add(
+                    answer_cache_lookup, question_id=question_in_db.id
+                )
+
             return final_answer
 
     async def _check_assistant_models(self, assistant: "Assistant", space: "Space"):
@@ -528,6 +592,89 @@ class AssistantService:
                     f"Embedding Model {item.embedding_model.name} is not in space."
                 )
 
+    async def _get_or_create_session(
+        self,
+        question: str,
+        files: list["File"],
+        assistant_id: "UUID",
+        max_history_tokens: int,
+        session_id: Optional["UUID"] = None,
+        group_chat_id: Optional["UUID"] = None,
+    ) -> "SessionInDB":
+        if session_id is not None:
+            if group_chat_id is not None:
+                return await self.session_service.get_session_with_history(
+                    id=session_id,
+                    max_history_tokens=max_history_tokens,
+                    group_chat_id=group_chat_id,
+                )
+
+            return await self.session_service.get_session_with_history(
+                id=session_id,
+                max_history_tokens=max_history_tokens,
+                assistant_id=assistant_id,
+            )
+
+        # Set the name as the question or the filenames
+        name = question
+        if not name and files:
+            name = " ".join(file.name for file in files)
+        if group_chat_id is not None:
+            return await self.session_service.create_session(
+                name=name, group_chat_id=group_chat_id
+            )
+
+        return await self.session_service.create_session(name=name, assistant_id=assistant_id)
+
+    async def _answer_from_cache(
+        self,
+        question: str,
+        cached: "CachedAnswer",
+        active_assistant: "Assistant",
+        assistant_to_ask: "Assistant",
+        stream: bool,
+        version: int,
+    ) -> AssistantResponse:
+        session = await self._get_or_create_session(
+            question=question, files=[], assistant_id=active_assistant.id, max_history_tokens=0
+        )
+        # Recorded like any other question, with the references of the cached
+        # answer. No completion was made, only the question was embedded.
+        await self.session_service.add_question_to_session(
+            question=question,
+            answer=cached.answer,
+            num_tokens_question=count_tokens(question),
+            num_tokens_answer=0,
+            session=session,
+            completion_model=assistant_to_ask.completion_model,
+            info_blob_chunks=[],
+            assistant_id=assistant_to_ask.id,
+            references_from_question_id=cached.question_id,
+        )
+
+        if stream:
+            answer = _replay_answer(cached.answer, info_blobs=cached.info_blobs, version=version)
+            info_blobs = cached.info_blobs
+        else:
+            answer = cached.answer
+            info_blobs = get_references(
+                response_string=cached.answer, info_blobs=cached.info_blobs, version=version
+            )
+
+        return AssistantResponse(
+            question=question,
+            files=[],
+            session=session,
+            answer=answer,
+            info_blobs=info_blobs,
+            completion_model=assistant_to_ask.completion_model,
+            tools=UseTools(
+                assistants=[ToolAssistant(id=assistant_to_ask.id, handle=assistant_to_ask.name)]
+            ),
+            description=assistant_to_ask.description,
+            web_search_results=[],
+        )
+
     async def ask(
         self,
         question: str,
@@ -566,38 +713,86 @@ class AssistantService:
             assistant_to_ask = active_assistant
 
         cleaned_question = clean_intric_tag(question)
-        files = await self.file_service.get_files_by_ids(file_ids=file_ids)
 
-        if session_id is not None:
-            if group_chat_id is not None:
-                session = await self.session_service.get_session_by_uuid(
-                    id=session_id, group_chat_id=group_chat_id
-                )
-            else:
-                session = await self.session_service.get_session_by_uuid(
-                    id=session_id, assistant_id=assistant_id
-                )
-        else:
-            # Set the name as the question or the filenames
-            name = question
-            if not name and files:
-                name = " ".join(file.name for file in files)
-            if group_chat_id is not None:
-                session = await self.session_service.create_session(
-                    name=name, group_chat_id=group_chat_id
-                )
-            else:
-                session = await self.session_service.create_session(
-                    name=name, assistant_id=active_assistant.id
+        # Only the first question of a new session, without files or web
+        # search, can be answered from the answer cache
+        answer_cache_lookup = None
+        if (
+            assistant_to_ask.answer_cache_enabled
+            and session_id is None
+            and group_chat_id is None
+            and not file_ids
+            and not use_web_search
+        ):
+            answer_cache_lookup = await self.answer_cache_service.lookup(
+                question=cleaned_question, assistant=assistant_to_ask, space=space, version=version
+            )
+            if answer_cache_lookup is not None and answer_cache_lookup.cached is not None:
+                return await self._answer_from_cache(
+                    question=question,
+                    cached=answer_cache_lookup.cached,
+                    active_assistant=active_assistant,
+                    assistant_to_ask=assistant_to_ask,
+                    stream=stream,
+                    version=version,
                 )
 
-        for _question in session.questions:
-            _question.question = clean_intric_tag(_question.question)
+        # Everything before the completion is done as two concurrent branches.
+        # The references depend on the session history, and the session name
+        # on the files, so those are awaited in turn on the request's database
+        # session. The web search only needs the question.
+        timings = {}
+
+        async def _timed(stage: str, awaitable: Awaitable[T]) -> T:
+            start = time.monotonic()
+            try:
+                return await awaitable
+            finally:
+                timings[stage] = time.monotonic() - start
+
+        async def _get_files_session_and_references():
+            files = await _timed("files", self.file_service.get_files_by_ids(file_ids=file_ids))
+            session = await _timed(
+                "session",
+                self._get_or_create_session(
+                    question=question,
+                    files=files,
+                    assistant_id=active_assistant.id,
+                    # Only the history that can fit in the context is loaded
+                    max_history_tokens=assistant_to_ask.completion_model.token_limit,
+                    session_id=session_id,
+                    group_chat_id=group_chat_id,
+                ),
+            )
 
-        if use_web_search and version == 2:
-            web_search_results = await self.web_search.search(search_query=question)
-        else:
-            web_search_results = []
+            for _question in session.questions:
+                _question.question = clean_intric_tag(_question.question)
+
+            datastore_result = await _timed(
+                "references",
+                assistant_to_ask.get_references(
+                    question=cleaned_question,
+                    references_service=self.references_service,
+                    session=session,
+                    version=version,
+                ),
+            )
+
+            return files, session, datastore_result
+
+        async def _search_web():
+            if use_web_search and version == 2:
+                return await _timed("web_search", self.web_search.search(search_query=question))
+
+            return []
+
+        (files, session, datastore_result), web_search_results = await _gather_or_cancel(
+            _get_files_session_and_references(), _search_web()
+        )
+        logger.debug(
+            "Pre-generation stages: %s",
+            ", ".join(f"{stage}={seconds * 1000:.0f}ms" for stage, seconds in timings.items()),
+        )
 
         response, datastore_result = await assistant_to_ask.ask(
             question=cleaned_question,
@@ -608,6 +803,7 @@ class AssistantService:
             stream=stream,
             version=version,
             web_search_results=web_search_results,
+            datastore_result=datastore_result,
         )
 
         # TODO: Separate the response based on stream true or false
@@ -617,13 +813,13 @@ class AssistantService:
             datastore_result=datastore_result,
             question=question,
             files=files,
-            completion_model=assistant_to_ask.completion_model,
             session=session,
             stream=stream,
             assistant_id=assistant_to_ask.id,
             version=version,
             web_search_results=web_search_results,
             assistant_selector_tokens=assistant_selector_tokens,
+            answer_cache_lookup=answer_cache_lookup,
         )
 
         if not stream:
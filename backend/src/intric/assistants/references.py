@@ -69,13 +69,21 @@ class ReferencesService:
     async def _get_info_blobs_from_chunks(
         self, info_blob_chunks: list["InfoBlobChunkInDBWithScore"]
     ) -> list["InfoBlobInDBWithScore"]:
-        info_blobs = []
-        for chunk in info_blob_chunks:
-            info_blob = await self.info_blobs_repo.get(chunk.info_blob_id)
-            info_blob = InfoBlobInDBWithScore(**info_blob.model_dump(), score=chunk.score)
-            info_blobs.append(info_blob)
+        if not info_blob_chunks:
+            return []
+
+        info_blobs = await self.info_blobs_repo.get_by_ids(
+            [chunk.info_blob_id for chunk in info_blob_chunks]
+        )
+        info_blobs_by_id = {info_blob.id: info_blob for info_blob in info_blobs}
 
-        return info_blobs
+        return [
+            InfoBlobInDBWithScore(
+                **info_blobs_by_id[chunk.info_blob_id].model_dump(), score=chunk.score
+            )
+            for chunk in info_blob_chunks
+            if chunk.info_blob_id in info_blobs_by_id
+        ]
 
     def _get_info_blob_chunks_without_duplicates(
         self, info_blob_chunks: list["InfoBlobChunkInDBWithScore"]
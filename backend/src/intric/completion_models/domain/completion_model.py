@@ -48,6 +48,8 @@ class CompletionModel(AIModel):
         reasoning: bool,
         base_url: Optional[str] = None,
         security_classification: Optional[SecurityClassification] = None,
+        tokens_per_minute: Optional[int] = None,
+        fallback_models: Optional[list[str]] = None,
     ):
         super().__init__(
             user=user,
@@ -69,6 +71,8 @@ class CompletionModel(AIModel):
         )
 
         self.base_url = base_url
+        self.tokens_per_minute = tokens_per_minute
+        self.fallback_models = fallback_models or []
         self.is_org_default = is_org_default
         self.reasoning = reasoning
         self.vision = vision
@@ -123,6 +127,8 @@ class CompletionModel(AIModel):
             is_org_default=is_org_default,
             reasoning=completion_model_db.reasoning,
             base_url=completion_model_db.base_url,
+            tokens_per_minute=completion_model_db.tokens_per_minute,
+            fallback_models=completion_model_db.fallback_models,
             security_classification=SecurityClassification.to_domain(
                 db_security_classification=security_classification
             ),
@@ -1,5 +1,3 @@
-import base64
-
 from anthropic import AsyncAnthropic
 
 from intric.ai_models.completion_models.completion_model import (
@@ -12,12 +10,14 @@ from intric.completion_models.infrastructure.adapters.base_adapter import (
     CompletionModelAdapter,
 )
 from intric.files.file_models import File
+from intric.files.image import encoded_images
 from intric.main.config import get_settings
 from intric.main.logging import get_logger
 
 logger = get_logger(__name__)
 
 MAX_TOKENS = 4096
+CACHE_CONTROL = {"type": "ephemeral"}
 
 
 class ClaudeModelAdapter(CompletionModelAdapter):
@@ -43,7 +43,7 @@ class ClaudeModelAdapter(CompletionModelAdapter):
         return self.model.token_limit
 
     def _build_image_input(self, file: File):
-        image_data = base64.b64encode(file.blob).decode("utf-8")
+        image_data = encoded_images.encode(file)
 
         return {
             "type": "image",
@@ -91,6 +91,33 @@ class ClaudeModelAdapter(CompletionModelAdapter):
             for function_definition in context.function_definitions
         ]
 
+    def _build_system(self, context: Context):
+        """The prompt as text blocks, with a cache breakpoint after the part
+        that is the same on every request."""
+        if not context.cacheable_prompt:
+            return context.prompt
+
+        system = [
+            {"type": "text", "text": context.cacheable_prompt, "cache_control": CACHE_CONTROL}
+        ]
+        rest = context.prompt[len(context.cacheable_prompt) :].strip()
+        if rest:
+            system.append({"type": "text", "text": rest})
+
+        return system
+
+    @staticmethod
+    def _add_history_breakpoint(context: Context, messages: list[dict]):
+        # When the whole system prompt is cacheable, the conversation up to
+        # the new question is the same on the next turn, so cache it as well
+        if context.prompt != context.cacheable_prompt or not context.messages:
+            return
+
+        last_answer = messages[-2]
+        last_answer["content"] = [
+            {"type": "text", "text": last_answer["content"], "cache_control": CACHE_CONTROL}
+        ]
+
     def create_query_from_context(self, context: Context):
         previous_messages = [
             message
@@ -118,7 +145,10 @@ class ClaudeModelAdapter(CompletionModelAdapter):
                 ),
             }
         ]
-        return previous_messages + question
+        messages = previous_messages + question
+        self._add_history_breakpoint(context, messages)
+
+        return messages
 
     async def get_response(
         self,
@@ -130,7 +160,7 @@ class ClaudeModelAdapter(CompletionModelAdapter):
             client=self.async_client,
             max_tokens=MAX_TOKENS,
             model_name=self.model.name,
-            prompt=context.prompt,
+            prompt=self._build_system(context),
             messages=query,
             model_kwargs=self._get_kwargs(model_kwargs),
         )
@@ -146,7 +176,7 @@ class ClaudeModelAdapter(CompletionModelAdapter):
             client=self.async_client,
             max_tokens=MAX_TOKENS,
             model_name=self.model.name,
-            prompt=context.prompt,
+            prompt=self._build_system(context),
             messages=query,
             model_kwargs=self._get_kwargs(model_kwargs),
             tools=tools,
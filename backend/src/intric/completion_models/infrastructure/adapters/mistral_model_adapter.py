@@ -16,6 +16,9 @@ from intric.ai_models.completion_models.completion_model import (
 from intric.completion_models.infrastructure.adapters.openai_model_adapter import (
     OpenAIModelAdapter,
 )
+from intric.completion_models.infrastructure.endpoint_health import (
+    stop_if_single_attempt,
+)
 from intric.main.config import get_settings
 from intric.main.exceptions import BadRequestException
 from intric.main.logging import get_logger
@@ -51,7 +54,7 @@ class MistralModelAdapter(OpenAIModelAdapter):
 
     @retry(
         wait=wait_random_exponential(min=1, max=20),
-        stop=stop_after_attempt(3),
+        stop=stop_after_attempt(3) | stop_if_single_attempt,
         reraise=True,
     )
     async def get_response(
@@ -86,7 +89,7 @@ class MistralModelAdapter(OpenAIModelAdapter):
 
         @retry(
             wait=wait_random_exponential(min=1, max=20),
-            stop=stop_after_attempt(3),
+            stop=stop_after_attempt(3) | stop_if_single_attempt,
             retry=retry_if_not_exception_type(BadRequestException),
             reraise=True,
         )
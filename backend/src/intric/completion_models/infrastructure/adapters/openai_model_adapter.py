@@ -1,4 +1,3 @@
-import base64
 import json
 
 from openai import AsyncOpenAI
@@ -13,6 +12,7 @@ from intric.completion_models.infrastructure.adapters.base_adapter import (
     CompletionModelAdapter,
 )
 from intric.files.file_models import File
+from intric.files.image import encoded_images
 from intric.logging.logging import LoggingDetails
 from intric.main.config import get_settings
 from intric.main.logging import get_logger
@@ -49,7 +49,7 @@ class OpenAIModelAdapter(CompletionModelAdapter):
         )
 
     def _build_image(self, file: File):
-        image_data = base64.b64encode(file.blob).decode("utf-8")
+        image_data = encoded_images.encode(file)
 
         return {
             "type": "image_url",
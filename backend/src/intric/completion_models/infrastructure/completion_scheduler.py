@@ -0,0 +1,303 @@
+"""Fair scheduling of completions across tenants.
+
+The completion models are shared by all tenants, and so are the rate limits of
+the providers. Requests to a model wait in a queue in redis, shared by all
+replicas, ordered by weighted fair queuing: each request is tagged with the
+virtual time its tenant would finish it, given the tokens of the request and
+the weight of the tenant. A tenant sending a burst of requests therefore only
+delays its own requests.
+
+A request is admitted when no request of a tenant below
+`completion_scheduler_max_concurrent_per_tenant` is ahead of it in the queue,
+and the tokens of the model's `tokens_per_minute` are not used up. Requests
+of tenants at their limit do not hold up the others. Admitted requests hold a lease
+until the completion is done. Leases, and the places in the queue of requests
+that are no longer waiting, expire, so that a replica going down does not
+block the queue.
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+from uuid import uuid4
+
+from redis.exceptions import RedisError
+
+from intric.main.config import get_settings
+from intric.main.exceptions import ModelBusyException
+from intric.main.logging import get_logger
+from intric.worker.redis import r
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from redis.asyncio import Redis
+
+    from intric.completion_models.domain import CompletionModel
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "completion_scheduler"
+
+# A request that has not polled for this long is no longer waiting
+HEARTBEAT_SECONDS = 10
+# Idle queues, virtual clocks and leases are removed after this long
+STATE_TTL_SECONDS = 60 * 60
+
+# KEYS: queue, tenant virtual time, model virtual clock
+# ARGV: member, cost, max queue length, ttl
+# Returns the number of requests ahead, or -1 if the queue is full
+ENQUEUE_SCRIPT = """
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return -1
+end
+
+local clock = tonumber(redis.call('GET', KEYS[3]) or '0')
+local tenant_time = tonumber(redis.call('GET', KEYS[2]) or '0')
+local finish = math.max(clock, tenant_time) + tonumber(ARGV[2])
+
+redis.call('SET', KEYS[2], finish, 'EX', ARGV[4])
+redis.call('ZADD', KEYS[1], finish, ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+
+return redis.call('ZRANK', KEYS[1], ARGV[1])
+"""
+
+# KEYS: queue, model virtual clock
+# ARGV: member, key prefix, model id, max concurrent per tenant, tokens,
+#       tokens per minute (0 for no limit), lease seconds, ttl
+# Returns -1 if admitted, -2 if the member is no longer in the queue, and
+# otherwise the number of admissible requests ahead of it. Only the first
+# admissible request is admitted, so that the order of the queue holds.
+ADMIT_SCRIPT = """
+local now = tonumber(redis.call('TIME')[1])
+local entries = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+local position = 0
+
+for i = 1, #entries, 2 do
+    local entry = entries[i]
+    local separator = string.find(entry, ':', 1, true)
+    local tenant = string.sub(entry, 1, separator - 1)
+    local request = string.sub(entry, separator + 1)
+
+    if redis.call('EXISTS', ARGV[2] .. ':waiting:' .. request) == 0 then
+        redis.call('ZREM', KEYS[1], entry)
+    else
+        local leases = ARGV[2] .. ':leases:' .. tenant
+        redis.call('ZREMRANGEBYSCORE', leases, '-inf', now)
+        local has_slot = redis.call('ZCARD', leases) < tonumber(ARGV[4])
+
+        if entry == ARGV[1] then
+            if position > 0 or not has_slot then
+                return position
+            end
+
+            local tokens_key = ARGV[2] .. ':tokens:' .. ARGV[3] .. ':' .. math.floor(now / 60)
+            local used = tonumber(redis.call('GET', tokens_key) or '0')
+            local limit = tonumber(ARGV[6])
+            -- A request larger than the whole budget is let through on its own
+            if limit > 0 and used > 0 and used + tonumber(ARGV[5]) > limit then
+                return position
+            end
+
+            redis.call('INCRBY', tokens_key, ARGV[5])
+            redis.call('EXPIRE', tokens_key, 120)
+            redis.call('ZREM', KEYS[1], entry)
+            redis.call('ZADD', leases, now + tonumber(ARGV[7]), request)
+            redis.call('EXPIRE', leases, ARGV[8])
+            redis.call('SET', KEYS[2], entries[i + 1], 'EX', ARGV[8])
+            return -1
+        end
+
+        if has_slot then
+            position = position + 1
+        end
+    end
+end
+
+return -2
+"""
+
+
+class CompletionTicket:
+    """The place of one completion in the queue of its model."""
+
+    def __init__(
+        self,
+        redis: "Redis",
+        tenant_id: "UUID",
+        model: "CompletionModel",
+        tokens: int,
+    ):
+        self.redis = redis
+        self.tenant_id = tenant_id
+        self.model = model
+        self.tokens = max(tokens, 1)
+        self.request_id = uuid4().hex
+        self.admitted = False
+        self._joined = False
+        self._leased = False
+
+    @property
+    def _member(self):
+        return f"{self.tenant_id}:{self.request_id}"
+
+    @property
+    def _queue_key(self):
+        return f"{KEY_PREFIX}:queue:{self.model.id}"
+
+    @property
+    def _clock_key(self):
+        return f"{KEY_PREFIX}:clock:{self.model.id}"
+
+    @property
+    def _waiting_key(self):
+        return f"{KEY_PREFIX}:waiting:{self.request_id}"
+
+    @property
+    def _lease_key(self):
+        return f"{KEY_PREFIX}:leases:{self.tenant_id}"
+
+    async def _enqueue(self) -> int:
+        settings = get_settings()
+        weight = settings.completion_scheduler_tenant_weights.get(str(self.tenant_id), 1.0)
+
+        await self.redis.set(self._waiting_key, 1, ex=HEARTBEAT_SECONDS)
+        position = await self.redis.eval(
+            ENQUEUE_SCRIPT,
+            3,
+            self._queue_key,
+            f"{KEY_PREFIX}:tenant_time:{self.model.id}:{self.tenant_id}",
+            self._clock_key,
+            self._member,
+            self.tokens / weight,
+            settings.completion_scheduler_max_queue,
+            STATE_TTL_SECONDS,
+        )
+        if position < 0:
+            raise ModelBusyException(
+                f"Too many requests are waiting for {self.model.nickname}, try again later."
+            )
+
+        return position
+
+    async def _admit(self) -> int:
+        settings = get_settings()
+
+        await self.redis.set(self._waiting_key, 1, ex=HEARTBEAT_SECONDS)
+        return await self.redis.eval(
+            ADMIT_SCRIPT,
+            2,
+            self._queue_key,
+            self._clock_key,
+            self._member,
+            KEY_PREFIX,
+            str(self.model.id),
+            settings.completion_scheduler_max_concurrent_per_tenant,
+            self.tokens,
+            self.model.tokens_per_minute or 0,
+            settings.completion_scheduler_lease_seconds,
+            STATE_TTL_SECONDS,
+        )
+
+    async def _leave_queue(self):
+        await self.redis.zrem(self._queue_key, self._member)
+        await self.redis.delete(self._waiting_key)
+
+    async def join(self):
+        """Join the queue of the model.
+
+        Raises ModelBusyException if the queue is full. If redis is
+        unavailable, the completion is admitted without scheduling.
+        """
+        if self._joined or self.admitted:
+            return
+
+        try:
+            await self._enqueue()
+            self._joined = True
+
+        except ModelBusyException:
+            await self._leave_queue_quietly()
+            raise
+
+        except RedisError as e:
+            logger.warning(f"Could not schedule completion, continuing without: {e}")
+            self.admitted = True
+
+    async def wait(self) -> AsyncIterator[int]:
+        """Wait until the completion is admitted, yielding the number of
+        requests ahead of it whenever it changes.
+
+        Joins the queue first, if not already done. Raises ModelBusyException
+        if the queue is full, or the completion is not admitted within
+        `completion_scheduler_max_wait_seconds`.
+        """
+        settings = get_settings()
+        deadline = time.monotonic() + settings.completion_scheduler_max_wait_seconds
+
+        await self.join()
+        if self.admitted:
+            return
+
+        try:
+            last_position = None
+
+            while True:
+                position = await self._admit()
+                if position == -1:
+                    self.admitted = self._leased = True
+                    await self.redis.delete(self._waiting_key)
+                    return
+
+                if position == -2:
+                    # Dropped from the queue after missing a heartbeat
+                    position = await self._enqueue()
+
+                if position != last_position:
+                    last_position = position
+                    yield position
+
+                if time.monotonic() > deadline:
+                    await self._leave_queue()
+                    raise ModelBusyException(
+                        f"{self.model.nickname} is busy, try again later."
+                    )
+
+                await asyncio.sleep(settings.completion_scheduler_poll_seconds)
+
+        except RedisError as e:
+            logger.warning(f"Could not schedule completion, continuing without: {e}")
+            self.admitted = True
+
+        finally:
+            if not self.admitted:
+                await asyncio.shield(self._leave_queue_quietly())
+
+    async def _leave_queue_quietly(self):
+        try:
+            await self._leave_queue()
+        except RedisError:
+            pass
+
+    async def release(self):
+        if not self._leased:
+            return
+
+        self._leased = False
+        try:
+            await self.redis.zrem(self._lease_key, self.request_id)
+        except RedisError as e:
+            logger.warning(f"Could not release completion lease, it will expire: {e}")
+
+
+class CompletionScheduler:
+    def __init__(self, redis: Optional["Redis"] = None):
+        self.redis = redis or r
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return get_settings().completion_scheduler_enabled
+
+    def ticket(self, tenant_id: "UUID", model: "CompletionModel", tokens: int):
+        return CompletionTicket(self.redis, tenant_id=tenant_id, model=model, tokens=tokens)
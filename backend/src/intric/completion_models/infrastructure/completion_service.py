@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import random
+import time
 from typing import TYPE_CHECKING, AsyncGenerator
 
 from intric.ai_models.completion_models.completion_model import (
@@ -20,22 +23,42 @@ from intric.completion_models.infrastructure.adapters import (
     VLMMModelAdapter,
 )
 from intric.completion_models.infrastructure.context_builder import ContextBuilder
+from intric.completion_models.infrastructure.endpoint_health import (
+    endpoint_health,
+    single_attempt,
+)
 from intric.files.file_models import File
+from intric.files.image import encoded_images
 from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
-from intric.main.config import SETTINGS
+from intric.main.config import SETTINGS, get_settings
+from intric.main.exceptions import BadRequestException, QueryException
 from intric.main.logging import get_logger
 from intric.sessions.session import SessionInDB
 from intric.vision_models.infrastructure.flux_ai import FluxAdapter
 
 if TYPE_CHECKING:
+    from intric.ai_models.completion_models.completion_model import Context
+    from intric.completion_models.domain import CompletionModelRepository
     from intric.completion_models.infrastructure.adapters.base_adapter import (
         CompletionModelAdapter,
     )
+    from intric.completion_models.infrastructure.completion_scheduler import (
+        CompletionScheduler,
+        CompletionTicket,
+    )
     from intric.completion_models.infrastructure.web_search import WebSearchResult
+    from intric.files.file_repo import FileRepository
     from intric.main.container.container import Container
+    from intric.users.user import UserInDB
 
 logger = get_logger(__name__)
 
+# Errors caused by the request rather than the endpoint, another model would
+# fail the same way
+REQUEST_ERRORS = (BadRequestException, QueryException)
+# Attempts at the last candidate, as many as the providers' own retries make
+LAST_CANDIDATE_ATTEMPTS = 3
+
 
 async def generate_image(prompt: str):
     flux = FluxAdapter()
@@ -47,6 +70,10 @@ class CompletionService:
     def __init__(
         self,
         context_builder: ContextBuilder,
+        file_repo: "FileRepository",
+        user: "UserInDB" = None,
+        completion_scheduler: "CompletionScheduler" = None,
+        completion_model_repo: "CompletionModelRepository" = None,
     ):
         self._adapters = {
             ModelFamily.OPEN_AI: OpenAIModelAdapter,
@@ -57,6 +84,10 @@ class CompletionService:
             ModelFamily.MISTRAL: MistralModelAdapter,
         }
         self.context_builder = context_builder
+        self.file_repo = file_repo
+        self.user = user
+        self.completion_scheduler = completion_scheduler
+        self.completion_model_repo = completion_model_repo
 
     def _get_adapter(self, model: CompletionModel) -> "CompletionModelAdapter":
         adapter_class = self._adapters.get(model.family.value)
@@ -112,6 +143,245 @@ class CompletionService:
 
                 yield chunk
 
+            elif chunk.reasoning_token_count or chunk.cached_token_count:
+                # Token usage, without a response type
+                yield chunk
+
+    def _get_ticket(self, model: CompletionModel, tokens: int) -> "CompletionTicket | None":
+        if (
+            self.completion_scheduler is None
+            or self.user is None
+            or not self.completion_scheduler.is_enabled()
+        ):
+            return None
+
+        return self.completion_scheduler.ticket(
+            tenant_id=self.user.tenant_id, model=model, tokens=tokens
+        )
+
+    @staticmethod
+    async def _scheduled(completion: AsyncGenerator[Completion], ticket: "CompletionTicket"):
+        """Wait for the turn of the completion before streaming it, telling the
+        place in the queue meanwhile."""
+        try:
+            async for position in ticket.wait():
+                yield Completion(response_type=ResponseType.INTRIC_EVENT, queue_position=position)
+
+            async for chunk in completion:
+                yield chunk
+        finally:
+            await ticket.release()
+
+    async def _get_fallback_adapters(
+        self, model: CompletionModel, context: "Context"
+    ) -> list["CompletionModelAdapter"]:
+        """Adapters of the fallback models that the tenant can use in place of
+        the model, and that can take the context."""
+        if not model.fallback_models or self.completion_model_repo is None:
+            return []
+
+        models = await self.completion_model_repo.all()
+        primary = next((m for m in models if m.id == model.id), None)
+        if primary is None:
+            return []
+
+        models_by_name = {m.name: m for m in models}
+        needs_vision = bool(context.images) or any(
+            message.images or message.generated_images for message in context.messages
+        )
+
+        adapters = []
+        for name in model.fallback_models:
+            fallback = models_by_name.get(name)
+            if (
+                fallback is None
+                or not fallback.can_access
+                or not fallback.meets_security_classification(primary.security_classification)
+                or (needs_vision and not fallback.vision)
+            ):
+                continue
+
+            adapter = self._get_adapter(fallback)
+            if adapter.get_token_limit_of_model() > context.token_count:
+                adapters.append(adapter)
+
+        return adapters
+
+    async def _candidates(self, model_adapter: "CompletionModelAdapter", context: "Context"):
+        """The adapter of the model, then those of its fallbacks, skipping the
+        endpoints with an open circuit unless all of them have one.
+
+        The fallbacks are only looked up when the model can not be used.
+        """
+        any_allowed = False
+        if endpoint_health.get(model_adapter.model).allows_request():
+            any_allowed = True
+            yield model_adapter
+
+        for fallback in await self._get_fallback_adapters(model_adapter.model, context):
+            if endpoint_health.get(fallback.model).allows_request():
+                any_allowed = True
+                yield fallback
+
+        if not any_allowed:
+            yield model_adapter
+
+    @staticmethod
+    async def _timed_response(
+        model_adapter: "CompletionModelAdapter", context: "Context", model_kwargs
+    ):
+        """Make one attempt at the endpoint of the adapter, without the
+        retries of the provider, and record how it went."""
+        health = endpoint_health.get(model_adapter.model)
+        started = time.monotonic()
+        token = single_attempt.set(True)
+        try:
+            completion = await model_adapter.get_response(
+                context=context, model_kwargs=model_kwargs
+            )
+        except REQUEST_ERRORS:
+            raise
+        except asyncio.CancelledError:
+            # Lost to a hedge, the time it would have taken is not known
+            raise
+        except Exception:
+            health.record_failure()
+            raise
+        finally:
+            single_attempt.reset(token)
+
+        health.record_success(latency=time.monotonic() - started)
+        return model_adapter, completion
+
+    async def _hedged_response(
+        self,
+        model_adapter: "CompletionModelAdapter",
+        candidates: AsyncGenerator["CompletionModelAdapter"],
+        context: "Context",
+        model_kwargs,
+    ):
+        """Send the request again, to the next candidate or else the same model,
+        if it takes longer than the p95 latency of its endpoint, and use the
+        response that comes first."""
+        settings = get_settings()
+        p95 = endpoint_health.get(model_adapter.model).latency_percentile(0.95)
+        first = asyncio.create_task(self._timed_response(model_adapter, context, model_kwargs))
+        tasks = [first]
+
+        try:
+            if p95 is None:
+                return await first
+
+            delay = max(p95, settings.completion_hedging_min_delay_seconds)
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                hedge_adapter = await anext(candidates, None) or model_adapter
+                logger.info(
+                    f"Hedging completion of {model_adapter.model.name} "
+                    f"with {hedge_adapter.model.name} after {delay:.1f} s"
+                )
+                tasks.append(
+                    asyncio.create_task(
+                        self._timed_response(hedge_adapter, context, model_kwargs)
+                    )
+                )
+
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+
+            # All failed, raise the error of the first request
+            return first.result()
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _get_response_with_failover(
+        self, model_adapter: "CompletionModelAdapter", context: "Context", model_kwargs
+    ):
+        """Get the response from the first candidate that answers.
+
+        A failed attempt moves on to the next candidate at once. Only the last
+        candidate is retried, with backoff, as long as its circuit allows it.
+
+        Returns the adapter that answered and the completion.
+        """
+        candidates = self._candidates(model_adapter, context)
+        candidate = await anext(candidates)
+        attempt = 1
+
+        while True:
+            try:
+                if get_settings().completion_hedging_enabled:
+                    return await self._hedged_response(
+                        candidate, candidates, context, model_kwargs
+                    )
+
+                return await self._timed_response(candidate, context, model_kwargs)
+
+            except REQUEST_ERRORS:
+                raise
+
+            except Exception as e:
+                logger.warning(f"Completion with {candidate.model.name} failed: {e}")
+
+                next_candidate = await anext(candidates, None)
+                if next_candidate is not None:
+                    candidate, attempt = next_candidate, 1
+                elif attempt < LAST_CANDIDATE_ATTEMPTS and (
+                    endpoint_health.get(candidate.model).allows_request()
+                ):
+                    attempt += 1
+                    await asyncio.sleep(random.uniform(1, min(2**attempt, 20)))
+                else:
+                    raise
+
+    async def _stream_with_failover(
+        self,
+        model_adapter: "CompletionModelAdapter",
+        response: CompletionModelResponse,
+        context: "Context",
+        model_kwargs,
+    ):
+        """Stream the response from the first candidate that answers, and set
+        it as the model of `response`. Once the answer has started, errors are
+        raised as they are."""
+        error = None
+
+        async for candidate in self._candidates(model_adapter, context):
+            health = endpoint_health.get(candidate.model)
+            streamed = False
+
+            try:
+                async for chunk in candidate.get_response_streaming(
+                    context=context, model_kwargs=model_kwargs
+                ):
+                    if not streamed:
+                        response.model = candidate.model
+                    streamed = True
+                    yield chunk
+
+            except REQUEST_ERRORS:
+                raise
+
+            except Exception as e:
+                health.record_failure()
+                if streamed:
+                    raise
+
+                logger.warning(f"Streamed completion with {candidate.model.name} failed: {e}")
+                error = e
+                continue
+
+            health.record_success()
+            return
+
+        raise error
+
     async def get_response(
         self,
         model: CompletionModel,
@@ -152,6 +422,15 @@ class CompletionService:
             web_search_results=web_search_results,
         )
 
+        # Only the images that made it into the context, and whose encodings
+        # are not cached, are loaded from the blob store
+        images = [
+            *context.images,
+            *[image for message in context.messages for image in message.images],
+            *[image for message in context.messages for image in message.generated_images],
+        ]
+        await self.file_repo.load_blobs(encoded_images.lookup(images))
+
         if extended_logging:
             logging_details = model_adapter.get_logging_details(
                 context=context, model_kwargs=model_kwargs
@@ -159,26 +438,48 @@ class CompletionService:
         else:
             logging_details = None
 
+        ticket = self._get_ticket(model, tokens=context.token_count)
+
+        # The model is the one that answered, which is a fallback of `model` if
+        # it could not be used
+        response = CompletionModelResponse(
+            completion=None,
+            model=model_adapter.model,
+            extended_logging=logging_details,
+            total_token_count=context.token_count,
+        )
+
         if not stream:
-            completion = await model_adapter.get_response(
-                context=context,
-                model_kwargs=model_kwargs,
-            )
+            if ticket is not None:
+                async for _ in ticket.wait():
+                    pass
+
+            try:
+                model_adapter, response.completion = await self._get_response_with_failover(
+                    model_adapter, context=context, model_kwargs=model_kwargs
+                )
+                response.model = model_adapter.model
+            finally:
+                if ticket is not None:
+                    await ticket.release()
         else:
             # Will be an async generator - not awaitable
-            completion = model_adapter.get_response_streaming(
-                context=context,
-                model_kwargs=model_kwargs,
+            completion = self._stream_with_failover(
+                model_adapter, response, context=context, model_kwargs=model_kwargs
             )
 
             completion = self._handle_tool_call(completion)
 
-        return CompletionModelResponse(
-            completion=completion,
-            model=model_adapter.model,
-            extended_logging=logging_details,
-            total_token_count=context.token_count,
-        )
+            # The provider is only called once the completion is admitted. The
+            # queue is joined here, so that a full queue is refused before the
+            # response starts streaming.
+            if ticket is not None:
+                await ticket.join()
+                completion = self._scheduled(completion, ticket)
+
+            response.completion = completion
+
+        return response
 
 
 class CompletionServiceFactory:
@@ -11,6 +11,7 @@ from intric.ai_models.completion_models.completion_model import (
 )
 from intric.completion_models.infrastructure.static_prompts import (
     HALLUCINATION_GUARD,
+    HISTORY_SUMMARY_QUESTION,
     SHOW_REFERENCES_PROMPT,
     TRANSCRIPTION_PROMPT,
 )
@@ -75,11 +76,13 @@ class _Prompt:
         self._knowledge_tokens = 0
         self.version = version
 
-    def __str__(self):
-        components = []
+    def _cacheable_components(self):
+        # The same on every request to the assistant, so that providers can
+        # cache the start of the prompt
+        return [component for component in (self.prompt, self.attachments) if component]
 
-        if self.prompt:
-            components.append(self.prompt)
+    def __str__(self):
+        components = self._cacheable_components()
 
         # Add references prompt if either knowledge or web search results exist
         # but only for version 2
@@ -96,11 +99,12 @@ class _Prompt:
         if self.web_search_result:
             components.append(self.web_search_result)
 
-        if self.attachments:
-            components.append(self.attachments)
-
         return "\n\n".join(components)
 
+    @property
+    def cacheable_prefix(self):
+        return "\n\n".join(self._cacheable_components())
+
     @staticmethod
     def _common_overlap(text1: str, text2: str):
         # Cache the text lengths to prevent multiple calls.
@@ -349,7 +353,22 @@ class ContextBuilder:
         messages = []
         total_tokens = 0
 
+        # The summary of the older questions goes first, as a question and answer
+        # of its own, and the recent questions get what is left
+        summary = None
+        if session.history_summary:
+            summary = Message(question=HISTORY_SUMMARY_QUESTION, answer=session.history_summary)
+            total_tokens += (session.history_summary_tokens or 0) + count_tokens(
+                HISTORY_SUMMARY_QUESTION
+            )
+
         for message in reversed(session.questions):
+            if (
+                session.history_summarized_until is not None
+                and message.created_at <= session.history_summarized_until
+            ):
+                break
+
             question = self._build_input(
                 message.question,
                 self._get_files_by_type(message.files, FileType.TEXT),
@@ -377,6 +396,9 @@ class ContextBuilder:
 
             total_tokens += message_tokens
 
+        if summary is not None:
+            messages.insert(0, summary)
+
         return messages, total_tokens
 
     def build_context(
@@ -449,6 +471,7 @@ class ContextBuilder:
         return Context(
             input=_input_string,
             prompt=prompt_text,
+            cacheable_prompt=_prompt.cacheable_prefix,
             messages=messages,
             images=self._get_files_by_type(files, FileType.IMAGE),
             token_count=tokens_used,
@@ -0,0 +1,129 @@
+"""Health of the endpoints of the completion models, as seen by this process.
+
+Each endpoint, a model at a provider or at a base url, keeps an exponentially
+weighted moving average of its latency and error rate, and its recent
+latencies. A circuit breaker opens when the endpoint keeps failing; while it
+is open, completions go to the fallback models instead. After a cooldown, one
+request is let through to probe the endpoint, and the circuit closes again if
+it succeeds.
+
+The completion service makes the attempts at the endpoints itself, so that a
+failing endpoint is left after one attempt and each attempt is a sample of its
+health. While it does, `single_attempt` is set, and the providers' own retries
+stop after the first attempt.
+"""
+
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Optional
+
+from intric.main.config import get_settings
+
+if TYPE_CHECKING:
+    from intric.completion_models.domain import CompletionModel
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+# Samples needed before the error rate, or the latency percentile, is used
+MIN_SAMPLES = 10
+LATENCY_SAMPLES = 200
+
+single_attempt: ContextVar[bool] = ContextVar("single_attempt", default=False)
+
+
+def stop_if_single_attempt(retry_state) -> bool:
+    """Tenacity stop condition for the retries of the providers."""
+    return single_attempt.get()
+
+
+def endpoint_key(model: "CompletionModel") -> str:
+    return f"{model.family.value}:{model.base_url or ''}:{model.name}"
+
+
+class EndpointHealth:
+    def __init__(self):
+        self.latency_ewma: Optional[float] = None
+        self.error_rate_ewma = 0.0
+        self.samples = 0
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def _add_sample(self, error: bool):
+        self.samples += 1
+        self.error_rate_ewma += EWMA_ALPHA * (float(error) - self.error_rate_ewma)
+
+    def record_success(self, latency: Optional[float] = None):
+        """Record a successful completion, with its latency if it was not streamed."""
+        self._add_sample(error=False)
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+        if latency is not None:
+            self.add_latency(latency)
+
+    def add_latency(self, latency: float):
+        self._latencies.append(latency)
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += EWMA_ALPHA * (latency - self.latency_ewma)
+
+    def record_failure(self):
+        settings = get_settings()
+        self._add_sample(error=True)
+        self.consecutive_failures += 1
+
+        failing = self.consecutive_failures >= settings.completion_circuit_breaker_failures or (
+            self.samples >= MIN_SAMPLES
+            and self.error_rate_ewma >= settings.completion_circuit_breaker_error_rate
+        )
+        if self.probe_started_at is not None or failing:
+            self.opened_at = time.monotonic()
+            self.probe_started_at = None
+
+    def allows_request(self) -> bool:
+        """Whether a request should be sent to the endpoint.
+
+        When the circuit is open this is false, except for one request
+        probing the endpoint after each cooldown.
+        """
+        if self.opened_at is None:
+            return True
+
+        cooldown = get_settings().completion_circuit_breaker_cooldown_seconds
+        now = time.monotonic()
+        last_attempt = self.probe_started_at or self.opened_at
+        if now - last_attempt >= cooldown:
+            self.probe_started_at = now
+            return True
+
+        return False
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if len(self._latencies) < MIN_SAMPLES:
+            return None
+
+        latencies = sorted(self._latencies)
+        return latencies[min(int(len(latencies) * percentile), len(latencies) - 1)]
+
+
+class EndpointHealthTracker:
+    def __init__(self):
+        self._endpoints: dict[str, EndpointHealth] = {}
+
+    def get(self, model: "CompletionModel") -> EndpointHealth:
+        return self._endpoints.setdefault(endpoint_key(model), EndpointHealth())
+
+    def clear(self):
+        self._endpoints.clear()
+
+
+endpoint_health = EndpointHealthTracker()
@@ -8,6 +8,9 @@ from tenacity import (
 )
 
 from intric.ai_models.completion_models.completion_model import Completion, FunctionCall
+from intric.completion_models.infrastructure.endpoint_health import (
+    stop_if_single_attempt,
+)
 from intric.main.exceptions import BadRequestException, ClaudeException
 from intric.main.logging import get_logger
 
@@ -16,14 +19,14 @@ logger = get_logger(__name__)
 
 @retry(
     wait=wait_random_exponential(min=1, max=20),
-    stop=stop_after_attempt(3),
+    stop=stop_after_attempt(3) | stop_if_single_attempt,
     retry=retry_if_not_exception_type(BadRequestException),
     reraise=True,
 )
 async def get_response(
     client: AsyncAnthropic,
     model_name: str,
-    prompt: str,
+    prompt: str | list[dict],
     messages: list,
     model_kwargs: dict,
     max_tokens: int,
@@ -36,7 +39,11 @@ async def get_response(
             model=model_name,
             **model_kwargs,
         )
-        completion = Completion(text=message.content[0].text)
+        # The cache fields are newer than the installed SDK's types
+        completion = Completion(
+            text=message.content[0].text,
+            cached_token_count=getattr(message.usage, "cache_read_input_tokens", None) or 0,
+        )
         return completion
     except anthropic.APIConnectionError as exc:
         logger.exception("Connection error:")
@@ -53,14 +60,14 @@ async def get_response(
 
 @retry(
     wait=wait_random_exponential(min=1, max=20),
-    stop=stop_after_attempt(3),
+    stop=stop_after_attempt(3) | stop_if_single_attempt,
     retry=retry_if_not_exception_type(BadRequestException),
     reraise=True,
 )
 async def get_response_streaming(
     client: AsyncAnthropic,
     model_name: str,
-    prompt: str,
+    prompt: str | list[dict],
     messages: list,
     model_kwargs: dict,
     max_tokens: int,
@@ -79,6 +86,13 @@ async def get_response_streaming(
         )
 
         async for event in stream:
+            if event.type == "message_start":
+                cached_token_count = getattr(
+                    event.message.usage, "cache_read_input_tokens", None
+                )
+                if cached_token_count:
+                    yield Completion(cached_token_count=cached_token_count)
+
             if event.type == "content_block_delta":
                 if event.delta.type == "text_delta":
                     yield Completion(text=event.delta.text)
@@ -8,15 +8,28 @@ from tenacity import (
 )
 
 from intric.ai_models.completion_models.completion_model import Completion, FunctionCall
+from intric.completion_models.infrastructure.endpoint_health import (
+    stop_if_single_attempt,
+)
 from intric.main.exceptions import BadRequestException, OpenAIException
 from intric.main.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+def _get_cached_tokens(usage) -> int:
+    # Prompts are cached automatically, from 1024 tokens and up. Not every
+    # OpenAI compatible server reports it
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+
+    return getattr(details, "cached_tokens", None) or 0
+
+
 @retry(
     wait=wait_random_exponential(min=1, max=20),
-    stop=stop_after_attempt(3),
+    stop=stop_after_attempt(3) | stop_if_single_attempt,
     retry=retry_if_not_exception_type(BadRequestException),
     reraise=True,
 )
@@ -46,6 +59,7 @@ async def get_response(
 
         completion = Completion(
             reasoning_token_count=reasoning_tokens,
+            cached_token_count=_get_cached_tokens(response.usage),
             text=completion_str,
         )
 
@@ -62,7 +76,7 @@ async def get_response(
 
 @retry(
     wait=wait_random_exponential(min=1, max=20),
-    stop=stop_after_attempt(3),
+    stop=stop_after_attempt(3) | stop_if_single_attempt,
     retry=retry_if_not_exception_type(BadRequestException),
     reraise=True,
 )
@@ -103,13 +117,17 @@ async def get_response_streaming(
                 yield Completion(text=delta.content, tool_call=tool_call)
             elif chunk.usage:
                 try:
-                    yield Completion(
-                        reasoning_token_count=chunk.usage.completion_tokens_details.reasoning_tokens,  # noqa
-                    )
+                    reasoning_tokens = chunk.usage.completion_tokens_details.reasoning_tokens
                 except AttributeError as attr_err:
                     logger.warning(
                         f"Attribution error while processing chunk: {attr_err}"
                     )
+                    reasoning_tokens = 0
+
+                yield Completion(
+                    reasoning_token_count=reasoning_tokens,
+                    cached_token_count=_get_cached_tokens(chunk.usage),
+                )
 
     except openai.BadRequestError as exc:
         raise BadRequestException("Invalid model kwargs") from exc
@@ -21,6 +21,23 @@ ANALYSIS_PROMPT = (
     "last {days} days. Use these to answer questions."
 )
 
+ANALYSIS_MAP_PROMPT = (
+    "You are an expert in data analysis. Below, enclosed by triple quotation marks, "
+    "is one part of the questions that have been asked to an AI assistant in the "
+    "last {days} days. Questions that were asked more than once are followed by how "
+    "many times they were asked. Do not answer the user's question directly. Instead, "
+    "summarize everything in these questions that is relevant to it, such as recurring "
+    "themes, notable examples and approximate counts, so that the summary can later "
+    "be combined with summaries of the other parts."
+)
+
+ANALYSIS_REDUCE_PROMPT = (
+    "You are an expert in data analysis. Below, enclosed by triple quotation marks, "
+    "are summaries of the questions that have been asked to an AI assistant in the "
+    "last {days} days. Each summary covers a different part of the questions. "
+    "Combine them to answer questions, adding up counts where it makes sense."
+)
+
 SET_TITLE_OF_CONVERSATION_PROMPT = """
 You are an expert in summarizing conversations.
 
@@ -32,3 +49,15 @@ The title should be in the language of the conversation.
 
 The title should be no more than 10 words.
 """
+
+HISTORY_COMPACTION_PROMPT = (
+    "You are an expert in summarizing conversations. Below, enclosed by triple quotation "
+    "marks, is the earlier part of a conversation between a user and an AI assistant, "
+    "possibly starting with a summary of what came before it. Summarize it so that the "
+    "assistant can continue the conversation without it. Keep the facts, names, numbers, "
+    "decisions and open questions, and what the user asked the assistant to remember or "
+    "how to answer. Leave out greetings and repetition. Write the summary in the language "
+    "of the conversation."
+)
+
+HISTORY_SUMMARY_QUESTION = "Summarize our conversation so far."
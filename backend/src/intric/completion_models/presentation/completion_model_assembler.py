@@ -39,6 +39,8 @@ class CompletionModelAssembler:
             is_locked=completion_model.is_locked,
             reasoning=completion_model.reasoning,
             base_url=completion_model.base_url,
+            tokens_per_minute=completion_model.tokens_per_minute,
+            fallback_models=completion_model.fallback_models,
             security_classification=SecurityClassificationPublic.from_domain(
                 completion_model.security_classification,
                 return_none_if_not_enabled=False,
@@ -72,6 +74,8 @@ class CompletionModelAssembler:
             vision=completion_model.vision,
             reasoning=completion_model.reasoning,
             base_url=completion_model.base_url,
+            tokens_per_minute=completion_model.tokens_per_minute,
+            fallback_models=completion_model.fallback_models,
         )
 
     def from_completion_models_to_models(self, completion_models: list["CompletionModel"]):
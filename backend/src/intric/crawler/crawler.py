@@ -1,23 +1,32 @@
 import asyncio
 import json
 import os
+from collections import deque
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
 from tempfile import NamedTemporaryFile, TemporaryDirectory
-from typing import Iterable, Optional
+from typing import Iterable, Optional, Union
 
 import crochet
 from scrapy.crawler import CrawlerRunner
+from twisted.internet import defer, reactor
 
-from intric.crawler.parse_html import CrawledPage
-from intric.crawler.pipelines import FileNamePipeline
+from intric.crawler.parse_html import CrawledPage, KnownPage, UnchangedPage
+from intric.crawler.pipelines import FileNamePipeline, StreamPipeline
 from intric.crawler.spiders.crawl_spider import CrawlSpider
 from intric.crawler.spiders.sitemap_spider import SitemapSpider
 from intric.main.config import SETTINGS
 from intric.main.exceptions import CrawlerException
+from intric.main.logging import get_logger
 from intric.websites.domain.crawl_run import CrawlType
 
+logger = get_logger(__name__)
+
+STOP_TIMEOUT_SECONDS = 60
+
+_END = object()
+
 
 @dataclass
 class Crawl:
@@ -25,19 +34,123 @@ class Crawl:
     files: Optional[Iterable[Path]]
 
 
-def create_runner(filepath: str, files_dir: Optional[str] = None):
+class CrawlStream:
+    """Pages and files of a crawl that is still running.
+
+    Items are handed over from the reactor thread through a bounded queue. While
+    the queue is full the item pipeline waits, which holds back the spider.
+    Several consumers can call `get` concurrently.
+    """
+
+    def __init__(self, files_dir: Optional[str], max_queued_items: int):
+        self.files_dir = files_dir
+        self.runner: Optional[CrawlerRunner] = None
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=max_queued_items)
+        self._ready = deque()
+        self._pending = set()
+        self._num_items = 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+
+    def put(self, item) -> defer.Deferred:
+        """Called from the item pipeline, on the reactor thread."""
+        deferred = defer.Deferred()
+        self._num_items += 1
+
+        if self._closed:
+            deferred.callback(item)
+            return deferred
+
+        future = asyncio.run_coroutine_threadsafe(self._put(item), self._loop)
+        self._pending.add(future)
+
+        def _on_done(future):
+            self._pending.discard(future)
+            reactor.callFromThread(deferred.callback, item)
+
+        future.add_done_callback(_on_done)
+
+        return deferred
+
+    async def _put(self, item):
+        if not self._closed:
+            await self._queue.put(item)
+
+    async def finish(self, error: Optional[BaseException] = None):
+        if self._closed:
+            return
+
+        if error is None and self._num_items == 0:
+            error = CrawlerException("Crawl failed")
+
+        self._error = error
+        await self._queue.put(_END)
+
+    def close(self):
+        """Release the spider if the consumers stop before the crawl is done."""
+        self._closed = True
+
+        for future in list(self._pending):
+            future.cancel()
+
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def _to_results(self, item) -> list[Union[CrawledPage, UnchangedPage, Path]]:
+        if isinstance(item, (CrawledPage, UnchangedPage)):
+            return [item]
+
+        # Items from the FilesPipeline
+        return [Path(self.files_dir) / file["path"] for file in item.get("files", [])]
+
+    async def get(self) -> Union[CrawledPage, UnchangedPage, Path, None]:
+        """Next crawled page or downloaded file, or None once the crawl is done."""
+        while not self._ready:
+            item = await self._queue.get()
+
+            if item is _END:
+                # Leave the marker for the other consumers
+                self._queue.put_nowait(_END)
+
+                if self._error is not None:
+                    raise CrawlerException("Crawl failed") from self._error
+
+                return None
+
+            self._ready.extend(self._to_results(item))
+
+        return self._ready.popleft()
+
+
+def create_runner(
+    filepath: Optional[str],
+    files_dir: Optional[str] = None,
+    stream: bool = False,
+):
     settings = {
-        "FEEDS": {filepath: {"format": "jsonl", "item_classes": [CrawledPage]}},
         "CLOSESPIDER_ITEMCOUNT": SETTINGS.closespider_itemcount,
         "AUTOTHROTTLE_ENABLED": SETTINGS.autothrottle_enabled,
         "ROBOTSTXT_OBEY": SETTINGS.obey_robots,
         "DOWNLOAD_MAXSIZE": SETTINGS.upload_max_file_size,
     }
+    pipelines = {}
+
+    if filepath is not None:
+        settings["FEEDS"] = {filepath: {"format": "jsonl", "item_classes": [CrawledPage]}}
 
     if files_dir is not None:
-        settings["ITEM_PIPELINES"] = {FileNamePipeline: 300}
+        pipelines[FileNamePipeline] = 300
         settings["FILES_STORE"] = files_dir
 
+    if stream:
+        # Runs after the FilesPipeline so that files are on disk when streamed
+        pipelines[StreamPipeline] = 400
+
+    if pipelines:
+        settings["ITEM_PIPELINES"] = pipelines
+
     return CrawlerRunner(settings=settings)
 
 
@@ -61,6 +174,79 @@ class Crawler:
         runner = create_runner(filepath=filepath)
         return runner.crawl(SitemapSpider, sitemap_url=sitemap_url)
 
+    @crochet.run_in_reactor
+    @staticmethod
+    def _start_stream(spider, *, crawl_stream: CrawlStream, files_dir: Optional[str], **kwargs):
+        runner = create_runner(filepath=None, files_dir=files_dir, stream=True)
+        crawl_stream.runner = runner
+        return runner.crawl(spider, crawl_stream=crawl_stream, **kwargs)
+
+    @crochet.run_in_reactor
+    @staticmethod
+    def _stop_stream(crawl_stream: CrawlStream):
+        if crawl_stream.runner is not None:
+            return crawl_stream.runner.stop()
+
+    async def _stop(self, crawl_stream: CrawlStream):
+        await asyncio.to_thread(self._stop_stream(crawl_stream).wait, STOP_TIMEOUT_SECONDS)
+
+    async def _watch_stream(self, result: crochet.EventualResult, crawl_stream: CrawlStream):
+        try:
+            await asyncio.to_thread(result.wait, SETTINGS.crawl_max_length)
+        except crochet.TimeoutError as e:
+            logger.warning("Crawl exceeded the maximum length, stopping it")
+            await self._stop(crawl_stream)
+            await crawl_stream.finish(error=e)
+        except Exception as e:
+            await crawl_stream.finish(error=e)
+        else:
+            await crawl_stream.finish()
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        download_files: bool = False,
+        crawl_type: CrawlType = CrawlType.CRAWL,
+        max_queued_items: int = SETTINGS.crawl_stream_queue_size,
+        known_pages: Optional[dict[str, KnownPage]] = None,
+    ):
+        """Crawl `url`, yielding a `CrawlStream` that is fed while the spider runs.
+
+        Leaving the context before the crawl is done stops the spider.
+
+        `known_pages` lets the sitemap crawl skip pages that have not changed
+        since they were last crawled. These are streamed as `UnchangedPage`.
+        """
+        if crawl_type == CrawlType.CRAWL:
+            spider, kwargs = CrawlSpider, {"url": url}
+        elif crawl_type == CrawlType.SITEMAP:
+            spider, kwargs = SitemapSpider, {"sitemap_url": url, "known_pages": known_pages}
+            download_files = False
+        else:
+            raise ValueError(f"crawl_type {crawl_type} is not a CrawlType")
+
+        with TemporaryDirectory() as tmp_dir:
+            crawl_stream = CrawlStream(files_dir=tmp_dir, max_queued_items=max_queued_items)
+            result = self._start_stream(
+                spider,
+                crawl_stream=crawl_stream,
+                files_dir=tmp_dir if download_files else None,
+                **kwargs,
+            )
+            watcher = asyncio.create_task(self._watch_stream(result, crawl_stream))
+
+            try:
+                yield crawl_stream
+            finally:
+                crawl_stream.close()
+
+                if not watcher.done():
+                    await self._stop(crawl_stream)
+
+                # Make sure the spider is done with the files before removing them
+                await watcher
+
     @asynccontextmanager
     async def _crawl(self, func, **kwargs):
         with NamedTemporaryFile() as tmp_file:
@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
@@ -13,9 +15,53 @@ class CrawledPage:
     url: str
     title: str
     content: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+@dataclass
+class UnchangedPage:
+    """A page that was not downloaded again, since it has not changed since the last crawl."""
+
+    url: str
+
+
+@dataclass
+class KnownPage:
+    """What is stored from the last crawl of a page or file."""
+
+    content_hash: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    crawled_at: datetime
+
+
+def _get_header(response: Response, name: bytes) -> Optional[str]:
+    value = response.headers.get(name)
+
+    if value is None:
+        return None
+
+    return value.decode("latin-1")
+
+
+def conditional_headers(known_page: Optional[KnownPage]) -> dict[str, str]:
+    if known_page is None:
+        return {}
+
+    headers = {}
+    if known_page.etag is not None:
+        headers["If-None-Match"] = known_page.etag
+    if known_page.last_modified is not None:
+        headers["If-Modified-Since"] = known_page.last_modified
+
+    return headers
 
 
 def parse_response(response: Response):
+    if response.status == 304:
+        return UnchangedPage(url=response.url)
+
     soup = BeautifulSoup(response.body, "lxml")
 
     # Replace relative links with absolute
@@ -26,7 +72,13 @@ def parse_response(response: Response):
     title = response.css("title::text").get()
     url = response.url
 
-    return CrawledPage(url=url, title=title, content=content)
+    return CrawledPage(
+        url=url,
+        title=title,
+        content=content,
+        etag=_get_header(response, b"ETag"),
+        last_modified=_get_header(response, b"Last-Modified"),
+    )
 
 
 def parse_file(response: Response):
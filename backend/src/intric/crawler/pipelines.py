@@ -24,3 +24,14 @@ class FileNamePipeline(FilesPipeline):
                 return msg.get_filename()
 
         return PurePosixPath(urlparse(request.url).path).name
+
+
+class StreamPipeline:
+    """Hands items over to the consumer of a streaming crawl.
+
+    The returned deferred only fires once the consumer has room for the item,
+    which holds back the spider while the ingest is behind.
+    """
+
+    def process_item(self, item, spider: scrapy.Spider):
+        return spider.crawl_stream.put(item)
@@ -1,16 +1,89 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
 import scrapy
-from scrapy.http import Response
+from scrapy.http import Request, Response
+
+from intric.crawler.parse_html import (
+    KnownPage,
+    UnchangedPage,
+    conditional_headers,
+    parse_response,
+)
+
+
+def _parse_lastmod(lastmod: str) -> Optional[datetime]:
+    try:
+        modified_at = datetime.fromisoformat(lastmod.strip())
+    except ValueError:
+        return None
+
+    if modified_at.tzinfo is None:
+        modified_at = modified_at.replace(tzinfo=timezone.utc)
 
-from intric.crawler.parse_html import parse_response
+    # A plain date could mean any time during that day
+    if len(lastmod.strip()) == 10:
+        modified_at += timedelta(days=1)
+
+    return modified_at
 
 
 class SitemapSpider(scrapy.spiders.SitemapSpider):
     name = "sitemapspider"
 
-    def __init__(self, sitemap_url: str, *args, **kwargs):
+    # Answers to conditional requests for unchanged pages
+    handle_httpstatus_list = [304]
+
+    def __init__(
+        self,
+        sitemap_url: str,
+        *args,
+        known_pages: Optional[dict[str, KnownPage]] = None,
+        **kwargs,
+    ):
         self.sitemap_urls = [sitemap_url]
+        self.known_pages = known_pages or {}
+        self._unchanged_urls = []
 
         super().__init__(*args, **kwargs)
 
+    def _is_unchanged(self, entry: dict) -> bool:
+        known_page = self.known_pages.get(entry["loc"])
+        lastmod = entry.get("lastmod")
+
+        if known_page is None or lastmod is None:
+            return False
+
+        modified_at = _parse_lastmod(lastmod)
+        return modified_at is not None and modified_at <= known_page.crawled_at
+
+    def sitemap_filter(self, entries):
+        for entry in entries:
+            if entries.type == "urlset" and self._is_unchanged(entry):
+                self._unchanged_urls.append(entry["loc"])
+            else:
+                yield entry
+
+    def _flush_unchanged(self):
+        while self._unchanged_urls:
+            yield UnchangedPage(url=self._unchanged_urls.pop())
+
+    def _parse_sitemap(self, response: Response):
+        # Pages skipped by `sitemap_filter` are still reported, so that they
+        # are not removed from the website as if they had disappeared
+        for request in super()._parse_sitemap(response):
+            yield from self._flush_unchanged()
+            yield self._with_conditional_headers(request)
+
+        yield from self._flush_unchanged()
+
+    def _with_conditional_headers(self, request: Request) -> Request:
+        headers = conditional_headers(self.known_pages.get(request.url))
+
+        if not headers:
+            return request
+
+        return request.replace(headers=headers)
+
     def parse(self, response: Response):
         return parse_response(response)
@@ -1,4 +1,8 @@
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
 
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,13 +12,94 @@ from intric.database.tables.app_table import AppRuns, Apps
 from intric.database.tables.assistant_table import Assistants
 from intric.database.tables.questions_table import Questions
 from intric.database.tables.sessions_table import Sessions
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_TIME_BUDGET_SECONDS = 15 * 60
+
+
+@dataclass
+class RetentionCursor:
+    """Keyset position of the last deleted row, ordered by (created_at, id)."""
+
+    created_at: datetime
+    id: UUID
+
+
+@dataclass
+class RetentionBatchResult:
+    deleted: int
+    cursor: Optional[RetentionCursor]
+
+
+@dataclass
+class RetentionTargetMetrics:
+    deleted: int = 0
+    batches: int = 0
+    completed: bool = False
+
+
+@dataclass
+class RetentionRunMetrics:
+    questions: RetentionTargetMetrics = field(default_factory=RetentionTargetMetrics)
+    app_runs: RetentionTargetMetrics = field(default_factory=RetentionTargetMetrics)
+    sessions: RetentionTargetMetrics = field(default_factory=RetentionTargetMetrics)
+    duration_seconds: float = 0.0
+
+    @property
+    def total_deleted(self) -> int:
+        return self.questions.deleted + self.app_runs.deleted + self.sessions.deleted
+
+    @property
+    def completed(self) -> bool:
+        return (
+            self.questions.completed
+            and self.app_runs.completed
+            and self.sessions.completed
+        )
+
+
+def _after_cursor(table, cursor: Optional[RetentionCursor]):
+    if cursor is None:
+        return sa.true()
+
+    return sa.tuple_(table.created_at, table.id) > sa.tuple_(
+        sa.literal(cursor.created_at), sa.literal(cursor.id)
+    )
 
 
 class DataRetentionService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def delete_old_questions(self):
+    async def _delete_batch(
+        self, table, subquery: sa.Select, batch_size: int
+    ) -> RetentionBatchResult:
+        subquery = subquery.order_by(table.created_at, table.id).limit(batch_size)
+
+        query = (
+            sa.delete(table)
+            .where(table.id.in_(subquery))
+            .returning(table.created_at, table.id)
+        )
+        rows = (await self.session.execute(query)).all()
+
+        if not rows:
+            return RetentionBatchResult(deleted=0, cursor=None)
+
+        last_created_at, last_id = max(rows)
+        return RetentionBatchResult(
+            deleted=len(rows),
+            cursor=RetentionCursor(created_at=last_created_at, id=last_id),
+        )
+
+    async def delete_old_questions(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cursor: Optional[RetentionCursor] = None,
+    ) -> RetentionBatchResult:
         subquery = (
             sa.select(Questions.id)
             .join(Assistants, Questions.assistant_id == Assistants.id)
@@ -23,14 +108,18 @@ class DataRetentionService:
                     Assistants.data_retention_days.isnot(None),
                     Questions.created_at
                     < sa.func.now() - Assistants.data_retention_days * text("INTERVAL '1 day'"),
+                    _after_cursor(Questions, cursor),
                 )
             )
         )
 
-        query = sa.delete(Questions).where(Questions.id.in_(subquery))
-        await self.session.execute(query)
+        return await self._delete_batch(Questions, subquery, batch_size=batch_size)
 
-    async def delete_old_app_runs(self):
+    async def delete_old_app_runs(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cursor: Optional[RetentionCursor] = None,
+    ) -> RetentionBatchResult:
         subquery = (
             sa.select(AppRuns.id)
             .join(Apps, AppRuns.app_id == Apps.id)
@@ -39,21 +128,80 @@ class DataRetentionService:
                     Apps.data_retention_days.isnot(None),
                     AppRuns.created_at
                     < sa.func.now() - Apps.data_retention_days * text("INTERVAL '1 day'"),
+                    _after_cursor(AppRuns, cursor),
                 )
             )
         )
 
-        query = sa.delete(AppRuns).where(AppRuns.id.in_(subquery))
-        await self.session.execute(query)
+        return await self._delete_batch(AppRuns, subquery, batch_size=batch_size)
 
-    async def delete_old_sessions(self):
+    async def delete_old_sessions(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cursor: Optional[RetentionCursor] = None,
+    ) -> RetentionBatchResult:
         one_day_ago = datetime.now(timezone.utc) - timedelta(days=1)
 
         subquery = (
             sa.select(Sessions.id)
             .outerjoin(Questions, Sessions.id == Questions.session_id)
-            .where(sa.and_(Sessions.created_at < one_day_ago, Questions.id.is_(None)))
+            .where(
+                sa.and_(
+                    Sessions.created_at < one_day_ago,
+                    Questions.id.is_(None),
+                    _after_cursor(Sessions, cursor),
+                )
+            )
+        )
+
+        return await self._delete_batch(Sessions, subquery, batch_size=batch_size)
+
+    async def run(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        time_budget_seconds: float = DEFAULT_TIME_BUDGET_SECONDS,
+    ) -> RetentionRunMetrics:
+        """Delete expired data in bounded batches, committing after each batch.
+
+        Stops once the time budget is spent. Anything left over is picked up
+        by the next run, since deleted rows never match again.
+        """
+        metrics = RetentionRunMetrics()
+        start = time.monotonic()
+        deadline = start + time_budget_seconds
+
+        targets = [
+            (self.delete_old_questions, metrics.questions),
+            (self.delete_old_app_runs, metrics.app_runs),
+            # Sessions go last so that sessions emptied by the question
+            # cleanup are removed in the same run
+            (self.delete_old_sessions, metrics.sessions),
+        ]
+
+        for delete_batch, target_metrics in targets:
+            cursor = None
+
+            while time.monotonic() < deadline:
+                async with self.session.begin():
+                    result = await delete_batch(batch_size=batch_size, cursor=cursor)
+
+                target_metrics.batches += 1
+                target_metrics.deleted += result.deleted
+                cursor = result.cursor
+
+                if result.deleted < batch_size:
+                    target_metrics.completed = True
+                    break
+
+        metrics.duration_seconds = time.monotonic() - start
+
+        logger.info(
+            "Data retention run finished: "
+            f"questions={metrics.questions.deleted} "
+            f"app_runs={metrics.app_runs.deleted} "
+            f"sessions={metrics.sessions.deleted} "
+            f"duration={metrics.duration_seconds:.1f}s "
+            f"completed={metrics.completed}"
         )
 
-        query = sa.delete(Sessions).where(Sessions.id.in_(subquery))
-        await self.session.execute(query)
+        return metrics
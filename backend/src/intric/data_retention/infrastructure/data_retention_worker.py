@@ -1,3 +1,4 @@
+from intric.main.config import get_settings
 from intric.main.container.container import Container
 from intric.worker.worker import Worker
 
@@ -6,10 +7,13 @@ worker = Worker()
 
 @worker.cron_job(hour=3, minute=0)  # Run daily at 3 AM
 async def cleanup_old_data(container: Container):
+    settings = get_settings()
     data_retention_service = container.data_retention_service()
 
-    async with container.session().begin():
-        await data_retention_service.delete_old_questions()
-        await data_retention_service.delete_old_app_runs()
-        await data_retention_service.delete_old_sessions()
-    return True
+    # Each batch is committed separately by the service, so the run never
+    # holds long row locks while chat traffic is writing
+    metrics = await data_retention_service.run(
+        batch_size=settings.data_retention_batch_size,
+        time_budget_seconds=settings.data_retention_time_budget_seconds,
+    )
+    return metrics.completed
@@ -2,6 +2,7 @@
 
 import intric.database.tables.ai_models_table
 import intric.database.tables.allowed_origins_table
+import intric.database.tables.answer_cache_table
 import intric.database.tables.api_keys_table
 import intric.database.tables.app_table
 import intric.database.tables.app_template_table
@@ -24,7 +25,10 @@ import intric.database.tables.service_table
 import intric.database.tables.sessions_table
 import intric.database.tables.settings_table
 import intric.database.tables.spaces_table
+import intric.database.tables.storage_usage_table
 import intric.database.tables.tenant_table
+import intric.database.tables.transcription_cache_table
+import intric.database.tables.usage_rollups_table
 import intric.database.tables.user_groups_table
 import intric.database.tables.users_table
 import intric.database.tables.web_search_results_table
@@ -1,7 +1,7 @@
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ARRAY, ForeignKey, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from intric.database.tables.base_class import BaseCrossReference, BasePublic
@@ -29,6 +29,9 @@ class CompletionModels(BasePublic):
     vision: Mapped[bool] = mapped_column(server_default="False")
     reasoning: Mapped[bool] = mapped_column(server_default="False")
     base_url: Mapped[Optional[str]] = mapped_column()
+    tokens_per_minute: Mapped[Optional[int]] = mapped_column()
+    # Names of equivalent models to fail over to, in order
+    fallback_models: Mapped[Optional[list[str]]] = mapped_column(ARRAY(String))
 
 
 class CompletionModelSettings(BaseCrossReference):
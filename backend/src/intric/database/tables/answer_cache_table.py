@@ -0,0 +1,28 @@
+from uuid import UUID
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from intric.database.tables.assistant_table import Assistants
+from intric.database.tables.base_class import BasePublic
+from intric.database.tables.questions_table import Questions
+from intric.database.tables.tenant_table import Tenants
+
+
+class AnswerCache(BasePublic):
+    # Everything besides the question that the answer depends on, hashed
+    cache_key: Mapped[str] = mapped_column()
+    embedding: Mapped[list[float]] = mapped_column(Vector)
+
+    # Foreign keys
+    tenant_id: Mapped[UUID] = mapped_column(ForeignKey(Tenants.id, ondelete="CASCADE"))
+    assistant_id: Mapped[UUID] = mapped_column(ForeignKey(Assistants.id, ondelete="CASCADE"))
+    # The answer and its references are those of the question
+    question_id: Mapped[UUID] = mapped_column(
+        ForeignKey(Questions.id, ondelete="CASCADE"), index=True
+    )
+
+    __table_args__ = (
+        Index("answer_cache_assistant_id_cache_key_idx", "assistant_id", "cache_key"),
+    )
@@ -25,6 +25,7 @@ class Assistants(BasePublic):
     published: Mapped[bool] = mapped_column()
     description: Mapped[Optional[str]] = mapped_column()
     insight_enabled: Mapped[bool] = mapped_column(default=False)
+    answer_cache_enabled: Mapped[bool] = mapped_column(server_default="false")
     data_retention_days: Mapped[Optional[int]] = mapped_column()
     metadata_json: Mapped[Optional[dict]] = mapped_column(JSONB)
     # TODO: refactor since this is a somewhat weird solution having a
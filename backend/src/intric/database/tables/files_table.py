@@ -5,7 +5,7 @@ from sqlalchemy import ForeignKey
 from sqlalchemy.dialects.postgresql import BYTEA
 from sqlalchemy.orm import Mapped, mapped_column
 
-from intric.database.tables.base_class import BasePublic
+from intric.database.tables.base_class import BaseCrossReference, BasePublic
 from intric.database.tables.tenant_table import Tenants
 from intric.database.tables.users_table import Users
 from intric.files.file_models import FileType
@@ -14,7 +14,13 @@ from intric.files.file_models import FileType
 class Files(BasePublic):
     name: Mapped[str] = mapped_column()
     text: Mapped[Optional[str]] = mapped_column()
-    blob: Mapped[Optional[bytes]] = mapped_column(BYTEA)
+    # Content is kept in the blob store under `blob_key`. Files from before
+    # the blob store still have their content in the `blob` column, until
+    # they are moved by the `move_file_blobs_to_store` job
+    blob_key: Mapped[Optional[str]] = mapped_column(index=True)
+    # The image that is sent to the models, if the original is larger
+    downscaled_blob_key: Mapped[Optional[str]] = mapped_column(index=True)
+    legacy_blob: Mapped[Optional[bytes]] = mapped_column("blob", BYTEA, deferred=True)
     checksum: Mapped[str] = mapped_column(index=True)
     size: Mapped[int] = mapped_column()
     mimetype: Mapped[Optional[str]] = mapped_column()
@@ -24,3 +30,13 @@ class Files(BasePublic):
     # Foreign keys
     user_id: Mapped[UUID] = mapped_column(ForeignKey(Users.id, ondelete="CASCADE"))
     tenant_id: Mapped[UUID] = mapped_column(ForeignKey(Tenants.id, ondelete="CASCADE"))
+
+
+class OrphanedBlobs(BaseCrossReference):
+    """
+    Blob store keys whose files were deleted, including by cascading deletes.
+    Written by a trigger on files, the blobs are deleted from the store by the
+    `delete_orphaned_blobs` job once no file references them.
+    """
+
+    key: Mapped[str] = mapped_column(primary_key=True)
@@ -1,7 +1,8 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import DateTime, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from intric.database.tables.ai_models_table import EmbeddingModels
@@ -19,6 +20,17 @@ class InfoBlobs(BasePublic):
     url: Mapped[Optional[str]] = mapped_column()
     size: Mapped[int] = mapped_column()
 
+    # Used to skip unchanged pages and files when a website is recrawled
+    content_hash: Mapped[Optional[str]] = mapped_column()
+    etag: Mapped[Optional[str]] = mapped_column()
+    last_modified: Mapped[Optional[str]] = mapped_column()
+    # When the page was last found unchanged, a sitemap lastmod is compared with it
+    last_crawled_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    # Used to reuse the text and chunks when identical content is ingested again
+    extraction_key: Mapped[Optional[str]] = mapped_column(index=True)
+    embedding_key: Mapped[Optional[str]] = mapped_column(index=True)
+
     # Foreign keys
     user_id: Mapped[UUID] = mapped_column(ForeignKey(Users.id, ondelete="CASCADE"), index=True)
     tenant_id: Mapped[UUID] = mapped_column(ForeignKey(Tenants.id, ondelete="CASCADE"))
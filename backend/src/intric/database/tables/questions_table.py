@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.ext.associationproxy import AssociationProxy, association_proxy
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -24,6 +24,7 @@ class Questions(BasePublic):
     answer: Mapped[str] = mapped_column()
     num_tokens_question: Mapped[int] = mapped_column()
     num_tokens_answer: Mapped[int] = mapped_column()
+    num_tokens_cached: Mapped[int] = mapped_column(server_default="0")
 
     # Foreign keys
     completion_model_id: Mapped[Optional[UUID]] = mapped_column(
@@ -65,6 +66,10 @@ class Questions(BasePublic):
         order_by="WebSearchResult.score.desc()"
     )
 
+    __table_args__ = (
+        Index("questions_assistant_id_created_at_idx", "assistant_id", "created_at"),
+    )
+
 
 class InfoBlobReferences(BaseCrossReference):
     question_id: Mapped[UUID] = mapped_column(
@@ -1,7 +1,8 @@
+from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, Index
+from sqlalchemy import DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from intric.database.tables.assistant_table import Assistants
@@ -20,6 +21,13 @@ class Sessions(BasePublic):
     feedback_value: Mapped[Optional[int]] = mapped_column()
     feedback_text: Mapped[Optional[str]] = mapped_column()
 
+    # Summary of the questions up to and including `history_summarized_until`
+    history_summary: Mapped[Optional[str]] = mapped_column()
+    history_summary_tokens: Mapped[Optional[int]] = mapped_column()
+    history_summarized_until: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
+
     # Foreign keys
     assistant_id: Mapped[Optional[UUID]] = mapped_column(
         ForeignKey(Assistants.id, ondelete="CASCADE")
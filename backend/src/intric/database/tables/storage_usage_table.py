@@ -0,0 +1,30 @@
+from uuid import UUID
+
+from sqlalchemy import BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from intric.database.tables.base_class import BaseCrossReference, BasePublic
+
+
+class StorageUsageCounters(BaseCrossReference):
+    scope: Mapped[str] = mapped_column(primary_key=True)
+    owner_id: Mapped[UUID] = mapped_column(primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger)
+
+
+class StorageUsageDeltas(BasePublic):
+    """
+    Written by a trigger on info_blobs in the same transaction as the change.
+    Appending instead of updating the counters directly means that long running
+    ingest transactions never hold a lock on a shared counter row.
+    """
+
+    # No foreign keys, the owners might be deleted in the same transaction
+    user_id: Mapped[UUID] = mapped_column()
+    tenant_id: Mapped[UUID] = mapped_column()
+    size_delta: Mapped[int] = mapped_column(BigInteger)
+
+    __table_args__ = (
+        Index("storage_usage_deltas_user_id_idx", "user_id"),
+        Index("storage_usage_deltas_tenant_id_idx", "tenant_id"),
+    )
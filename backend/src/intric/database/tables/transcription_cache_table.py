@@ -0,0 +1,19 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from intric.database.tables.ai_models_table import TranscriptionModels
+from intric.database.tables.base_class import BaseCrossReference
+from intric.database.tables.tenant_table import Tenants
+
+
+class TranscriptionCache(BaseCrossReference):
+    tenant_id: Mapped[UUID] = mapped_column(
+        ForeignKey(Tenants.id, ondelete="CASCADE"), primary_key=True
+    )
+    checksum: Mapped[str] = mapped_column(String, primary_key=True)
+    transcription_model_id: Mapped[UUID] = mapped_column(
+        ForeignKey(TranscriptionModels.id, ondelete="CASCADE"), primary_key=True
+    )
+    text: Mapped[str] = mapped_column()
@@ -0,0 +1,52 @@
+from datetime import date
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import BigInteger, Date, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from intric.database.tables.ai_models_table import CompletionModels
+from intric.database.tables.app_table import Apps
+from intric.database.tables.assistant_table import Assistants
+from intric.database.tables.base_class import BaseCrossReference, BasePublic
+from intric.database.tables.tenant_table import Tenants
+
+
+class UsageDailyRollups(BasePublic):
+    source: Mapped[str] = mapped_column()
+    day: Mapped[date] = mapped_column(Date)
+    input_tokens: Mapped[int] = mapped_column(BigInteger)
+    output_tokens: Mapped[int] = mapped_column(BigInteger)
+    request_count: Mapped[int] = mapped_column(BigInteger)
+
+    # Foreign keys
+    tenant_id: Mapped[UUID] = mapped_column(ForeignKey(Tenants.id, ondelete="CASCADE"))
+    completion_model_id: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey(CompletionModels.id, ondelete="SET NULL")
+    )
+    assistant_id: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey(Assistants.id, ondelete="SET NULL")
+    )
+    app_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey(Apps.id, ondelete="SET NULL"))
+
+    __table_args__ = (
+        Index("usage_daily_rollups_tenant_id_day_idx", "tenant_id", "day"),
+        Index("usage_daily_rollups_source_day_idx", "source", "day"),
+    )
+
+
+class UsageRollupWatermarks(BaseCrossReference):
+    source: Mapped[str] = mapped_column(primary_key=True)
+    # Exclusive: every day before this one has been rolled up
+    rolled_up_until: Mapped[date] = mapped_column(Date)
+
+
+class UsageRollupStaleDays(BaseCrossReference):
+    """
+    Days that were rolled up before questions or app runs of them were deleted
+    or changed. Written by triggers on the source tables, the rollups of these days are
+    recomputed by the next refresh.
+    """
+
+    source: Mapped[str] = mapped_column(primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
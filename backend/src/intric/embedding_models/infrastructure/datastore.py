@@ -1,5 +1,6 @@
 import time
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, AsyncIterable, Optional
+from uuid import UUID
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from pydantic_settings import BaseSettings
@@ -84,20 +85,35 @@ class Datastore:
         self.create_embeddings_service = create_embeddings_service
 
     def _chunk_text(self, info_blob: InfoBlobInDB):
-        splitter = RecursiveCharacterTextSplitter(
+        return self._split_text(text=info_blob.text, info_blob_id=info_blob.id)
+
+    @staticmethod
+    def embedding_key(text_hash: str, embedding_model: "EmbeddingModel") -> str:
+        """Identifies the chunks and embeddings of a text, see `content_cache`."""
+        return (
+            f"{text_hash}:{embedding_model.id}:"
+            f"{settings.chunk_size}:{settings.chunk_overlap}"
+        )
+
+    @staticmethod
+    def _get_splitter():
+        return RecursiveCharacterTextSplitter(
             chunk_size=settings.chunk_size,
             chunk_overlap=settings.chunk_overlap,
             length_function=count_tokens,
         )
 
+    def _split_text(self, text: str, info_blob_id: UUID):
+        splitter = self._get_splitter()
+
         info_blob_chunks = [
             InfoBlobChunk(
                 chunk_no=i,
                 text=chunk.strip(),
-                info_blob_id=info_blob.id,
+                info_blob_id=info_blob_id,
                 tenant_id=self.user.tenant_id,
             )
-            for i, chunk in enumerate(splitter.split_text(info_blob.text))
+            for i, chunk in enumerate(splitter.split_text(text))
             if chunk.strip()
         ]
 
@@ -123,22 +139,108 @@ class Datastore:
             logger.debug(f"Last batch. Adding {len(chunks)} chunks to datastore.")
             await self.chunk_repo.add(chunks)
 
-    async def add(self, info_blob: InfoBlobInDB, embedding_model: "EmbeddingModel"):
+    async def embed(
+        self, *, text: str, info_blob_id: UUID, embedding_model: "EmbeddingModel"
+    ) -> Optional[ChunkEmbeddingList]:
+        """Chunk and embed text for an info blob that does not need to exist yet.
+
+        Lets callers do the slow embedding outside of the database transaction
+        and store the result later with `add_embeddings`.
+        """
         logger.debug("Chunking text.")
-        info_blob_chunks = self._chunk_text(info_blob)
+        info_blob_chunks = self._split_text(text=text, info_blob_id=info_blob_id)
 
         if not info_blob_chunks:
-            logger.warning(f"Info Blob {info_blob.id} did not yield any chunks after splitting.")
-            return
+            logger.warning(f"Info Blob {info_blob_id} did not yield any chunks after splitting.")
+            return None
 
         logger.debug(f"Embedding {len(info_blob_chunks)} info-blob chunks.")
-        chunk_embedding_list = await self.create_embeddings_service.get_embeddings(
+        return await self.create_embeddings_service.get_embeddings(
             model=embedding_model, chunks=info_blob_chunks
         )
 
-        logger.debug(f"Adding {len(info_blob_chunks)} info-blob chunks to datastore.")
+    async def add_embeddings(self, chunk_embedding_list: Optional[ChunkEmbeddingList]):
+        if chunk_embedding_list is None:
+            return
+
+        logger.debug("Adding info-blob chunks to datastore.")
         await self._add(chunk_embedding_list)
 
+    async def copy_embeddings(self, *, from_info_blob_id: UUID, to_info_blob_id: UUID):
+        logger.debug(f"Copying info-blob chunks from {from_info_blob_id}.")
+        await self.chunk_repo.copy_chunks(
+            from_info_blob_id=from_info_blob_id, to_info_blob_id=to_info_blob_id
+        )
+
+    async def add(self, info_blob: InfoBlobInDB, embedding_model: "EmbeddingModel"):
+        chunk_embedding_list = await self.embed(
+            text=info_blob.text, info_blob_id=info_blob.id, embedding_model=embedding_model
+        )
+        await self.add_embeddings(chunk_embedding_list)
+
+    async def add_stream(
+        self,
+        *,
+        info_blob_id: UUID,
+        texts: AsyncIterable[str],
+        embedding_model: "EmbeddingModel",
+        batch_size: int = 100,
+    ):
+        """Chunk, embed and store text that arrives in parts, e.g. page by page.
+
+        Chunks are embedded and stored in batches as soon as they are complete,
+        so memory use does not grow with the size of the document. The last
+        chunk of every part is carried over and split again together with the
+        next part, since it may continue there.
+        """
+        splitter = self._get_splitter()
+        chunk_no = 0
+        carry = ""
+        info_blob_chunks: list[InfoBlobChunk] = []
+
+        def _add_chunk(text: str):
+            nonlocal chunk_no
+            if not text.strip():
+                return
+
+            info_blob_chunks.append(
+                InfoBlobChunk(
+                    chunk_no=chunk_no,
+                    text=text.strip(),
+                    info_blob_id=info_blob_id,
+                    tenant_id=self.user.tenant_id,
+                )
+            )
+            chunk_no += 1
+
+        async def _flush():
+            logger.debug(f"Embedding {len(info_blob_chunks)} info-blob chunks.")
+            chunk_embedding_list = await self.create_embeddings_service.get_embeddings(
+                model=embedding_model, chunks=info_blob_chunks
+            )
+            await self._add(chunk_embedding_list, batch_size=batch_size)
+            info_blob_chunks.clear()
+
+        async for text in texts:
+            pieces = splitter.split_text(f"{carry} {text}" if carry else text)
+            if not pieces:
+                continue
+
+            carry = pieces.pop()
+            for piece in pieces:
+                _add_chunk(piece)
+
+            if len(info_blob_chunks) >= batch_size:
+                await _flush()
+
+        _add_chunk(carry)
+
+        if info_blob_chunks:
+            await _flush()
+
+        if chunk_no == 0:
+            logger.warning(f"Info Blob {info_blob_id} did not yield any chunks after splitting.")
+
     async def semantic_search(
         self,
         search_string: str,
@@ -1,15 +1,16 @@
 # MIT License
 
 import asyncio
+import os
 import tempfile
-import wave
+import threading
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator
+from typing import AsyncIterator, Callable
 
 import audioread
 import numpy as np
-import soundfile as sf
 from soundfile import SoundFile
 
 from intric.files.text import MimeTypesBase
@@ -17,7 +18,9 @@ from intric.main.logging import get_logger
 
 logger = get_logger(__name__)
 
-FRAMES = 32768  # Number of frames in one mebibyte
+# Speech models work on 16 kHz mono, anything more is sent for nothing
+SAMPLERATE = 16000
+RESAMPLING_TAPS = 31
 
 
 # TODO: When we support video, remove the video mimetypes
@@ -33,92 +36,171 @@ class AudioMimeTypes(MimeTypesBase):
     MP4A = "audio/mp4"
 
 
-def _to_wav(filepath: str):
-    logger.debug(f"Converting {filepath} to wav")
+@dataclass
+class AudioSegment:
+    path: Path
+    # In seconds from the start of the audio, not counting the overlap
+    start: float
+    end: float
+
+
+class _Resampler:
+    """Resamples a stream of blocks. Low-pass filters when downsampling,
+    then interpolates linearly between the samples."""
+
+    def __init__(self, from_rate: int, to_rate: int):
+        self.step = from_rate / to_rate
+
+        if from_rate > to_rate:
+            # Windowed sinc, cutting a bit below the new Nyquist frequency
+            cutoff = 0.9 * to_rate / 2 / from_rate
+            n = np.arange(RESAMPLING_TAPS) - (RESAMPLING_TAPS - 1) / 2
+            kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(RESAMPLING_TAPS)
+            self.kernel = (kernel / kernel.sum()).astype(np.float32)
+        else:
+            self.kernel = np.ones(1, dtype=np.float32)
+
+        # The end of the previous block, for filtering and interpolating
+        # across the block boundary
+        self.history = np.zeros(len(self.kernel) - 1, dtype=np.float32)
+        self.last = np.zeros(0, dtype=np.float32)
+        # Position of the next output sample, in samples from self.last
+        self.position = 0.0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        padded = np.concatenate([self.history, samples])
+        self.history = padded[len(padded) - (len(self.kernel) - 1) :]
+        signal = np.concatenate([self.last, np.convolve(padded, self.kernel, mode="valid")])
+
+        if len(signal) < 2:
+            self.last = signal
+            return np.zeros(0, dtype=np.float32)
+
+        positions = np.arange(self.position, len(signal) - 1, self.step)
+        resampled = np.interp(positions, np.arange(len(signal)), signal)
+
+        self.position += len(positions) * self.step - (len(signal) - 1)
+        self.last = signal[-1:]
+
+        return resampled.astype(np.float32)
+
+
+def _transcode(
+    filepath: Path,
+    seconds: int,
+    overlap_seconds: int,
+    on_segment: Callable[[AudioSegment], None],
+    stopped: threading.Event,
+    created: list[Path],
+):
+    segment_size = SAMPLERATE * seconds
+    overlap_size = SAMPLERATE * overlap_seconds
+    overlap = np.zeros(0, dtype=np.float32)
+    segment_start = 0
+    frames_in_segment = 0
+    soundfile = None
+
+    def _open_segment():
+        fd, name = tempfile.mkstemp(suffix=".mp3")
+        os.close(fd)
+        created.append(Path(name))
+
+        segment = SoundFile(name, mode="w", samplerate=SAMPLERATE, channels=1, format="mp3")
+
+        # Repeat the end of the previous segment, so that words cut at the
+        # boundary are heard in full in one of the segments
+        if len(overlap):
+            segment.write(overlap)
+
+        return segment
+
+    def _close_segment():
+        soundfile.close()
+        on_segment(
+            AudioSegment(
+                path=created[-1],
+                start=segment_start / SAMPLERATE,
+                end=(segment_start + frames_in_segment) / SAMPLERATE,
+            )
+        )
 
-    with audioread.audio_open(filepath) as f:
-        tmp_file = tempfile.NamedTemporaryFile(suffix=".wav")
-        with wave.open(tmp_file, "w") as of:
-            of.setframerate(f.samplerate)
-            of.setnchannels(f.channels)
-            of.setsampwidth(2)
+    logger.debug(f"Transcoding {filepath}")
 
-            for buf in f:
-                of.writeframes(buf)
+    with audioread.audio_open(str(filepath)) as f:
+        resampler = _Resampler(f.samplerate, SAMPLERATE)
 
-    return tmp_file
+        for buf in f:
+            if stopped.is_set():
+                break
 
+            # Make mono by averaging the channels
+            samples = np.frombuffer(buf, dtype="<i2").astype(np.float32) / 32768
+            samples = resampler.process(samples.reshape(-1, f.channels).mean(axis=1))
 
-@asynccontextmanager
-async def to_wav(filepath: str):
-    tmp_file = await asyncio.to_thread(_to_wav, filepath)
+            while len(samples):
+                if soundfile is None:
+                    soundfile = _open_segment()
 
-    try:
-        yield AudioFile(tmp_file.name)
-    finally:
-        tmp_file.close()
-
-
-class AudioFile:
-    def __init__(self, path_to_file: str):
-        self.path = Path(path_to_file)
-        self.info = sf.info(path_to_file)
-
-    def _gen_file(self):
-        for block in sf.blocks(self.path, blocksize=FRAMES):
-            yield block
-
-    def _write_to_file(self, gen: Iterator[np.ndarray], max_size: int):
-        frames_in_file = 0
-        temp_file = tempfile.NamedTemporaryFile(suffix=".mp3")
-        soundfile = SoundFile(
-            temp_file,
-            mode="w",
-            samplerate=self.info.samplerate,
-            channels=1,
-            format="mp3",
-        )
-        for block in gen:
-            if self.info.channels == 2:
-                # Make mono by averageing the two channels
-                data = np.sum(block, axis=1) / 2
-            else:
-                data = block
+                data = samples[: segment_size - frames_in_segment]
+                samples = samples[len(data) :]
+                soundfile.write(data)
+                frames_in_segment += len(data)
 
-            frames_in_file += len(data)
-            soundfile.write(data)
-            soundfile.flush()
+                if overlap_size:
+                    overlap = np.concatenate([overlap, data])[-overlap_size:]
 
-            if frames_in_file > max_size:
-                return temp_file, False
+                if frames_in_segment == segment_size:
+                    _close_segment()
+                    soundfile = None
+                    segment_start += frames_in_segment
+                    frames_in_segment = 0
 
-        return temp_file, True
+        if soundfile is not None:
+            _close_segment()
 
-    def _split_file(self, seconds: int):
-        max_size = self.info.samplerate * seconds
-        temp_files = []
-        gen = self._gen_file()
-        done = False
-        while not done:
-            file, done = self._write_to_file(gen, max_size)
-            temp_files.append(file)
 
-        return temp_files
+@asynccontextmanager
+async def transcode(
+    filepath: Path, seconds: int, overlap_seconds: int = 0
+) -> AsyncIterator[AsyncIterator[AudioSegment]]:
+    """Decode, downmix to mono and resample to 16 kHz, in one pass.
+
+    Yields the segments of `seconds` each as MP3 files, as soon as each is
+    written. Every segment but the first also starts with the last
+    `overlap_seconds` of the segment before it. Only one block of the decoded
+    audio is held in memory at a time, and the segments are removed on exit.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[AudioSegment | None] = asyncio.Queue()
+    stopped = threading.Event()
+    created: list[Path] = []
+
+    def _on_segment(segment: AudioSegment):
+        loop.call_soon_threadsafe(queue.put_nowait, segment)
+
+    async def _run():
+        try:
+            await asyncio.to_thread(
+                _transcode, filepath, seconds, overlap_seconds, _on_segment, stopped, created
+            )
+        finally:
+            queue.put_nowait(None)
 
-    @asynccontextmanager
-    async def asplit_file(self, seconds: int):
-        logger.debug("Splitting the file")
+    task = asyncio.create_task(_run())
 
-        temp_files = await asyncio.to_thread(self._split_file, seconds)
-        filepaths = [Path(f.name) for f in temp_files]
+    async def _segments():
+        while (segment := await queue.get()) is not None:
+            yield segment
 
-        logger.debug("File was split in %s parts", len(filepaths))
+        # Raise if decoding failed
+        await task
+        logger.debug("File was split in %s parts", len(created))
 
-        try:
-            yield filepaths
-        finally:
-            for f in temp_files:
-                f.close()
+    try:
+        yield _segments()
+    finally:
+        stopped.set()
+        await asyncio.gather(task, return_exceptions=True)
 
-    def delete(self):
-        self.path.unlink()
+        for path in created:
+            path.unlink(missing_ok=True)
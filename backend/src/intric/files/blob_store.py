@@ -0,0 +1,299 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from urllib.parse import quote, urlsplit
+
+from yarl import URL
+
+from intric.main.aiohttp_client import aiohttp_client
+from intric.main.config import SETTINGS
+from intric.main.exceptions import NotFoundException
+
+CHUNK_SIZE = 1024 * 1024
+
+EMPTY_PAYLOAD_HASH = hashlib.sha256(b"").hexdigest()
+
+
+def blob_key(tenant_id: uuid.UUID, checksum: str) -> str:
+    """Content addressed key of a blob.
+
+    Keys are scoped by tenant, so identical files of one tenant share a blob
+    while tenants never share storage.
+    """
+    return f"{tenant_id}/{checksum}"
+
+
+def downscaled_blob_key(key: str) -> str:
+    """Key of the downscaled version of the image stored under `key`."""
+    return f"{key}.downscaled"
+
+
+class BlobStore(ABC):
+    """Stores the binary content of files outside of the database."""
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        pass
+
+    @abstractmethod
+    async def stream(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Open the blob and return an iterator over its bytes `start` to `end`.
+
+        `end` is inclusive, like in a HTTP range. Raises NotFoundException
+        before anything is read if the blob does not exist.
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid blob key: {key}")
+
+        return path
+
+    def _write(self, path: Path, data: bytes):
+        # Content addressed, so an existing blob already has this content
+        if path.exists():
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write next to the target and rename, so readers never see partial blobs
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    async def put(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(self._write, self._path(key), data)
+
+    async def get(self, key: str) -> bytes:
+        try:
+            return await asyncio.to_thread(self._path(key).read_bytes)
+        except FileNotFoundError as e:
+            raise NotFoundException("Blob not found") from e
+
+    async def _read_chunks(self, file, start: int, end: Optional[int]):
+        try:
+            await asyncio.to_thread(file.seek, start)
+            remaining = None if end is None else end - start + 1
+
+            while remaining is None or remaining > 0:
+                size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+                chunk = await asyncio.to_thread(file.read, size)
+                if not chunk:
+                    break
+
+                if remaining is not None:
+                    remaining -= len(chunk)
+
+                yield chunk
+        finally:
+            file.close()
+
+    async def stream(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        try:
+            file = await asyncio.to_thread(open, self._path(key), "rb")
+        except FileNotFoundError as e:
+            raise NotFoundException("Blob not found") from e
+
+        return self._read_chunks(file, start, end)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, True)
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode(), hashlib.sha256).digest()
+
+
+def sign_request(
+    *,
+    method: str,
+    host: str,
+    path: str,
+    headers: dict[str, str],
+    payload_hash: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    now: datetime,
+) -> dict[str, str]:
+    """Sign a request with AWS Signature Version 4.
+
+    Returns the headers to send, including `headers` and the authorization.
+    """
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date = amz_date[:8]
+
+    signed = {
+        **{name.lower(): value.strip() for name, value in headers.items()},
+        "host": host,
+        "x-amz-content-sha256": payload_hash,
+        "x-amz-date": amz_date,
+    }
+    signed_headers = ";".join(sorted(signed))
+    canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in sorted(signed))
+
+    canonical_request = "\n".join(
+        [method, path, "", canonical_headers, signed_headers, payload_hash]
+    )
+
+    scope = f"{date}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+
+    signing_key = _hmac(f"AWS4{secret_key}".encode(), date)
+    for part in (region, "s3", "aws4_request"):
+        signing_key = _hmac(signing_key, part)
+
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    signed.pop("host")
+    signed["authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+
+    return signed
+
+
+class S3BlobStore(BlobStore):
+    """Blob store for S3 and S3 compatible services, such as MinIO.
+
+    Uses path style addressing, which every S3 compatible service supports.
+    """
+
+    def __init__(
+        self,
+        *,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.host = urlsplit(self.endpoint_url).netloc
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+
+    def _request(
+        self,
+        method: str,
+        key: str,
+        data: bytes = b"",
+        headers: Optional[dict[str, str]] = None,
+    ):
+        path = quote(f"/{self.bucket}/{key}", safe="/-_.~")
+        signed_headers = sign_request(
+            method=method,
+            host=self.host,
+            path=path,
+            headers=headers or {},
+            payload_hash=hashlib.sha256(data).hexdigest() if data else EMPTY_PAYLOAD_HASH,
+            access_key=self.access_key,
+            secret_key=self.secret_key,
+            region=self.region,
+            now=datetime.now(timezone.utc),
+        )
+
+        return aiohttp_client().request(
+            method,
+            URL(f"{self.endpoint_url}{path}", encoded=True),
+            data=data or None,
+            headers=signed_headers,
+        )
+
+    async def put(self, key: str, data: bytes) -> None:
+        async with self._request("PUT", key, data=data) as resp:
+            resp.raise_for_status()
+
+    async def get(self, key: str) -> bytes:
+        async with self._request("GET", key) as resp:
+            if resp.status == 404:
+                raise NotFoundException("Blob not found")
+            resp.raise_for_status()
+
+            return await resp.read()
+
+    async def _read_chunks(self, resp):
+        try:
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                yield chunk
+        finally:
+            resp.release()
+
+    async def stream(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        headers = {}
+        if start > 0 or end is not None:
+            headers["range"] = f"bytes={start}-{'' if end is None else end}"
+
+        resp = await self._request("GET", key, headers=headers)
+
+        if resp.status == 404:
+            resp.release()
+            raise NotFoundException("Blob not found")
+
+        if resp.status >= 400:
+            resp.release()
+            resp.raise_for_status()
+
+        return self._read_chunks(resp)
+
+    async def delete(self, key: str) -> None:
+        async with self._request("DELETE", key) as resp:
+            # Deleting a missing object is not an error in S3
+            if resp.status != 404:
+                resp.raise_for_status()
+
+
+def create_blob_store() -> BlobStore:
+    match SETTINGS.blob_store_backend:
+        case "s3":
+            return S3BlobStore(
+                endpoint_url=SETTINGS.s3_endpoint_url,
+                bucket=SETTINGS.s3_bucket,
+                access_key=SETTINGS.s3_access_key,
+                secret_key=SETTINGS.s3_secret_key,
+                region=SETTINGS.s3_region,
+            )
+        case _:
+            return LocalBlobStore(SETTINGS.blob_store_path)
+
+
+blob_store = create_blob_store()
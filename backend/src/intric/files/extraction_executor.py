@@ -0,0 +1,160 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.queues import SimpleQueue
+from typing import Callable, Optional, TypeVar
+
+from intric.main.config import SETTINGS
+from intric.main.exceptions import TextExtractionException
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def _limit_memory(memory_limit_bytes: Optional[int]):
+    if memory_limit_bytes is None:
+        return
+
+    # Limits the heap rather than the address space (RLIMIT_AS). The address
+    # space includes memory that is reserved but never used, such as the
+    # arenas of every thread, and grows with the number of cores.
+    # Not available on every platform, extraction then runs without a limit
+    try:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_DATA, (memory_limit_bytes, memory_limit_bytes))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def _init_worker(memory_limit_bytes: Optional[int], pids: SimpleQueue):
+    pids.put(os.getpid())
+    _limit_memory(memory_limit_bytes)
+
+
+class ExtractionExecutor:
+    """Runs CPU bound text extraction in a pool of worker processes.
+
+    Keeps parsing of large documents from blocking the event loop, and lets
+    extraction scale across cores. Each extraction gets a timeout, and the
+    worker processes can be limited in how much memory they allocate.
+
+    A process that hits the timeout can not be interrupted on its own, so the
+    whole pool is replaced. Extractions that were running in the old pool are
+    retried once in the new one.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout_seconds: float = 300,
+        memory_limit_bytes: Optional[int] = None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_bytes = memory_limit_bytes
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # The executor has no public way to terminate its processes, so the
+        # workers report their pids when they start
+        self._worker_pids: dict[ProcessPoolExecutor, SimpleQueue] = {}
+
+    def start(self):
+        if self._pool is not None:
+            return
+
+        # The parent process runs threads, which makes forking unsafe
+        context = multiprocessing.get_context("spawn")
+        pids = context.SimpleQueue()
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.memory_limit_bytes, pids),
+        )
+        self._worker_pids[self._pool] = pids
+
+    def stop(self):
+        if self._pool is None:
+            return
+
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._worker_pids.pop(self._pool).close()
+        self._pool = None
+
+    def _kill(self, pool: ProcessPoolExecutor):
+        if self._pool is pool:
+            self._pool = None
+
+        # Killing the workers breaks the pool, which fails its other futures
+        # with BrokenProcessPool rather than cancelling them
+        pids = self._worker_pids.pop(pool, None)
+        while pids is not None and not pids.empty():
+            try:
+                os.kill(pids.get(), signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        if pids is not None:
+            pids.close()
+
+        pool.shutdown(wait=False)
+
+    async def _run_once(self, func: Callable[..., T], *args) -> T:
+        self.start()
+        pool = self._pool
+        loop = asyncio.get_running_loop()
+
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(pool, func, *args), timeout=self.timeout_seconds
+            )
+        except asyncio.TimeoutError as e:
+            logger.warning(f"Text extraction timed out after {self.timeout_seconds} seconds")
+            self._kill(pool)
+            raise TextExtractionException("Text extraction timed out") from e
+        except MemoryError as e:
+            raise TextExtractionException("Text extraction ran out of memory") from e
+        except BrokenProcessPool:
+            if self._pool is pool:
+                self._pool = None
+                self._worker_pids.pop(pool).close()
+            raise
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Run `func(*args)` in a worker process.
+
+        `func` and its arguments need to be picklable, so `func` has to be
+        defined at the top level of a module.
+        """
+        try:
+            return await self._run_once(func, *args)
+        except BrokenProcessPool:
+            # Either another extraction timed out and took the pool with it,
+            # or a worker process was killed, most likely for using too much memory
+            logger.warning("Extraction pool was broken, retrying in a new pool")
+
+        try:
+            return await self._run_once(func, *args)
+        except BrokenProcessPool as e:
+            raise TextExtractionException("Text extraction crashed") from e
+
+
+def _memory_limit_bytes() -> Optional[int]:
+    if SETTINGS.extraction_memory_limit_mb is None:
+        return None
+
+    return SETTINGS.extraction_memory_limit_mb * 1024 * 1024
+
+
+extraction_executor = ExtractionExecutor(
+    max_workers=SETTINGS.extraction_max_workers,
+    timeout_seconds=SETTINGS.extraction_timeout_seconds,
+    memory_limit_bytes=_memory_limit_bytes(),
+)
@@ -0,0 +1,31 @@
+from intric.main.container.container import Container
+from intric.worker.worker import Worker
+
+worker = Worker()
+
+BATCH_SIZE = 100
+
+
+@worker.cron_job(minute={20})  # Run hourly
+async def move_file_blobs_to_store(container: Container):
+    file_repo = container.file_repo()
+
+    # Commit after every batch, so files that are moved stay moved if the job stops
+    num_moved = BATCH_SIZE
+    while num_moved == BATCH_SIZE:
+        async with container.session().begin():
+            num_moved = await file_repo.move_legacy_blobs(batch_size=BATCH_SIZE)
+
+    return True
+
+
+@worker.cron_job(minute={50})  # Run hourly
+async def delete_orphaned_blobs(container: Container):
+    file_repo = container.file_repo()
+
+    num_deleted = BATCH_SIZE
+    while num_deleted == BATCH_SIZE:
+        async with container.session().begin():
+            num_deleted = await file_repo.delete_orphaned_blobs(batch_size=BATCH_SIZE)
+
+    return True
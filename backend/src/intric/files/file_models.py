@@ -2,7 +2,7 @@ from enum import Enum
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 
 from intric.main.models import InDB
 
@@ -27,11 +27,16 @@ class FileBase(BaseModel):
     file_type: FileType
 
 
-class FileBaseWithContent(FileBase):
+class FileContent(FileBase):
     text: Optional[str] = None
     blob: Optional[bytes] = None
     transcription: Optional[str] = None
+    # Images larger than the models make use of are sent downscaled, while
+    # `blob` keeps the original for downloads
+    downscaled_blob: Optional[bytes] = None
 
+
+class FileBaseWithContent(FileContent):
     @model_validator(mode="after")
     def require_one_of_text_or_image(self) -> "FileBaseWithContent":
         if self.text is None and self.blob is None:
@@ -50,8 +55,17 @@ class FileCreate(FileBaseWithContent):
     tenant_id: UUID
 
 
-class File(InDB, FileCreate):
-    pass
+class File(InDB, FileContent):
+    user_id: UUID
+    tenant_id: UUID
+
+    # The content of images and audio is in the blob store, and only
+    # loaded when needed, see FileRepository.load_blobs
+    blob_key: Optional[str] = None
+    downscaled_blob_key: Optional[str] = None
+
+    # The base64 encoding of an image found in the cache, see EncodedImageCache
+    encoded: Optional[str] = Field(default=None, exclude=True)
 
 
 class FilePublic(InDB):
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from pathlib import Path
 from typing import Callable
@@ -7,10 +8,9 @@ from fastapi import UploadFile
 from intric.files.audio import AudioMimeTypes
 from intric.files.file_models import FileBaseWithContent, FileType
 from intric.files.file_size_service import FileSizeService
-from intric.files.image import ImageExtractor, ImageMimeTypes
+from intric.files.image import ImageExtractor, ImageMimeTypes, downscale_image
 from intric.files.text import TextExtractor
 from intric.main.config import get_settings
-from intric.main.exceptions import FileTooLargeException
 
 
 def bytes_extractor(filepath: Path, _: str):
@@ -36,15 +36,14 @@ class FileProtocol:
         max_size: int,
         extractor: Callable[[Path, str], str | bytes],
     ):
-        if self.file_size_service.is_too_large(upload_file.file, max_size=max_size):
-            raise FileTooLargeException()
-
-        filepath = await self.file_size_service.save_file_to_disk(upload_file.file)
-        filepath = Path(filepath)
+        saved_file = await self.file_size_service.save_upload(
+            upload_file.file, max_size=max_size, checksum=True
+        )
+        filepath = saved_file.path
 
         try:
-            content = extractor(filepath, upload_file.content_type)
-            checksum = self.file_size_service.get_file_checksum(filepath)
+            content = await asyncio.to_thread(extractor, filepath, upload_file.content_type)
+            checksum = saved_file.checksum
 
             if isinstance(content, str):
                 size = len(content.encode("utf-8"))
@@ -89,13 +88,19 @@ class FileProtocol:
         )
 
     async def image_to_domain(self, upload_file: UploadFile):
-        return await self._get_content(
+        file = await self._get_content(
             upload_file,
             file_type=FileType.IMAGE,
             max_size=get_settings().upload_image_to_session_max_size,
             extractor=self.image_extractor.extract,
         )
 
+        downscaled = await asyncio.to_thread(downscale_image, file.blob, file.mimetype)
+        if downscaled is not file.blob:
+            file.downscaled_blob = downscaled
+
+        return file
+
     async def audio_to_domain(self, upload_file: UploadFile):
         return await self._get_content(
             upload_file,
@@ -1,3 +1,5 @@
+import asyncio
+from typing import AsyncIterator, Optional
 from uuid import UUID
 
 import sqlalchemy as sa
@@ -5,19 +7,46 @@ from sqlalchemy.orm import defer
 
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
-from intric.database.tables.files_table import Files
-from intric.files.file_models import File, FileCreate, FileInfo
+from intric.database.tables.files_table import Files, OrphanedBlobs
+from intric.files.blob_store import BlobStore, blob_key, downscaled_blob_key
+from intric.files.file_models import File, FileCreate, FileInfo, FileType
+from intric.main.exceptions import NotFoundException
+
+
+async def _iterate(content: bytes) -> AsyncIterator[bytes]:
+    yield content
 
 
 class FileRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, blob_store: BlobStore):
         self._delegate = BaseRepositoryDelegate(
             session=session, table=Files, in_db_model=File
         )
         self.session = session
+        self.blob_store = blob_store
 
     async def add(self, file: FileCreate) -> File:
-        return await self._delegate.add(file)
+        if file.blob is None:
+            return await self._delegate.add(file)
+
+        key = blob_key(file.tenant_id, file.checksum)
+        await self._put_blob(key, file.blob)
+
+        downscaled_key = None
+        if file.downscaled_blob is not None:
+            downscaled_key = downscaled_blob_key(key)
+            await self._put_blob(downscaled_key, file.downscaled_blob)
+
+        file_in_db = await self._delegate.add(
+            file,
+            exclude={"blob", "downscaled_blob"},
+            blob_key=key,
+            downscaled_blob_key=downscaled_key,
+        )
+        file_in_db.blob = file.blob
+        file_in_db.downscaled_blob = file.downscaled_blob
+
+        return file_in_db
 
     async def get_list_by_id_and_user(
         self, ids: list[UUID], user_id: UUID, include_transcription: bool = True
@@ -48,11 +77,174 @@ class FileRepository:
     async def get_by_checksum(self, checksum: str) -> File:
         return await self._delegate.get_by(conditions={Files.checksum: checksum})
 
+    def _lock_blob(self, key: str, shared: bool):
+        # Held until the end of the transaction. Files that are being added hold
+        # it shared, so `delete_orphaned_blobs` skips their keys until they are
+        # committed and visible to its check
+        if shared:
+            return sa.func.pg_advisory_xact_lock_shared(sa.func.hashtext(key))
+
+        return sa.func.pg_try_advisory_xact_lock(sa.func.hashtext(key))
+
+    async def _put_blob(self, key: str, data: bytes):
+        await self.session.execute(sa.select(self._lock_blob(key, shared=True)))
+
+        # Take the key off the orphan queue before writing. If
+        # `delete_orphaned_blobs` is deleting it right now, the lock above waits
+        # until it is done, so the blob is written again after it was deleted
+        stmt = sa.delete(OrphanedBlobs).where(OrphanedBlobs.key == key)
+        await self.session.execute(stmt)
+
+        await self.blob_store.put(key, data)
+
     async def delete(self, id: UUID) -> File:
+        # The blob is queued for deletion by a trigger, and deleted from the
+        # store by `delete_orphaned_blobs` after this transaction commits
         return await self._delegate.delete(id)
 
+    async def delete_orphaned_blobs(self, batch_size: int) -> int:
+        """Delete blobs that no file references anymore from the store.
+
+        Blobs are shared by the files of a tenant with the same content, so a
+        queued blob is kept if another file still references it. Keys of files
+        that are being added are left in the queue for a later run. Returns the
+        number of queued keys handled.
+        """
+        claim = (
+            sa.select(OrphanedBlobs.key)
+            .where(self._lock_blob(OrphanedBlobs.key, shared=False))
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        keys = (await self.session.scalars(claim)).all()
+
+        if not keys:
+            return 0
+
+        # A separate statement, so that the check sees every file that was
+        # committed before the locks were taken
+        stmt = (
+            sa.delete(OrphanedBlobs)
+            .where(OrphanedBlobs.key.in_(keys))
+            .returning(
+                OrphanedBlobs.key,
+                sa.exists()
+                .where(
+                    sa.or_(
+                        Files.blob_key == OrphanedBlobs.key,
+                        Files.downscaled_blob_key == OrphanedBlobs.key,
+                    )
+                )
+                .label("referenced"),
+            )
+        )
+        rows = (await self.session.execute(stmt)).all()
+
+        # Deleted before the locks are released, see `_put_blob`
+        for row in rows:
+            if not row.referenced:
+                await self.blob_store.delete(row.key)
+
+        return len(keys)
+
     async def update(self, file: File) -> File:
-        return await self._delegate.update(file)
+        return await self._delegate.update(
+            file, exclude={"blob", "blob_key", "downscaled_blob", "downscaled_blob_key"}
+        )
+
+    async def _get_legacy_blobs(self, ids: list[UUID]) -> dict[UUID, bytes]:
+        stmt = (
+            sa.select(Files.id, Files.legacy_blob)
+            .where(Files.id.in_(ids))
+            .where(Files.legacy_blob.isnot(None))
+        )
+        result = await self.session.execute(stmt)
+
+        return {row.id: row.legacy_blob for row in result}
+
+    async def get_blob(self, file: File) -> bytes:
+        if file.blob is not None:
+            return file.blob
+
+        if file.blob_key is not None:
+            return await self.blob_store.get(file.blob_key)
+
+        legacy_blobs = await self._get_legacy_blobs([file.id])
+        if file.id not in legacy_blobs:
+            raise NotFoundException("File content not found")
+
+        return legacy_blobs[file.id]
+
+    async def load_blobs(self, files: list[File]):
+        """Load the content of images and audio files into `blob`.
+
+        Images that have a downscaled version are loaded into
+        `downscaled_blob` instead, since that is what is sent to the models.
+        """
+        files = [
+            file
+            for file in files
+            if file.file_type in (FileType.IMAGE, FileType.AUDIO)
+            and (file.downscaled_blob if file.downscaled_blob_key else file.blob) is None
+        ]
+        if not files:
+            return
+
+        in_store = [file for file in files if file.blob_key is not None]
+        blobs = await asyncio.gather(
+            *[
+                self.blob_store.get(file.downscaled_blob_key or file.blob_key)
+                for file in in_store
+            ]
+        )
+        for file, blob in zip(in_store, blobs):
+            if file.downscaled_blob_key is not None:
+                file.downscaled_blob = blob
+            else:
+                file.blob = blob
+
+        in_db = [file for file in files if file.blob_key is None]
+        if in_db:
+            legacy_blobs = await self._get_legacy_blobs([file.id for file in in_db])
+            for file in in_db:
+                file.blob = legacy_blobs.get(file.id)
+
+    async def stream_blob(
+        self, file: File, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream bytes `start` to `end` of the content, `end` inclusive."""
+        if file.blob_key is not None:
+            return await self.blob_store.stream(file.blob_key, start=start, end=end)
+
+        blob = await self.get_blob(file)
+        return _iterate(blob[start : None if end is None else end + 1])
+
+    async def move_legacy_blobs(self, batch_size: int) -> int:
+        """Move content still stored in the database to the blob store.
+
+        Returns the number of files moved.
+        """
+        stmt = (
+            sa.select(Files.id, Files.tenant_id, Files.checksum, Files.legacy_blob)
+            .where(Files.blob_key.is_(None))
+            .where(Files.legacy_blob.isnot(None))
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = (await self.session.execute(stmt)).all()
+
+        for row in rows:
+            key = blob_key(row.tenant_id, row.checksum)
+            await self._put_blob(key, row.legacy_blob)
+
+            stmt = (
+                sa.update(Files)
+                .values({Files.blob_key: key, Files.legacy_blob: None})
+                .where(Files.id == row.id)
+            )
+            await self.session.execute(stmt)
+
+        return len(rows)
 
     async def get_file_infos(self, ids: list[UUID]) -> list[FileInfo]:
         stmt = (
@@ -60,7 +252,7 @@ class FileRepository:
             .where(Files.id.in_(ids))
             .options(
                 defer(Files.text, raiseload=True),
-                defer(Files.blob, raiseload=True),
+                defer(Files.legacy_blob, raiseload=True),
                 defer(Files.transcription, raiseload=True),
             )
         )
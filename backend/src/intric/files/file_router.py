@@ -162,68 +162,60 @@ async def download_file_signed(
     file_repo = container.file_repo()
     file = await file_repo.get_by_id(file_id=payload["file_id"])
 
-    if file.text is None and file.blob is None:
-        raise NotFoundException(detail="File content not found")
-
-    content_bytes = None
     if file.file_type == FileType.TEXT and file.text:
         content_bytes = file.text.encode("utf-8")
-    elif file.blob:
-        content_bytes = file.blob
+        total_size = len(content_bytes)
+    elif file.file_type != FileType.TEXT:
+        content_bytes = None
+        total_size = file.size
     else:
-        return Response(status_code=404, content="File content not found")
+        raise NotFoundException(detail="File content not found")
 
-    total_size = len(content_bytes)
     headers = {
         "Content-Disposition": f"{content_disposition.value}; filename=\"{file.name}\"",
         "Accept-Ranges": "bytes",
     }
 
+    async def get_content(start: int = 0, end: int | None = None):
+        if content_bytes is not None:
+            return io.BytesIO(content_bytes[start : None if end is None else end + 1])
+
+        # Streamed from the blob store, so the content is never held in memory
+        return await file_repo.stream_blob(file, start=start, end=end)
+
     # Handle range request
     if range:
         # Only allow range requests for audio files
         if file.file_type != FileType.AUDIO:
             raise BadRequestException("Range is only allowed for audio files")
 
-        try:
-            range_match = re.match(r'bytes=(\d+)-(\d*)', range)
-            if range_match:
-                start = int(range_match.group(1))
-                end = (
-                    int(range_match.group(2))
-                    if range_match.group(2)
-                    else total_size - 1
-                )
+        range_match = re.match(r"bytes=(\d+)-(\d*)", range)
+        if range_match:
+            start = int(range_match.group(1))
+            end = int(range_match.group(2)) if range_match.group(2) else total_size - 1
 
-                # Validate range
-                if start >= total_size or end >= total_size or start > end:
-                    return Response(
-                        status_code=416,  # Range Not Satisfiable
-                        headers={"Content-Range": f"bytes */{total_size}"},
-                    )
-
-                # Create partial response
-                content = io.BytesIO(content_bytes[start : end + 1])
-
-                headers.update(
-                    {
-                        "Content-Range": f"bytes {start}-{end}/{total_size}",
-                        "Content-Length": str(end - start + 1),
-                    }
+            # Validate range
+            if start >= total_size or end >= total_size or start > end:
+                return Response(
+                    status_code=416,  # Range Not Satisfiable
+                    headers={"Content-Range": f"bytes */{total_size}"},
                 )
 
-                return StreamingResponse(
-                    content,
-                    status_code=206,  # Partial Content
-                    media_type=file.mimetype,
-                    headers=headers,
-                )
-        except Exception:
-            # If range parsing fails, fall back to full content
-            pass
+            headers.update(
+                {
+                    "Content-Range": f"bytes {start}-{end}/{total_size}",
+                    "Content-Length": str(end - start + 1),
+                }
+            )
+
+            return StreamingResponse(
+                await get_content(start, end),
+                status_code=206,  # Partial Content
+                media_type=file.mimetype,
+                headers=headers,
+            )
 
     # Return full content if range is not specified or invalid
     headers["Content-Length"] = str(total_size)
-    content = io.BytesIO(content_bytes)
 
-    return StreamingResponse(content, media_type=file.mimetype, headers=headers)
+    return StreamingResponse(await get_content(), media_type=file.mimetype, headers=headers)
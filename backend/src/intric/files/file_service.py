@@ -1,3 +1,4 @@
+import asyncio
 import hashlib
 from uuid import UUID
 
@@ -6,7 +7,8 @@ from fastapi import UploadFile
 from intric.files.file_models import File, FileBaseWithContent, FileCreate, FileType
 from intric.files.file_protocol import FileProtocol
 from intric.files.file_repo import FileRepository
-from intric.main.exceptions import NotFoundException, UnauthorizedException
+from intric.files.image import downscale_image
+from intric.main.exceptions import UnauthorizedException
 from intric.users.user import UserInDB
 
 
@@ -36,6 +38,7 @@ class FileService:
         """Create a file from raw image bytes returned by an AI model."""
         checksum = hashlib.md5(image_data).hexdigest()
         size = len(image_data)
+        downscaled = await asyncio.to_thread(downscale_image, image_data, mimetype)
 
         file_base = FileBaseWithContent(
             name=name,
@@ -44,6 +47,7 @@ class FileService:
             file_type=FileType.IMAGE,
             mimetype=mimetype,
             blob=image_data,
+            downscaled_blob=downscaled if downscaled is not image_data else None,
         )
 
         return await self.repo.add(
@@ -103,8 +107,8 @@ class FileService:
         if file.user_id != self.user.id:
             raise UnauthorizedException()
 
-        if file.text is None and file.blob is None:
-            raise NotFoundException(detail="File content not found")
+        if file.text is None:
+            file.blob = await self.repo.get_blob(file)
 
         return file
 
@@ -116,7 +120,7 @@ class FileService:
         """
         file = await self.repo.get_by_id(file_id=file_id)
 
-        if file.text is None and file.blob is None:
-            raise NotFoundException(detail="File content not found")
+        if file.text is None:
+            file.blob = await self.repo.get_blob(file)
 
         return file
@@ -1,52 +1,107 @@
 import asyncio
 import hashlib
 import os
-import shutil
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
 from tempfile import SpooledTemporaryFile
-from typing import IO
+from typing import IO, Optional
+
+from intric.main.exceptions import FileTooLargeException
 
 TMP_DIR = "/tmp/"
 
+CHUNK_SIZE = 1024 * 1024
 
-class FileSizeService:
-    @staticmethod
-    async def save_file_to_disk(file: SpooledTemporaryFile):
-        destination = os.path.join(TMP_DIR, uuid.uuid4().hex)
-        destination_path = Path(destination)
 
-        try:
-            with destination_path.open("wb") as buffer:
-                await asyncio.to_thread(shutil.copyfileobj, file, buffer)
-        finally:
-            file.close()
+@dataclass
+class SavedFile:
+    path: Path
+    size: int
+    checksum: Optional[str] = None
 
-        return destination
 
-    @staticmethod
-    def is_too_large(file: IO, max_size: int):
-        real_file_size = 0
-        for chunk in file:
-            real_file_size += len(chunk)
-            if real_file_size > max_size:
-                return True
+def _disk_fileno(file: IO) -> Optional[int]:
+    # Asking a SpooledTemporaryFile for its fileno would roll it over to disk
+    if isinstance(file, SpooledTemporaryFile) and not file._rolled:
+        return None
+
+    try:
+        return file.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _copy_in_kernel(source_fd: int, destination_fd: int, size: int):
+    """Copy without passing the data through user space, if the platform allows it."""
+    offset = 0
+    while offset < size:
+        if hasattr(os, "copy_file_range"):
+            copied = os.copy_file_range(source_fd, destination_fd, size - offset, offset)
+        else:
+            copied = os.sendfile(destination_fd, source_fd, offset, size - offset)
+
+        if copied == 0:
+            raise OSError(f"Only {offset} of {size} bytes could be copied")
+
+        offset += copied
 
-        # return the pointer back to the starting point so that
-        # the next read starts from the starting point
-        file.seek(0)
 
-        return False
+def _save(file: IO, destination: Path, max_size: int, checksum: bool) -> SavedFile:
+    file.seek(0)
+    source_fd = _disk_fileno(file)
 
+    with destination.open("wb") as buffer:
+        # Without a checksum to compute, files on disk never need to be read here
+        if source_fd is not None and not checksum:
+            size = os.fstat(source_fd).st_size
+            if size > max_size:
+                raise FileTooLargeException("File too large.")
+
+            try:
+                _copy_in_kernel(source_fd, buffer.fileno(), size)
+                return SavedFile(path=destination, size=size)
+            except OSError:
+                # Copied again below, by reading and writing
+                buffer.seek(0)
+                buffer.truncate()
+                file.seek(0)
+
+        sha256 = hashlib.sha256() if checksum else None
+        size = 0
+
+        while chunk := file.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise FileTooLargeException("File too large.")
+
+            if sha256 is not None:
+                sha256.update(chunk)
+            buffer.write(chunk)
+
+    return SavedFile(
+        path=destination,
+        size=size,
+        checksum=sha256.hexdigest() if sha256 is not None else None,
+    )
+
+
+class FileSizeService:
     @staticmethod
-    def get_file_checksum(filepath: Path):
-        """Taken from https://stackoverflow.com/a/44873382"""
-        h = hashlib.sha256()
-        b = bytearray(128 * 1024)
-        mv = memoryview(b)
+    async def save_upload(
+        file: SpooledTemporaryFile, max_size: int, checksum: bool = False
+    ) -> SavedFile:
+        """Save an upload to disk in a single pass.
 
-        with open(filepath, "rb", buffering=0) as f:
-            while n := f.readinto(mv):
-                h.update(mv[:n])
+        The size limit is enforced, and the SHA-256 checksum computed, while
+        the file is written. Nothing is left on disk if the file is too large.
+        """
+        destination = Path(os.path.join(TMP_DIR, uuid.uuid4().hex))
 
-        return h.hexdigest()
+        try:
+            return await asyncio.to_thread(_save, file, destination, max_size, checksum)
+        except BaseException:
+            destination.unlink(missing_ok=True)
+            raise
+        finally:
+            file.close()
@@ -1,14 +1,71 @@
+import base64
+import io
+from collections import OrderedDict
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from intric.files.blob_store import blob_key
 from intric.files.text import MimeTypesBase
 from intric.main.exceptions import FileNotSupportedException
 
+if TYPE_CHECKING:
+    from intric.files.file_models import File
+
+# Larger images are downscaled by the providers before the model sees them,
+# Claude to at most 1568 px on the long side and about 1.15 megapixels.
+# OpenAI scales further, to 768 px on the short side, from this size.
+MAX_IMAGE_SIDE = 1568
+MAX_IMAGE_PIXELS = 1_150_000
+JPEG_QUALITY = 85
+
+ENCODED_IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
 
 class ImageMimeTypes(MimeTypesBase):
     PNG = "image/png"
     JPEG = "image/jpeg"
 
 
+def _target_size(width: int, height: int) -> tuple[int, int] | None:
+    scale = min(
+        1.0,
+        MAX_IMAGE_SIDE / max(width, height),
+        (MAX_IMAGE_PIXELS / (width * height)) ** 0.5,
+    )
+    if scale == 1.0:
+        return None
+
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def downscale_image(content: bytes, mimetype: str) -> bytes:
+    """Downscale the image to the largest size the providers make use of.
+
+    Images that are small enough are returned as they are. Larger images are
+    rotated according to their EXIF orientation, since the metadata is not
+    kept, resized and encoded again in the same format.
+    """
+    try:
+        image = Image.open(io.BytesIO(content))
+        if _target_size(image.width, image.height) is None:
+            return content
+
+        image = ImageOps.exif_transpose(image)
+        image = image.resize(_target_size(image.width, image.height), Image.Resampling.LANCZOS)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise FileNotSupportedException("The image could not be read") from e
+
+    output = io.BytesIO()
+    if mimetype == ImageMimeTypes.JPEG:
+        image.convert("RGB").save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    else:
+        image.save(output, format="PNG", optimize=True)
+
+    return output.getvalue()
+
+
 class ImageExtractor:
     @staticmethod
     def extract_from_image(filepath: Path) -> bytes:
@@ -20,3 +77,74 @@ class ImageExtractor:
             return self.extract_from_image(filepath)
 
         raise FileNotSupportedException(f"{mimetype} files is not supported")
+
+
+class EncodedImageCache:
+    """Base64 encodings of images, least recently used are evicted first.
+
+    The images of the whole chat history are sent on every turn, the cache
+    keeps them from being loaded and encoded again each time. Keyed by the
+    blob key of the image that is sent, which is derived from the tenant and
+    the checksum of the content.
+    """
+
+    def __init__(self, max_bytes: int = ENCODED_IMAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._size = 0
+        self._encoded: OrderedDict[str, str] = OrderedDict()
+
+    @staticmethod
+    def _key(file: "File") -> str:
+        return (
+            file.downscaled_blob_key
+            or file.blob_key
+            or blob_key(file.tenant_id, file.checksum)
+        )
+
+    def get(self, file: "File") -> str | None:
+        key = self._key(file)
+
+        encoded = self._encoded.get(key)
+        if encoded is not None:
+            self._encoded.move_to_end(key)
+
+        return encoded
+
+    def lookup(self, files: list["File"]) -> list["File"]:
+        """Set `encoded` on the files that are in the cache, so that they do
+        not need to be loaded. Returns the files that are not."""
+        for file in files:
+            if file.encoded is None:
+                file.encoded = self.get(file)
+
+        return [file for file in files if file.encoded is None]
+
+    def encode(self, file: "File") -> str:
+        if file.encoded is not None:
+            return file.encoded
+
+        key = self._key(file)
+
+        encoded = self.get(file)
+        if encoded is not None:
+            return encoded
+
+        content = file.downscaled_blob if file.downscaled_blob is not None else file.blob
+        encoded = base64.b64encode(content).decode("utf-8")
+        if len(encoded) > self.max_bytes:
+            return encoded
+
+        self._encoded[key] = encoded
+        self._size += len(encoded)
+        while self._size > self.max_bytes:
+            _, evicted = self._encoded.popitem(last=False)
+            self._size -= len(evicted)
+
+        return encoded
+
+    def clear(self):
+        self._encoded.clear()
+        self._size = 0
+
+
+encoded_images = EncodedImageCache()
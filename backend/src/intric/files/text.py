@@ -1,4 +1,5 @@
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 
 import magic
@@ -7,6 +8,14 @@ from docx2python import docx2python
 from pypdf import PdfReader
 
 
+# The parts of a PDF are read one after another, mostly by the same extraction
+# process, which then parses the document only once. Keyed by the modification
+# time and size as well, since upload paths can be reused.
+@lru_cache(maxsize=1)
+def _pdf_reader(filepath: str, mtime_ns: int, size: int) -> PdfReader:
+    return PdfReader(filepath)
+
+
 class MimeTypesBase(str, Enum):
     @classmethod
     def has_value(cls, value) -> bool:
@@ -62,6 +71,18 @@ class TextExtractor:
         sanitized_text = TextSanitizer.sanitize(extracted_text)
         return sanitized_text
 
+    @staticmethod
+    def extract_pdf_pages(filepath: Path, start: int, count: int) -> list[str]:
+        """Text of `count` pages from `start`, so large PDFs can be read in parts."""
+        stat = filepath.stat()
+        reader = _pdf_reader(str(filepath), stat.st_mtime_ns, stat.st_size)
+        end = start + count
+        return [TextSanitizer.sanitize(page.extract_text()) for page in reader.pages[start:end]]
+
+    @staticmethod
+    def get_mimetype(filepath: Path, mimetype: str | None = None) -> str:
+        return mimetype or magic.from_file(filepath, mime=True)
+
     @staticmethod
     def extract_from_docx(filepath: Path) -> str:
         with docx2python(filepath) as docx_content:
@@ -83,7 +104,7 @@ class TextExtractor:
         return extracted_text
 
     def extract(self, filepath: Path, mimetype: str | None = None) -> str:
-        mimetype = mimetype or magic.from_file(filepath, mime=True)
+        mimetype = self.get_mimetype(filepath, mimetype)
 
         match mimetype:
             case (
@@ -1,12 +1,13 @@
 # MIT License
 
+import asyncio
 import tempfile
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from intric.files import audio
 from intric.files.audio import AudioMimeTypes
 from intric.files.file_models import File
+from intric.info_blobs.content_cache import hash_file
 from intric.transcription_models.infrastructure.adapters.whisper import (
     OpenAISTTModelAdapter,
 )
@@ -16,44 +17,109 @@ if TYPE_CHECKING:
     from intric.transcription_models.domain.transcription_model import (
         TranscriptionModel,
     )
+    from intric.transcription_models.infrastructure.transcription_cache_repo import (
+        TranscriptionCacheRepository,
+    )
+    from intric.users.user import UserInDB
 
 
 class Transcriber:
-    def __init__(self, file_repo: "FileRepository"):
+    def __init__(
+        self,
+        user: "UserInDB",
+        file_repo: "FileRepository",
+        transcription_cache_repo: "TranscriptionCacheRepository",
+    ):
+        self.user = user
         self.file_repo = file_repo
+        self.transcription_cache_repo = transcription_cache_repo
 
     async def transcribe(self, file: File, transcription_model: "TranscriptionModel"):
-        if file.blob is None or not AudioMimeTypes.has_value(file.mimetype):
+        [transcription] = await self.transcribe_files([file], transcription_model)
+        return transcription
+
+    async def transcribe_files(
+        self, files: list[File], transcription_model: "TranscriptionModel"
+    ) -> list[str]:
+        """Transcribe the files concurrently, returns the transcriptions in order.
+
+        Reading and writing the database is kept sequential, since the files
+        share one session.
+        """
+        for file in files:
+            if not AudioMimeTypes.has_value(file.mimetype):
+                raise ValueError("File needs to be an audio file")
+
+        to_transcribe = []
+        for file in files:
+            # If file already has a transcription, return it
+            if file.transcription:
+                continue
+
+            cached = await self.transcription_cache_repo.get(
+                tenant_id=file.tenant_id,
+                checksum=file.checksum,
+                transcription_model_id=transcription_model.id,
+            )
+            if cached is not None:
+                file.transcription = cached
+                await self.file_repo.update(file)
+                continue
+
+            to_transcribe.append(file)
+
+        await self.file_repo.load_blobs(to_transcribe)
+        if any(file.blob is None for file in to_transcribe):
             raise ValueError("File needs to be an audio file")
 
-        # If file already has a transcription, return it
-        if file.transcription:
-            return file.transcription
+        transcriptions = await asyncio.gather(
+            *[self._transcribe_blob(file.blob, transcription_model) for file in to_transcribe]
+        )
+
+        for file, transcription in zip(to_transcribe, transcriptions):
+            file.transcription = transcription
+            await self.transcription_cache_repo.add(
+                tenant_id=file.tenant_id,
+                checksum=file.checksum,
+                transcription_model_id=transcription_model.id,
+                text=transcription,
+            )
+            await self.file_repo.update(file)
+
+        return [file.transcription for file in files]
 
+    async def _transcribe_blob(self, blob: bytes, transcription_model: "TranscriptionModel"):
         try:
             with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                temp_file.write(file.blob)
+                temp_file.write(blob)
                 temp_file_path = Path(temp_file.name)
 
-            result = await self.transcribe_from_filepath(
-                filepath=temp_file_path, transcription_model=transcription_model
-            )
-
-            # Store the transcription in the file object
-            file.transcription = result
-
-            # If we have a repository, update the file in the database
-            if self.file_repo:
-                await self.file_repo.update(file)
+            return await self._transcribe(temp_file_path, transcription_model)
         finally:
             temp_file_path.unlink()  # Clean up the temporary file
 
-        return result
-
     async def transcribe_from_filepath(
         self, *, filepath: Path, transcription_model: "TranscriptionModel"
     ):
-        adapter = OpenAISTTModelAdapter(model=transcription_model)
+        checksum = await asyncio.to_thread(hash_file, filepath)
+        cached = await self.transcription_cache_repo.get(
+            tenant_id=self.user.tenant_id,
+            checksum=checksum,
+            transcription_model_id=transcription_model.id,
+        )
+        if cached is not None:
+            return cached
+
+        transcription = await self._transcribe(filepath, transcription_model)
+        await self.transcription_cache_repo.add(
+            tenant_id=self.user.tenant_id,
+            checksum=checksum,
+            transcription_model_id=transcription_model.id,
+            text=transcription,
+        )
 
-        async with audio.to_wav(filepath) as wav_file:
-            return await adapter.get_text_from_file(wav_file)
+        return transcription
+
+    async def _transcribe(self, filepath: Path, transcription_model: "TranscriptionModel"):
+        adapter = OpenAISTTModelAdapter(model=transcription_model)
+        return await adapter.get_text_from_file(filepath)
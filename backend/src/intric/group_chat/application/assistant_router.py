@@ -0,0 +1,132 @@
+"""Routing of group chat questions by embedding similarity.
+
+The descriptions of the assistants are embedded once, and each question is
+scored against them. The router only decides when the best assistant is
+clearly ahead of the next one, otherwise the completion model selects.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+from uuid import UUID
+
+import numpy as np
+
+from intric.info_blobs.content_cache import hash_text
+from intric.info_blobs.info_blob import InfoBlobChunk
+from intric.main.config import get_settings
+from intric.main.logging import get_logger
+
+if TYPE_CHECKING:
+    from intric.embedding_models.domain.embedding_model import EmbeddingModel
+    from intric.embedding_models.infrastructure.create_embeddings_service import (
+        CreateEmbeddingsService,
+    )
+    from intric.group_chat.domain.entities.group_chat import GroupChatAssistant
+    from intric.users.user import UserInDB
+
+logger = get_logger(__name__)
+
+DESCRIPTION_EMBEDDINGS_MAX_ENTRIES = 4096
+
+
+def _description_text(assistant: "GroupChatAssistant") -> str:
+    return f"{assistant.assistant.name}: {assistant.description}"
+
+
+class DescriptionEmbeddings:
+    """Embeddings of assistant descriptions, least recently used are evicted first.
+
+    Keyed by the embedding model and the hash of the description, so that an
+    updated description is embedded again.
+    """
+
+    def __init__(self, max_entries: int = DESCRIPTION_EMBEDDINGS_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._embeddings: OrderedDict[tuple[UUID, str], np.ndarray] = OrderedDict()
+
+    def get(self, embedding_model_id: UUID, text: str) -> Optional[np.ndarray]:
+        key = (embedding_model_id, hash_text(text))
+        embedding = self._embeddings.get(key)
+        if embedding is not None:
+            self._embeddings.move_to_end(key)
+
+        return embedding
+
+    def add(self, embedding_model_id: UUID, text: str, embedding: np.ndarray):
+        self._embeddings[(embedding_model_id, hash_text(text))] = embedding
+        while len(self._embeddings) > self.max_entries:
+            self._embeddings.popitem(last=False)
+
+    def clear(self):
+        self._embeddings.clear()
+
+
+description_embeddings = DescriptionEmbeddings()
+
+
+def _normalize(embedding) -> np.ndarray:
+    embedding = np.asarray(embedding, dtype=np.float32)
+    return embedding / (np.linalg.norm(embedding) or 1.0)
+
+
+class EmbeddingAssistantRouter:
+    def __init__(self, user: "UserInDB", create_embeddings_service: "CreateEmbeddingsService"):
+        self.user = user
+        self.create_embeddings_service = create_embeddings_service
+
+    async def _get_description_embeddings(
+        self, assistants: list["GroupChatAssistant"], embedding_model: "EmbeddingModel"
+    ) -> list[np.ndarray]:
+        texts = [_description_text(assistant) for assistant in assistants]
+        embeddings = [description_embeddings.get(embedding_model.id, text) for text in texts]
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            # The adapters only embed passages as chunks
+            chunks = [
+                InfoBlobChunk(
+                    text=texts[i],
+                    chunk_no=i,
+                    info_blob_id=assistants[i].assistant.id,
+                    tenant_id=self.user.tenant_id,
+                )
+                for i in missing
+            ]
+            embedded = await self.create_embeddings_service.get_embeddings(
+                model=embedding_model, chunks=chunks
+            )
+            for chunk, embedding in embedded:
+                embedding = _normalize(embedding)
+                embeddings[chunk.chunk_no] = embedding
+                description_embeddings.add(embedding_model.id, texts[chunk.chunk_no], embedding)
+
+        return embeddings
+
+    async def select(
+        self,
+        question: str,
+        assistants: list["GroupChatAssistant"],
+        embedding_model: "EmbeddingModel",
+    ) -> Optional["GroupChatAssistant"]:
+        """Return the assistant closest to the question, or None if it is ambiguous."""
+        if len(assistants) < 2:
+            return assistants[0] if assistants else None
+
+        question_embedding, descriptions = await asyncio.gather(
+            self.create_embeddings_service.get_embedding_for_query(
+                model=embedding_model, query=question
+            ),
+            self._get_description_embeddings(assistants, embedding_model),
+        )
+
+        scores = np.stack(descriptions) @ _normalize(question_embedding)
+        second, best = np.argsort(scores)[-2:]
+        margin = float(scores[best] - scores[second])
+
+        logger.debug(f"Group chat router scores {scores.round(3).tolist()}, margin {margin:.3f}")
+
+        if margin < get_settings().group_chat_router_min_margin:
+            return None
+
+        return assistants[best]
@@ -1,10 +1,9 @@
 # Copyright (c) 2025 Sundsvalls Kommun
 #
 # Licensed under the MIT License.
-import asyncio
 import re
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Optional, Union
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Union
 
 from intric.ai_models.completion_models.completion_model import Completion, ResponseType
 from intric.assistants.api.assistant_models import AssistantResponse
@@ -14,7 +13,9 @@ from intric.group_chat.domain.entities.group_chat import (
     GroupChatAssistant,
     GroupChatAssistantData,
 )
+from intric.main.config import get_settings
 from intric.main.exceptions import BadRequestException, UnauthorizedException
+from intric.main.logging import get_logger
 from intric.main.models import NOT_PROVIDED, NotProvided
 from intric.questions.question import ToolAssistant, UseTools
 
@@ -27,18 +28,27 @@ if TYPE_CHECKING:
     from intric.completion_models.infrastructure.completion_service import (
         CompletionService,
     )
+    from intric.group_chat.application.assistant_router import EmbeddingAssistantRouter
     from intric.sessions.session import SessionInDB
     from intric.sessions.session_service import SessionService
+    from intric.spaces.space import Space
     from intric.spaces.space_repo import SpaceRepository
     from intric.spaces.space_service import SpaceService
     from intric.users.user import UserInDB
 
+logger = get_logger(__name__)
+
+# Characters the selector may put before the number of the assistant
+SELECTION_PREFIX_CHARS = " \t\n\"'*`"
+
 
 @dataclass
 class GroupChatAssistantSelectionResult:
     assistant: Optional[GroupChatAssistant]
     response_str: str
     assistant_selector_tokens: int
+    # When streaming, the rest of the clarification after `response_str`
+    response_stream: Optional[AsyncIterator[Completion]] = None
 
 
 class GroupChatService:
@@ -51,6 +61,7 @@ class GroupChatService:
         assistant_service: "AssistantService",
         session_service: "SessionService",
         completion_service: "CompletionService",
+        assistant_router: "EmbeddingAssistantRouter",
     ):
         self.user = user
         self.space_service = space_service
@@ -59,6 +70,7 @@ class GroupChatService:
         self.assistant_service = assistant_service
         self.session_service = session_service
         self.completion_service = completion_service
+        self.assistant_router = assistant_router
 
     async def create_group_chat(self, space_id: "UUID", name: str) -> "GroupChat":
         space = await self.space_service.get_space(id=space_id)
@@ -142,10 +154,9 @@ class GroupChatService:
 
         return updated_group_chat
 
-    async def get_group_chat(
-        self,
-        group_chat_id: "UUID",
-    ) -> "GroupChat":
+    async def _get_space_and_group_chat(
+        self, group_chat_id: "UUID"
+    ) -> tuple["Space", "GroupChat"]:
         space = await self.space_service.get_space_by_group_chat(group_chat_id=group_chat_id)
         actor = self.actor_manager.get_space_actor_from_space(space)
         group_chat = space.get_group_chat(group_chat_id=group_chat_id)
@@ -155,6 +166,13 @@ class GroupChatService:
 
         group_chat.permissions = actor.get_group_chat_permissions(group_chat=group_chat)
 
+        return space, group_chat
+
+    async def get_group_chat(
+        self,
+        group_chat_id: "UUID",
+    ) -> "GroupChat":
+        _, group_chat = await self._get_space_and_group_chat(group_chat_id=group_chat_id)
         return group_chat
 
     async def _find_suitable_completion_model(self, assistants: list[GroupChatAssistant]):
@@ -173,12 +191,7 @@ class GroupChatService:
 
         assistant_info = []
         for i, assistant in enumerate(assistants):
-            description = (
-                assistant.user_description
-                or assistant.assistant.description
-                or "No description"  # should not be able to happen
-            )
-            assistant_info.append(f"{i + 1}. {assistant.assistant.name}: {description}")
+            assistant_info.append(f"{i + 1}. {assistant.assistant.name}: {assistant.description}")
 
         assistant_list = "\n".join(assistant_info)
 
@@ -217,11 +230,43 @@ class GroupChatService:
         else:
             return None
 
+    async def _read_streamed_selection(
+        self, completion: AsyncIterator[Completion], assistants: list[GroupChatAssistant]
+    ) -> tuple[Optional[int], str]:
+        """Read the selector's stream until it is clear whether it chose an assistant.
+
+        Returns the number of the chosen assistant, or None, and the text read.
+        The stream is closed as soon as the number is known, otherwise the rest
+        of it is the clarification.
+        """
+        text = ""
+        async for chunk in completion:
+            if not chunk.text:
+                continue
+
+            text += chunk.text
+            stripped = text.lstrip(SELECTION_PREFIX_CHARS)
+            if not stripped:
+                continue
+
+            digits = re.match(r"\d*", stripped).group()
+            if not digits:
+                return None, text
+
+            # Done when the number has ended, or no more digits could make it valid
+            if len(digits) < len(stripped) or int(digits) * 10 > len(assistants):
+                await completion.aclose()
+                return int(digits), text
+
+        digits = re.match(r"\d*", text.lstrip(SELECTION_PREFIX_CHARS)).group()
+        return (int(digits) if digits else None), text
+
     async def _select_assistant_with_completion_model(
         self,
         question: str,
         assistants: list[GroupChatAssistant],
         session: Optional["SessionInDB"] = None,
+        stream: bool = False,
     ) -> GroupChatAssistantSelectionResult:
         """Select the most appropriate assistant using a completion model to analyze the question"""
 
@@ -245,29 +290,94 @@ class GroupChatService:
         response = await self.completion_service.get_response(
             model=completion_model,
             prompt=selection_prompt,
-            stream=False,
+            stream=stream,
             session=session,
             text_input=question,
         )
-        # parse the response to determine which assistant to use
-        assistant_match = self._is_match(
-            response.completion.text,
-            assistants,
-        )
-        if assistant_match:
-            if 1 <= assistant_match <= len(assistants):
+
+        if stream:
+            assistant_match, text = await self._read_streamed_selection(
+                response.completion, assistants
+            )
+            if assistant_match is not None and 1 <= assistant_match <= len(assistants):
                 return GroupChatAssistantSelectionResult(
                     assistant=assistants[assistant_match - 1],
-                    response_str=response.completion.text,
+                    response_str=text,
                     assistant_selector_tokens=assistant_selector_tokens,
                 )
-        else:
+
             return GroupChatAssistantSelectionResult(
                 assistant=None,
+                response_str=text,
+                assistant_selector_tokens=assistant_selector_tokens,
+                response_stream=response.completion,
+            )
+
+        # parse the response to determine which assistant to use
+        assistant_match = self._is_match(
+            response.completion.text,
+            assistants,
+        )
+        if assistant_match and 1 <= assistant_match <= len(assistants):
+            return GroupChatAssistantSelectionResult(
+                assistant=assistants[assistant_match - 1],
                 response_str=response.completion.text,
                 assistant_selector_tokens=assistant_selector_tokens,
             )
 
+        return GroupChatAssistantSelectionResult(
+            assistant=None,
+            response_str=response.completion.text,
+            assistant_selector_tokens=assistant_selector_tokens,
+        )
+
+    async def _select_assistant_with_embeddings(
+        self, question: str, assistants: list[GroupChatAssistant], space: "Space"
+    ) -> Optional[GroupChatAssistant]:
+        """Select the assistant whose description is clearly closest to the question.
+
+        Returns None when the router can not decide, in which case the
+        completion model should select.
+        """
+        try:
+            embedding_model = space.get_latest_embedding_model()
+            if embedding_model is None:
+                return None
+
+            return await self.assistant_router.select(
+                question=question, assistants=assistants, embedding_model=embedding_model
+            )
+        except Exception as e:
+            logger.warning(f"Group chat router failed, using the completion model: {e}")
+            return None
+
+    async def _select_assistant(
+        self,
+        question: str,
+        assistants: list[GroupChatAssistant],
+        space: "Space",
+        session: "SessionInDB",
+        stream: bool = False,
+    ) -> GroupChatAssistantSelectionResult:
+        # The router only sees the question, so follow-up questions, which may
+        # depend on the earlier ones, are left to the completion model
+        if (
+            get_settings().group_chat_router == "embeddings"
+            and len(assistants) > 1
+            and not session.questions
+        ):
+            assistant = await self._select_assistant_with_embeddings(question, assistants, space)
+            if assistant is not None:
+                return GroupChatAssistantSelectionResult(
+                    assistant=assistant,
+                    response_str="",
+                    assistant_selector_tokens=0,
+                )
+
+        return await self._select_assistant_with_completion_model(
+            question, assistants, session, stream=stream
+        )
+
     async def _handle_response(
         self,
         response: str,
@@ -276,35 +386,44 @@ class GroupChatService:
         session: "SessionInDB",
         stream: bool,
         assistant_selector_tokens: int = 0,
+        response_stream: Optional[AsyncIterator[Completion]] = None,
     ):
-        """Handle response for group chat selector, matching assistant_service"""
+        """Handle response for group chat selector, matching assistant_service
+
+        When streaming, `response` is the start of the clarification and the
+        rest is streamed from `response_stream` as the selector generates it.
+        """
 
         if stream:
 
-            async def response_stream():
-                chunk_response = response.split()
-                response_string = ""
-                for i, chunk in enumerate(chunk_response):
-                    if i < len(chunk_response):
-                        chunk_text = chunk + " "
-                    else:
-                        chunk_text = chunk
-
-                    response_string += chunk_text
-                    # yield empty references and chunk text, matching assistant_service format
+            async def response_stream_with_start():
+                # yield empty references and chunk text, matching assistant_service format
+                answer = response
+                if response:
                     yield Completion(
-                        text=chunk_text,
+                        text=response,
                         response_type=ResponseType.TEXT,
                         reference_chunks=[],
                     )
-                    await asyncio.sleep(0.05)
+
+                if response_stream is not None:
+                    async for chunk in response_stream:
+                        if not chunk.text:
+                            continue
+
+                        answer += chunk.text
+                        yield Completion(
+                            text=chunk.text,
+                            response_type=ResponseType.TEXT,
+                            reference_chunks=[],
+                        )
 
                 # NOTE: refactor question_token_count to include the whole contructed prompt.
                 question_token_count = count_tokens(question)
-                token_count = count_tokens(response)
+                token_count = count_tokens(answer)
                 await self.session_service.add_question_to_session(
                     question=question,
-                    answer=response,
+                    answer=answer,
                     num_tokens_question=question_token_count + assistant_selector_tokens,
                     num_tokens_answer=token_count,
                     session=session,
@@ -314,7 +433,7 @@ class GroupChatService:
                     logging_details=None,
                 )
 
-            return response_stream()
+            return response_stream_with_start()
         else:
             # NOTE: refactor question_token_count to include the whole contructed prompt.
             question_token_count = count_tokens(question)
@@ -349,7 +468,7 @@ class GroupChatService:
         the question will be directed to the specified assistant. Otherwise, the most
         appropriate assistant will be selected based on the question.
         """
-        group_chat = await self.get_group_chat(group_chat_id=group_chat_id)
+        space, group_chat = await self._get_space_and_group_chat(group_chat_id=group_chat_id)
         response_from_selector = None
         if not group_chat.assistants:
             raise BadRequestException("No assistants in the group chat")
@@ -380,10 +499,10 @@ class GroupChatService:
 
             assistant_to_ask = tool_assistant_id
         else:
-            # select the best assistant based on the question using the completion model
-            # including conversation history
-            selection_result = await self._select_assistant_with_completion_model(
-                question, group_chat.assistants, session
+            # select the best assistant based on the question, using the completion
+            # model including conversation history unless the router is decisive
+            selection_result = await self._select_assistant(
+                question, group_chat.assistants, space, session, stream=stream
             )
             response_from_selector = selection_result.response_str
             if selection_result.assistant:
@@ -399,6 +518,7 @@ class GroupChatService:
                 session=session,
                 stream=stream,
                 assistant_selector_tokens=selection_result.assistant_selector_tokens,
+                response_stream=selection_result.response_stream,
             )
             response = AssistantResponse(
                 question=question,
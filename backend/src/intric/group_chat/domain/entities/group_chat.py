@@ -36,6 +36,14 @@ class GroupChatAssistant:
         self.user_description = user_description
         return self
 
+    @property
+    def description(self) -> str:
+        return (
+            self.user_description
+            or self.assistant.description
+            or "No description"  # should not be able to happen
+        )
+
 
 class GroupChat(Entity):
     def __init__(
@@ -0,0 +1,30 @@
+"""Keys for reusing extracted text and embeddings of identical content.
+
+Info blobs store the keys of the content they were created from. When the
+same content is ingested again in the same tenant, the text and chunks of the
+existing info blob are copied, instead of being extracted and embedded again.
+"""
+
+import hashlib
+from pathlib import Path
+
+# Bump when a change to TextExtractor changes the text it extracts,
+# so that text extracted by earlier versions is not reused
+EXTRACTOR_VERSION = 1
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def hash_file(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(block)
+
+    return sha256.hexdigest()
+
+
+def extraction_key(file_hash: str, mimetype: str) -> str:
+    return f"{file_hash}:{mimetype}:{EXTRACTOR_VERSION}"
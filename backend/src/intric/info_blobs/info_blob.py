@@ -23,12 +23,19 @@ class InfoBlobMetadata(InfoBlobMetadataUpsertPublic):
 
 
 class InfoBlobAdd(InfoBlobBase, InfoBlobMetadataUpsertPublic):
+    # Only set when the chunks are embedded before the info blob is stored
+    id: Optional[UUID] = None
     size: Optional[int] = None
     user_id: UUID
     group_id: Optional[UUID] = None
     website_id: Optional[UUID] = None
     tenant_id: UUID
     integration_knowledge_id: Optional[UUID] = None
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    extraction_key: Optional[str] = None
+    embedding_key: Optional[str] = None
 
     @model_validator(mode="after")
     def require_one_of_group_id_and_website_id(self) -> "InfoBlobAdd":
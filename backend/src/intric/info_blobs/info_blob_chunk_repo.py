@@ -131,3 +131,27 @@ class InfoBlobChunkRepo:
             stmt = self._filter_on_sources(stmt, group_ids)
 
         return await self.delegate.get_models_from_query(stmt)
+
+    async def copy_chunks(self, *, from_info_blob_id: UUID, to_info_blob_id: UUID):
+        """Copy the chunks and embeddings of an info blob with identical content."""
+        source_chunks = sa.select(
+            InfoBlobChunks.text,
+            InfoBlobChunks.chunk_no,
+            InfoBlobChunks.size,
+            InfoBlobChunks.embedding,
+            sa.literal(to_info_blob_id, type_=InfoBlobChunks.info_blob_id.type),
+            InfoBlobChunks.tenant_id,
+        ).where(InfoBlobChunks.info_blob_id == from_info_blob_id)
+
+        stmt = sa.insert(InfoBlobChunks).from_select(
+            [
+                InfoBlobChunks.text,
+                InfoBlobChunks.chunk_no,
+                InfoBlobChunks.size,
+                InfoBlobChunks.embedding,
+                InfoBlobChunks.info_blob_id,
+                InfoBlobChunks.tenant_id,
+            ],
+            source_chunks,
+        )
+        await self.session.execute(stmt)
@@ -1,15 +1,22 @@
+from collections import defaultdict
+from datetime import datetime
 from uuid import UUID
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import defer, selectinload
 
+from intric.crawler.parse_html import KnownPage
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
 from intric.database.tables.collections_table import CollectionsTable
 from intric.database.tables.info_blob_chunk_table import InfoBlobChunks
 from intric.database.tables.info_blobs_table import InfoBlobs
 from intric.database.tables.integration_table import IntegrationKnowledge
-from intric.database.tables.users_table import Users
+from intric.database.tables.storage_usage_table import (
+    StorageUsageCounters,
+    StorageUsageDeltas,
+)
 from intric.database.tables.websites_table import Websites
 from intric.info_blobs.info_blob import (
     InfoBlobAdd,
@@ -18,6 +25,7 @@ from intric.info_blobs.info_blob import (
     InfoBlobInDBNoText,
     InfoBlobUpdate,
 )
+from intric.storage.domain.storage import StorageUsageScope
 
 
 class InfoBlobRepository:
@@ -103,6 +111,14 @@ class InfoBlobRepository:
 
         return info_blob_updated
 
+    async def append_text(self, info_blob_id: UUID, text: str, size: int):
+        stmt = (
+            sa.update(InfoBlobs)
+            .values(text=InfoBlobs.text + text, size=InfoBlobs.size + size)
+            .where(InfoBlobs.id == info_blob_id)
+        )
+        await self.session.execute(stmt)
+
     async def get_by_user(self, user_id: UUID):
         query = (
             sa.select(InfoBlobs)
@@ -118,6 +134,10 @@ class InfoBlobRepository:
     async def get(self, id: UUID) -> InfoBlobInDB:
         return await self.delegate.get(id)
 
+    async def get_by_ids(self, ids: list[UUID]) -> list[InfoBlobInDB]:
+        query = sa.select(InfoBlobs).where(InfoBlobs.id.in_(ids))
+        return await self.delegate.get_models_from_query(query)
+
     async def get_by_title_and_group(self, title: str, group_id: UUID):
         return await self.delegate.get_by(
             conditions={InfoBlobs.title: title, InfoBlobs.group_id: group_id}
@@ -172,25 +192,39 @@ class InfoBlobRepository:
 
         return size
 
-    async def get_total_size_of_user(self, user_id: UUID):
-        stmt = self._sum_stmt().where(InfoBlobs.user_id == user_id)
+    def _usage_stmt(self, scope: StorageUsageScope, owner_id: UUID, pending_deltas):
+        counter = (
+            sa.select(sa.func.coalesce(sa.func.sum(StorageUsageCounters.size), 0))
+            .where(StorageUsageCounters.scope == scope.value)
+            .where(StorageUsageCounters.owner_id == owner_id)
+            .scalar_subquery()
+        )
+        pending = (
+            sa.select(sa.func.coalesce(sa.func.sum(StorageUsageDeltas.size_delta), 0))
+            .where(pending_deltas)
+            .scalar_subquery()
+        )
 
-        size = await self.session.scalar(stmt)
+        return sa.select(counter + pending)
 
-        if size is None:
-            return 0
+    async def get_total_size_of_user(self, user_id: UUID):
+        # Maintained by a trigger on info_blobs, see StorageUsageRepository
+        stmt = self._usage_stmt(
+            StorageUsageScope.USER,
+            owner_id=user_id,
+            pending_deltas=StorageUsageDeltas.user_id == user_id,
+        )
 
-        return size
+        return await self.session.scalar(stmt)
 
     async def get_total_size_of_tenant(self, tenant_id: UUID):
-        stmt = self._sum_stmt().join(Users).where(Users.tenant_id == tenant_id)
-
-        size = await self.session.scalar(stmt)
-
-        if size is None:
-            return 0
+        stmt = self._usage_stmt(
+            StorageUsageScope.TENANT,
+            owner_id=tenant_id,
+            pending_deltas=StorageUsageDeltas.tenant_id == tenant_id,
+        )
 
-        return size
+        return await self.session.scalar(stmt)
 
     async def get_ids(self):
         stmt = sa.select(InfoBlobs.id)
@@ -203,3 +237,128 @@ class InfoBlobRepository:
         stmt = sa.select(InfoBlobs.title).where(InfoBlobs.website_id == website_id)
         result = await self.session.scalars(stmt)
         return list(result)
+
+    async def get_ids_by_title(
+        self, *, group_id: UUID | None = None, website_id: UUID | None = None
+    ) -> dict[str, list[UUID]]:
+        stmt = sa.select(InfoBlobs.title, InfoBlobs.id).where(InfoBlobs.title.isnot(None))
+
+        if group_id is not None:
+            stmt = stmt.where(InfoBlobs.group_id == group_id)
+        else:
+            stmt = stmt.where(InfoBlobs.website_id == website_id)
+
+        result = await self.session.execute(stmt)
+
+        ids_by_title = defaultdict(list)
+        for row in result:
+            ids_by_title[row.title].append(row.id)
+
+        return dict(ids_by_title)
+
+    async def get_known_pages_of_website(self, website_id: UUID) -> dict[str, KnownPage]:
+        stmt = sa.select(
+            InfoBlobs.title,
+            InfoBlobs.content_hash,
+            InfoBlobs.etag,
+            InfoBlobs.last_modified,
+            sa.func.coalesce(InfoBlobs.last_crawled_at, InfoBlobs.created_at).label(
+                "crawled_at"
+            ),
+        ).where(InfoBlobs.website_id == website_id)
+        result = await self.session.execute(stmt)
+
+        return {
+            row.title: KnownPage(
+                content_hash=row.content_hash,
+                etag=row.etag,
+                last_modified=row.last_modified,
+                crawled_at=row.crawled_at,
+            )
+            for row in result
+        }
+
+    async def update_crawl_metadata(
+        self,
+        *,
+        title: str,
+        website_id: UUID,
+        etag: str | None,
+        last_modified: str | None,
+    ):
+        stmt = (
+            sa.update(InfoBlobs)
+            .values(etag=etag, last_modified=last_modified)
+            .where(InfoBlobs.title == title)
+            .where(InfoBlobs.website_id == website_id)
+        )
+        await self.session.execute(stmt)
+
+    async def set_crawled_at(self, *, website_id: UUID, titles: list[str], crawled_at: datetime):
+        """Record when the pages were last found unchanged."""
+        stmt = (
+            sa.update(InfoBlobs)
+            .values(last_crawled_at=crawled_at)
+            .where(InfoBlobs.website_id == website_id)
+            .where(InfoBlobs.title == sa.any_(sa.literal(titles, ARRAY(sa.String))))
+        )
+        await self.session.execute(stmt)
+
+    async def get_text_by_extraction_key(self, *, tenant_id: UUID, extraction_key: str):
+        stmt = (
+            sa.select(InfoBlobs.text)
+            .where(InfoBlobs.tenant_id == tenant_id)
+            .where(InfoBlobs.extraction_key == extraction_key)
+            .limit(1)
+        )
+
+        return await self.session.scalar(stmt)
+
+    async def get_id_by_embedding_key(
+        self, *, tenant_id: UUID, embedding_key: str, replaced: InfoBlobAdd
+    ) -> UUID | None:
+        stmt = (
+            sa.select(InfoBlobs.id)
+            .where(InfoBlobs.tenant_id == tenant_id)
+            .where(InfoBlobs.embedding_key == embedding_key)
+            # The info blob that is replaced by `replaced` is deleted before its
+            # chunks could be copied
+            .where(
+                sa.or_(
+                    InfoBlobs.title.is_distinct_from(replaced.title),
+                    InfoBlobs.group_id.is_distinct_from(replaced.group_id),
+                    InfoBlobs.website_id.is_distinct_from(replaced.website_id),
+                )
+            )
+            .limit(1)
+        )
+
+        return await self.session.scalar(stmt)
+
+    async def set_embedding_key(self, info_blob_id: UUID, embedding_key: str):
+        stmt = (
+            sa.update(InfoBlobs)
+            .values(embedding_key=embedding_key)
+            .where(InfoBlobs.id == info_blob_id)
+        )
+        await self.session.execute(stmt)
+
+    async def get_content_stamp(
+        self,
+        *,
+        group_ids: list[UUID],
+        website_ids: list[UUID],
+        integration_knowledge_ids: list[UUID],
+    ) -> str:
+        """A stamp that changes when any info blob of the sources is added,
+        updated or deleted."""
+        stmt = sa.select(sa.func.count(), sa.func.max(InfoBlobs.updated_at)).where(
+            sa.or_(
+                InfoBlobs.group_id.in_(group_ids),
+                InfoBlobs.website_id.in_(website_ids),
+                InfoBlobs.integration_knowledge_id.in_(integration_knowledge_ids),
+            )
+        )
+        count, last_updated_at = (await self.session.execute(stmt)).one()
+
+        return f"{count}:{last_updated_at.isoformat() if last_updated_at else ''}"
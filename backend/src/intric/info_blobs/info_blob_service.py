@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
@@ -31,6 +33,16 @@ if TYPE_CHECKING:
 logger = get_logger(__name__)
 
 
+@dataclass
+class BulkIngest:
+    """State of an ongoing bulk ingest, see `InfoBlobService.bulk_ingest`."""
+
+    group_ids: set[UUID] = field(default_factory=set)
+    website_ids: set[UUID] = field(default_factory=set)
+    # Info blob ids by title, per collection or website
+    titles: dict[UUID, dict[str, list[UUID]]] = field(default_factory=dict)
+
+
 class InfoBlobService:
     def __init__(
         self,
@@ -53,6 +65,47 @@ class InfoBlobService:
         self.space_service = space_service
         self.actor_manager = actor_manager
 
+        self._bulk_ingest: Optional[BulkIngest] = None
+
+    @asynccontextmanager
+    async def bulk_ingest(self):
+        """Ingest many info blobs into the same collections or websites.
+
+        The collection and website sizes are recomputed once when the block
+        exits, instead of once per added info blob. The titles of each
+        collection or website are loaded once to find the info blobs to replace.
+        """
+        self._bulk_ingest = BulkIngest()
+        try:
+            yield
+            bulk_ingest = self._bulk_ingest
+        finally:
+            self._bulk_ingest = None
+
+        for group_id in bulk_ingest.group_ids:
+            await self.group_service.update_group_size(group_id)
+        for website_id in bulk_ingest.website_ids:
+            await self.update_website_size_service.update_website_size(website_id)
+
+    def _in_bulk_ingest(self, info_blob: InfoBlobAdd | InfoBlobInDB) -> bool:
+        return (
+            self._bulk_ingest is not None
+            and bool(info_blob.title)
+            and (info_blob.group_id or info_blob.website_id) is not None
+        )
+
+    async def _get_bulk_titles(
+        self, info_blob: InfoBlobAdd | InfoBlobInDB
+    ) -> dict[str, list[UUID]]:
+        container_id = info_blob.group_id or info_blob.website_id
+
+        if container_id not in self._bulk_ingest.titles:
+            self._bulk_ingest.titles[container_id] = await self.repo.get_ids_by_title(
+                group_id=info_blob.group_id, website_id=info_blob.website_id
+            )
+
+        return self._bulk_ingest.titles[container_id]
+
     async def _get_actor(self, info_blob: Optional[InfoBlobInDB], group_id: Optional[UUID]):
         if info_blob is None and group_id is None:
             raise ValueError("One of info_blob and group_id has to exist")
@@ -100,8 +153,21 @@ class InfoBlobService:
                 if not actor.can_delete_info_blobs():
                     raise UnauthorizedException()
 
+    async def _bulk_delete_if_same_title(self, info_blob: InfoBlobAdd):
+        titles = await self._get_bulk_titles(info_blob)
+        info_blob_ids = titles.pop(info_blob.title, [])
+
+        for info_blob_id in info_blob_ids:
+            await self.repo.delete(info_blob_id)
+
+        if info_blob_ids:
+            logger.debug(f"Info blob ({info_blob.title}) was replaced")
+
     async def _delete_if_same_title(self, info_blob: InfoBlobAdd):
-        if info_blob.title:
+        if self._in_bulk_ingest(info_blob):
+            await self._bulk_delete_if_same_title(info_blob)
+
+        elif info_blob.title:
             if info_blob.group_id:
                 info_blob_deleted = await self.repo.delete_by_title_and_group(
                     info_blob.title, info_blob.group_id
@@ -130,8 +196,35 @@ class InfoBlobService:
         info_blob.size = size_of_text
         info_blob_in_db = await self.repo.add(info_blob)
 
+        if self._in_bulk_ingest(info_blob_in_db):
+            titles = await self._get_bulk_titles(info_blob_in_db)
+            titles[info_blob_in_db.title] = [info_blob_in_db.id]
+
         return info_blob_in_db
 
+    async def get_text_by_extraction_key(self, extraction_key: str) -> Optional[str]:
+        return await self.repo.get_text_by_extraction_key(
+            tenant_id=self.user.tenant_id, extraction_key=extraction_key
+        )
+
+    async def get_id_with_same_embeddings(self, info_blob: InfoBlobAdd) -> Optional[UUID]:
+        """Find an info blob whose chunks can be copied to `info_blob`."""
+        if info_blob.embedding_key is None:
+            return None
+
+        return await self.repo.get_id_by_embedding_key(
+            tenant_id=self.user.tenant_id,
+            embedding_key=info_blob.embedding_key,
+            replaced=info_blob,
+        )
+
+    async def set_embedding_key(self, info_blob_id: UUID, embedding_key: str):
+        await self.repo.set_embedding_key(info_blob_id, embedding_key=embedding_key)
+
+    async def append_text(self, info_blob_id: UUID, text: str):
+        size_of_text = await self.quota_service.add_text(text)
+        await self.repo.append_text(info_blob_id, text=text, size=size_of_text)
+
     async def add_info_blob(self, info_blob: InfoBlobAdd):
         info_blob_in_db = await self.add_info_blob_without_validation(info_blob)
 
@@ -166,6 +259,14 @@ class InfoBlobService:
     async def update_info_blob_size(self, info_blob_id: UUID):
         updated_info_blob = await self.repo.update_size(info_blob_id=info_blob_id)
 
+        if self._bulk_ingest is not None:
+            if updated_info_blob.group_id is not None:
+                self._bulk_ingest.group_ids.add(updated_info_blob.group_id)
+            if updated_info_blob.website_id is not None:
+                self._bulk_ingest.website_ids.add(updated_info_blob.website_id)
+
+            return updated_info_blob
+
         if updated_info_blob.group_id is not None:
             await self.group_service.update_group_size(updated_info_blob.group_id)
         if updated_info_blob.website_id is not None:
@@ -1,9 +1,15 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING
-from uuid import UUID
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+from uuid import UUID, uuid4
 
 from intric.embedding_models.infrastructure.datastore import Datastore
-from intric.files.text import TextExtractor
+from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from intric.files.extraction_executor import extraction_executor
+from intric.files.text import TextExtractor, TextMimeTypes
+from intric.info_blobs import content_cache
 from intric.info_blobs.info_blob import InfoBlobAdd
 from intric.info_blobs.info_blob_service import InfoBlobService
 from intric.users.user import UserInDB
@@ -11,6 +17,18 @@ from intric.users.user import UserInDB
 if TYPE_CHECKING:
     from intric.embedding_models.domain.embedding_model import EmbeddingModel
 
+PDF_PAGES_PER_PART = 20
+
+
+@dataclass
+class PreparedText:
+    """Text that is chunked and embedded, but not yet stored."""
+
+    info_blob_id: UUID
+    text: str
+    chunk_embedding_list: Optional[ChunkEmbeddingList]
+    embedding_key: Optional[str] = None
+
 
 class TextProcessor:
     def __init__(
@@ -25,6 +43,12 @@ class TextProcessor:
         self.datastore = datastore
         self.info_blob_service = info_blob_service
 
+    def _embedding_key(self, text: str, embedding_model: "EmbeddingModel"):
+        return self.datastore.embedding_key(content_cache.hash_text(text), embedding_model)
+
+    def bulk_ingest(self):
+        return self.info_blob_service.bulk_ingest()
+
     async def process_file(
         self,
         *,
@@ -35,7 +59,25 @@ class TextProcessor:
         group_id: UUID | None = None,
         website_id: UUID | None = None,
     ):
-        text = self.extractor.extract(filepath, mimetype)
+        mimetype = self.extractor.get_mimetype(filepath, mimetype)
+        file_hash = await asyncio.to_thread(content_cache.hash_file, filepath)
+        extraction_key = content_cache.extraction_key(file_hash, mimetype)
+
+        # The same file has been extracted before in this tenant
+        text = await self.info_blob_service.get_text_by_extraction_key(extraction_key)
+
+        if text is None and mimetype == TextMimeTypes.PDF:
+            return await self._process_pdf(
+                filepath=filepath,
+                title=filename,
+                embedding_model=embedding_model,
+                group_id=group_id,
+                website_id=website_id,
+                extraction_key=extraction_key,
+            )
+
+        if text is None:
+            text = await extraction_executor.run(self.extractor.extract, filepath, mimetype)
 
         return await self.process_text(
             text=text,
@@ -43,6 +85,7 @@ class TextProcessor:
             embedding_model=embedding_model,
             group_id=group_id,
             website_id=website_id,
+            extraction_key=extraction_key,
         )
 
     async def process_text(
@@ -54,6 +97,7 @@ class TextProcessor:
         group_id: UUID | None = None,
         website_id: UUID | None = None,
         url: str | None = None,
+        extraction_key: str | None = None,
     ):
         info_blob_add = InfoBlobAdd(
             title=title,
@@ -63,10 +107,137 @@ class TextProcessor:
             url=url,
             website_id=website_id,
             tenant_id=self.user.tenant_id,
+            extraction_key=extraction_key,
+            embedding_key=self._embedding_key(text, embedding_model),
+        )
+
+        # Look up before adding, which may delete an info blob with the same title
+        same_embeddings_id = await self.info_blob_service.get_id_with_same_embeddings(
+            info_blob_add
         )
 
         info_blob = await self.info_blob_service.add_info_blob_without_validation(info_blob_add)
-        await self.datastore.add(info_blob=info_blob, embedding_model=embedding_model)
+
+        if same_embeddings_id is not None:
+            await self.datastore.copy_embeddings(
+                from_info_blob_id=same_embeddings_id, to_info_blob_id=info_blob.id
+            )
+        else:
+            await self.datastore.add(info_blob=info_blob, embedding_model=embedding_model)
+
         info_blob_updated = await self.info_blob_service.update_info_blob_size(info_blob.id)
 
         return info_blob_updated
+
+    async def _pdf_parts(
+        self, filepath: Path, info_blob_id: UUID, text_hash: "hashlib._Hash"
+    ) -> AsyncIterator[str]:
+        start = 0
+        while True:
+            pages = await extraction_executor.run(
+                self.extractor.extract_pdf_pages, filepath, start, PDF_PAGES_PER_PART
+            )
+            if not pages:
+                return
+
+            text = " ".join(pages)
+            appended = text if start == 0 else f" {text}"
+            text_hash.update(appended.encode())
+            await self.info_blob_service.append_text(info_blob_id, appended)
+            yield text
+
+            start += len(pages)
+
+    async def _process_pdf(
+        self,
+        *,
+        filepath: Path,
+        title: str,
+        embedding_model: "EmbeddingModel",
+        group_id: UUID | None = None,
+        website_id: UUID | None = None,
+        extraction_key: str | None = None,
+    ):
+        """Process a PDF a few pages at a time, so that large documents
+        are never held in memory as a whole."""
+        info_blob_add = InfoBlobAdd(
+            title=title,
+            user_id=self.user.id,
+            text="",
+            group_id=group_id,
+            website_id=website_id,
+            tenant_id=self.user.tenant_id,
+            extraction_key=extraction_key,
+        )
+
+        info_blob = await self.info_blob_service.add_info_blob_without_validation(info_blob_add)
+        text_hash = hashlib.sha256()
+        await self.datastore.add_stream(
+            info_blob_id=info_blob.id,
+            texts=self._pdf_parts(filepath, info_blob.id, text_hash),
+            embedding_model=embedding_model,
+        )
+        await self.info_blob_service.set_embedding_key(
+            info_blob.id, self.datastore.embedding_key(text_hash.hexdigest(), embedding_model)
+        )
+
+        return await self.info_blob_service.update_info_blob_size(info_blob.id)
+
+    # The prepare/store split below lets several texts be extracted and embedded
+    # concurrently, while only the short `store` step needs the database session
+
+    async def prepare_file(
+        self,
+        *,
+        filepath: Path,
+        embedding_model: "EmbeddingModel",
+        mimetype: str | None = None,
+    ) -> PreparedText:
+        text = await extraction_executor.run(self.extractor.extract, filepath, mimetype)
+
+        return await self.prepare_text(text=text, embedding_model=embedding_model)
+
+    async def prepare_text(self, *, text: str, embedding_model: "EmbeddingModel") -> PreparedText:
+        info_blob_id = uuid4()
+        chunk_embedding_list = await self.datastore.embed(
+            text=text, info_blob_id=info_blob_id, embedding_model=embedding_model
+        )
+
+        return PreparedText(
+            info_blob_id=info_blob_id,
+            text=text,
+            chunk_embedding_list=chunk_embedding_list,
+            embedding_key=self._embedding_key(text, embedding_model),
+        )
+
+    async def store(
+        self,
+        prepared: PreparedText,
+        *,
+        title: str,
+        group_id: UUID | None = None,
+        website_id: UUID | None = None,
+        url: str | None = None,
+        content_hash: str | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ):
+        info_blob_add = InfoBlobAdd(
+            id=prepared.info_blob_id,
+            title=title,
+            user_id=self.user.id,
+            text=prepared.text,
+            group_id=group_id,
+            url=url,
+            website_id=website_id,
+            tenant_id=self.user.tenant_id,
+            content_hash=content_hash,
+            etag=etag,
+            last_modified=last_modified,
+            embedding_key=prepared.embedding_key,
+        )
+
+        info_blob = await self.info_blob_service.add_info_blob_without_validation(info_blob_add)
+        await self.datastore.add_embeddings(prepared.chunk_embedding_list)
+
+        return await self.info_blob_service.update_info_blob_size(info_blob.id)
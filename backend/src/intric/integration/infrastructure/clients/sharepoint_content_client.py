@@ -3,6 +3,7 @@ from uuid import UUID
 
 import aiohttp
 
+from intric.files.extraction_executor import extraction_executor
 from intric.integration.infrastructure.content_service.utils import (
     process_sharepoint_response,
 )
@@ -257,10 +258,8 @@ class SharePointContentClient(BaseClient):
                     return await response.text(), content_type
                 else:
                     binary_content = await response.read()
-                    text, detected_content_type = process_sharepoint_response(
-                        response_content=binary_content,
-                        content_type=content_type,
-                        filename=file_name,
+                    text, detected_content_type = await extraction_executor.run(
+                        process_sharepoint_response, binary_content, content_type, file_name
                     )
                     return text, detected_content_type
         except aiohttp.ClientResponseError as e:
@@ -294,10 +293,8 @@ class SharePointContentClient(BaseClient):
                         return await response.text(), content_type
                     else:
                         binary_content = await response.read()
-                        text, detected_content_type = process_sharepoint_response(
-                            response_content=binary_content,
-                            content_type=content_type,
-                            filename=file_name,
+                        text, detected_content_type = await extraction_executor.run(
+                            process_sharepoint_response, binary_content, content_type, file_name
                         )
                         return text, detected_content_type
             else:
@@ -17,6 +17,7 @@ class Task(str, Enum):
     RUN_APP = "run_app"
     PULL_CONFLUENCE_CONTENT = "pull_confluence_content"
     PULL_SHAREPOINT_CONTENT = "pull_sharepoint_content"
+    COMPACT_HISTORY = "compact_history"
 
 
 class JobBase(BaseModel):
@@ -34,3 +34,8 @@ class UploadInfoBlob(UploadTask):
 
 class Transcription(UploadTask):
     pass
+
+
+class CompactHistoryTask(TaskParams):
+    session_id: UUID
+    completion_model_id: UUID
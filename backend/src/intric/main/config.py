@@ -1,7 +1,7 @@
 import json
 import logging
 import os
-from typing import Optional
+from typing import Literal, Optional
 
 from intric.definitions import ROOT_DIR
 from pydantic import computed_field
@@ -93,13 +93,76 @@ class Settings(BaseSettings):
     testing: bool = False
     dev: bool = False
 
+    # Text extraction, runs in a process pool. Defaults to one process per core
+    extraction_max_workers: Optional[int] = None
+    extraction_timeout_seconds: int = 300
+    # Limits the heap of each extraction process (RLIMIT_DATA), unlimited if unset.
+    # Leave room for the libraries, which take a few hundred MB before parsing
+    extraction_memory_limit_mb: Optional[int] = None
+
+    # Blob store for the content of images and audio files, "local" or "s3"
+    blob_store_backend: Literal["local", "s3"] = "local"
+    blob_store_path: str = f"{ROOT_DIR}/blobs"
+    s3_endpoint_url: Optional[str] = None
+    s3_bucket: Optional[str] = None
+    s3_region: str = "us-east-1"
+    s3_access_key: Optional[str] = None
+    s3_secret_key: Optional[str] = None
+
+    # Transcription, audio is split into segments that are transcribed concurrently
+    transcription_max_concurrency: int = 4
+    transcription_segment_overlap_seconds: int = 3
+
+    # Answer cache of assistants, answers are reused for questions at least this similar
+    answer_cache_similarity_threshold: float = 0.97
+    answer_cache_max_age_hours: int = 24
+
+    # Completion scheduling, requests to a model are queued fairly across tenants,
+    # within the tokens_per_minute of the model. Weights are by tenant id.
+    completion_scheduler_enabled: bool = False
+    completion_scheduler_max_concurrent_per_tenant: int = 8
+    completion_scheduler_max_queue: int = 500
+    completion_scheduler_max_wait_seconds: int = 120
+    completion_scheduler_poll_seconds: float = 0.25
+    completion_scheduler_lease_seconds: int = 600
+    completion_scheduler_tenant_weights: dict[str, float] = {}
+
+    # Completion endpoints, the circuit of a failing endpoint opens and completions
+    # go to the fallback models of the model until the cooldown has passed.
+    # Hedging sends a second non-streamed request, to the next model, when the
+    # first is slower than the p95 latency of its endpoint.
+    completion_circuit_breaker_failures: int = 5
+    completion_circuit_breaker_error_rate: float = 0.5
+    completion_circuit_breaker_cooldown_seconds: int = 30
+    completion_hedging_enabled: bool = False
+    completion_hedging_min_delay_seconds: float = 2.0
+
+    # Sessions, the history past the threshold is summarized, except for the most
+    # recent questions. The summary is made by the model with this name if it is
+    # available, otherwise by the model that answered.
+    history_compaction_threshold_tokens: int = 6000
+    history_compaction_keep_questions: int = 4
+    history_compaction_model: Optional[str] = None
+
+    # Group chat, "embeddings" routes the first question of a session by the similarity
+    # to the assistant descriptions. The completion model selects when the margin is
+    # too small, and for follow-up questions
+    group_chat_router: Literal["completion_model", "embeddings"] = "completion_model"
+    group_chat_router_min_margin: float = 0.05
+
     # Crawl
     crawl_max_length: int = 60 * 60 * 4  # 4 hour crawls max
     closespider_itemcount: int = 20000
+    crawl_ingest_workers: int = 4
+    crawl_stream_queue_size: int = 50
     obey_robots: bool = True
     autothrottle_enabled: bool = True
     using_crawl: bool = True
 
+    # Data retention
+    data_retention_batch_size: int = 1000
+    data_retention_time_budget_seconds: int = 60 * 15  # 15 minutes per run
+
     # integration callback
     oauth_callback_url: Optional[str] = None
 
@@ -23,6 +23,8 @@ from intric.apps import (
     AppRunService,
     AppService,
 )
+from intric.assistants.answer_cache import AnswerCacheService
+from intric.assistants.answer_cache_repo import AnswerCacheRepository
 from intric.assistants.api.assistant_assembler import AssistantAssembler
 from intric.assistants.assistant_factory import AssistantFactory
 from intric.assistants.assistant_repo import AssistantRepository
@@ -36,6 +38,9 @@ from intric.completion_models.domain import CompletionModelRepository
 from intric.completion_models.domain.completion_model_service import (
     CompletionModelService,
 )
+from intric.completion_models.infrastructure.completion_scheduler import (
+    CompletionScheduler,
+)
 from intric.completion_models.infrastructure.completion_service import CompletionService
 from intric.completion_models.infrastructure.context_builder import ContextBuilder
 from intric.completion_models.presentation import CompletionModelAssembler
@@ -53,6 +58,7 @@ from intric.embedding_models.infrastructure.create_embeddings_service import (
     CreateEmbeddingsService,
 )
 from intric.embedding_models.infrastructure.datastore import Datastore
+from intric.files.blob_store import blob_store
 from intric.files.file_protocol import FileProtocol
 from intric.files.file_repo import FileRepository
 from intric.files.file_service import FileService
@@ -60,6 +66,7 @@ from intric.files.file_size_service import FileSizeService
 from intric.files.image import ImageExtractor
 from intric.files.text import TextExtractor
 from intric.files.transcriber import Transcriber
+from intric.group_chat.application.assistant_router import EmbeddingAssistantRouter
 from intric.group_chat.application.group_chat_service import GroupChatService
 from intric.group_chat.presentation.assemblers.group_chat_assembler import (
     GroupChatAssembler,
@@ -173,6 +180,7 @@ from intric.security_classifications.domain.repositories.security_classification
 from intric.services.service_repo import ServiceRepository
 from intric.services.service_runner import ServiceRunner
 from intric.services.service_service import ServiceService
+from intric.sessions.history_compaction import HistoryCompactionService
 from intric.sessions.session_service import SessionService
 from intric.sessions.sessions_repo import SessionRepository
 from intric.settings.setting_service import SettingService
@@ -186,6 +194,7 @@ from intric.spaces.space_service import SpaceService
 from intric.storage.application.storage_services import StorageInfoService
 from intric.storage.domain.storage_factory import StorageInfoFactory
 from intric.storage.domain.storage_repo import StorageInfoRepository
+from intric.storage.domain.storage_usage_repo import StorageUsageRepository
 from intric.storage.presentation.storage_assembler import StorageInfoAssembler
 from intric.templates.api.templates_assembler import TemplateAssembler
 from intric.templates.app_template.api.app_template_assembler import (
@@ -211,13 +220,18 @@ from intric.tenants.tenant import TenantInDB
 from intric.tenants.tenant_repo import TenantRepository
 from intric.tenants.tenant_service import TenantService
 from intric.token_usage.application.token_usage_service import TokenUsageService
+from intric.token_usage.application.usage_rollup_service import UsageRollupService
 from intric.token_usage.infrastructure.token_usage_analyzer import TokenUsageAnalyzer
+from intric.token_usage.infrastructure.usage_rollup_repo import UsageRollupRepository
 from intric.transcription_models.application import TranscriptionModelCRUDService
 from intric.transcription_models.domain import TranscriptionModelRepository
 from intric.transcription_models.domain.transcription_model_service import (
     TranscriptionModelService,
 )
 from intric.transcription_models.infrastructure import TranscriptionModelEnableService
+from intric.transcription_models.infrastructure.transcription_cache_repo import (
+    TranscriptionCacheRepository,
+)
 from intric.user_groups.user_groups_repo import UserGroupsRepository
 from intric.user_groups.user_groups_service import UserGroupsService
 from intric.users.user import UserInDB
@@ -247,6 +261,7 @@ class Container(containers.DeclarativeContainer):
     user = providers.Dependency(instance_of=UserInDB)
     tenant = providers.Dependency(instance_of=TenantInDB)
     aiohttp_client = providers.Object(aiohttp_client)
+    blob_store = providers.Object(blob_store)
 
     # Factories
     prompt_factory = providers.Factory(PromptFactory)
@@ -343,6 +358,8 @@ class Container(containers.DeclarativeContainer):
     transcription_model_repo = providers.Factory(
         TranscriptionModelRepository, session=session, user=user
     )
+    transcription_cache_repo = providers.Factory(TranscriptionCacheRepository, session=session)
+    answer_cache_repo = providers.Factory(AnswerCacheRepository, session=session)
     embedding_model_repo = providers.Factory(AdminEmbeddingModelsService, session=session)
     website_sparse_repo = providers.Factory(WebsiteSparseRepository, session=session)
     integration_knowledge_repo = providers.Factory(
@@ -380,12 +397,13 @@ class Container(containers.DeclarativeContainer):
     analysis_repo = providers.Factory(AnalysisRepository, session=session)
     session_repo = providers.Factory(SessionRepository, session=session)
     question_repo = providers.Factory(QuestionRepository, session=session)
-    file_repo = providers.Factory(FileRepository, session=session)
+    file_repo = providers.Factory(FileRepository, session=session, blob_store=blob_store)
     crawl_run_repo = providers.Factory(CrawlRunRepository, session=session)
 
     storage_repo = providers.Factory(
         StorageInfoRepository, user=user, session=session, factory=storage_info_factory
     )
+    storage_usage_repo = providers.Factory(StorageUsageRepository, session=session)
     app_repo = providers.Factory(
         AppRepository,
         session=session,
@@ -427,9 +445,14 @@ class Container(containers.DeclarativeContainer):
 
     # Completion model adapters
     context_builder = providers.Factory(ContextBuilder)
+    completion_scheduler = providers.Factory(CompletionScheduler)
     completion_service = providers.Factory(
         CompletionService,
         context_builder=context_builder,
+        file_repo=file_repo,
+        user=user,
+        completion_scheduler=completion_scheduler,
+        completion_model_repo=completion_model_repo2,
     )
 
     # Datastore
@@ -619,11 +642,19 @@ class Container(containers.DeclarativeContainer):
         repo=assistant_template_repo,
         factory=assistant_template_factory,
     )
+    history_compaction_service = providers.Factory(
+        HistoryCompactionService,
+        user=user,
+        session_repo=session_repo,
+        completion_service=completion_service,
+        completion_model_crud_service=completion_model_crud_service,
+    )
     session_service = providers.Factory(
         SessionService,
         user=user,
         question_repo=question_repo,
         session_repo=session_repo,
+        history_compaction_service=history_compaction_service,
     )
     resource_mover_service = providers.Factory(
         ResourceMoverService,
@@ -631,6 +662,13 @@ class Container(containers.DeclarativeContainer):
         space_service=space_service,
         actor_manager=actor_manager,
     )
+    answer_cache_service = providers.Factory(
+        AnswerCacheService,
+        user=user,
+        answer_cache_repo=answer_cache_repo,
+        info_blob_repo=info_blob_repo,
+        create_embeddings_service=create_embeddings_service,
+    )
     assistant_service = providers.Factory(
         AssistantService,
         user=user,
@@ -650,6 +688,12 @@ class Container(containers.DeclarativeContainer):
         integration_knowledge_repo=integration_knowledge_repo,
         completion_service=completion_service,
         references_service=references_service,
+        answer_cache_service=answer_cache_service,
+    )
+    assistant_router = providers.Factory(
+        EmbeddingAssistantRouter,
+        user=user,
+        create_embeddings_service=create_embeddings_service,
     )
     group_chat_service = providers.Factory(
         GroupChatService,
@@ -660,6 +704,7 @@ class Container(containers.DeclarativeContainer):
         assistant_service=assistant_service,
         session_service=session_service,
         completion_service=completion_service,
+        assistant_router=assistant_router,
     )
     app_template_service = providers.Factory(
         AppTemplateService,
@@ -830,6 +875,14 @@ class Container(containers.DeclarativeContainer):
         user=user,
         token_usage_analyzer=token_usage_analyzer,
     )
+    usage_rollup_repo = providers.Factory(
+        UsageRollupRepository,
+        session=session,
+    )
+    usage_rollup_service = providers.Factory(
+        UsageRollupService,
+        repo=usage_rollup_repo,
+    )
 
     # Worker
     task_manager = providers.Factory(
@@ -847,7 +900,9 @@ class Container(containers.DeclarativeContainer):
     )
     transcriber = providers.Factory(
         Transcriber,
+        user=user,
         file_repo=file_repo,
+        transcription_cache_repo=transcription_cache_repo,
     )
     crawler = providers.Factory(Crawler)
 
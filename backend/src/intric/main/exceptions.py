@@ -28,6 +28,7 @@ class ErrorCodes(int, Enum):
     INTERNAL_HTTP_ERROR = 9023
     INTERNAL_SERVER_ERROR = 9024
     TENANT_SUSPENDED = 9025
+    MODEL_BUSY = 9026
 
 
 class NotFoundException(Exception):
@@ -98,6 +99,10 @@ class ChunkEmbeddingMisMatchException(Exception):
     pass
 
 
+class TextExtractionException(Exception):
+    pass
+
+
 class CrawlerException(Exception):
     pass
 
@@ -142,6 +147,10 @@ class TenantSuspendedException(Exception):
     pass
 
 
+class ModelBusyException(Exception):
+    pass
+
+
 # Map exceptions to response codes
 # Set message to None to use the internal message
 # Set error codes in the range 9000 - 9999
@@ -188,4 +197,5 @@ EXCEPTION_MAP = {
         ErrorCodes.INTERNAL_SERVER_ERROR,
     ),
     TenantSuspendedException: (403, "Tenant is suspended", ErrorCodes.TENANT_SUSPENDED),
+    ModelBusyException: (429, None, ErrorCodes.MODEL_BUSY),
 }
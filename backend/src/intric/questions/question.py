@@ -61,6 +61,8 @@ class QuestionBase(BaseModel):
 class QuestionAdd(QuestionBase):
     num_tokens_question: int
     num_tokens_answer: int
+    # Of num_tokens_question, the ones read from the provider's prompt cache
+    num_tokens_cached: int = 0
     tenant_id: UUID
     completion_model_id: Optional[UUID] = None
     session_id: Optional[UUID] = None
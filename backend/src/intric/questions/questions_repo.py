@@ -92,6 +92,21 @@ class QuestionRepository:
 
         return (await self.session.scalars(stmt)).all()
 
+    async def _copy_references(self, from_question_id: UUID, to_question_id: UUID):
+        columns = [
+            InfoBlobReferences.info_blob_id,
+            InfoBlobReferences.similarity_score,
+            InfoBlobReferences.order,
+        ]
+        stmt = sa.insert(InfoBlobReferences).from_select(
+            [InfoBlobReferences.question_id, *columns],
+            sa.select(sa.literal(to_question_id), *columns).where(
+                InfoBlobReferences.question_id == from_question_id
+            ),
+        )
+
+        await self.session.execute(stmt)
+
     async def _add_files(
         self, question_id: int, files: list[File], file_type: str = "user"
     ):
@@ -133,6 +148,7 @@ class QuestionRepository:
         files: list[File] = [],
         generated_files: list[File] = [],
         web_search_results: list["WebSearchResult"] = [],
+        references_from_question_id: UUID | None = None,
     ):
         stmt = (
             sa.insert(Questions)
@@ -148,6 +164,11 @@ class QuestionRepository:
             question_id=question_record.id, chunks=info_blob_chunks
         )
 
+        if references_from_question_id is not None:
+            await self._copy_references(
+                from_question_id=references_from_question_id, to_question_id=question_record.id
+            )
+
         if files:
             await self._add_files(
                 question_id=question_record.id, files=files, file_type="user"
@@ -3,6 +3,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from intric.database.database import sessionmanager
+from intric.files.extraction_executor import extraction_executor
 from intric.jobs.job_manager import job_manager
 from intric.main.aiohttp_client import aiohttp_client
 from intric.main.config import SETTINGS
@@ -21,6 +22,7 @@ async def lifespan(app: FastAPI):
 
 async def startup():
     aiohttp_client.start()
+    extraction_executor.start()
     sessionmanager.init(SETTINGS.database_url)
     await job_manager.init()
 
@@ -37,5 +39,6 @@ async def startup():
 async def shutdown():
     await sessionmanager.close()
     await aiohttp_client.stop()
+    extraction_executor.stop()
     await job_manager.close()
     await websocket_manager.shutdown()
@@ -77,7 +77,7 @@ class ServiceRunner:
             answer=answer,
             num_tokens_question=ai_response.total_token_count,
             num_tokens_answer=num_tokens_answer,
-            completion_model_id=self.service.completion_model.id,
+            completion_model_id=ai_response.model.id,
             service_id=self.service.id,
         )
         await self.question_repo.add(
@@ -0,0 +1,194 @@
+"""Compaction of the history of long sessions.
+
+Once the questions of a session that are not yet summarized grow past
+`history_compaction_threshold_tokens`, a worker summarizes all but the most
+recent of them, together with the previous summary. The context builder then
+uses the summary and the recent questions, instead of dropping the oldest
+questions that do not fit. Histories that do not fit in the context of the
+compaction model are summarized a part at a time, each part together with the
+summary of the parts before it.
+"""
+
+from typing import TYPE_CHECKING, Optional
+from uuid import UUID, uuid5
+
+from intric.completion_models.infrastructure.context_builder import count_tokens
+from intric.completion_models.infrastructure.static_prompts import (
+    HISTORY_COMPACTION_PROMPT,
+)
+from intric.jobs.job_manager import job_manager
+from intric.jobs.job_models import Task
+from intric.jobs.task_models import CompactHistoryTask
+from intric.main.config import get_settings
+from intric.main.logging import get_logger
+
+if TYPE_CHECKING:
+    from intric.completion_models.application.completion_model_crud_service import (
+        CompletionModelCRUDService,
+    )
+    from intric.completion_models.domain import CompletionModel
+    from intric.completion_models.infrastructure.completion_service import (
+        CompletionService,
+    )
+    from intric.questions.question import Question
+    from intric.sessions.session import SessionInDB
+    from intric.sessions.sessions_repo import SessionRepository
+    from intric.users.user import UserInDB
+
+logger = get_logger(__name__)
+
+# Deciding whether to compact should not tokenize the history again, so it is
+# estimated from the length of the text
+CHARS_PER_TOKEN = 4
+
+# Share of the compaction model's context that the transcript of one request
+# may use, the rest is left for the prompt and the summary
+TRANSCRIPT_SHARE = 0.5
+
+
+def _estimate_tokens(questions: list["Question"]) -> int:
+    return sum(len(q.question) + len(q.answer or "") for q in questions) // CHARS_PER_TOKEN
+
+
+def _turn(question: "Question") -> str:
+    return f"user: {question.question}\nassistant: {question.answer or ''}"
+
+
+def _cut(text: str, max_tokens: int) -> str:
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text
+
+    return text[: len(text) * max(max_tokens, 0) // tokens]
+
+
+def _take_turns(questions: list["Question"], max_tokens: int) -> list[str]:
+    """The turns of the first questions that fit in `max_tokens`. At least one,
+    which is cut if it does not fit on its own."""
+    turns = []
+    tokens = 0
+    for question in questions:
+        turn = _turn(question)
+        tokens += count_tokens(turn)
+        if turns and tokens > max_tokens:
+            break
+        turns.append(turn)
+
+    if len(turns) == 1:
+        turns = [_cut(turns[0], max_tokens)]
+
+    return turns
+
+
+def _build_transcript(summary: Optional[str], turns: list[str]) -> str:
+    if summary:
+        turns = [f"summary: {summary}", *turns]
+
+    transcript = "\n\n".join(turns)
+    return f'"""{transcript}"""'
+
+
+class HistoryCompactionService:
+    def __init__(
+        self,
+        user: "UserInDB",
+        session_repo: "SessionRepository",
+        completion_service: "CompletionService",
+        completion_model_crud_service: "CompletionModelCRUDService",
+    ):
+        self.user = user
+        self.session_repo = session_repo
+        self.completion_service = completion_service
+        self.completion_model_crud_service = completion_model_crud_service
+
+    @staticmethod
+    def needs_compaction(session: "SessionInDB", question: "Question") -> bool:
+        """Whether the history of the session, with the question just added to
+        it, has grown past the threshold."""
+        settings = get_settings()
+        questions = [*session.questions, question]
+        if len(questions) <= settings.history_compaction_keep_questions:
+            return False
+
+        return _estimate_tokens(questions) > settings.history_compaction_threshold_tokens
+
+    async def queue_if_needed(
+        self,
+        session: "SessionInDB",
+        question: "Question",
+        completion_model: Optional["CompletionModel"],
+    ):
+        if completion_model is None or not self.needs_compaction(session, question):
+            return
+
+        params = CompactHistoryTask(
+            user_id=self.user.id,
+            session_id=session.id,
+            completion_model_id=completion_model.id,
+        )
+
+        # Compaction only makes the next questions cheaper, the answer does not
+        # depend on it. One job per question, so that it is not queued twice.
+        try:
+            await job_manager.enqueue(
+                Task.COMPACT_HISTORY, uuid5(session.id, str(question.id)), params
+            )
+        except Exception as e:
+            logger.warning(f"Could not queue compaction of session {session.id}: {e}")
+
+    async def _get_completion_model(self, completion_model_id: UUID) -> "CompletionModel":
+        name = get_settings().history_compaction_model
+        if name is not None:
+            models = await self.completion_model_crud_service.get_available_completion_models()
+            for model in models:
+                if model.name == name:
+                    return model
+
+        return await self.completion_model_crud_service.get_completion_model(completion_model_id)
+
+    async def compact(self, session_id: UUID, completion_model_id: UUID):
+        """Summarize the session's history, except for the most recent questions."""
+        settings = get_settings()
+        completion_model = await self._get_completion_model(completion_model_id)
+
+        session = await self.session_repo.get_with_history(id=session_id)
+        if session is None:
+            return
+
+        recent = settings.history_compaction_keep_questions
+        older = session.questions[:-recent] if recent else session.questions
+        if not older:
+            return
+
+        history_tokens = sum(
+            count_tokens(q.question) + count_tokens(q.answer) for q in session.questions
+        )
+        if history_tokens <= settings.history_compaction_threshold_tokens:
+            return
+
+        max_tokens = int(completion_model.token_limit * TRANSCRIPT_SHARE)
+        summary = session.history_summary
+        remaining = older
+        while remaining:
+            turns = _take_turns(remaining, max_tokens - count_tokens(summary))
+            response = await self.completion_service.get_response(
+                model=completion_model,
+                prompt=HISTORY_COMPACTION_PROMPT,
+                text_input=_build_transcript(summary, turns),
+            )
+            summary = response.completion.text
+            remaining = remaining[len(turns) :]
+
+        summary_tokens = count_tokens(summary)
+
+        replaced = await self.session_repo.update_history_summary(
+            id=session.id,
+            summary=summary,
+            summary_tokens=summary_tokens,
+            summarized_until=older[-1].created_at,
+        )
+
+        logger.debug(
+            f"Compacted {len(older)} questions of session {session.id} "
+            f"into {summary_tokens} tokens, replaced: {replaced}"
+        )
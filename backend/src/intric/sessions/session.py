@@ -1,3 +1,4 @@
+from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING, Literal, Optional
 from uuid import UUID
@@ -37,6 +38,9 @@ class SessionInDB(SessionBase, InDB):
     user_id: UUID
     feedback_value: Optional[Literal[-1, 1]] = None
     feedback_text: Optional[str] = None
+    history_summary: Optional[str] = None
+    history_summary_tokens: Optional[int] = None
+    history_summarized_until: Optional[datetime] = None
 
     questions: list[Question] = []
     assistant: Optional["AssistantSparse"] = None
@@ -92,6 +96,7 @@ class SessionResponse(BaseModel):
 
 class IntricEventType(str, Enum):
     GENERATING_IMAGE = "generating_image"
+    QUEUED = "queued"
 
 
 class SSEBase(BaseModel):
@@ -109,6 +114,8 @@ class SSEFiles(SSEBase):
 
 class SSEIntricEvent(SSEBase):
     intric_event_type: IntricEventType
+    # Number of requests ahead in the queue of the completion model, when queued
+    queue_position: Optional[int] = None
 
 
 class SSEFirstChunk(AskChatResponse):
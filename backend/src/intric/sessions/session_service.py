@@ -15,6 +15,7 @@ from intric.main.exceptions import (
 )
 from intric.questions.question import QuestionAdd
 from intric.questions.questions_repo import QuestionRepository
+from intric.sessions.history_compaction import HistoryCompactionService
 from intric.sessions.session import SessionAdd, SessionFeedback, SessionInDB
 from intric.sessions.sessions_repo import SessionRepository
 from intric.users.user import UserInDB
@@ -31,12 +32,14 @@ class SessionService:
         user: UserInDB,
         assistant_service: AssistantService = None,
         group_chat_service: GroupChatService = None,
+        history_compaction_service: HistoryCompactionService = None,
     ):
         self.session_repo = session_repo
         self.question_repo = question_repo
         self.user = user
         self.assistant_service = assistant_service
         self.group_chat_service = group_chat_service
+        self.history_compaction_service = history_compaction_service
 
     def _check_exists_and_belongs_to_user(
         self,
@@ -74,6 +77,23 @@ class SessionService:
 
         return session
 
+    async def get_session_with_history(
+        self,
+        id: UUID,
+        max_history_tokens: int,
+        assistant_id: UUID = None,
+        group_chat_id: UUID = None,
+    ):
+        """Get the session with the recent questions that fit in the history,
+        for asking a follow-up question."""
+        session = await self.session_repo.get_with_history(id=id, max_tokens=max_history_tokens)
+
+        self._check_exists_and_belongs_to_user(
+            session, assistant_id=assistant_id, group_chat_id=group_chat_id
+        )
+
+        return session
+
     async def get_sessions_by_assistant(
         self,
         assistant_id: UUID,
@@ -123,6 +143,7 @@ class SessionService:
         num_tokens_question: int,
         num_tokens_answer: int,
         session: SessionInDB,
+        num_tokens_cached: int = 0,
         completion_model: CompletionModel = None,
         info_blob_chunks: list[InfoBlobChunkInDBWithScore],
         files: list[File] = [],
@@ -130,6 +151,7 @@ class SessionService:
         logging_details: LoggingDetails = None,
         assistant_id: Optional[UUID] = None,
         web_search_results: list["WebSearchResult"] = [],
+        references_from_question_id: Optional[UUID] = None,
     ):
         completion_model_id = completion_model.id if completion_model else None
         question_add = QuestionAdd(
@@ -138,20 +160,29 @@ class SessionService:
             answer=answer,
             num_tokens_question=num_tokens_question,
             num_tokens_answer=num_tokens_answer,
+            num_tokens_cached=num_tokens_cached,
             completion_model_id=completion_model_id,
             session_id=session.id,
             logging_details=logging_details,
             assistant_id=assistant_id,
         )
 
-        return await self.question_repo.add(
+        question_in_db = await self.question_repo.add(
             question_add,
             info_blob_chunks=info_blob_chunks,
             files=files,
             generated_files=generated_files,
             web_search_results=web_search_results,
+            references_from_question_id=references_from_question_id,
         )
 
+        if self.history_compaction_service is not None:
+            await self.history_compaction_service.queue_if_needed(
+                session=session, question=question_in_db, completion_model=completion_model
+            )
+
+        return question_in_db
+
     async def leave_feedback(
         self,
         session_id: UUID,
@@ -3,7 +3,7 @@ from typing import Optional
 from uuid import UUID
 
 import sqlalchemy as sa
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
@@ -16,6 +16,7 @@ from intric.database.tables.questions_table import (
 )
 from intric.database.tables.sessions_table import Sessions
 from intric.database.tables.users_table import Users
+from intric.questions.question import Question
 from intric.sessions.session import (
     SessionAdd,
     SessionFeedback,
@@ -23,6 +24,14 @@ from intric.sessions.session import (
     SessionUpdate,
 )
 
+# The history is cut by the context builder, counting tokens. Here the cut is
+# made by the bytes of the questions and answers, and a token is rarely longer
+# than four bytes. With this many bytes per token of the whole context window,
+# the window loaded covers the history even when it is given all of the context.
+HISTORY_BYTES_PER_TOKEN = 4
+# The context builder keeps at least this many questions, whatever their size
+HISTORY_MIN_QUESTIONS = 4
+
 
 class SessionRepository:
     def __init__(self, session: AsyncSession):
@@ -87,6 +96,97 @@ class SessionRepository:
 
         return await self.delegate.filter_by(conditions={Sessions.user_id: user_id})
 
+    async def get_with_history(
+        self, id: UUID, max_tokens: Optional[int] = None
+    ) -> Optional[SessionInDB]:
+        """Get the session with only the most recent questions, up to what
+        `max_tokens` of history can fit, or with all of them if it is None.
+
+        Questions covered by the history summary are left out. Loads what the
+        context builder uses of each question, the text and the files, but not
+        the references, logging details or web search results.
+        """
+        stmt = (
+            sa.select(Sessions)
+            .where(Sessions.id == id)
+            .options(
+                noload(Sessions.questions),
+                selectinload(Sessions.assistant).selectinload(Assistants.user),
+            )
+        )
+        session = await self.session.scalar(stmt)
+        if session is None:
+            return None
+
+        stmt = (
+            sa.select(Questions)
+            .where(Questions.session_id == id)
+            .order_by(Questions.created_at)
+            .options(
+                selectinload(Questions.questions_files).selectinload(QuestionsFiles.file),
+                noload(Questions.info_blob_references),
+                noload(Questions.logging_details),
+                noload(Questions.assistant),
+                noload(Questions.completion_model),
+                noload(Questions.web_search_results),
+            )
+        )
+        if session.history_summarized_until is not None:
+            stmt = stmt.where(Questions.created_at > session.history_summarized_until)
+
+        if max_tokens is not None:
+            size = sa.func.octet_length(Questions.question) + sa.func.coalesce(
+                sa.func.octet_length(Questions.answer), 0
+            )
+            newest_first = dict(order_by=Questions.created_at.desc(), rows=(None, 0))
+            window = sa.select(
+                Questions.id,
+                sa.func.row_number().over(**newest_first).label("position"),
+                (sa.func.sum(size).over(**newest_first) - size).label("size_of_newer"),
+            ).where(Questions.session_id == id)
+            if session.history_summarized_until is not None:
+                window = window.where(Questions.created_at > session.history_summarized_until)
+            window = window.subquery()
+            stmt = stmt.join(window, window.c.id == Questions.id).where(
+                sa.or_(
+                    window.c.position <= HISTORY_MIN_QUESTIONS,
+                    window.c.size_of_newer <= max_tokens * HISTORY_BYTES_PER_TOKEN,
+                )
+            )
+
+        questions = await self.session.scalars(stmt)
+
+        session_in_db = SessionInDB.model_validate(session)
+        session_in_db.questions = [Question.model_validate(question) for question in questions]
+
+        return session_in_db
+
+    async def update_history_summary(
+        self, id: UUID, summary: str, summary_tokens: int, summarized_until: datetime
+    ) -> bool:
+        """Replace the history summary, unless it already covers more questions.
+
+        Returns whether the summary was replaced.
+        """
+        stmt = (
+            sa.update(Sessions)
+            .where(
+                Sessions.id == id,
+                sa.or_(
+                    Sessions.history_summarized_until.is_(None),
+                    Sessions.history_summarized_until < summarized_until,
+                ),
+            )
+            .values(
+                history_summary=summary,
+                history_summary_tokens=summary_tokens,
+                history_summarized_until=summarized_until,
+            )
+            .returning(Sessions.id)
+        )
+
+        return await self.session.scalar(stmt) is not None
+
     async def _get_total_count(
         self,
         assistant_id: UUID = None,
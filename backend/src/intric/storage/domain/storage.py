@@ -3,6 +3,7 @@
 # Licensed under the MIT License.
 
 
+from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
@@ -12,6 +13,11 @@ if TYPE_CHECKING:
     from intric.spaces.api.space_models import SpaceMember
 
 
+class StorageUsageScope(str, Enum):
+    USER = "user"
+    TENANT = "tenant"
+
+
 class StorageSpaceInfo:
     """
     Represents storage information for a specific space.
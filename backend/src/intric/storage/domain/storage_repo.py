@@ -32,12 +32,14 @@ class StorageInfoRepository:
 
     async def _get_spaces(self):
         tenant_id = self.user.tenant_id
-        # Aliases for subqueries
+        # Aliases for subqueries, scoped to the tenant so that
+        # the sizes of other tenants are never aggregated
         group_size_subquery = (
             sa.select(
                 CollectionsTable.space_id,
                 sa.func.sum(CollectionsTable.size).label("total_groups_size"),
             )
+            .where(CollectionsTable.tenant_id == tenant_id)
             .group_by(CollectionsTable.space_id)
             .alias("group_size_subquery")
         )
@@ -47,6 +49,7 @@ class StorageInfoRepository:
                 Websites.space_id,
                 sa.func.sum(Websites.size).label("total_website_size"),
             )
+            .where(Websites.tenant_id == tenant_id)
             .group_by(Websites.space_id)
             .alias("website_size_subquery")
         )
@@ -56,6 +59,7 @@ class StorageInfoRepository:
                 IntegrationKnowledge.space_id,
                 sa.func.sum(IntegrationKnowledge.size).label("total_integration_knowledge_size"),
             )
+            .where(IntegrationKnowledge.tenant_id == tenant_id)
             .group_by(IntegrationKnowledge.space_id)
             .alias("integration_knowledge_size_subquery")
         )
@@ -0,0 +1,68 @@
+# Copyright (c) 2025 Sundsvalls Kommun
+#
+# Licensed under the MIT License.
+
+import sqlalchemy as sa
+
+from intric.database.database import AsyncSession
+
+# Both statements run as a single statement each, so the deltas that are removed
+# are exactly the ones that are visible in the same snapshot as the info blobs.
+# Deltas from transactions that commit in the meantime are left for the next run.
+
+FOLD_DELTAS = sa.text(
+    """
+    WITH folded AS (
+        DELETE FROM storage_usage_deltas
+        RETURNING user_id, tenant_id, size_delta
+    )
+    INSERT INTO storage_usage_counters (scope, owner_id, size)
+    SELECT 'user', user_id, SUM(size_delta) FROM folded GROUP BY user_id
+    UNION ALL
+    SELECT 'tenant', tenant_id, SUM(size_delta) FROM folded GROUP BY tenant_id
+    ON CONFLICT (scope, owner_id) DO UPDATE
+    SET size = storage_usage_counters.size + EXCLUDED.size, updated_at = now()
+    """
+)
+
+RECONCILE_COUNTERS = sa.text(
+    """
+    WITH cleared AS (
+        DELETE FROM storage_usage_deltas
+    ),
+    totals AS (
+        SELECT 'user' AS scope, user_id AS owner_id, COALESCE(SUM(size), 0) AS size
+        FROM info_blobs GROUP BY user_id
+        UNION ALL
+        SELECT 'tenant', tenant_id, COALESCE(SUM(size), 0)
+        FROM info_blobs GROUP BY tenant_id
+    ),
+    emptied AS (
+        UPDATE storage_usage_counters AS counters
+        SET size = 0, updated_at = now()
+        WHERE counters.size <> 0 AND NOT EXISTS (
+            SELECT 1 FROM totals
+            WHERE totals.scope = counters.scope AND totals.owner_id = counters.owner_id
+        )
+    )
+    INSERT INTO storage_usage_counters (scope, owner_id, size)
+    SELECT scope, owner_id, size FROM totals
+    ON CONFLICT (scope, owner_id) DO UPDATE
+    SET size = EXCLUDED.size, updated_at = now()
+    """
+)
+
+
+class StorageUsageRepository:
+    """Maintenance of the user and tenant storage counters."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def fold_deltas(self):
+        """Move the pending deltas into the counters."""
+        await self.session.execute(FOLD_DELTAS)
+
+    async def reconcile(self):
+        """Recompute the counters from info_blobs, correcting any drift."""
+        await self.session.execute(RECONCILE_COUNTERS)
@@ -0,0 +1,28 @@
+# Copyright (c) 2025 Sundsvalls Kommun
+#
+# Licensed under the MIT License.
+
+from intric.main.container.container import Container
+from intric.worker.worker import Worker
+
+worker = Worker()
+
+
+@worker.cron_job(minute={0, 10, 20, 30, 40, 50})
+async def fold_storage_usage_deltas(container: Container):
+    storage_usage_repo = container.storage_usage_repo()
+
+    async with container.session().begin():
+        await storage_usage_repo.fold_deltas()
+
+    return True
+
+
+@worker.cron_job(hour=4, minute=5)  # Run daily, after the data retention cleanup
+async def reconcile_storage_usage(container: Container):
+    storage_usage_repo = container.storage_usage_repo()
+
+    async with container.session().begin():
+        await storage_usage_repo.reconcile()
+
+    return True
@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from intric.main.logging import get_logger
+from intric.token_usage.domain.token_usage_models import UsageSource
+from intric.token_usage.infrastructure.usage_rollup_repo import UsageRollupRepository
+
+logger = get_logger(__name__)
+
+# Rows are timestamped when inserted, so give transactions that were open
+# over midnight some time to commit before the day is considered closed
+CLOSE_DAY_DELAY = timedelta(hours=1)
+MAX_DAYS_PER_BATCH = 31
+
+
+class UsageRollupService:
+    """Keeps the daily usage rollups up to date, one batch of days at a time."""
+
+    def __init__(self, repo: UsageRollupRepository):
+        self.repo = repo
+
+    @staticmethod
+    def _last_closed_day(now: Optional[datetime] = None) -> date:
+        now = now or datetime.now(timezone.utc)
+        return (now - CLOSE_DAY_DELAY).date()
+
+    async def _refresh_stale_days(self, source: UsageSource) -> bool:
+        """
+        Roll up the days that rows were deleted from or changed in again.
+
+        Returns:
+            True if there are more stale days left
+        """
+        days = await self.repo.pop_stale_days(source, limit=MAX_DAYS_PER_BATCH)
+
+        for day in days:
+            await self.repo.rollup_days(source, from_day=day, to_day=day + timedelta(days=1))
+
+        if days:
+            logger.debug(f"Rolled up {len(days)} stale days of {source.value} usage")
+
+        return len(days) == MAX_DAYS_PER_BATCH
+
+    async def refresh_next_batch(self, now: Optional[datetime] = None) -> bool:
+        """
+        Roll up the next batch of closed days for every source.
+
+        Returns:
+            True if there are more closed days left to roll up
+        """
+        until = self._last_closed_day(now)
+        more_left = False
+
+        for source in UsageSource:
+            watermark = await self.repo.get_watermark(source)
+
+            if watermark is None:
+                watermark = await self.repo.get_first_day(source)
+
+                if watermark is None:
+                    # Nothing has ever been recorded for this source, so there
+                    # is nothing to roll up before the last closed day
+                    await self.repo.set_watermark(source, rolled_up_until=until)
+                    continue
+
+            elif await self._refresh_stale_days(source):
+                more_left = True
+
+            if watermark >= until:
+                continue
+
+            to_day = min(watermark + timedelta(days=MAX_DAYS_PER_BATCH), until)
+            await self.repo.rollup_days(source, from_day=watermark, to_day=to_day)
+            await self.repo.set_watermark(source, rolled_up_until=to_day)
+
+            logger.debug(f"Rolled up {source.value} usage from {watermark} to {to_day}")
+
+            if to_day < until:
+                more_left = True
+
+        return more_left
@@ -1,8 +1,14 @@
 from dataclasses import dataclass
 from datetime import datetime
+from enum import Enum
 from uuid import UUID
 
 
+class UsageSource(str, Enum):
+    QUESTIONS = "questions"
+    APP_RUNS = "app_runs"
+
+
 @dataclass
 class ModelTokenUsage:
     model_id: UUID
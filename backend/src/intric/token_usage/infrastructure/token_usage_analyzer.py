@@ -1,22 +1,35 @@
-from typing import TYPE_CHECKING
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import func, select, union_all
 
 from intric.database.tables.ai_models_table import CompletionModels
 from intric.database.tables.app_table import AppRuns
 from intric.database.tables.questions_table import Questions
+from intric.database.tables.usage_rollups_table import (
+    UsageDailyRollups,
+    UsageRollupWatermarks,
+)
 from intric.token_usage.domain.token_usage_models import (
     ModelTokenUsage,
     TokenUsageSummary,
+    UsageSource,
 )
+from intric.token_usage.infrastructure.usage_rollup_repo import start_of_day
 
 if TYPE_CHECKING:
-    from datetime import datetime
     from uuid import UUID
 
     from sqlalchemy.ext.asyncio import AsyncSession
 
 
+def _as_utc(value: datetime) -> datetime:
+    # Naive datetimes are stored and compared as UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 class TokenUsageAnalyzer:
     """
     Analyzer for token usage statistics across different models.
@@ -27,21 +40,50 @@ class TokenUsageAnalyzer:
     def __init__(self, session: "AsyncSession"):
         self.session = session
 
-    async def get_model_token_usage(
-        self, tenant_id: "UUID", start_date: "datetime", end_date: "datetime"
-    ) -> TokenUsageSummary:
-        """
-        Get token usage statistics aggregated by model.
+    async def _get_rolled_up_until(self) -> Optional[date]:
+        rows = await self.session.execute(
+            select(UsageRollupWatermarks.source, UsageRollupWatermarks.rolled_up_until)
+        )
+        watermarks = {source: rolled_up_until for source, rolled_up_until in rows}
 
-        Args:
-            tenant_id: The tenant ID to filter by
-            start_date: The start date for the analysis period
-            end_date: The end date for the analysis period
+        if any(source.value not in watermarks for source in UsageSource):
+            return None
 
-        Returns:
-            A TokenUsageSummary with token usage per model
-        """
+        return min(watermarks.values())
+
+    def _rollups_query(self, tenant_id: "UUID", from_day: date, to_day: date):
+        return (
+            select(
+                UsageDailyRollups.completion_model_id.label("model_id"),
+                CompletionModels.name.label("model_name"),
+                CompletionModels.nickname.label("model_nickname"),
+                CompletionModels.org.label("model_org"),
+                func.sum(UsageDailyRollups.input_tokens).label("input_tokens"),
+                func.sum(UsageDailyRollups.output_tokens).label("output_tokens"),
+                func.sum(UsageDailyRollups.request_count).label("request_count"),
+            )
+            .join(
+                CompletionModels,
+                UsageDailyRollups.completion_model_id == CompletionModels.id,
+            )
+            .where(UsageDailyRollups.tenant_id == tenant_id)
+            .where(UsageDailyRollups.day >= from_day)
+            .where(UsageDailyRollups.day < to_day)
+            .group_by(
+                UsageDailyRollups.completion_model_id,
+                CompletionModels.name,
+                CompletionModels.nickname,
+                CompletionModels.org,
+            )
+        )
 
+    def _source_queries(
+        self,
+        tenant_id: "UUID",
+        start: datetime,
+        end: datetime,
+        include_end: bool = False,
+    ):
         # Get token usage from questions (chat messages)
         questions_query = (
             select(
@@ -58,8 +100,10 @@ class TokenUsageAnalyzer:
                 Questions.completion_model_id == CompletionModels.id,
             )
             .where(Questions.tenant_id == tenant_id)
-            .where(Questions.created_at >= start_date)
-            .where(Questions.created_at <= end_date)
+            .where(Questions.created_at >= start)
+            .where(
+                Questions.created_at <= end if include_end else Questions.created_at < end
+            )
             .group_by(
                 Questions.completion_model_id,
                 CompletionModels.name,
@@ -88,8 +132,8 @@ class TokenUsageAnalyzer:
                 AppRuns.completion_model_id == CompletionModels.id,
             )
             .where(AppRuns.tenant_id == tenant_id)
-            .where(AppRuns.created_at >= start_date)
-            .where(AppRuns.created_at <= end_date)
+            .where(AppRuns.created_at >= start)
+            .where(AppRuns.created_at <= end if include_end else AppRuns.created_at < end)
             .group_by(
                 AppRuns.completion_model_id,
                 CompletionModels.name,
@@ -98,10 +142,63 @@ class TokenUsageAnalyzer:
             )
         )
 
-        # Combine the results from both queries using union_all
-        combined_usage_query = union_all(questions_query, app_runs_query).alias(
-            "combined_usage"
-        )
+        return [questions_query, app_runs_query]
+
+    async def get_model_token_usage(
+        self, tenant_id: "UUID", start_date: datetime, end_date: datetime
+    ) -> TokenUsageSummary:
+        """
+        Get token usage statistics aggregated by model.
+
+        Args:
+            tenant_id: The tenant ID to filter by
+            start_date: The start date for the analysis period
+            end_date: The end date for the analysis period
+
+        Returns:
+            A TokenUsageSummary with token usage per model
+        """
+
+        start = _as_utc(start_date)
+        end = _as_utc(end_date)
+        queries = []
+
+        # Whole days that have been rolled up are read from the rollups,
+        # the partial days at the edges of the period are read from the source tables
+        rolled_up_until = await self._get_rolled_up_until()
+        first_full_day = start.date()
+        if start > start_of_day(first_full_day):
+            first_full_day += timedelta(days=1)
+        last_full_day = min(end.date(), rolled_up_until) if rolled_up_until else None
+
+        if last_full_day is not None and first_full_day < last_full_day:
+            queries.append(
+                self._rollups_query(
+                    tenant_id=tenant_id, from_day=first_full_day, to_day=last_full_day
+                )
+            )
+            queries.extend(
+                self._source_queries(
+                    tenant_id=tenant_id, start=start, end=start_of_day(first_full_day)
+                )
+            )
+            queries.extend(
+                self._source_queries(
+                    tenant_id=tenant_id,
+                    start=start_of_day(last_full_day),
+                    end=end,
+                    include_end=True,
+                )
+            )
+        else:
+            queries.extend(
+                self._source_queries(
+                    tenant_id=tenant_id, start=start, end=end, include_end=True
+                )
+            )
+
+        # Combine the results from all queries using union_all
+        combined_usage_query = union_all(*queries).alias("combined_usage")
 
         # Sum up the input/output tokens and request counts for each model
         final_query = select(
@@ -0,0 +1,160 @@
+from datetime import date, datetime, time, timezone
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import delete, func, insert, literal, literal_column, null, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from intric.database.tables.app_table import AppRuns
+from intric.database.tables.questions_table import Questions
+from intric.database.tables.usage_rollups_table import (
+    UsageDailyRollups,
+    UsageRollupStaleDays,
+    UsageRollupWatermarks,
+)
+from intric.token_usage.domain.token_usage_models import UsageSource
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def start_of_day(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _utc_day(column):
+    # Inlined so that the grouping expression matches the selected one
+    return func.date(func.timezone(literal_column("'UTC'"), column))
+
+
+class UsageRollupRepository:
+    """
+    Maintains the daily usage rollups. Rollups only ever contain whole days,
+    everything from the watermark and onwards is read from the source tables.
+    Days that rows are deleted from or changed in after they were rolled up are
+    marked stale by triggers, and rolled up again.
+    """
+
+    def __init__(self, session: "AsyncSession"):
+        self.session = session
+
+    async def get_watermark(self, source: UsageSource) -> Optional[date]:
+        stmt = select(UsageRollupWatermarks.rolled_up_until).where(
+            UsageRollupWatermarks.source == source.value
+        )
+        return await self.session.scalar(stmt)
+
+    async def set_watermark(self, source: UsageSource, rolled_up_until: date):
+        stmt = (
+            pg_insert(UsageRollupWatermarks)
+            .values(source=source.value, rolled_up_until=rolled_up_until)
+            .on_conflict_do_update(
+                index_elements=[UsageRollupWatermarks.source],
+                set_=dict(rolled_up_until=rolled_up_until, updated_at=func.now()),
+            )
+        )
+        await self.session.execute(stmt)
+
+    async def pop_stale_days(self, source: UsageSource, limit: int) -> list[date]:
+        """Remove and return the oldest days whose rollups are stale."""
+        oldest = (
+            select(UsageRollupStaleDays.day)
+            .where(UsageRollupStaleDays.source == source.value)
+            .order_by(UsageRollupStaleDays.day)
+            .limit(limit)
+        )
+        stmt = (
+            delete(UsageRollupStaleDays)
+            .where(UsageRollupStaleDays.source == source.value)
+            .where(UsageRollupStaleDays.day.in_(oldest.scalar_subquery()))
+            .returning(UsageRollupStaleDays.day)
+        )
+
+        return sorted(await self.session.scalars(stmt))
+
+    async def get_first_day(self, source: UsageSource) -> Optional[date]:
+        table = Questions if source == UsageSource.QUESTIONS else AppRuns
+        return await self.session.scalar(select(_utc_day(func.min(table.created_at))))
+
+    def _questions_rollup_query(self, from_day: date, to_day: date):
+        day = _utc_day(Questions.created_at)
+
+        return (
+            select(
+                literal(UsageSource.QUESTIONS.value),
+                day,
+                Questions.tenant_id,
+                Questions.completion_model_id,
+                Questions.assistant_id,
+                null(),
+                func.sum(Questions.num_tokens_question),
+                func.sum(Questions.num_tokens_answer),
+                func.count(Questions.id),
+            )
+            .where(Questions.created_at >= start_of_day(from_day))
+            .where(Questions.created_at < start_of_day(to_day))
+            .group_by(
+                day,
+                Questions.tenant_id,
+                Questions.completion_model_id,
+                Questions.assistant_id,
+            )
+        )
+
+    def _app_runs_rollup_query(self, from_day: date, to_day: date):
+        day = _utc_day(AppRuns.created_at)
+
+        return (
+            select(
+                literal(UsageSource.APP_RUNS.value),
+                day,
+                AppRuns.tenant_id,
+                AppRuns.completion_model_id,
+                null(),
+                AppRuns.app_id,
+                func.sum(func.coalesce(AppRuns.num_tokens_input, 0)),
+                func.sum(func.coalesce(AppRuns.num_tokens_output, 0)),
+                func.count(AppRuns.id),
+            )
+            .where(AppRuns.created_at >= start_of_day(from_day))
+            .where(AppRuns.created_at < start_of_day(to_day))
+            .group_by(
+                day,
+                AppRuns.tenant_id,
+                AppRuns.completion_model_id,
+                AppRuns.app_id,
+            )
+        )
+
+    async def rollup_days(self, source: UsageSource, from_day: date, to_day: date):
+        """
+        (Re)compute the rollups for the days in [from_day, to_day).
+        Existing rollups for those days are replaced, so this is safe to repeat.
+        """
+        delete_stmt = (
+            delete(UsageDailyRollups)
+            .where(UsageDailyRollups.source == source.value)
+            .where(UsageDailyRollups.day >= from_day)
+            .where(UsageDailyRollups.day < to_day)
+        )
+        await self.session.execute(delete_stmt)
+
+        if source == UsageSource.QUESTIONS:
+            rollup_query = self._questions_rollup_query(from_day, to_day)
+        else:
+            rollup_query = self._app_runs_rollup_query(from_day, to_day)
+
+        insert_stmt = insert(UsageDailyRollups).from_select(
+            [
+                UsageDailyRollups.source,
+                UsageDailyRollups.day,
+                UsageDailyRollups.tenant_id,
+                UsageDailyRollups.completion_model_id,
+                UsageDailyRollups.assistant_id,
+                UsageDailyRollups.app_id,
+                UsageDailyRollups.input_tokens,
+                UsageDailyRollups.output_tokens,
+                UsageDailyRollups.request_count,
+            ],
+            rollup_query,
+        )
+        await self.session.execute(insert_stmt)
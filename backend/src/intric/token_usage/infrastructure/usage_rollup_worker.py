@@ -0,0 +1,17 @@
+from intric.main.container.container import Container
+from intric.worker.worker import Worker
+
+worker = Worker()
+
+
+@worker.cron_job(minute={15})  # Run hourly
+async def refresh_usage_rollups(container: Container):
+    usage_rollup_service = container.usage_rollup_service()
+
+    # Commit after every batch so that a large backfill is resumable
+    more_left = True
+    while more_left:
+        async with container.session().begin():
+            more_left = await usage_rollup_service.refresh_next_batch()
+
+    return True
@@ -1,5 +1,6 @@
 # MIT License
 
+import asyncio
 from pathlib import Path
 
 import openai
@@ -11,7 +12,8 @@ from tenacity import (
     wait_random_exponential,
 )
 
-from intric.files.audio import AudioFile
+from intric.files import audio
+from intric.files.audio import AudioSegment
 from intric.main.config import SETTINGS
 from intric.main.exceptions import BadRequestException, OpenAIException
 from intric.main.logging import get_logger
@@ -19,39 +21,98 @@ from intric.transcription_models.domain import TranscriptionModel
 
 logger = get_logger(__name__)
 
+# How far into the texts to look for the words spoken in the overlap
+OVERLAP_MAX_WORDS = 40
+# Words at the edges of the overlap may be cut, and transcribed differently
+OVERLAP_EDGE_WORDS = 3
+
+
+def _normalize(word: str):
+    return "".join(c for c in word.lower() if c.isalnum())
+
+
+def remove_overlap(previous: str, current: str) -> str:
+    """Remove the start of `current` that repeats the end of `previous`.
+
+    Looks for the longest run of words that both the end of `previous` and
+    the start of `current` have, and drops `current` up to the end of it.
+    """
+    previous_words = [_normalize(word) for word in previous.split()[-OVERLAP_MAX_WORDS:]]
+    current_words = current.split()
+    current_head = [_normalize(word) for word in current_words[:OVERLAP_MAX_WORDS]]
+
+    # (length of the run, where it ends in `current`)
+    best = (0, 0)
+    for start_current in range(min(OVERLAP_EDGE_WORDS + 1, len(current_head))):
+        for start_previous in range(len(previous_words)):
+            length = 0
+            while (
+                start_previous + length < len(previous_words)
+                and start_current + length < len(current_head)
+                and previous_words[start_previous + length] == current_head[start_current + length]
+            ):
+                length += 1
+
+            ends_previous = start_previous + length >= len(previous_words) - OVERLAP_EDGE_WORDS
+            if ends_previous and length > best[0]:
+                best = (length, start_current + length)
+
+    # A single word is too likely to be repeated by chance
+    length, end = best
+    if length < 2:
+        return current
+
+    return " ".join(current_words[end:])
+
 
 class OpenAISTTModelAdapter:
     def __init__(self, model: TranscriptionModel):
         self.model = model
         self.client = AsyncOpenAI(api_key=SETTINGS.openai_api_key, base_url=model.base_url)
 
-    async def get_text_from_file(self, audio_file: AudioFile):
+    async def get_text_from_file(self, filepath: Path):
         text = ""
         five_minutes = 60 * 5
-        chunk_index = 0
-        total_duration_seconds = int(audio_file.info.duration)
-
-        async with audio_file.asplit_file(seconds=five_minutes) as files:
-            total_chunks = len(files)
-
-            for i, path in enumerate(files):
-                block_text = await self._get_text_from_file(path)
-                start_time = chunk_index * five_minutes
-
-                # For the last chunk, calculate the correct end time based on total duration
-                if i == total_chunks - 1:
-                    end_time = total_duration_seconds
-                else:
-                    end_time = (chunk_index + 1) * five_minutes
-
-                start_time_formatted = f"{start_time // 60}:{start_time % 60:02d}"
-                end_time_formatted = f"{end_time // 60}:{end_time % 60:02d}"
-
-                # Add markdown formatting with timestamp
-                if chunk_index > 0:
-                    text += "\n\n"
-                text += f"### {start_time_formatted} - {end_time_formatted}\n\n{block_text}"
-                chunk_index += 1
+        semaphore = asyncio.Semaphore(SETTINGS.transcription_max_concurrency)
+
+        async def _transcribe(segment: AudioSegment):
+            async with semaphore:
+                return await self._get_text_from_file(segment.path)
+
+        # Start transcribing each segment as soon as it is transcoded
+        segments: list[AudioSegment] = []
+        tasks: list[asyncio.Task] = []
+        async with audio.transcode(
+            filepath,
+            seconds=five_minutes,
+            overlap_seconds=SETTINGS.transcription_segment_overlap_seconds,
+        ) as transcoded:
+            try:
+                async for segment in transcoded:
+                    segments.append(segment)
+                    tasks.append(asyncio.create_task(_transcribe(segment)))
+
+                block_texts = await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        for chunk_index, (segment, block_text) in enumerate(zip(segments, block_texts)):
+            start_time = int(segment.start)
+            end_time = int(segment.end)
+
+            start_time_formatted = f"{start_time // 60}:{start_time % 60:02d}"
+            end_time_formatted = f"{end_time // 60}:{end_time % 60:02d}"
+
+            # Every chunk but the first starts with the end of the chunk before it
+            if chunk_index > 0:
+                block_text = remove_overlap(block_texts[chunk_index - 1], block_text)
+
+            # Add markdown formatting with timestamp
+            if chunk_index > 0:
+                text += "\n\n"
+            text += f"### {start_time_formatted} - {end_time_formatted}\n\n{block_text}"
 
         return text
 
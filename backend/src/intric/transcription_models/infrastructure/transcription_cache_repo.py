@@ -0,0 +1,52 @@
+from typing import TYPE_CHECKING, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from intric.database.tables.transcription_cache_table import TranscriptionCache
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from intric.database.database import AsyncSession
+
+
+class TranscriptionCacheRepository:
+    """Transcriptions by the checksum of the audio and the model that made them."""
+
+    def __init__(self, session: "AsyncSession"):
+        self.session = session
+
+    async def get(
+        self, *, tenant_id: "UUID", checksum: str, transcription_model_id: "UUID"
+    ) -> Optional[str]:
+        stmt = sa.select(TranscriptionCache.text).where(
+            TranscriptionCache.tenant_id == tenant_id,
+            TranscriptionCache.checksum == checksum,
+            TranscriptionCache.transcription_model_id == transcription_model_id,
+        )
+
+        return await self.session.scalar(stmt)
+
+    async def add(
+        self,
+        *,
+        tenant_id: "UUID",
+        checksum: str,
+        transcription_model_id: "UUID",
+        text: str,
+    ):
+        # The same audio may be transcribed by two requests at once,
+        # both transcriptions are equally good
+        stmt = (
+            pg_insert(TranscriptionCache)
+            .values(
+                tenant_id=tenant_id,
+                checksum=checksum,
+                transcription_model_id=transcription_model_id,
+                text=text,
+            )
+            .on_conflict_do_nothing()
+        )
+
+        await self.session.execute(stmt)
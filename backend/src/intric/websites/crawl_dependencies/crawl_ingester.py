@@ -0,0 +1,177 @@
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+from uuid import UUID
+
+from intric.crawler.crawler import CrawlStream
+from intric.crawler.parse_html import CrawledPage, KnownPage, UnchangedPage
+from intric.database.database import AsyncSession
+from intric.info_blobs.content_cache import hash_file, hash_text
+from intric.info_blobs.info_blob_repo import InfoBlobRepository
+from intric.info_blobs.text_processor import TextProcessor
+from intric.main.logging import get_logger
+
+if TYPE_CHECKING:
+    from intric.embedding_models.domain.embedding_model import EmbeddingModel
+
+logger = get_logger(__name__)
+
+PROGRESS_INTERVAL = 25
+
+
+@dataclass
+class CrawlIngestResult:
+    num_pages: int = 0
+    num_files: int = 0
+    num_failed_pages: int = 0
+    num_failed_files: int = 0
+    num_unchanged: int = 0
+    titles: list[str] = field(default_factory=list)
+    unchanged_titles: list[str] = field(default_factory=list)
+
+    def as_progress(self) -> dict:
+        return {
+            "pages_crawled": self.num_pages,
+            "files_downloaded": self.num_files,
+            "pages_failed": self.num_failed_pages,
+            "files_failed": self.num_failed_files,
+        }
+
+
+class CrawlIngester:
+    """Ingests the pages and files of a crawl while the spider is still running.
+
+    Extraction and embedding run concurrently in a pool of workers. The database
+    writes are serialized, since all workers share the session of the task.
+
+    Pages and files whose content hash matches `known_pages` are kept as they
+    are, instead of being extracted and embedded again.
+    """
+
+    def __init__(
+        self,
+        *,
+        text_processor: TextProcessor,
+        info_blob_repo: InfoBlobRepository,
+        session: AsyncSession,
+        website_id: UUID,
+        embedding_model: "EmbeddingModel",
+        num_workers: int,
+        known_pages: Optional[dict[str, KnownPage]] = None,
+        on_progress: Optional[Callable[[dict], Awaitable[None]]] = None,
+        progress_interval: int = PROGRESS_INTERVAL,
+    ):
+        self.text_processor = text_processor
+        self.info_blob_repo = info_blob_repo
+        self.known_pages = known_pages or {}
+        self.session = session
+        self.website_id = website_id
+        self.embedding_model = embedding_model
+        self.num_workers = num_workers
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+
+        self.result = CrawlIngestResult()
+        self._db_lock = asyncio.Lock()
+        self._num_processed = 0
+
+    async def ingest(self, crawl_stream: CrawlStream) -> CrawlIngestResult:
+        await asyncio.gather(*[self._work(crawl_stream) for _ in range(self.num_workers)])
+
+        return self.result
+
+    async def _work(self, crawl_stream: CrawlStream):
+        while (item := await crawl_stream.get()) is not None:
+            if isinstance(item, UnchangedPage):
+                self._keep_unchanged_page(item)
+            elif isinstance(item, CrawledPage):
+                await self._ingest_page(item)
+            else:
+                await self._ingest_file(item)
+
+            await self._report_progress()
+
+    async def _store(self, prepared, **kwargs):
+        async with self._db_lock:
+            async with self.session.begin_nested():
+                await self.text_processor.store(prepared, website_id=self.website_id, **kwargs)
+
+    def _is_unchanged(self, title: str, content_hash: str) -> bool:
+        known_page = self.known_pages.get(title)
+        return known_page is not None and known_page.content_hash == content_hash
+
+    def _keep_unchanged_page(self, page: UnchangedPage):
+        self.result.num_pages += 1
+        self.result.num_unchanged += 1
+        self.result.titles.append(page.url)
+        self.result.unchanged_titles.append(page.url)
+
+    async def _refresh_validators(self, page: CrawledPage):
+        known_page = self.known_pages[page.url]
+        if (known_page.etag, known_page.last_modified) == (page.etag, page.last_modified):
+            return
+
+        async with self._db_lock, self.session.begin_nested():
+            await self.info_blob_repo.update_crawl_metadata(
+                title=page.url,
+                website_id=self.website_id,
+                etag=page.etag,
+                last_modified=page.last_modified,
+            )
+
+    async def _ingest_page(self, page: CrawledPage):
+        self.result.num_pages += 1
+        try:
+            content_hash = hash_text(page.content)
+
+            if self._is_unchanged(page.url, content_hash):
+                self.result.num_unchanged += 1
+                self.result.unchanged_titles.append(page.url)
+                await self._refresh_validators(page)
+            else:
+                prepared = await self.text_processor.prepare_text(
+                    text=page.content, embedding_model=self.embedding_model
+                )
+                await self._store(
+                    prepared,
+                    title=page.url,
+                    url=page.url,
+                    content_hash=content_hash,
+                    etag=page.etag,
+                    last_modified=page.last_modified,
+                )
+
+            self.result.titles.append(page.url)
+
+        except Exception:
+            logger.exception("Exception while uploading page")
+            self.result.num_failed_pages += 1
+
+    async def _ingest_file(self, file: Path):
+        self.result.num_files += 1
+        try:
+            content_hash = await asyncio.to_thread(hash_file, file)
+
+            if self._is_unchanged(file.stem, content_hash):
+                self.result.num_unchanged += 1
+            else:
+                prepared = await self.text_processor.prepare_file(
+                    filepath=file, embedding_model=self.embedding_model
+                )
+                await self._store(prepared, title=file.stem, content_hash=content_hash)
+
+            self.result.titles.append(file.stem)
+
+        except Exception:
+            logger.exception("Exception while uploading file")
+            self.result.num_failed_files += 1
+
+    async def _report_progress(self):
+        self._num_processed += 1
+
+        if self.on_progress is not None and self._num_processed % self.progress_interval == 0:
+            try:
+                await self.on_progress(self.result.as_progress())
+            except Exception:
+                logger.exception("Exception while reporting crawl progress")
@@ -2,7 +2,14 @@ from intric.apps.app_runs.api.app_run_worker import worker as app_worker
 from intric.data_retention.infrastructure.data_retention_worker import (
     worker as data_retention_worker,
 )
+from intric.files.file_blob_worker import worker as file_blob_worker
 from intric.integration.tasks.integration_task import worker as integration_worker
+from intric.storage.infrastructure.storage_usage_worker import (
+    worker as storage_usage_worker,
+)
+from intric.token_usage.infrastructure.usage_rollup_worker import (
+    worker as usage_rollup_worker,
+)
 from intric.worker.routes import worker as sub_worker
 from intric.worker.worker import Worker
 
@@ -11,6 +18,9 @@ worker.include_subworker(sub_worker)
 worker.include_subworker(app_worker)
 worker.include_subworker(integration_worker)
 worker.include_subworker(data_retention_worker)
+worker.include_subworker(usage_rollup_worker)
+worker.include_subworker(storage_usage_worker)
+worker.include_subworker(file_blob_worker)
 
 
 class WorkerSettings:
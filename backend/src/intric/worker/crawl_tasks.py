@@ -1,9 +1,12 @@
+from datetime import datetime, timezone
 from uuid import UUID
 
 from dependency_injector import providers
 
+from intric.main.config import SETTINGS
 from intric.main.container.container import Container
 from intric.main.logging import get_logger
+from intric.websites.crawl_dependencies.crawl_ingester import CrawlIngester
 from intric.websites.crawl_dependencies.crawl_models import (
     CrawlTask,
 )
@@ -50,82 +53,65 @@ async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
 
         # Do task
         logger.info(f"Running crawl with params: {params}")
-        num_pages = 0
-        num_files = 0
-        num_failed_pages = 0
-        num_failed_files = 0
-        num_deleted_blobs = 0
 
         # Unfortunately, in this type of background task we still need to care about the session atm
         session = container.session()
 
-        existing_titles = await info_blob_repo.get_titles_of_website(params.website_id)
-
-        crawled_titles = []
+        known_pages = await info_blob_repo.get_known_pages_of_website(params.website_id)
+        crawled_at = datetime.now(timezone.utc)
 
-        async with crawler.crawl(
+        async with uploader.bulk_ingest(), crawler.stream(
             url=params.url,
             download_files=params.download_files,
             crawl_type=params.crawl_type,
-        ) as crawl:
-            for page in crawl.pages:
-                num_pages += 1
-                try:
-                    title = page.url
-                    async with session.begin_nested():
-                        await uploader.process_text(
-                            text=page.content,
-                            title=title,
-                            website_id=params.website_id,
-                            url=page.url,
-                            embedding_model=website.embedding_model,
-                        )
-                    crawled_titles.append(title)
-
-                except Exception:
-                    logger.exception("Exception while uploading page")
-                    num_failed_pages += 1
-
-            for file in crawl.files:
-                num_files += 1
-                try:
-                    filename = file.stem
-                    async with session.begin_nested():
-                        await uploader.process_file(
-                            filepath=file,
-                            filename=filename,
-                            website_id=params.website_id,
-                            embedding_model=website.embedding_model,
-                        )
-
-                    crawled_titles.append(filename)
-                except Exception:
-                    logger.exception("Exception while uploading file")
-                    num_failed_files += 1
-
-            for title in existing_titles:
-                if title not in crawled_titles:
-                    num_deleted_blobs += 1
-                    await info_blob_repo.delete_by_title_and_website(
-                        title=title, website_id=params.website_id
-                    )
-
-            await update_website_size_service.update_website_size(website_id=website.id)
-
-            logger.info(
-                f"Crawler finished. {num_pages} pages, {num_failed_pages} failed. "
-                f"{num_files} files, {num_failed_files} failed. "
-                f"{num_deleted_blobs} blobs deleted."
+            known_pages=known_pages,
+        ) as crawl_stream:
+            ingester = CrawlIngester(
+                text_processor=uploader,
+                info_blob_repo=info_blob_repo,
+                session=session,
+                website_id=params.website_id,
+                embedding_model=website.embedding_model,
+                num_workers=SETTINGS.crawl_ingest_workers,
+                known_pages=known_pages,
+                on_progress=task_manager.report_progress,
             )
-
-            crawl_run = await crawl_run_repo.one(params.run_id)
-            crawl_run.update(
-                pages_crawled=num_pages,
-                files_downloaded=num_files,
-                pages_failed=num_failed_pages,
-                files_failed=num_failed_files,
+            result = await ingester.ingest(crawl_stream)
+
+        # Pages whose sitemap lastmod is not newer than this are skipped next time
+        if result.unchanged_titles:
+            await info_blob_repo.set_crawled_at(
+                website_id=params.website_id,
+                titles=result.unchanged_titles,
+                crawled_at=crawled_at,
             )
-            await crawl_run_repo.update(crawl_run)
+
+        num_deleted_blobs = 0
+        crawled_titles = set(result.titles)
+        for title in known_pages:
+            if title not in crawled_titles:
+                num_deleted_blobs += 1
+                await info_blob_repo.delete_by_title_and_website(
+                    title=title, website_id=params.website_id
+                )
+
+        await update_website_size_service.update_website_size(website_id=website.id)
+
+        logger.info(
+            f"Crawler finished. {result.num_pages} pages, {result.num_failed_pages} failed. "
+            f"{result.num_files} files, {result.num_failed_files} failed. "
+            f"{result.num_unchanged} unchanged. "
+            f"{num_deleted_blobs} blobs deleted."
+        )
+
+        crawl_run = await crawl_run_repo.one(params.run_id)
+        crawl_run.update(
+            pages_crawled=result.num_pages,
+            files_downloaded=result.num_files,
+            pages_failed=result.num_failed_pages,
+            files_failed=result.num_failed_files,
+        )
+        await crawl_run_repo.update(crawl_run)
 
         task_manager.result_location = f"/api/v1/websites/{params.website_id}/info-blobs/"
 
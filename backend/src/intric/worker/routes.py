@@ -1,4 +1,4 @@
-from intric.jobs.task_models import Transcription, UploadInfoBlob
+from intric.jobs.task_models import CompactHistoryTask, Transcription, UploadInfoBlob
 from intric.main.container.container import Container
 from intric.websites.crawl_dependencies.crawl_models import CrawlTask
 from intric.worker.crawl_tasks import crawl_task, queue_website_crawls
@@ -23,6 +23,14 @@ async def crawl(job_id: str, params: CrawlTask, container: Container):
     return await crawl_task(job_id=job_id, params=params, container=container)
 
 
+@worker.function()
+async def compact_history(job_id: str, params: CompactHistoryTask, container: Container):
+    history_compaction_service = container.history_compaction_service()
+    return await history_compaction_service.compact(
+        session_id=params.session_id, completion_model_id=params.completion_model_id
+    )
+
+
 @worker.cron_job(weekday="fri", hour=23, minute=0)
 async def crawl_all_websites(container: Container):
     return await queue_website_crawls(container=container)
@@ -96,6 +96,12 @@ class TaskManager:
     def successful(self):
         return self.success
 
+    async def report_progress(self, progress: dict):
+        """Publish intermediate results of a running job."""
+        self.additional_data = progress
+        logger.info(f"Progress for {self.job_id}: {progress}")
+        await self._publish_status(status=Status.IN_PROGRESS)
+
     async def set_status(self, status: Status):
         self._log_status(status)
         await self._publish_status(status=status)
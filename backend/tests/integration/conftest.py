@@ -0,0 +1,85 @@
+"""
+Fixtures for tests that need a real PostgreSQL database.
+
+The tests run against `<POSTGRES_DB>_test`, the same database that the alembic
+migrations target when `TESTING` is set. It is created and migrated once per
+test run. The `session` of a test runs in a transaction that is rolled back
+afterwards, tests that commit from several sessions use `engine` directly.
+The tests are skipped when the database server can not be reached.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import asyncpg
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from intric.main.config import get_settings
+
+BACKEND_DIR = Path(__file__).parents[2]
+
+
+async def _create_database(settings, name: str):
+    connection = await asyncpg.connect(
+        host=settings.postgres_host,
+        port=settings.postgres_port,
+        user=settings.postgres_user,
+        password=settings.postgres_password,
+        database=settings.postgres_db,
+    )
+    try:
+        exists = await connection.fetchval(
+            "SELECT 1 FROM pg_database WHERE datname = $1", name
+        )
+        if not exists:
+            await connection.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await connection.close()
+
+
+def _migrate():
+    # In a separate process, as the alembic env reconfigures the logging
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "TESTING": "1"},
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture(scope="session")
+def database_url():
+    settings = get_settings()
+
+    try:
+        asyncio.run(_create_database(settings, f"{settings.postgres_db}_test"))
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"PostgreSQL is not available: {e}")
+
+    _migrate()
+
+    return f"{settings.database_url}_test"
+
+
+@pytest.fixture
+async def engine(database_url):
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(engine):
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        async with AsyncSession(
+            bind=connection, join_transaction_mode="create_savepoint"
+        ) as session:
+            yield session
+        await transaction.rollback()
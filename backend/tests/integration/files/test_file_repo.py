@@ -0,0 +1,153 @@
+from uuid import uuid4
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from intric.database.tables.files_table import OrphanedBlobs
+from intric.database.tables.tenant_table import Tenants
+from intric.database.tables.users_table import Users
+from intric.files.blob_store import LocalBlobStore
+from intric.files.file_models import FileCreate, FileType
+from intric.files.file_repo import FileRepository
+from intric.main.exceptions import NotFoundException
+
+
+async def _add_owner(session) -> tuple:
+    tenant_id = await session.scalar(
+        sa.insert(Tenants)
+        .values(name=f"tenant-{uuid4()}", quota_limit=10_000, state="active")
+        .returning(Tenants.id)
+    )
+    user_id = await session.scalar(
+        sa.insert(Users)
+        .values(
+            username=f"user-{uuid4()}",
+            email=f"{uuid4()}@example.com",
+            tenant_id=tenant_id,
+            state="active",
+            used_tokens=0,
+        )
+        .returning(Users.id)
+    )
+    return tenant_id, user_id
+
+
+def _file_create(tenant_id, user_id, checksum="checksum"):
+    return FileCreate(
+        name="image.png",
+        checksum=checksum,
+        size=3,
+        file_type=FileType.IMAGE,
+        blob=b"abc",
+        user_id=user_id,
+        tenant_id=tenant_id,
+    )
+
+
+@pytest.fixture
+def blob_store(tmp_path):
+    return LocalBlobStore(tmp_path)
+
+
+@pytest.fixture
+async def owner(session):
+    return await _add_owner(session)
+
+
+@pytest.fixture
+def repo(session, blob_store):
+    return FileRepository(session=session, blob_store=blob_store)
+
+
+async def _exists(blob_store, key):
+    try:
+        await blob_store.get(key)
+    except NotFoundException:
+        return False
+    return True
+
+
+async def _queued(session, key):
+    return await session.scalar(
+        sa.select(sa.func.count())
+        .select_from(OrphanedBlobs)
+        .where(OrphanedBlobs.key == key)
+    )
+
+
+async def test_blobs_of_deleted_files_are_deleted(repo, blob_store, owner):
+    file = await repo.add(_file_create(*owner))
+
+    await repo.delete(file.id)
+
+    assert await _exists(blob_store, file.blob_key)
+    assert await repo.delete_orphaned_blobs(batch_size=10) == 1
+    assert not await _exists(blob_store, file.blob_key)
+    assert await _queued(repo.session, file.blob_key) == 0
+
+
+async def test_blobs_that_are_still_referenced_are_kept(repo, blob_store, owner):
+    file = await repo.add(_file_create(*owner))
+    other_file = await repo.add(_file_create(*owner))
+
+    await repo.delete(file.id)
+
+    assert await repo.delete_orphaned_blobs(batch_size=10) == 1
+    assert other_file.blob_key == file.blob_key
+    assert await _exists(blob_store, file.blob_key)
+
+
+async def test_adding_a_file_takes_its_blob_off_the_queue(repo, blob_store, owner):
+    file = await repo.add(_file_create(*owner))
+    await repo.delete(file.id)
+
+    await repo.add(_file_create(*owner))
+
+    assert await _queued(repo.session, file.blob_key) == 0
+    assert await repo.delete_orphaned_blobs(batch_size=10) == 0
+    assert await _exists(blob_store, file.blob_key)
+
+
+async def test_blobs_of_files_that_are_being_added_are_kept(engine, blob_store):
+    async with AsyncSession(engine) as session:
+        tenant_id, user_id = await _add_owner(session)
+        await session.commit()
+
+    try:
+        async with AsyncSession(engine) as session:
+            repo = FileRepository(session=session, blob_store=blob_store)
+            file = await repo.add(_file_create(tenant_id, user_id))
+            await session.commit()
+
+        async with AsyncSession(engine) as adding, AsyncSession(engine) as deleting:
+            adding_repo = FileRepository(session=adding, blob_store=blob_store)
+            await adding_repo.add(_file_create(tenant_id, user_id))
+
+            # Committed while the other file with the same content is not
+            await FileRepository(session=deleting, blob_store=blob_store).delete(file.id)
+            await deleting.commit()
+
+            async with AsyncSession(engine) as session:
+                repo = FileRepository(session=session, blob_store=blob_store)
+                assert await repo.delete_orphaned_blobs(batch_size=10) == 0
+                await session.commit()
+
+            await adding.commit()
+
+        async with AsyncSession(engine) as session:
+            repo = FileRepository(session=session, blob_store=blob_store)
+            assert await repo.delete_orphaned_blobs(batch_size=10) == 1
+            await session.commit()
+
+        assert await _exists(blob_store, file.blob_key)
+
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.execute(sa.delete(Tenants).where(Tenants.id == tenant_id))
+            await session.execute(
+                sa.delete(OrphanedBlobs).where(
+                    OrphanedBlobs.key.startswith(f"{tenant_id}/")
+                )
+            )
+            await session.commit()
@@ -0,0 +1,159 @@
+from uuid import uuid4
+
+import pytest
+import sqlalchemy as sa
+
+from intric.database.tables.info_blobs_table import InfoBlobs
+from intric.database.tables.storage_usage_table import (
+    StorageUsageCounters,
+    StorageUsageDeltas,
+)
+from intric.database.tables.tenant_table import Tenants
+from intric.database.tables.users_table import Users
+from intric.info_blobs.info_blob_repo import InfoBlobRepository
+from intric.storage.domain.storage_usage_repo import StorageUsageRepository
+
+
+async def _add_user(session, tenant_id):
+    return await session.scalar(
+        sa.insert(Users)
+        .values(
+            username=f"user-{uuid4()}",
+            email=f"{uuid4()}@example.com",
+            tenant_id=tenant_id,
+            state="active",
+            used_tokens=0,
+        )
+        .returning(Users.id)
+    )
+
+
+@pytest.fixture
+async def tenant_id(session):
+    return await session.scalar(
+        sa.insert(Tenants)
+        .values(name=f"tenant-{uuid4()}", quota_limit=10_000, state="active")
+        .returning(Tenants.id)
+    )
+
+
+@pytest.fixture
+async def user_id(session, tenant_id):
+    return await _add_user(session, tenant_id)
+
+
+@pytest.fixture
+def info_blob_repo(session):
+    return InfoBlobRepository(session)
+
+
+@pytest.fixture
+def storage_usage_repo(session):
+    return StorageUsageRepository(session)
+
+
+async def _add_blob(session, user_id, tenant_id, size):
+    return await session.scalar(
+        sa.insert(InfoBlobs)
+        .values(text="text", size=size, user_id=user_id, tenant_id=tenant_id)
+        .returning(InfoBlobs.id)
+    )
+
+
+async def _usage(info_blob_repo, user_id, tenant_id):
+    return (
+        await info_blob_repo.get_total_size_of_user(user_id),
+        await info_blob_repo.get_total_size_of_tenant(tenant_id),
+    )
+
+
+async def _pending_deltas(session, user_id):
+    return await session.scalar(
+        sa.select(sa.func.count())
+        .select_from(StorageUsageDeltas)
+        .where(StorageUsageDeltas.user_id == user_id)
+    )
+
+
+async def test_usage_includes_pending_deltas(
+    session, info_blob_repo, user_id, tenant_id
+):
+    await _add_blob(session, user_id, tenant_id, size=100)
+    await _add_blob(session, user_id, tenant_id, size=50)
+
+    assert await _pending_deltas(session, user_id) == 2
+    assert await _usage(info_blob_repo, user_id, tenant_id) == (150, 150)
+
+
+async def test_updates_and_deletes_are_recorded(
+    session, info_blob_repo, user_id, tenant_id
+):
+    other_user_id = await _add_user(session, tenant_id)
+    resized = await _add_blob(session, user_id, tenant_id, size=100)
+    moved = await _add_blob(session, user_id, tenant_id, size=30)
+    deleted = await _add_blob(session, user_id, tenant_id, size=20)
+
+    await session.execute(
+        sa.update(InfoBlobs).where(InfoBlobs.id == resized).values(size=70)
+    )
+    await session.execute(
+        sa.update(InfoBlobs).where(InfoBlobs.id == moved).values(user_id=other_user_id)
+    )
+    await session.execute(sa.delete(InfoBlobs).where(InfoBlobs.id == deleted))
+
+    assert await info_blob_repo.get_total_size_of_user(user_id) == 70
+    assert await info_blob_repo.get_total_size_of_user(other_user_id) == 30
+    assert await info_blob_repo.get_total_size_of_tenant(tenant_id) == 100
+
+
+async def test_fold_moves_deltas_into_counters(
+    session, info_blob_repo, storage_usage_repo, user_id, tenant_id
+):
+    blob_id = await _add_blob(session, user_id, tenant_id, size=100)
+    await _add_blob(session, user_id, tenant_id, size=50)
+
+    await storage_usage_repo.fold_deltas()
+
+    assert await _pending_deltas(session, user_id) == 0
+    assert await _usage(info_blob_repo, user_id, tenant_id) == (150, 150)
+
+    await session.execute(sa.delete(InfoBlobs).where(InfoBlobs.id == blob_id))
+    assert await _usage(info_blob_repo, user_id, tenant_id) == (50, 50)
+
+    await storage_usage_repo.fold_deltas()
+
+    counters = await session.execute(
+        sa.select(StorageUsageCounters.scope, StorageUsageCounters.size).where(
+            StorageUsageCounters.owner_id.in_([user_id, tenant_id])
+        )
+    )
+    assert sorted(counters.all()) == [("tenant", 50), ("user", 50)]
+    assert await _usage(info_blob_repo, user_id, tenant_id) == (50, 50)
+
+
+async def test_reconcile_corrects_drift(
+    session, info_blob_repo, storage_usage_repo, user_id, tenant_id
+):
+    emptied_user_id = await _add_user(session, tenant_id)
+    await _add_blob(session, user_id, tenant_id, size=100)
+    blob_id = await _add_blob(session, emptied_user_id, tenant_id, size=40)
+    await storage_usage_repo.fold_deltas()
+    await session.execute(sa.delete(InfoBlobs).where(InfoBlobs.id == blob_id))
+
+    # Drift that the trigger would never produce
+    await session.execute(
+        sa.update(StorageUsageCounters)
+        .where(StorageUsageCounters.owner_id.in_([user_id, tenant_id]))
+        .values(size=999)
+    )
+    await session.execute(
+        sa.insert(StorageUsageDeltas).values(
+            user_id=user_id, tenant_id=tenant_id, size_delta=5
+        )
+    )
+
+    await storage_usage_repo.reconcile()
+
+    assert await _pending_deltas(session, user_id) == 0
+    assert await _usage(info_blob_repo, user_id, tenant_id) == (100, 100)
+    assert await info_blob_repo.get_total_size_of_user(emptied_user_id) == 0
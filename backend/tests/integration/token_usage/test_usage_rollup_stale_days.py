@@ -0,0 +1,80 @@
+from datetime import date, datetime, timezone
+from uuid import uuid4
+
+import pytest
+import sqlalchemy as sa
+
+from intric.database.tables.questions_table import Questions
+from intric.database.tables.tenant_table import Tenants
+from intric.token_usage.domain.token_usage_models import UsageSource
+from intric.token_usage.infrastructure.usage_rollup_repo import UsageRollupRepository
+
+ROLLED_UP_UNTIL = date(2025, 5, 10)
+CLOSED_DAY = datetime(2025, 5, 5, 12, tzinfo=timezone.utc)
+OPEN_DAY = datetime(2025, 5, 12, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def repo(session):
+    repo = UsageRollupRepository(session)
+    await repo.set_watermark(UsageSource.QUESTIONS, rolled_up_until=ROLLED_UP_UNTIL)
+    # Left over from earlier statements of the test database
+    await repo.pop_stale_days(UsageSource.QUESTIONS, limit=1000)
+    return repo
+
+
+@pytest.fixture
+async def tenant_id(session):
+    return await session.scalar(
+        sa.insert(Tenants)
+        .values(name=f"tenant-{uuid4()}", quota_limit=10_000, state="active")
+        .returning(Tenants.id)
+    )
+
+
+async def _add_question(session, tenant_id, created_at):
+    return await session.scalar(
+        sa.insert(Questions)
+        .values(
+            question="question",
+            answer="answer",
+            num_tokens_question=10,
+            num_tokens_answer=20,
+            tenant_id=tenant_id,
+            created_at=created_at,
+        )
+        .returning(Questions.id)
+    )
+
+
+async def test_changes_to_rolled_up_days_mark_them_stale(session, repo, tenant_id):
+    closed = await _add_question(session, tenant_id, CLOSED_DAY)
+    open_ = await _add_question(session, tenant_id, OPEN_DAY)
+
+    await session.execute(
+        sa.update(Questions)
+        .where(Questions.id.in_([closed, open_]))
+        .values(num_tokens_answer=Questions.num_tokens_answer + 5)
+    )
+
+    assert await repo.pop_stale_days(UsageSource.QUESTIONS, limit=10) == [CLOSED_DAY.date()]
+
+
+async def test_touching_updated_at_does_not_mark_days_stale(session, repo, tenant_id):
+    question_id = await _add_question(session, tenant_id, CLOSED_DAY)
+
+    await session.execute(
+        sa.update(Questions)
+        .where(Questions.id == question_id)
+        .values(updated_at=sa.func.clock_timestamp())
+    )
+
+    assert await repo.pop_stale_days(UsageSource.QUESTIONS, limit=10) == []
+
+
+async def test_deletes_from_rolled_up_days_mark_them_stale(session, repo, tenant_id):
+    question_id = await _add_question(session, tenant_id, CLOSED_DAY)
+
+    await session.execute(sa.delete(Questions).where(Questions.id == question_id))
+
+    assert await repo.pop_stale_days(UsageSource.QUESTIONS, limit=10) == [CLOSED_DAY.date()]
@@ -0,0 +1,295 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.ai_models.completion_models.completion_model import Completion
+from intric.completion_models.infrastructure import get_response_open_ai
+from intric.completion_models.infrastructure.completion_service import CompletionService
+from intric.completion_models.infrastructure.endpoint_health import (
+    EndpointHealth,
+    endpoint_health,
+    single_attempt,
+)
+from intric.main.exceptions import BadRequestException, OpenAIException
+
+CONTEXT = MagicMock(token_count=1000, images=[], messages=[])
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    settings = MagicMock(
+        completion_circuit_breaker_failures=3,
+        completion_circuit_breaker_error_rate=0.5,
+        completion_circuit_breaker_cooldown_seconds=30,
+        completion_hedging_enabled=False,
+        completion_hedging_min_delay_seconds=0,
+    )
+    for module in ("endpoint_health", "completion_service"):
+        monkeypatch.setattr(
+            f"intric.completion_models.infrastructure.{module}.get_settings", lambda: settings
+        )
+    # No backoff between the attempts
+    monkeypatch.setattr(
+        "intric.completion_models.infrastructure.completion_service.random.uniform",
+        lambda a, b: 0,
+    )
+    endpoint_health.clear()
+    return settings
+
+
+def _model(name: str, fallback_models: list[str] = []):
+    model = MagicMock(
+        id=uuid4(),
+        base_url=None,
+        fallback_models=fallback_models,
+        can_access=True,
+        vision=False,
+        security_classification=None,
+    )
+    model.name = name
+    model.meets_security_classification.return_value = True
+    return model
+
+
+def _adapter(model, response=None, error=None):
+    adapter = MagicMock(model=model)
+    adapter.get_token_limit_of_model.return_value = 128000
+    adapter.get_response = AsyncMock(return_value=response, side_effect=error)
+    return adapter
+
+
+@pytest.fixture
+def models():
+    return [_model("primary", fallback_models=["fallback"]), _model("fallback")]
+
+
+def _service(models, adapters):
+    completion_model_repo = AsyncMock()
+    completion_model_repo.all.return_value = models
+    service = CompletionService(
+        context_builder=MagicMock(),
+        file_repo=AsyncMock(),
+        completion_model_repo=completion_model_repo,
+    )
+    service._get_adapter = lambda model: adapters[model.name]
+    return service
+
+
+def test_circuit_opens_after_failures_and_probes_after_cooldown(settings, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(
+        "intric.completion_models.infrastructure.endpoint_health.time.monotonic", lambda: now
+    )
+    health = EndpointHealth()
+
+    for _ in range(3):
+        assert health.allows_request()
+        health.record_failure()
+
+    assert health.is_open
+    assert not health.allows_request()
+
+    now += 30
+    assert health.allows_request()
+    assert not health.allows_request()
+
+    health.record_success(latency=1.0)
+    assert not health.is_open
+    assert health.allows_request()
+
+
+async def test_fails_over_to_the_fallback(settings, models):
+    primary, fallback = models
+    adapters = {
+        "primary": _adapter(primary, error=OpenAIException("Unavailable")),
+        "fallback": _adapter(fallback, response=Completion(text="Answer")),
+    }
+    service = _service(models, adapters)
+
+    adapter, completion = await service._get_response_with_failover(
+        adapters["primary"], CONTEXT, None
+    )
+
+    assert adapter.model is fallback
+    assert completion.text == "Answer"
+    assert endpoint_health.get(primary).consecutive_failures == 1
+
+
+async def test_provider_retries_stop_after_one_attempt_when_single(settings):
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(side_effect=ConnectionError("Unavailable"))
+
+    token = single_attempt.set(True)
+    try:
+        with pytest.raises(OpenAIException):
+            await get_response_open_ai.get_response(
+                client=client, model_name="gpt-4o", messages=[], model_kwargs={}
+            )
+    finally:
+        single_attempt.reset(token)
+
+    client.chat.completions.create.assert_awaited_once()
+
+
+async def test_last_candidate_is_retried(settings, models):
+    primary, fallback = models
+    primary.fallback_models = []
+    adapter = _adapter(primary)
+    adapter.get_response.side_effect = [
+        OpenAIException("Unavailable"),
+        OpenAIException("Unavailable"),
+        Completion(text="Answer"),
+    ]
+    service = _service(models, {"primary": adapter})
+
+    _, completion = await service._get_response_with_failover(adapter, CONTEXT, None)
+
+    assert completion.text == "Answer"
+    assert adapter.get_response.await_count == 3
+
+
+async def test_last_candidate_is_not_retried_once_its_circuit_opens(settings, models):
+    settings.completion_circuit_breaker_failures = 2
+    primary, fallback = models
+    primary.fallback_models = []
+    adapter = _adapter(primary, error=OpenAIException("Unavailable"))
+    service = _service(models, {"primary": adapter})
+
+    with pytest.raises(OpenAIException):
+        await service._get_response_with_failover(adapter, CONTEXT, None)
+
+    assert adapter.get_response.await_count == 2
+
+
+async def test_open_circuit_goes_straight_to_the_fallback(settings, models):
+    primary, fallback = models
+    adapters = {
+        "primary": _adapter(primary),
+        "fallback": _adapter(fallback, response=Completion(text="Answer")),
+    }
+    for _ in range(3):
+        endpoint_health.get(primary).record_failure()
+
+    service = _service(models, adapters)
+    adapter, _ = await service._get_response_with_failover(adapters["primary"], CONTEXT, None)
+
+    assert adapter.model is fallback
+    adapters["primary"].get_response.assert_not_awaited()
+
+
+async def test_bad_requests_are_not_failed_over(settings, models):
+    primary, fallback = models
+    adapters = {
+        "primary": _adapter(primary, error=BadRequestException("Invalid model kwargs")),
+        "fallback": _adapter(fallback),
+    }
+    service = _service(models, adapters)
+
+    with pytest.raises(BadRequestException):
+        await service._get_response_with_failover(adapters["primary"], CONTEXT, None)
+
+    adapters["fallback"].get_response.assert_not_awaited()
+    assert endpoint_health.get(primary).consecutive_failures == 0
+
+
+async def test_fallbacks_must_meet_the_security_classification(settings, models):
+    primary, fallback = models
+    fallback.meets_security_classification.return_value = False
+    adapters = {
+        "primary": _adapter(primary, error=OpenAIException("Unavailable")),
+        "fallback": _adapter(fallback),
+    }
+    service = _service(models, adapters)
+
+    with pytest.raises(OpenAIException):
+        await service._get_response_with_failover(adapters["primary"], CONTEXT, None)
+
+    fallback.meets_security_classification.assert_called_once_with(
+        primary.security_classification
+    )
+    adapters["fallback"].get_response.assert_not_awaited()
+
+
+def _stream(*texts, error=None):
+    async def stream(**kwargs):
+        for text in texts:
+            yield Completion(text=text)
+        if error is not None:
+            raise error
+
+    return stream
+
+
+async def test_stream_fails_over_before_the_first_chunk(settings, models):
+    primary, fallback = models
+    adapters = {"primary": _adapter(primary), "fallback": _adapter(fallback)}
+    adapters["primary"].get_response_streaming = _stream(error=OpenAIException("Unavailable"))
+    adapters["fallback"].get_response_streaming = _stream("An", "swer")
+    service = _service(models, adapters)
+    response = MagicMock(model=primary)
+
+    chunks = [
+        chunk.text
+        async for chunk in service._stream_with_failover(
+            adapters["primary"], response, CONTEXT, None
+        )
+    ]
+
+    assert chunks == ["An", "swer"]
+    assert response.model is fallback
+
+
+async def test_stream_is_not_failed_over_once_started(settings, models):
+    primary, fallback = models
+    adapters = {"primary": _adapter(primary), "fallback": _adapter(fallback)}
+    adapters["primary"].get_response_streaming = _stream("An", error=OpenAIException("Lost"))
+    adapters["fallback"].get_response_streaming = _stream("Answer")
+    service = _service(models, adapters)
+    response = MagicMock(model=None)
+
+    chunks = []
+    with pytest.raises(OpenAIException):
+        async for chunk in service._stream_with_failover(
+            adapters["primary"], response, CONTEXT, None
+        ):
+            chunks.append(chunk.text)
+
+    assert chunks == ["An"]
+    assert response.model is primary
+
+
+async def test_slow_request_is_hedged(settings, models):
+    settings.completion_hedging_enabled = True
+    primary, fallback = models
+    for _ in range(20):
+        endpoint_health.get(primary).record_success(latency=0.01)
+
+    cancelled = asyncio.Event()
+
+    async def slow_response(**kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    adapters = {
+        "primary": _adapter(primary),
+        "fallback": _adapter(fallback, response=Completion(text="Hedged")),
+    }
+    adapters["primary"].get_response = slow_response
+    service = _service(models, adapters)
+
+    adapter, completion = await asyncio.wait_for(
+        service._get_response_with_failover(adapters["primary"], CONTEXT, None), timeout=1
+    )
+    await asyncio.sleep(0)
+
+    assert adapter.model is fallback
+    assert completion.text == "Hedged"
+    assert cancelled.is_set()
+    # The cancelled request is not a sample of the latency
+    assert endpoint_health.get(primary).latency_percentile(0.95) == 0.01
+    assert len(endpoint_health.get(primary)._latencies) == 20
@@ -0,0 +1,278 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError
+
+from intric.ai_models.completion_models.completion_model import Completion, ResponseType
+from intric.completion_models.infrastructure.completion_scheduler import (
+    CompletionScheduler,
+    CompletionTicket,
+)
+from intric.completion_models.infrastructure.completion_service import CompletionService
+from intric.main.exceptions import ModelBusyException
+from tests.fixtures import TEST_MODEL_GPT4
+
+QUEUE_FULL = -1
+ADMITTED = -1
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    settings = MagicMock(
+        completion_scheduler_enabled=True,
+        completion_scheduler_max_concurrent_per_tenant=2,
+        completion_scheduler_max_queue=10,
+        completion_scheduler_max_wait_seconds=60,
+        completion_scheduler_poll_seconds=0,
+        completion_scheduler_lease_seconds=600,
+        completion_scheduler_tenant_weights={},
+    )
+    monkeypatch.setattr(
+        "intric.completion_models.infrastructure.completion_scheduler.get_settings",
+        lambda: settings,
+    )
+    return settings
+
+
+def _ticket(*eval_results):
+    """A ticket whose scripts return the results, the first from enqueueing."""
+    redis = AsyncMock()
+    redis.eval.side_effect = list(eval_results)
+    model = MagicMock(id=uuid4(), tokens_per_minute=1000)
+    return CompletionTicket(redis, tenant_id=uuid4(), model=model, tokens=100)
+
+
+async def test_wait_tells_the_position_until_admitted(settings):
+    ticket = _ticket(2, 2, 1, 1, 0, ADMITTED)
+
+    positions = [position async for position in ticket.wait()]
+
+    assert positions == [2, 1, 0]
+    assert ticket.admitted
+
+    await ticket.release()
+    ticket.redis.zrem.assert_awaited_once_with(
+        f"completion_scheduler:leases:{ticket.tenant_id}", ticket.request_id
+    )
+
+
+async def test_tokens_are_weighted_by_tenant(settings):
+    ticket = _ticket(0, ADMITTED)
+    settings.completion_scheduler_tenant_weights = {str(ticket.tenant_id): 4.0}
+
+    [_ async for _ in ticket.wait()]
+
+    enqueue_args = ticket.redis.eval.call_args_list[0].args
+    assert enqueue_args[6] == 25
+
+
+async def test_full_queue_is_rejected(settings):
+    ticket = _ticket(QUEUE_FULL)
+
+    with pytest.raises(ModelBusyException):
+        [_ async for _ in ticket.wait()]
+
+    assert not ticket.admitted
+
+
+async def test_waiting_too_long_leaves_the_queue(settings):
+    settings.completion_scheduler_max_wait_seconds = -1
+    ticket = _ticket(3, 3)
+
+    with pytest.raises(ModelBusyException):
+        [_ async for _ in ticket.wait()]
+
+    ticket.redis.zrem.assert_awaited_with(
+        f"completion_scheduler:queue:{ticket.model.id}",
+        f"{ticket.tenant_id}:{ticket.request_id}",
+    )
+
+
+async def test_rejoins_the_queue_when_dropped(settings):
+    ticket = _ticket(0, -2, 4, ADMITTED)
+
+    positions = [position async for position in ticket.wait()]
+
+    assert positions == [4]
+    assert ticket.redis.eval.await_count == 4
+
+
+TENANT_A = UUID(int=1)
+TENANT_B = UUID(int=2)
+
+
+@pytest.fixture
+def scheduler(settings):
+    return CompletionScheduler(redis=fakeredis.FakeAsyncRedis())
+
+
+@pytest.fixture
+def model():
+    return MagicMock(id=uuid4(), tokens_per_minute=None)
+
+
+async def _queued(scheduler: CompletionScheduler, tenant_id, model, tokens=100):
+    ticket = scheduler.ticket(tenant_id=tenant_id, model=model, tokens=tokens)
+    await ticket.join()
+    return ticket
+
+
+async def test_requests_are_admitted_in_fair_order(scheduler, model):
+    a1 = await _queued(scheduler, TENANT_A, model)
+    a2 = await _queued(scheduler, TENANT_A, model)
+    b1 = await _queued(scheduler, TENANT_B, model)
+
+    # The second request of A is queued behind the first request of B
+    assert await a2._admit() == 2
+    assert await b1._admit() == 1
+    assert await a1._admit() == ADMITTED
+    assert await a2._admit() == 1
+    assert await b1._admit() == ADMITTED
+    assert await a2._admit() == ADMITTED
+
+
+async def test_tenants_at_their_limit_do_not_hold_up_others(settings, scheduler, model):
+    settings.completion_scheduler_max_concurrent_per_tenant = 1
+    a1 = await _queued(scheduler, TENANT_A, model)
+    a2 = await _queued(scheduler, TENANT_A, model)
+    b1 = await _queued(scheduler, TENANT_B, model, tokens=300)
+
+    assert [position async for position in a1.wait()] == []
+    assert await a2._admit() == 0
+    assert await b1._admit() == ADMITTED
+
+    await a1.release()
+    assert await a2._admit() == ADMITTED
+
+
+async def test_requests_wait_for_the_tokens_per_minute(scheduler, model):
+    model.tokens_per_minute = 150
+    a1 = await _queued(scheduler, TENANT_A, model)
+    b1 = await _queued(scheduler, TENANT_B, model)
+
+    assert await a1._admit() == ADMITTED
+    assert await b1._admit() == 0
+
+
+async def test_requests_no_longer_waiting_are_dropped(scheduler, model):
+    a1 = await _queued(scheduler, TENANT_A, model)
+    b1 = await _queued(scheduler, TENANT_B, model)
+    await scheduler.redis.delete(a1._waiting_key)
+
+    assert await b1._admit() == ADMITTED
+    assert await a1._admit() == -2
+
+
+async def test_joining_a_full_queue_is_rejected(settings, scheduler, model):
+    settings.completion_scheduler_max_queue = 2
+    await _queued(scheduler, TENANT_A, model)
+    await _queued(scheduler, TENANT_B, model)
+
+    ticket = scheduler.ticket(tenant_id=TENANT_A, model=model, tokens=100)
+    with pytest.raises(ModelBusyException):
+        await ticket.join()
+
+    assert not await scheduler.redis.exists(ticket._waiting_key)
+
+
+async def test_admitted_without_scheduling_when_redis_is_down(settings):
+    ticket = _ticket(ConnectionError("down"))
+
+    positions = [position async for position in ticket.wait()]
+
+    assert positions == []
+    assert ticket.admitted
+
+    await ticket.release()
+    ticket.redis.zrem.assert_not_awaited()
+
+
+class StubTicket:
+    def __init__(self, *positions):
+        self.positions = positions
+        self.events = []
+
+    async def join(self):
+        self.events.append("joined")
+
+    async def wait(self):
+        for position in self.positions:
+            yield position
+        self.events.append("admitted")
+
+    async def release(self):
+        self.events.append("released")
+
+
+@pytest.fixture
+def completion_service(settings, monkeypatch):
+    monkeypatch.setattr(
+        "intric.completion_models.infrastructure.completion_service.random.uniform",
+        lambda a, b: 0,
+    )
+    scheduler = MagicMock(spec=CompletionScheduler)
+    scheduler.is_enabled.return_value = True
+    context_builder = MagicMock()
+    context_builder.build_context.return_value = MagicMock(
+        token_count=100, images=[], messages=[]
+    )
+    service = CompletionService(
+        context_builder=context_builder,
+        file_repo=AsyncMock(),
+        user=MagicMock(tenant_id=uuid4()),
+        completion_scheduler=scheduler,
+    )
+    service._get_adapter = MagicMock()
+    service._get_adapter.return_value.model = TEST_MODEL_GPT4
+    return service
+
+
+async def test_streamed_completion_waits_for_its_turn(completion_service: CompletionService):
+    ticket = StubTicket(1, 0)
+    completion_service.completion_scheduler.ticket.return_value = ticket
+
+    async def provider_stream():
+        ticket.events.append("provider")
+        yield Completion(text="Answer")
+
+    adapter = completion_service._get_adapter.return_value
+    adapter.get_response_streaming = MagicMock(return_value=provider_stream())
+
+    response = await completion_service.get_response(
+        model=MagicMock(), text_input="question", stream=True
+    )
+    chunks = [chunk async for chunk in response.completion]
+
+    assert [chunk.queue_position for chunk in chunks[:2]] == [1, 0]
+    assert chunks[0].response_type == ResponseType.INTRIC_EVENT
+    assert chunks[2].text == "Answer"
+    assert ticket.events == ["joined", "admitted", "provider", "released"]
+
+
+async def test_lease_is_released_when_the_completion_fails(
+    completion_service: CompletionService,
+):
+    ticket = StubTicket()
+    completion_service.completion_scheduler.ticket.return_value = ticket
+    adapter = completion_service._get_adapter.return_value
+    adapter.get_response = AsyncMock(side_effect=Exception("Provider error"))
+
+    with pytest.raises(Exception, match="Provider error"):
+        await completion_service.get_response(model=MagicMock(), text_input="question")
+
+    assert ticket.events == ["admitted", "released"]
+
+
+async def test_streamed_completion_is_refused_when_the_queue_is_full(
+    completion_service: CompletionService,
+):
+    ticket = StubTicket()
+    ticket.join = AsyncMock(side_effect=ModelBusyException("Full"))
+    completion_service.completion_scheduler.ticket.return_value = ticket
+
+    with pytest.raises(ModelBusyException):
+        await completion_service.get_response(
+            model=MagicMock(), text_input="question", stream=True
+        )
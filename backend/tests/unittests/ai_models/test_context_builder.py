@@ -1,5 +1,6 @@
 # flake8: noqa
 
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock
 from uuid import uuid4
 
@@ -12,6 +13,7 @@ from intric.completion_models.infrastructure.context_builder import (
 )
 from intric.completion_models.infrastructure.static_prompts import (
     HALLUCINATION_GUARD,
+    HISTORY_SUMMARY_QUESTION,
     SHOW_REFERENCES_PROMPT,
 )
 from intric.files.file_models import File, FileType
@@ -117,6 +119,8 @@ def test_context_with_messages(context_builder: ContextBuilder):
     )
 
     session = MagicMock(
+        history_summary=None,
+        history_summarized_until=None,
         questions=[
             MagicMock(
                 question="Question 1",
@@ -180,6 +184,8 @@ def test_context_with_messages_and_images(context_builder: ContextBuilder):
     )
 
     session = MagicMock(
+        history_summary=None,
+        history_summarized_until=None,
         questions=[
             MagicMock(
                 question="Question 1",
@@ -243,3 +249,42 @@ def test_truncate_knowledge_if_too_many_chunks(context_builder: ContextBuilder):
 
     assert context.token_count < 10000
     assert count_tokens(context.prompt) + count_tokens(QUESTION) < 10000
+
+
+def test_context_with_history_summary(context_builder: ContextBuilder, monkeypatch):
+    monkeypatch.setattr(
+        "intric.completion_models.infrastructure.context_builder.count_tokens",
+        lambda text: len(text or ""),
+    )
+    summarized_until = datetime(2025, 5, 21, 10, tzinfo=timezone.utc)
+    session = MagicMock(
+        history_summary="The user is planning a trip to Lund.",
+        history_summary_tokens=36,
+        history_summarized_until=summarized_until,
+        questions=[
+            MagicMock(
+                question="Question 1",
+                answer="Answer 1",
+                files=[],
+                created_at=summarized_until,
+            ),
+            MagicMock(
+                question="Question 2",
+                answer="Answer 2",
+                files=[],
+                created_at=summarized_until + timedelta(minutes=1),
+            ),
+        ],
+    )
+
+    context = context_builder.build_context(
+        input_str=QUESTION, session=session, max_tokens=10000
+    )
+
+    assert context.messages == [
+        Message(
+            question=HISTORY_SUMMARY_QUESTION,
+            answer="The user is planning a trip to Lund.",
+        ),
+        Message(question="Question 2", answer="Answer 2"),
+    ]
@@ -0,0 +1,141 @@
+import pytest
+from aiohttp import web
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+
+from intric.ai_models.completion_models.completion_model import Context, Message
+from intric.completion_models.infrastructure.adapters.claude_model_adapter import (
+    ClaudeModelAdapter,
+)
+from intric.completion_models.infrastructure.adapters.openai_model_adapter import (
+    OpenAIModelAdapter,
+)
+from intric.completion_models.infrastructure.context_builder import _Prompt
+from intric.completion_models.infrastructure.static_prompts import (
+    SHOW_REFERENCES_PROMPT,
+)
+from tests.fixtures import TEST_MODEL_GPT4
+
+PROMPT = "You are a helpful assistant"
+ATTACHMENTS = "Below are files uploaded by the user..."
+KNOWLEDGE = '"""source_title: blob, source_id: 1\ninformation"""'
+
+CONTEXT = Context(
+    input="And now?",
+    prompt=f"{PROMPT}\n\n{ATTACHMENTS}\n\n{KNOWLEDGE}",
+    cacheable_prompt=f"{PROMPT}\n\n{ATTACHMENTS}",
+    messages=[Message(question="First question", answer="First answer")],
+)
+
+
+@pytest.fixture
+async def stub_server():
+    """Records the requests, and answers like a provider that read 1024
+    tokens from its prompt cache."""
+    requests = []
+
+    async def anthropic_messages(request: web.Request):
+        requests.append(await request.json())
+        return web.json_response(
+            {
+                "id": "msg_1",
+                "type": "message",
+                "role": "assistant",
+                "model": "claude",
+                "content": [{"type": "text", "text": "Answer"}],
+                "stop_reason": "end_turn",
+                "usage": {
+                    "input_tokens": 10,
+                    "output_tokens": 1,
+                    "cache_read_input_tokens": 1024,
+                },
+            }
+        )
+
+    async def openai_chat_completions(request: web.Request):
+        requests.append(await request.json())
+        return web.json_response(
+            {
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4-turbo",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "Answer"},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 1100,
+                    "completion_tokens": 1,
+                    "total_tokens": 1101,
+                    "prompt_tokens_details": {"cached_tokens": 1024},
+                },
+            }
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1/messages", anthropic_messages)
+    app.router.add_post("/v1/chat/completions", openai_chat_completions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    yield f"http://127.0.0.1:{port}", requests
+
+    await runner.cleanup()
+
+
+def test_cacheable_content_comes_first():
+    prompt = _Prompt(version=2)
+    prompt.add_prompt(PROMPT, transcription=False)
+    prompt.attachments = ATTACHMENTS
+    prompt.knowledge = KNOWLEDGE
+
+    assert str(prompt) == f"{PROMPT}\n\n{ATTACHMENTS}\n\n{SHOW_REFERENCES_PROMPT}\n\n{KNOWLEDGE}"
+    assert prompt.cacheable_prefix == f"{PROMPT}\n\n{ATTACHMENTS}"
+
+
+def test_claude_history_is_cached_when_whole_prompt_is():
+    adapter = ClaudeModelAdapter(TEST_MODEL_GPT4, async_client=None)
+    context = CONTEXT.model_copy(update={"prompt": CONTEXT.cacheable_prompt})
+
+    messages = adapter.create_query_from_context(context)
+
+    assert messages[1]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in str(messages[2])
+
+
+async def test_claude_marks_cacheable_prompt(stub_server):
+    base_url, requests = stub_server
+    client = AsyncAnthropic(api_key="key", base_url=base_url)
+    adapter = ClaudeModelAdapter(TEST_MODEL_GPT4, async_client=client)
+
+    completion = await adapter.get_response(CONTEXT)
+
+    assert requests[0]["system"] == [
+        {
+            "type": "text",
+            "text": CONTEXT.cacheable_prompt,
+            "cache_control": {"type": "ephemeral"},
+        },
+        {"type": "text", "text": KNOWLEDGE},
+    ]
+    # The knowledge changes every turn, so the history is not cached
+    assert "cache_control" not in str(requests[0]["messages"])
+    assert completion.cached_token_count == 1024
+
+
+async def test_openai_reports_cached_tokens(stub_server):
+    base_url, requests = stub_server
+    client = AsyncOpenAI(api_key="key", base_url=f"{base_url}/v1")
+    adapter = OpenAIModelAdapter(TEST_MODEL_GPT4, client=client)
+
+    completion = await adapter.get_response(CONTEXT)
+
+    assert requests[0]["messages"][0]["content"].startswith(CONTEXT.cacheable_prompt)
+    assert completion.cached_token_count == 1024
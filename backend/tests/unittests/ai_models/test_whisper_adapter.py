@@ -0,0 +1,88 @@
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from intric.files import audio
+from intric.files.audio import AudioSegment
+from intric.transcription_models.infrastructure.adapters.whisper import (
+    OpenAISTTModelAdapter,
+    remove_overlap,
+)
+
+
+def _transcode(segments: list[AudioSegment]):
+    @asynccontextmanager
+    async def transcode(filepath: Path, seconds: int, overlap_seconds: int = 0):
+        async def _segments():
+            for segment in segments:
+                yield segment
+
+        yield _segments()
+
+    return transcode
+
+
+def test_remove_overlap_drops_repeated_words():
+    previous = "We will now go through the budget for next year."
+    current = "budget for next year. The first item is salaries."
+
+    assert remove_overlap(previous, current) == "The first item is salaries."
+
+
+def test_remove_overlap_allows_cut_words_at_the_edges():
+    previous = "and that concludes the first part of the meet"
+    current = "ing part of the meeting, thank you all."
+
+    assert remove_overlap(previous, current) == "meeting, thank you all."
+
+
+def test_remove_overlap_keeps_text_without_overlap():
+    previous = "That is all for today."
+    current = "Questions from the audience follow."
+
+    assert remove_overlap(previous, current) == current
+
+
+def test_remove_overlap_keeps_repetition_far_into_the_text():
+    previous = "We start with the budget for next year."
+    current = "Hello again everyone, we have a short break and then the budget for next year."
+
+    assert remove_overlap(previous, current) == current
+
+
+async def test_segments_are_transcribed_concurrently_and_assembled_in_order(monkeypatch):
+    segments = [
+        AudioSegment(path=Path("0.mp3"), start=0, end=300),
+        AudioSegment(path=Path("1.mp3"), start=300, end=600),
+        AudioSegment(path=Path("2.mp3"), start=600, end=700.5),
+    ]
+    texts = {
+        "0.mp3": "First segment ends here.",
+        "1.mp3": "ends here. Second segment ends there.",
+        "2.mp3": "ends there. Last segment.",
+    }
+    running = 0
+    max_running = 0
+
+    async def transcribe(path: Path):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        # Finish in reverse order
+        await asyncio.sleep(0.01 * (len(segments) - int(path.stem)))
+        running -= 1
+        return texts[path.name]
+
+    monkeypatch.setattr(audio, "transcode", _transcode(segments))
+    adapter = OpenAISTTModelAdapter(MagicMock(base_url=None))
+    adapter._get_text_from_file = transcribe
+
+    text = await adapter.get_text_from_file(Path("recording.m4a"))
+
+    assert max_running == len(segments)
+    assert text == (
+        "### 0:00 - 5:00\n\nFirst segment ends here.\n\n"
+        "### 5:00 - 10:00\n\nSecond segment ends there.\n\n"
+        "### 10:00 - 11:40\n\nLast segment."
+    )
@@ -0,0 +1,44 @@
+from datetime import date
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from intric.analysis.analysis_repo import AnalysisRepository
+
+
+def _sql(stmt) -> str:
+    compiled = stmt.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    return " ".join(str(compiled).split())
+
+
+async def test_question_count_is_by_the_tenant_of_the_questions():
+    tenant_id = uuid4()
+    session = AsyncMock()
+    session.scalar.side_effect = [None, 7]
+
+    count = await AnalysisRepository(session).get_question_count(tenant_id=tenant_id)
+
+    assert count == 7
+    sql = _sql(session.scalar.call_args_list[1].args[0])
+    assert f"questions.tenant_id = '{tenant_id}'" in sql
+    # Questions of services, without a session, are counted as well
+    assert "sessions" not in sql
+
+
+async def test_question_count_reads_whole_days_from_the_rollups():
+    tenant_id = uuid4()
+    session = AsyncMock()
+    session.scalar.side_effect = [date(2025, 5, 13), 100, 7]
+
+    count = await AnalysisRepository(session).get_question_count(tenant_id=tenant_id)
+
+    assert count == 107
+    rolled_up, recent = [_sql(call.args[0]) for call in session.scalar.call_args_list[1:]]
+    assert "usage_daily_rollups.source = 'questions'" in rolled_up
+    assert f"usage_daily_rollups.tenant_id = '{tenant_id}'" in rolled_up
+    assert "usage_daily_rollups.day < '2025-05-13'" in rolled_up
+    assert f"questions.tenant_id = '{tenant_id}'" in recent
+    assert "questions.created_at >= '2025-05-13 00:00:00+00:00'" in recent
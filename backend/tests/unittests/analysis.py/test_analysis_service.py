@@ -4,6 +4,7 @@ from uuid import uuid4
 
 import pytest
 
+from intric.analysis.analysis import ConversationCounts
 from intric.analysis.analysis_service import AnalysisService
 from intric.main.exceptions import BadRequestException, UnauthorizedException
 from intric.roles.permissions import Permission
@@ -166,11 +167,9 @@ async def test_get_conversation_stats_assistant(service: AnalysisService):
     )
 
     # Mock repository response
-    mock_sessions = [
-        MagicMock(questions=[MagicMock(), MagicMock()]),  # 2 questions
-        MagicMock(questions=[MagicMock()]),  # 1 question
+    service.repo.get_assistant_conversation_counts.return_value = [
+        ConversationCounts(conversations=2, questions=3)
     ]
-    service.repo.get_assistant_sessions_since.return_value = mock_sessions
 
     # Call the service method
     result = await service.get_conversation_stats(
@@ -180,7 +179,8 @@ async def test_get_conversation_stats_assistant(service: AnalysisService):
     # Verify results
     assert result.total_conversations == 2
     assert result.total_questions == 3
-    service.repo.get_assistant_sessions_since.assert_called_once()
+    service.repo.get_assistant_conversation_counts.assert_called_once()
+    service.repo.get_assistant_sessions_since.assert_not_called()
 
 
 async def test_get_conversation_stats_group_chat(service: AnalysisService):
@@ -190,13 +190,11 @@ async def test_get_conversation_stats_group_chat(service: AnalysisService):
 
     group_chat_id = uuid4()
 
-    # Mock repository response
-    mock_sessions = [
-        MagicMock(questions=[MagicMock(), MagicMock(), MagicMock()]),  # 3 questions
-        MagicMock(questions=[MagicMock()]),  # 1 question
-        MagicMock(questions=[]),  # 0 questions
+    # Mock repository response, one entry per day
+    service.repo.get_group_chat_conversation_counts.return_value = [
+        ConversationCounts(conversations=2, questions=4),
+        ConversationCounts(conversations=1, questions=0),
     ]
-    service.repo.get_group_chat_sessions_since.return_value = mock_sessions
 
     # Call the service method
     result = await service.get_conversation_stats(
@@ -206,7 +204,7 @@ async def test_get_conversation_stats_group_chat(service: AnalysisService):
     # Verify results
     assert result.total_conversations == 3
     assert result.total_questions == 4
-    service.repo.get_group_chat_sessions_since.assert_called_once()
+    service.repo.get_group_chat_conversation_counts.assert_called_once()
 
 
 async def test_get_conversation_stats_with_date_range(service: AnalysisService):
@@ -219,8 +217,9 @@ async def test_get_conversation_stats_with_date_range(service: AnalysisService):
     end_time = datetime(2023, 1, 31, 23, 59)
 
     # Mock repository response
-    mock_sessions = [MagicMock(questions=[MagicMock()])]
-    service.repo.get_group_chat_sessions_since.return_value = mock_sessions
+    service.repo.get_group_chat_conversation_counts.return_value = [
+        ConversationCounts(conversations=1, questions=1)
+    ]
 
     # Call the service method
     result = await service.get_conversation_stats(
@@ -232,7 +231,7 @@ async def test_get_conversation_stats_with_date_range(service: AnalysisService):
     # Verify results
     assert result.total_conversations == 1
     assert result.total_questions == 1
-    service.repo.get_group_chat_sessions_since.assert_called_once_with(
+    service.repo.get_group_chat_conversation_counts.assert_called_once_with(
         group_chat_id=group_chat_id,
         from_date=start_time,
         to_date=end_time,
@@ -0,0 +1,122 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from intric.analysis import question_analyzer
+from intric.analysis.question_analyzer import QuestionAnalyzer
+from intric.main.exceptions import NoModelSelectedException, QueryException
+
+
+@pytest.fixture(autouse=True)
+def count_words(monkeypatch):
+    monkeypatch.setattr(question_analyzer, "count_tokens", lambda text: len(text.split()))
+
+
+@pytest.fixture
+def assistant():
+    assistant = MagicMock()
+    assistant.completion_model.token_limit = 50
+    assistant.attachments = []
+    assistant.get_response = AsyncMock(
+        return_value=MagicMock(completion=MagicMock(text="summary"))
+    )
+    return assistant
+
+
+def test_deduplicate_counts_repeated_questions():
+    questions = ["How do I apply?", "how do I  apply? ", "Opening hours?"]
+
+    assert QuestionAnalyzer.deduplicate(questions) == [
+        ("How do I apply?", 2),
+        ("Opening hours?", 1),
+    ]
+
+
+async def test_analyze_sends_small_windows_in_one_request(assistant):
+    analyzer = QuestionAnalyzer(completion_service=AsyncMock())
+
+    await analyzer.analyze(
+        assistant=assistant,
+        question="What do people ask about?",
+        questions=["How do I apply?", "How do I apply?"],
+        days=30,
+        stream=True,
+    )
+
+    assistant.get_response.assert_called_once()
+    kwargs = assistant.get_response.call_args.kwargs
+    assert kwargs["stream"] is True
+    assert '"""How do I apply?""" (asked 2 times)' in kwargs["prompt"]
+
+
+async def test_analyze_summarizes_large_windows_in_batches(assistant):
+    analyzer = QuestionAnalyzer(completion_service=AsyncMock())
+    questions = [f"question number {i} about topic" for i in range(10)]
+
+    await analyzer.analyze(
+        assistant=assistant,
+        question="What do people ask about?",
+        questions=questions,
+        days=30,
+        stream=True,
+    )
+
+    calls = assistant.get_response.call_args_list
+    # Five questions fit in each batch, then one final streamed request
+    assert len(calls) == 3
+    assert all(call.kwargs["stream"] is False for call in calls[:-1])
+    assert calls[-1].kwargs["stream"] is True
+    assert '"""summary"""' in calls[-1].kwargs["prompt"]
+
+
+async def test_analyze_fails_when_summaries_do_not_shrink(assistant):
+    analyzer = QuestionAnalyzer(completion_service=AsyncMock())
+    questions = [f"question number {i} about topic" for i in range(10)]
+    # Every summary is nearly as long as the budget of one request
+    assistant.get_response.return_value = MagicMock(
+        completion=MagicMock(text=" ".join(["summary"] * 20))
+    )
+
+    with pytest.raises(QueryException, match="could not be summarized"):
+        await analyzer.analyze(
+            assistant=assistant,
+            question="What do people ask about?",
+            questions=questions,
+            days=30,
+        )
+
+
+async def test_attachments_are_left_room_for_in_every_batch(assistant):
+    analyzer = QuestionAnalyzer(completion_service=AsyncMock())
+    questions = [f"question number {i} about topic" for i in range(4)]
+    assistant.attachments = [MagicMock(text=" ".join(["attachment"] * 15))]
+
+    await analyzer.analyze(
+        assistant=assistant,
+        question="What do people ask about?",
+        questions=questions,
+        days=30,
+    )
+
+    # Two questions fit next to the attachment in each batch
+    assert assistant.get_response.await_count == 3
+
+
+async def test_attachments_that_fill_the_budget_are_refused(assistant):
+    analyzer = QuestionAnalyzer(completion_service=AsyncMock())
+    assistant.attachments = [MagicMock(text=" ".join(["attachment"] * 25))]
+
+    with pytest.raises(QueryException, match="no room"):
+        await analyzer.analyze(
+            assistant=assistant, question="What?", questions=["How do I apply?"], days=30
+        )
+
+
+async def test_analyze_without_model(assistant):
+    analyzer = QuestionAnalyzer(completion_service=AsyncMock())
+    assistant.completion_model = None
+
+    with pytest.raises(NoModelSelectedException):
+        await analyzer.analyze(
+            assistant=assistant, question="What?", questions=["How do I apply?"], days=30
+        )
@@ -0,0 +1,92 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.assistants.answer_cache import AnswerCacheService
+from intric.main.config import get_settings
+
+
+def _assistant():
+    assistant = MagicMock(
+        id=uuid4(),
+        websites=[],
+        collections=[MagicMock(id=uuid4())],
+        integration_knowledge_list=[],
+        attachments=[],
+    )
+    assistant.get_prompt_text.return_value = "You are helpful"
+    assistant.completion_model_kwargs.model_dump.return_value = {"temperature": 0.5}
+    return assistant
+
+
+@pytest.fixture
+def service():
+    info_blob_repo = AsyncMock()
+    info_blob_repo.get_content_stamp.return_value = "10:2025-05-20T10:00:00+00:00"
+    create_embeddings_service = AsyncMock()
+    create_embeddings_service.get_embedding_for_query.return_value = [0.1, 0.2]
+
+    return AnswerCacheService(
+        user=MagicMock(tenant_id=uuid4()),
+        answer_cache_repo=AsyncMock(),
+        info_blob_repo=info_blob_repo,
+        create_embeddings_service=create_embeddings_service,
+    )
+
+
+async def _cache_key(service: AnswerCacheService, assistant):
+    lookup = await service.lookup("question", assistant, MagicMock(), version=1)
+    return lookup.cache_key
+
+
+async def test_lookup_finds_similar_questions(service: AnswerCacheService):
+    lookup = await service.lookup("question", _assistant(), MagicMock(), version=1)
+
+    assert lookup.cached is service.answer_cache_repo.find.return_value
+    find = service.answer_cache_repo.find.call_args.kwargs
+    assert find["embedding"] == [0.1, 0.2]
+    assert find["max_distance"] == pytest.approx(
+        1 - get_settings().answer_cache_similarity_threshold
+    )
+
+
+async def test_cache_key_changes_when_knowledge_is_reingested(service: AnswerCacheService):
+    assistant = _assistant()
+    before = await _cache_key(service, assistant)
+
+    service.info_blob_repo.get_content_stamp.return_value = "10:2025-05-21T10:00:00+00:00"
+
+    assert await _cache_key(service, assistant) != before
+
+
+async def test_cache_key_changes_with_prompt_and_model_kwargs(service: AnswerCacheService):
+    assistant = _assistant()
+    before = await _cache_key(service, assistant)
+
+    assistant.get_prompt_text.return_value = "You are terse"
+    after_prompt = await _cache_key(service, assistant)
+    assistant.completion_model_kwargs.model_dump.return_value = {"temperature": 1}
+    after_kwargs = await _cache_key(service, assistant)
+
+    assert len({before, after_prompt, after_kwargs}) == 3
+    assert await _cache_key(service, assistant) == after_kwargs
+
+
+async def test_no_lookup_when_question_can_not_be_embedded(service: AnswerCacheService):
+    service.create_embeddings_service.get_embedding_for_query.side_effect = Exception()
+
+    assert await service.lookup("question", _assistant(), MagicMock(), version=1) is None
+    service.answer_cache_repo.find.assert_not_awaited()
+
+
+async def test_add_stores_the_lookup(service: AnswerCacheService):
+    lookup = await service.lookup("question", _assistant(), MagicMock(), version=1)
+    question_id = uuid4()
+
+    await service.add(lookup, question_id=question_id)
+
+    add = service.answer_cache_repo.add.call_args.kwargs
+    assert add["cache_key"] == lookup.cache_key
+    assert add["question_id"] == question_id
+    service.answer_cache_repo.delete_created_before.assert_awaited_once()
@@ -1,3 +1,4 @@
+import asyncio
 from copy import deepcopy
 from dataclasses import dataclass
 from typing import Any
@@ -66,6 +67,7 @@ def setup_fixture():
         integration_knowledge_repo=AsyncMock(),
         completion_service=AsyncMock(),
         references_service=AsyncMock(),
+        answer_cache_service=AsyncMock(),
     )
 
     setup = Setup(assistant=assistant, service=service, group_service=AsyncMock())
@@ -173,3 +175,119 @@ async def test_error_when_assistant_cannot_be_used_in_space(setup: Setup):
 
     with pytest.raises(UnauthorizedException):
         await setup.service.ask(question="hello", assistant_id=MagicMock())
+
+
+async def test_ask_searches_web_and_gets_references_concurrently(setup: Setup, monkeypatch):
+    events = []
+
+    async def _stage(name: str, result: Any):
+        events.append(f"{name} started")
+        await asyncio.sleep(0.01)
+        events.append(f"{name} done")
+        return result
+
+    assistant = MagicMock(id=uuid4())
+    assistant.name = "assistant"
+    assistant.get_references = lambda **kwargs: _stage("references", MagicMock())
+    assistant.ask = AsyncMock(return_value=(MagicMock(), MagicMock()))
+    space = MagicMock()
+    space.get_assistant.return_value = assistant
+    setup.service.space_repo.get_space_by_assistant.return_value = space
+    setup.service.session_service.create_session.return_value = MagicMock(questions=[])
+    setup.service._handle_response = AsyncMock(return_value="answer")
+    web_search = MagicMock()
+    web_search.search = lambda search_query: _stage("web_search", [])
+    monkeypatch.setattr(AssistantService, "web_search", property(lambda self: web_search))
+    monkeypatch.setattr("intric.assistants.assistant_service.AssistantResponse", MagicMock())
+
+    await setup.service.ask(
+        question="hello", assistant_id=uuid4(), version=2, use_web_search=True
+    )
+
+    assert events.index("web_search started") < events.index("references done")
+    assert events.index("references started") < events.index("web_search done")
+    assert assistant.ask.call_args.kwargs["datastore_result"] is not None
+
+
+async def test_ask_cancels_references_when_web_search_fails(setup: Setup, monkeypatch):
+    references_cancelled = asyncio.Event()
+
+    async def _get_references(**kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            references_cancelled.set()
+            raise
+
+    async def _search(search_query: str):
+        raise BadRequestException("Web search failed")
+
+    assistant = MagicMock(get_references=_get_references)
+    space = MagicMock()
+    space.get_assistant.return_value = assistant
+    setup.service.space_repo.get_space_by_assistant.return_value = space
+    setup.service.session_service.create_session.return_value = MagicMock(questions=[])
+    web_search = MagicMock(search=_search)
+    monkeypatch.setattr(AssistantService, "web_search", property(lambda self: web_search))
+
+    with pytest.raises(BadRequestException):
+        await setup.service.ask(
+            question="hello", assistant_id=uuid4(), version=2, use_web_search=True
+        )
+
+    assert references_cancelled.is_set()
+
+
+def _cached_answer_setup(setup: Setup, monkeypatch):
+    assistant = MagicMock(id=uuid4(), answer_cache_enabled=True)
+    assistant.name = "assistant"
+    space = MagicMock()
+    space.get_assistant.return_value = assistant
+    setup.service.space_repo.get_space_by_assistant.return_value = space
+    setup.service.session_service.create_session.return_value = MagicMock(questions=[])
+    monkeypatch.setattr("intric.assistants.assistant_service.count_tokens", lambda text: 1)
+    monkeypatch.setattr("intric.assistants.assistant_service.AssistantResponse", MagicMock())
+
+    cached = MagicMock(question_id=uuid4(), answer="The library opens at nine.", info_blobs=[])
+    setup.service.answer_cache_service.lookup.return_value = MagicMock(cached=cached)
+
+    return assistant, cached
+
+
+async def test_ask_answers_from_cache(setup: Setup, monkeypatch):
+    assistant, cached = _cached_answer_setup(setup, monkeypatch)
+
+    await setup.service.ask(question="When does the library open?", assistant_id=uuid4())
+
+    assistant.ask.assert_not_called()
+    question = setup.service.session_service.add_question_to_session.call_args.kwargs
+    assert question["answer"] == cached.answer
+    assert question["references_from_question_id"] == cached.question_id
+
+
+async def test_ask_replays_cached_answer_as_stream(setup: Setup, monkeypatch):
+    _, cached = _cached_answer_setup(setup, monkeypatch)
+
+    await setup.service.ask(
+        question="When does the library open?", assistant_id=uuid4(), stream=True
+    )
+
+    from intric.assistants.assistant_service import AssistantResponse
+
+    answer = AssistantResponse.call_args.kwargs["answer"]
+    chunks = [chunk.text async for chunk in answer]
+    assert len(chunks) > 1
+    assert "".join(chunks) == cached.answer
+
+
+async def test_ask_does_not_use_cache_in_existing_sessions(setup: Setup, monkeypatch):
+    assistant, _ = _cached_answer_setup(setup, monkeypatch)
+    assistant.ask = AsyncMock(return_value=(MagicMock(), MagicMock()))
+    assistant.get_references = AsyncMock()
+    setup.service.session_service.get_session_with_history.return_value = MagicMock(questions=[])
+    setup.service._handle_response = AsyncMock(return_value="answer")
+
+    await setup.service.ask(question="hello", assistant_id=uuid4(), session_id=uuid4())
+
+    setup.service.answer_cache_service.lookup.assert_not_awaited()
+    assistant.ask.assert_awaited_once()
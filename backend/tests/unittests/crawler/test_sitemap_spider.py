@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+from scrapy.http import Request
+
+from intric.crawler.parse_html import KnownPage, UnchangedPage
+from intric.crawler.spiders.sitemap_spider import SitemapSpider
+
+
+class Entries(list):
+    type = "urlset"
+
+
+def _known_page(etag: str = None):
+    return KnownPage(
+        content_hash="hash",
+        etag=etag,
+        last_modified=None,
+        crawled_at=datetime(2024, 5, 1, 12, tzinfo=timezone.utc),
+    )
+
+
+def _spider():
+    return SitemapSpider(
+        sitemap_url="https://example.com/sitemap.xml",
+        known_pages={
+            "https://example.com/old": _known_page(),
+            "https://example.com/same-day": _known_page(),
+            "https://example.com/new": _known_page(etag='"abc"'),
+        },
+    )
+
+
+def test_sitemap_filter_skips_pages_not_modified_since_last_crawl():
+    spider = _spider()
+    entries = Entries(
+        [
+            {"loc": "https://example.com/old", "lastmod": "2024-04-30T08:00:00+00:00"},
+            {"loc": "https://example.com/same-day", "lastmod": "2024-05-01"},
+            {"loc": "https://example.com/new", "lastmod": "2024-05-02"},
+            {"loc": "https://example.com/unknown", "lastmod": "2024-01-01"},
+        ]
+    )
+
+    locs = [entry["loc"] for entry in spider.sitemap_filter(entries)]
+
+    assert locs == [
+        "https://example.com/same-day",
+        "https://example.com/new",
+        "https://example.com/unknown",
+    ]
+    assert list(spider._flush_unchanged()) == [UnchangedPage(url="https://example.com/old")]
+
+
+def test_known_pages_are_requested_conditionally():
+    spider = _spider()
+
+    request = spider._with_conditional_headers(Request("https://example.com/new"))
+
+    assert request.headers[b"If-None-Match"] == b'"abc"'
+    assert spider._with_conditional_headers(Request("https://example.com/unknown")).headers == {}
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.data_retention.infrastructure.data_retention_service import (
+    DataRetentionService,
+    RetentionBatchResult,
+    RetentionCursor,
+)
+
+
+def _cursor():
+    return RetentionCursor(created_at=datetime.now(timezone.utc), id=uuid4())
+
+
+@pytest.fixture
+def service():
+    session = MagicMock()
+    session.begin.return_value.__aenter__ = AsyncMock()
+    session.begin.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    service = DataRetentionService(session=session)
+    service.delete_old_questions = AsyncMock(
+        return_value=RetentionBatchResult(deleted=0, cursor=None)
+    )
+    service.delete_old_app_runs = AsyncMock(
+        return_value=RetentionBatchResult(deleted=0, cursor=None)
+    )
+    service.delete_old_sessions = AsyncMock(
+        return_value=RetentionBatchResult(deleted=0, cursor=None)
+    )
+
+    return service
+
+
+async def test_run_deletes_in_batches_until_exhausted(service: DataRetentionService):
+    first_cursor = _cursor()
+    service.delete_old_questions.side_effect = [
+        RetentionBatchResult(deleted=2, cursor=first_cursor),
+        RetentionBatchResult(deleted=1, cursor=_cursor()),
+    ]
+
+    metrics = await service.run(batch_size=2)
+
+    assert metrics.questions.deleted == 3
+    assert metrics.questions.batches == 2
+    assert metrics.completed
+    assert service.delete_old_questions.call_args_list[1].kwargs["cursor"] == first_cursor
+
+
+async def test_run_commits_each_batch_separately(service: DataRetentionService):
+    service.delete_old_app_runs.side_effect = [
+        RetentionBatchResult(deleted=2, cursor=_cursor()),
+        RetentionBatchResult(deleted=0, cursor=None),
+    ]
+
+    await service.run(batch_size=2)
+
+    # One batch for questions, two for app runs and one for sessions
+    assert service.session.begin.call_count == 4
+
+
+async def test_run_stops_when_time_budget_is_spent(service: DataRetentionService):
+    service.delete_old_questions.return_value = RetentionBatchResult(
+        deleted=2, cursor=_cursor()
+    )
+
+    metrics = await service.run(batch_size=2, time_budget_seconds=0)
+
+    assert metrics.questions.batches == 0
+    assert not metrics.completed
+    service.delete_old_sessions.assert_not_called()
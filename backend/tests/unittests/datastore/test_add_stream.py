@@ -0,0 +1,80 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.embedding_models.infrastructure import datastore as datastore_module
+from intric.embedding_models.infrastructure.datastore import ChunkSettings, Datastore
+from intric.files.chunk_embedding_list import ChunkEmbeddingList
+
+
+@pytest.fixture(name="datastore")
+def datastore_with_mocks(monkeypatch: pytest.MonkeyPatch):
+    # Count words instead of tokens, so that the tokenizer is not needed
+    monkeypatch.setattr(datastore_module, "count_tokens", lambda text: len(text.split()))
+    monkeypatch.setattr(datastore_module, "settings", ChunkSettings(chunk_size=4, chunk_overlap=0))
+
+    async def get_embeddings(model, chunks):
+        chunk_embedding_list = ChunkEmbeddingList()
+        chunk_embedding_list.add(chunks, [[0.0]] * len(chunks))
+        return chunk_embedding_list
+
+    create_embeddings_service = AsyncMock()
+    create_embeddings_service.get_embeddings.side_effect = get_embeddings
+
+    datastore = Datastore(
+        user=MagicMock(tenant_id=uuid4()),
+        info_blob_chunk_repo=AsyncMock(),
+        create_embeddings_service=create_embeddings_service,
+    )
+
+    # The datastore reuses the list it passes to the repo
+    datastore.stored_chunks = []
+    datastore.chunk_repo.add.side_effect = datastore.stored_chunks.extend
+
+    return datastore
+
+
+async def _texts(*texts: str):
+    for text in texts:
+        yield text
+
+
+async def test_add_stream_flushes_in_batches(datastore: Datastore):
+    pages = [f"page {i} has some words" for i in range(10)]
+
+    await datastore.add_stream(
+        info_blob_id=uuid4(),
+        texts=_texts(*pages),
+        embedding_model=MagicMock(),
+        batch_size=3,
+    )
+
+    chunks = datastore.stored_chunks
+    assert datastore.create_embeddings_service.get_embeddings.await_count > 1
+    assert all(
+        len(call.kwargs["chunks"]) <= 3 + 1
+        for call in datastore.create_embeddings_service.get_embeddings.await_args_list
+    )
+    assert [chunk.chunk_no for chunk in chunks] == list(range(len(chunks)))
+    assert " ".join(chunk.text for chunk in chunks).split() == " ".join(pages).split()
+
+
+async def test_add_stream_carries_text_over_page_boundaries(datastore: Datastore):
+    await datastore.add_stream(
+        info_blob_id=uuid4(),
+        texts=_texts("one two three four five", "six seven eight"),
+        embedding_model=MagicMock(),
+    )
+
+    texts = [chunk.text for chunk in datastore.stored_chunks]
+    # "five" is not left as a chunk of its own at the end of the first page
+    assert texts == ["one two three four", "five six seven eight"]
+
+
+async def test_add_stream_without_text_stores_nothing(datastore: Datastore):
+    await datastore.add_stream(
+        info_blob_id=uuid4(), texts=_texts("", "  "), embedding_model=MagicMock()
+    )
+
+    datastore.chunk_repo.add.assert_not_awaited()
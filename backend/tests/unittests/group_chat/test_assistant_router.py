@@ -0,0 +1,167 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from intric.group_chat.application.assistant_router import (
+    EmbeddingAssistantRouter,
+    description_embeddings,
+)
+from intric.group_chat.application.group_chat_service import GroupChatService
+from intric.group_chat.domain.entities.group_chat import GroupChatAssistant
+
+DESCRIPTION_EMBEDDINGS = {
+    "Economy": [1.0, 0.0, 0.0],
+    "Schools": [0.0, 1.0, 0.0],
+    "Parking": [0.0, 0.0, 1.0],
+}
+
+
+def _assistant(name: str):
+    assistant = MagicMock(id=uuid4(), description=f"Questions about {name.lower()}")
+    assistant.name = name
+    return GroupChatAssistant(assistant=assistant)
+
+
+async def _get_embeddings(model, chunks):
+    embeddings = ChunkEmbeddingList()
+    embeddings.add(chunks, [DESCRIPTION_EMBEDDINGS[chunk.text.split(":")[0]] for chunk in chunks])
+    return embeddings
+
+
+@pytest.fixture
+def create_embeddings_service():
+    description_embeddings.clear()
+    service = AsyncMock()
+    service.get_embeddings.side_effect = _get_embeddings
+    return service
+
+
+@pytest.fixture
+def router(create_embeddings_service):
+    return EmbeddingAssistantRouter(
+        user=MagicMock(tenant_id=uuid4()), create_embeddings_service=create_embeddings_service
+    )
+
+
+@pytest.fixture
+def assistants():
+    return [_assistant(name) for name in DESCRIPTION_EMBEDDINGS]
+
+
+async def test_select_closest_assistant(router, create_embeddings_service, assistants):
+    create_embeddings_service.get_embedding_for_query.return_value = [0.1, 0.9, 0.2]
+
+    selected = await router.select("question", assistants, MagicMock(id=uuid4()))
+
+    assert selected is assistants[1]
+
+
+async def test_select_none_when_ambiguous(router, create_embeddings_service, assistants):
+    create_embeddings_service.get_embedding_for_query.return_value = [0.7, 0.7, 0.0]
+
+    selected = await router.select("question", assistants, MagicMock(id=uuid4()))
+
+    assert selected is None
+
+
+async def test_descriptions_are_embedded_once(router, create_embeddings_service, assistants):
+    create_embeddings_service.get_embedding_for_query.return_value = [1.0, 0.0, 0.0]
+    embedding_model = MagicMock(id=uuid4())
+
+    await router.select("question", assistants, embedding_model)
+    await router.select("question", assistants, embedding_model)
+
+    create_embeddings_service.get_embeddings.assert_awaited_once()
+
+
+async def test_updated_description_is_embedded_again(
+    router, create_embeddings_service, assistants
+):
+    create_embeddings_service.get_embedding_for_query.return_value = [1.0, 0.0, 0.0]
+    embedding_model = MagicMock(id=uuid4())
+
+    await router.select("question", assistants, embedding_model)
+    assistants[2].update(user_description="Parking permits and fines")
+    await router.select("question", assistants, embedding_model)
+
+    [chunk] = create_embeddings_service.get_embeddings.call_args.kwargs["chunks"]
+    assert chunk.text == "Parking: Parking permits and fines"
+
+
+@pytest.fixture
+def group_chat_service(router):
+    service = GroupChatService(
+        user=MagicMock(),
+        space_service=AsyncMock(),
+        space_repo=AsyncMock(),
+        actor_manager=MagicMock(),
+        assistant_service=AsyncMock(),
+        session_service=AsyncMock(),
+        completion_service=AsyncMock(),
+        assistant_router=router,
+    )
+    service.completion_service.get_response.return_value.completion.text = "3"
+    return service
+
+
+async def test_completion_model_is_not_asked_when_router_decides(
+    group_chat_service, create_embeddings_service, assistants, monkeypatch
+):
+    monkeypatch.setattr(
+        "intric.group_chat.application.group_chat_service.get_settings",
+        lambda: MagicMock(group_chat_router="embeddings", group_chat_router_min_margin=0.05),
+    )
+    create_embeddings_service.get_embedding_for_query.return_value = [0.9, 0.1, 0.0]
+
+    result = await group_chat_service._select_assistant(
+        "question", assistants, space=MagicMock(), session=MagicMock(questions=[])
+    )
+
+    assert result.assistant is assistants[0]
+    group_chat_service.completion_service.get_response.assert_not_awaited()
+
+
+async def test_completion_model_selects_when_router_fails(
+    group_chat_service, create_embeddings_service, assistants, monkeypatch
+):
+    monkeypatch.setattr(
+        "intric.group_chat.application.group_chat_service.get_settings",
+        lambda: MagicMock(group_chat_router="embeddings"),
+    )
+    monkeypatch.setattr(
+        "intric.group_chat.application.group_chat_service.count_tokens", lambda text: 0
+    )
+    create_embeddings_service.get_embedding_for_query.side_effect = Exception("Unavailable")
+
+    result = await group_chat_service._select_assistant(
+        "question", assistants, space=MagicMock(), session=MagicMock(questions=[])
+    )
+
+    assert result.assistant is assistants[2]
+    group_chat_service.completion_service.get_response.assert_awaited_once()
+
+
+async def test_completion_model_selects_for_follow_up_questions(
+    group_chat_service, create_embeddings_service, assistants, monkeypatch
+):
+    monkeypatch.setattr(
+        "intric.group_chat.application.group_chat_service.get_settings",
+        lambda: MagicMock(group_chat_router="embeddings", group_chat_router_min_margin=0.05),
+    )
+    monkeypatch.setattr(
+        "intric.group_chat.application.group_chat_service.count_tokens", lambda text: 0
+    )
+    create_embeddings_service.get_embedding_for_query.return_value = [0.9, 0.1, 0.0]
+
+    result = await group_chat_service._select_assistant(
+        "and in Swedish?",
+        assistants,
+        space=MagicMock(),
+        session=MagicMock(questions=[MagicMock()]),
+    )
+
+    assert result.assistant is assistants[2]
+    create_embeddings_service.get_embedding_for_query.assert_not_awaited()
+    group_chat_service.completion_service.get_response.assert_awaited_once()
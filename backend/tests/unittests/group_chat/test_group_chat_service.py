@@ -0,0 +1,111 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.ai_models.completion_models.completion_model import Completion
+from intric.group_chat.application.group_chat_service import GroupChatService
+from intric.group_chat.domain.entities.group_chat import GroupChatAssistant
+
+
+def _assistants(count: int):
+    return [GroupChatAssistant(assistant=MagicMock(id=uuid4())) for _ in range(count)]
+
+
+class SelectorStream:
+    """Stands in for the selector's completion stream, recording what was read."""
+
+    def __init__(self, *texts: str):
+        self.texts = list(texts)
+        self.read = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed or self.read == len(self.texts):
+            raise StopAsyncIteration
+
+        self.read += 1
+        return Completion(text=self.texts[self.read - 1])
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(
+        "intric.group_chat.application.group_chat_service.count_tokens", lambda text: 1
+    )
+    return GroupChatService(
+        user=MagicMock(),
+        space_service=AsyncMock(),
+        space_repo=AsyncMock(),
+        actor_manager=MagicMock(),
+        assistant_service=AsyncMock(),
+        session_service=AsyncMock(),
+        completion_service=AsyncMock(),
+        assistant_router=AsyncMock(),
+    )
+
+
+async def _select(service: GroupChatService, stream: SelectorStream, assistants):
+    service.completion_service.get_response.return_value = MagicMock(completion=stream)
+    return await service._select_assistant_with_completion_model(
+        "question", assistants, session=MagicMock(), stream=True
+    )
+
+
+async def test_streamed_selection_commits_on_leading_digit(service):
+    assistants = _assistants(3)
+    stream = SelectorStream(" 2", " is the best", " choice")
+
+    result = await _select(service, stream, assistants)
+
+    assert result.assistant is assistants[1]
+    assert stream.read == 1
+    assert stream.closed
+
+
+async def test_streamed_selection_reads_numbers_with_more_digits(service):
+    assistants = _assistants(12)
+    stream = SelectorStream("1", "2", "\n")
+
+    result = await _select(service, stream, assistants)
+
+    assert result.assistant is assistants[11]
+    assert stream.read == 2
+
+
+async def test_streamed_selection_ends_with_the_stream(service):
+    assistants = _assistants(12)
+
+    result = await _select(service, SelectorStream("1"), assistants)
+
+    assert result.assistant is assistants[0]
+
+
+async def test_clarification_is_streamed(service):
+    stream = SelectorStream("Could you", " be more", " specific?")
+
+    result = await _select(service, stream, _assistants(3))
+
+    assert result.assistant is None
+    assert stream.read == 1
+    assert not stream.closed
+
+    answer = await service._handle_response(
+        response=result.response_str,
+        question="question",
+        completion_model=MagicMock(),
+        session=MagicMock(),
+        stream=True,
+        response_stream=result.response_stream,
+    )
+    chunks = [chunk.text async for chunk in answer]
+
+    assert chunks == ["Could you", " be more", " specific?"]
+    saved = service.session_service.add_question_to_session.call_args.kwargs
+    assert saved["answer"] == "Could you be more specific?"
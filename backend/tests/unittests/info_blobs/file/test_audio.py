@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from intric.files.audio import RESAMPLING_TAPS, SAMPLERATE, _Resampler, transcode
+
+
+def _dominant_frequency(samples: np.ndarray, samplerate: int):
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.fft.rfftfreq(len(samples), 1 / samplerate)[np.argmax(spectrum)]
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """25 seconds of a 440 Hz tone, in stereo at 44.1 kHz."""
+    samplerate = 44100
+    t = np.arange(samplerate * 25) / samplerate
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+    path = tmp_path / "recording.wav"
+    sf.write(path, np.stack([tone, tone], axis=1), samplerate, subtype="PCM_16")
+
+    return path
+
+
+def test_resampler_keeps_frequency_across_blocks():
+    samplerate = 44100
+    t = np.arange(samplerate * 2) / samplerate
+    tone = np.sin(2 * np.pi * 1000 * t).astype(np.float32)
+    resampler = _Resampler(samplerate, SAMPLERATE)
+
+    resampled = np.concatenate([resampler.process(block) for block in np.array_split(tone, 37)])
+
+    assert abs(len(resampled) - 2 * SAMPLERATE) <= 1
+    assert _dominant_frequency(resampled, SAMPLERATE) == pytest.approx(1000, abs=1)
+
+
+def test_resampler_filters_frequencies_above_new_nyquist():
+    samplerate = 44100
+    t = np.arange(samplerate) / samplerate
+    tone = np.sin(2 * np.pi * 12000 * t).astype(np.float32)
+
+    resampled = _Resampler(samplerate, SAMPLERATE).process(tone)
+
+    # After the filter has filled up
+    assert np.abs(resampled[RESAMPLING_TAPS:]).max() < 0.05
+
+
+async def test_transcode_to_overlapping_mono_segments(recording):
+    async with transcode(recording, seconds=10, overlap_seconds=3) as transcoded:
+        segments = [segment async for segment in transcoded]
+
+        assert [(segment.start, segment.end) for segment in segments] == [
+            (0, 10),
+            (10, 20),
+            pytest.approx((20, 25), abs=0.01),
+        ]
+
+        infos = [sf.info(segment.path) for segment in segments]
+        assert {(info.samplerate, info.channels) for info in infos} == {(SAMPLERATE, 1)}
+        # Every segment but the first starts with the end of the one before it
+        durations = [info.duration for info in infos]
+        assert durations == pytest.approx([10, 13, 8], abs=0.1)
+
+    assert not any(segment.path.exists() for segment in segments)
+
+
+async def test_segments_are_removed_when_stopped_early(recording):
+    async with transcode(recording, seconds=5) as transcoded:
+        first = await anext(transcoded)
+        assert first.path.exists()
+
+    assert not first.path.exists()
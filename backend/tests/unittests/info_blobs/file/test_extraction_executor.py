@@ -0,0 +1,53 @@
+import asyncio
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from intric.files.extraction_executor import ExtractionExecutor
+from intric.main.exceptions import TextExtractionException
+
+
+@pytest.fixture
+def executor():
+    executor = ExtractionExecutor(max_workers=1, timeout_seconds=2)
+    yield executor
+    executor.stop()
+
+
+async def test_run_returns_result_from_worker_process(executor: ExtractionExecutor):
+    assert await executor.run(pow, 2, 10) == 1024
+
+
+async def test_timeout_replaces_the_pool(executor: ExtractionExecutor):
+    with pytest.raises(TextExtractionException, match="timed out"):
+        await executor.run(time.sleep, 10)
+
+    assert await executor.run(pow, 3, 2) == 9
+
+
+async def test_timeout_kills_the_worker(executor: ExtractionExecutor):
+    pid = await executor.run(os.getpid)
+
+    with pytest.raises(TextExtractionException, match="timed out"):
+        await executor.run(time.sleep, 10)
+
+    for _ in range(50):
+        if pid not in [process.pid for process in multiprocessing.active_children()]:
+            break
+        await asyncio.sleep(0.1)
+    else:
+        pytest.fail("The worker was not killed")
+
+
+async def test_memory_limit():
+    executor = ExtractionExecutor(max_workers=1, memory_limit_bytes=256 * 1024 * 1024)
+
+    try:
+        with pytest.raises(TextExtractionException, match="out of memory"):
+            await executor.run(bytearray, 512 * 1024 * 1024)
+
+        assert len(await executor.run(bytearray, 1024)) == 1024
+    finally:
+        executor.stop()
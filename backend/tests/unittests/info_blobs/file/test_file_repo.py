@@ -0,0 +1,95 @@
+from unittest.mock import AsyncMock, MagicMock, call
+from uuid import uuid4
+
+import pytest
+
+from intric.files.file_models import File, FileCreate, FileType
+from intric.files.file_repo import FileRepository
+
+
+@pytest.fixture
+def calls():
+    # Records the session and blob store calls in the order they are made
+    return MagicMock()
+
+
+@pytest.fixture
+def repo(calls: MagicMock):
+    session = AsyncMock()
+    blob_store = AsyncMock()
+    calls.attach_mock(session.execute, "execute")
+    calls.attach_mock(blob_store.put, "put")
+    calls.attach_mock(blob_store.delete, "delete")
+
+    repo = FileRepository(session=session, blob_store=blob_store)
+    repo._delegate = AsyncMock()
+    return repo
+
+
+def _file_create(**kwargs):
+    return FileCreate(
+        name="image.png",
+        checksum="checksum",
+        size=3,
+        file_type=FileType.IMAGE,
+        user_id=uuid4(),
+        tenant_id=uuid4(),
+        **kwargs,
+    )
+
+
+def test_new_files_require_content():
+    with pytest.raises(ValueError):
+        _file_create()
+
+
+def test_stored_files_do_not_require_loaded_content():
+    file = File(
+        id=uuid4(),
+        name="image.png",
+        checksum="checksum",
+        size=3,
+        file_type=FileType.IMAGE,
+        user_id=uuid4(),
+        tenant_id=uuid4(),
+        blob_key="tenant/checksum",
+    )
+
+    assert file.blob is None
+
+
+async def test_add_stores_the_downscaled_image_next_to_the_original(
+    repo: FileRepository, calls: MagicMock
+):
+    file = _file_create(blob=b"original", downscaled_blob=b"downscaled")
+
+    await repo.add(file)
+
+    key = f"{file.tenant_id}/checksum"
+    assert calls.put.call_args_list == [
+        call(key, b"original"),
+        call(f"{key}.downscaled", b"downscaled"),
+    ]
+    assert repo._delegate.add.call_args.kwargs == {
+        "exclude": {"blob", "downscaled_blob"},
+        "blob_key": key,
+        "downscaled_blob_key": f"{key}.downscaled",
+    }
+
+
+async def test_load_blobs_loads_the_downscaled_images(repo: FileRepository):
+    repo.blob_store.get.side_effect = lambda key: key.encode()
+    downscaled = File(
+        **_file_create(blob=b"-").model_dump(exclude={"blob"}),
+        id=uuid4(),
+        blob_key="tenant/a",
+        downscaled_blob_key="tenant/a.downscaled",
+    )
+    original = File(
+        **_file_create(blob=b"-").model_dump(exclude={"blob"}), id=uuid4(), blob_key="tenant/b"
+    )
+
+    await repo.load_blobs([downscaled, original])
+
+    assert (downscaled.blob, downscaled.downscaled_blob) == (None, b"tenant/a.downscaled")
+    assert (original.blob, original.downscaled_blob) == (b"tenant/b", None)
@@ -0,0 +1,78 @@
+import hashlib
+import os
+from tempfile import SpooledTemporaryFile
+
+import pytest
+
+from intric.files.file_size_service import FileSizeService
+from intric.main.exceptions import FileTooLargeException
+
+CONTENT = b"a" * 3000
+
+
+def _upload(content: bytes, max_size: int) -> SpooledTemporaryFile:
+    file = SpooledTemporaryFile(max_size=max_size)
+    file.write(content)
+    file.seek(0)
+    return file
+
+
+@pytest.mark.parametrize("spool_size", [10_000, 100])
+async def test_save_upload_computes_checksum_while_writing(spool_size: int):
+    saved_file = await FileSizeService.save_upload(
+        _upload(CONTENT, spool_size), max_size=len(CONTENT), checksum=True
+    )
+
+    try:
+        assert saved_file.size == len(CONTENT)
+        assert saved_file.checksum == hashlib.sha256(CONTENT).hexdigest()
+        assert saved_file.path.read_bytes() == CONTENT
+    finally:
+        os.remove(saved_file.path)
+
+
+@pytest.mark.parametrize("spool_size", [10_000, 100])
+async def test_save_upload_without_checksum(spool_size: int):
+    saved_file = await FileSizeService.save_upload(
+        _upload(CONTENT, spool_size), max_size=len(CONTENT)
+    )
+
+    try:
+        assert saved_file.size == len(CONTENT)
+        assert saved_file.checksum is None
+        assert saved_file.path.read_bytes() == CONTENT
+    finally:
+        os.remove(saved_file.path)
+
+
+@pytest.mark.parametrize("spool_size", [10_000, 100])
+@pytest.mark.parametrize("checksum", [True, False])
+async def test_save_upload_removes_files_that_are_too_large(
+    spool_size: int, checksum: bool, tmp_path, monkeypatch
+):
+    monkeypatch.setattr("intric.files.file_size_service.TMP_DIR", str(tmp_path))
+    file = _upload(CONTENT, spool_size)
+
+    with pytest.raises(FileTooLargeException):
+        await FileSizeService.save_upload(file, max_size=len(CONTENT) - 1, checksum=checksum)
+
+    assert list(tmp_path.iterdir()) == []
+    assert file.closed
+
+
+async def test_save_upload_copies_again_after_a_short_copy(monkeypatch):
+    def copy_file_range(source_fd, destination_fd, count, offset_src=None):
+        # Copies the first chunk, then nothing more, as if the file ended early
+        if offset_src:
+            return 0
+        return os.write(destination_fd, os.pread(source_fd, 1000, 0))
+
+    monkeypatch.setattr(os, "copy_file_range", copy_file_range, raising=False)
+
+    saved_file = await FileSizeService.save_upload(_upload(CONTENT, 100), max_size=len(CONTENT))
+
+    try:
+        assert saved_file.size == len(CONTENT)
+        assert saved_file.path.read_bytes() == CONTENT
+    finally:
+        os.remove(saved_file.path)
@@ -0,0 +1,165 @@
+import base64
+import io
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from PIL import Image
+
+from intric.files.file_models import File, FileType
+from intric.files.file_service import FileService
+from intric.files.image import (
+    MAX_IMAGE_PIXELS,
+    MAX_IMAGE_SIDE,
+    EncodedImageCache,
+    downscale_image,
+)
+from intric.main.exceptions import FileNotSupportedException
+
+
+def _image(width: int, height: int, format: str = "JPEG", exif: Image.Exif | None = None):
+    output = io.BytesIO()
+    image = Image.new("RGB", (width, height), color=(200, 100, 50))
+    image.save(output, format=format, exif=exif if exif is not None else Image.Exif())
+    return output.getvalue()
+
+
+def _size(content: bytes):
+    return Image.open(io.BytesIO(content)).size
+
+
+def test_small_images_are_kept_as_they_are():
+    content = _image(800, 600)
+
+    assert downscale_image(content, "image/jpeg") is content
+
+
+@pytest.mark.parametrize("format, mimetype", [("JPEG", "image/jpeg"), ("PNG", "image/png")])
+def test_large_images_are_downscaled_in_the_same_format(format, mimetype):
+    content = _image(4032, 3024, format=format)
+
+    downscaled = downscale_image(content, mimetype)
+
+    width, height = _size(downscaled)
+    assert max(width, height) <= MAX_IMAGE_SIDE
+    assert width * height <= MAX_IMAGE_PIXELS
+    assert width / height == pytest.approx(4 / 3, rel=0.01)
+    assert Image.open(io.BytesIO(downscaled)).format == format
+
+
+def test_long_side_is_limited():
+    width, height = _size(downscale_image(_image(4000, 400), "image/jpeg"))
+
+    assert (width, height) == (MAX_IMAGE_SIDE, 156)
+
+
+def test_exif_orientation_is_applied():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Rotated 90 degrees
+
+    width, height = _size(downscale_image(_image(4032, 3024, exif=exif), "image/jpeg"))
+
+    assert width < height
+
+
+def test_unreadable_images_are_not_supported():
+    with pytest.raises(FileNotSupportedException):
+        downscale_image(b"not an image", "image/png")
+
+
+def _file(blob: bytes, **kwargs):
+    return File(
+        id=uuid4(),
+        name="image.png",
+        checksum=uuid4().hex,
+        size=len(blob),
+        file_type=FileType.IMAGE,
+        user_id=uuid4(),
+        tenant_id=uuid4(),
+        blob=blob,
+        blob_key=f"{uuid4()}/{uuid4().hex}",
+        **kwargs,
+    )
+
+
+def test_encoded_images_are_cached():
+    cache = EncodedImageCache()
+    file = _file(b"image")
+
+    encoded = cache.encode(file)
+    file.blob = None
+
+    assert cache.encode(file) == encoded == base64.b64encode(b"image").decode()
+
+
+def test_least_recently_used_images_are_evicted():
+    cache = EncodedImageCache(max_bytes=16)
+    first, second, third = _file(b"first."), _file(b"second"), _file(b"third.")
+
+    cache.encode(first)
+    cache.encode(second)
+    cache.encode(first)
+    cache.encode(third)
+    first.blob = second.blob = None
+
+    assert cache.encode(first) == base64.b64encode(b"first.").decode()
+    with pytest.raises(TypeError):
+        cache.encode(second)
+
+
+def test_downscaled_images_are_encoded():
+    cache = EncodedImageCache()
+    file = _file(
+        b"original", downscaled_blob=b"downscaled", downscaled_blob_key="tenant/key.downscaled"
+    )
+
+    assert cache.encode(file) == base64.b64encode(b"downscaled").decode()
+
+
+def test_lookup_returns_the_images_that_need_loading():
+    cache = EncodedImageCache()
+    cached, not_cached = _file(b"cached"), _file(b"not cached")
+    cache.encode(cached)
+    cached.blob = not_cached.blob = None
+
+    assert cache.lookup([cached, not_cached]) == [not_cached]
+    assert cached.encoded == base64.b64encode(b"cached").decode()
+
+
+def test_looked_up_images_survive_eviction():
+    cache = EncodedImageCache(max_bytes=16)
+    first, second = _file(b"first."), _file(b"second")
+    cache.encode(first)
+    first.blob = None
+
+    cache.lookup([first, second])
+    # Encoding the other images of the request evicts the first one
+    cache.encode(second)
+
+    assert cache.encode(first) == base64.b64encode(b"first.").decode()
+
+
+async def test_generated_images_keep_the_original():
+    repo = AsyncMock()
+    service = FileService(
+        user=MagicMock(id=uuid4(), tenant_id=uuid4()), repo=repo, protocol=MagicMock()
+    )
+    content = _image(4000, 400)
+
+    await service.save_image_from_bytes(content)
+
+    file = repo.add.call_args.args[0]
+    assert file.blob is content
+    assert file.size == len(content)
+    assert max(_size(file.downscaled_blob)) == MAX_IMAGE_SIDE
+
+
+async def test_small_generated_images_are_not_stored_twice():
+    repo = AsyncMock()
+    service = FileService(
+        user=MagicMock(id=uuid4(), tenant_id=uuid4()), repo=repo, protocol=MagicMock()
+    )
+
+    await service.save_image_from_bytes(_image(800, 600))
+
+    assert repo.add.call_args.args[0].downscaled_blob is None
@@ -0,0 +1,37 @@
+from pypdf import PdfWriter
+
+from intric.files import text
+from intric.files.text import TextExtractor
+
+
+def _pdf(path, num_pages: int):
+    writer = PdfWriter()
+    for _ in range(num_pages):
+        writer.add_blank_page(width=100, height=100)
+    writer.write(path)
+
+
+def test_pdf_parts_are_read_with_one_reader(tmp_path, monkeypatch):
+    filepath = tmp_path / "doc.pdf"
+    _pdf(filepath, num_pages=5)
+    text._pdf_reader.cache_clear()
+    opened = []
+    pdf_reader = text.PdfReader
+    monkeypatch.setattr(text, "PdfReader", lambda path: opened.append(path) or pdf_reader(path))
+
+    parts = [TextExtractor.extract_pdf_pages(filepath, start, 2) for start in (0, 2, 4, 6)]
+
+    assert [len(part) for part in parts] == [2, 2, 1, 0]
+    assert len(opened) == 1
+
+
+def test_a_changed_pdf_is_read_again(tmp_path, monkeypatch):
+    filepath = tmp_path / "doc.pdf"
+    _pdf(filepath, num_pages=1)
+    text._pdf_reader.cache_clear()
+
+    assert len(TextExtractor.extract_pdf_pages(filepath, 0, 10)) == 1
+
+    _pdf(filepath, num_pages=3)
+
+    assert len(TextExtractor.extract_pdf_pages(filepath, 0, 10)) == 3
@@ -0,0 +1,51 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.files.transcriber import Transcriber
+
+
+def _audio_file(checksum: str):
+    return MagicMock(
+        mimetype="audio/mpeg",
+        checksum=checksum,
+        tenant_id=uuid4(),
+        transcription=None,
+        blob=b"audio",
+    )
+
+
+@pytest.fixture
+def transcriber():
+    transcriber = Transcriber(
+        user=MagicMock(tenant_id=uuid4()),
+        file_repo=AsyncMock(),
+        transcription_cache_repo=AsyncMock(),
+    )
+    transcriber._transcribe = AsyncMock(side_effect=lambda path, model: "transcribed")
+
+    return transcriber
+
+
+async def test_cached_transcription_is_reused(transcriber: Transcriber):
+    transcriber.transcription_cache_repo.get.return_value = "cached"
+    file = _audio_file("checksum")
+
+    assert await transcriber.transcribe(file, MagicMock()) == "cached"
+
+    transcriber._transcribe.assert_not_awaited()
+    transcriber.file_repo.update.assert_awaited_once_with(file)
+
+
+async def test_new_transcriptions_are_cached_and_returned_in_order(transcriber: Transcriber):
+    transcriber.transcription_cache_repo.get.side_effect = [None, "cached"]
+    files = [_audio_file("new"), _audio_file("old")]
+
+    transcriptions = await transcriber.transcribe_files(files, MagicMock())
+
+    assert transcriptions == ["transcribed", "cached"]
+    transcriber.file_repo.load_blobs.assert_awaited_once_with([files[0]])
+    add = transcriber.transcription_cache_repo.add.call_args.kwargs
+    assert add["checksum"] == "new"
+    assert add["text"] == "transcribed"
@@ -1,9 +1,11 @@
 from dataclasses import dataclass
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, call
+from uuid import uuid4
 
 import pytest
 
 from intric.groups_legacy.group_service import GroupService
+from intric.info_blobs.info_blob import InfoBlobAdd
 from intric.info_blobs.info_blob_repo import InfoBlobRepository
 from intric.info_blobs.info_blob_service import InfoBlobService
 from intric.main.exceptions import NameCollisionException, NotFoundException
@@ -70,3 +72,35 @@ async def test_update_fails_if_info_blob_with_same_name_exists(setup: Setup):
 
     with pytest.raises(NameCollisionException):
         await setup.service.update_info_blob(MagicMock())
+
+
+def _info_blob_add(title: str, website_id):
+    return InfoBlobAdd(
+        title=title, text="text", user_id=uuid4(), tenant_id=uuid4(), website_id=website_id
+    )
+
+
+async def test_bulk_ingest_defers_size_updates_and_batches_title_lookups(setup: Setup):
+    website_id = uuid4()
+    old_ids = [uuid4(), uuid4()]
+    setup.repo.get_ids_by_title.return_value = {"page": old_ids}
+    setup.repo.add.side_effect = lambda info_blob: MagicMock(
+        id=uuid4(), title=info_blob.title, group_id=None, website_id=website_id
+    )
+    setup.repo.update_size.return_value = MagicMock(group_id=None, website_id=website_id)
+
+    async with setup.service.bulk_ingest():
+        for title in ["page", "other", "third"]:
+            info_blob = await setup.service.add_info_blob_without_validation(
+                _info_blob_add(title, website_id)
+            )
+            await setup.service.update_info_blob_size(info_blob.id)
+
+        setup.service.update_website_size_service.update_website_size.assert_not_awaited()
+
+    setup.repo.get_ids_by_title.assert_awaited_once_with(group_id=None, website_id=website_id)
+    assert setup.repo.delete.await_args_list == [call(old_id) for old_id in old_ids]
+    setup.repo.delete_by_title_and_website.assert_not_awaited()
+    setup.service.update_website_size_service.update_website_size.assert_awaited_once_with(
+        website_id
+    )
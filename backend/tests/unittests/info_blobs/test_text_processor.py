@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.embedding_models.infrastructure.datastore import Datastore
+from intric.info_blobs import content_cache
+from intric.info_blobs.text_processor import PDF_PAGES_PER_PART, TextProcessor
+
+TEXT = "Standard document that many collections share"
+
+
+@dataclass
+class Setup:
+    text_processor: TextProcessor
+    datastore: MagicMock
+    info_blob_service: AsyncMock
+    extractor: MagicMock
+
+
+@pytest.fixture
+def setup():
+    datastore = AsyncMock()
+    datastore.embedding_key = Datastore.embedding_key
+    info_blob_service = AsyncMock()
+    info_blob_service.get_id_with_same_embeddings.return_value = None
+    info_blob_service.get_text_by_extraction_key.return_value = None
+    extractor = MagicMock()
+    extractor.get_mimetype.return_value = "text/plain"
+
+    text_processor = TextProcessor(
+        user=MagicMock(id=uuid4(), tenant_id=uuid4()),
+        extractor=extractor,
+        datastore=datastore,
+        info_blob_service=info_blob_service,
+    )
+
+    return Setup(
+        text_processor=text_processor,
+        datastore=datastore,
+        info_blob_service=info_blob_service,
+        extractor=extractor,
+    )
+
+
+async def test_process_text_embeds_new_content(setup: Setup):
+    await setup.text_processor.process_text(
+        text=TEXT, title="doc", embedding_model=MagicMock(id=uuid4()), group_id=uuid4()
+    )
+
+    setup.datastore.add.assert_awaited_once()
+    setup.datastore.copy_embeddings.assert_not_awaited()
+
+
+async def test_process_text_copies_embeddings_of_identical_content(setup: Setup):
+    same_embeddings_id = uuid4()
+    setup.info_blob_service.get_id_with_same_embeddings.return_value = same_embeddings_id
+    info_blob = setup.info_blob_service.add_info_blob_without_validation.return_value
+
+    await setup.text_processor.process_text(
+        text=TEXT, title="doc", embedding_model=MagicMock(id=uuid4()), group_id=uuid4()
+    )
+
+    setup.datastore.add.assert_not_awaited()
+    setup.datastore.copy_embeddings.assert_awaited_once_with(
+        from_info_blob_id=same_embeddings_id, to_info_blob_id=info_blob.id
+    )
+
+
+async def test_embedding_key_depends_on_text_and_embedding_model(setup: Setup):
+    embedding_model = MagicMock(id=uuid4())
+    ingested = [
+        (TEXT, embedding_model),
+        (TEXT, embedding_model),
+        ("Other text", embedding_model),
+        (TEXT, MagicMock(id=uuid4())),
+    ]
+
+    for text, model in ingested:
+        await setup.text_processor.process_text(
+            text=text, title="doc", embedding_model=model, group_id=uuid4()
+        )
+
+    keys = [
+        call.args[0].embedding_key
+        for call in setup.info_blob_service.get_id_with_same_embeddings.call_args_list
+    ]
+    assert keys[0] == keys[1]
+    assert len(set(keys)) == 3
+
+
+async def test_process_file_reuses_extracted_text(setup: Setup, tmp_path):
+    filepath = tmp_path / "doc.txt"
+    filepath.write_text(TEXT)
+    setup.info_blob_service.get_text_by_extraction_key.return_value = TEXT
+
+    await setup.text_processor.process_file(
+        filepath=filepath,
+        filename="doc.txt",
+        embedding_model=MagicMock(id=uuid4()),
+        group_id=uuid4(),
+    )
+
+    setup.extractor.extract.assert_not_called()
+    info_blob_add = setup.info_blob_service.add_info_blob_without_validation.call_args.args[0]
+    assert info_blob_add.text == TEXT
+    assert info_blob_add.extraction_key is not None
+
+
+async def test_pdfs_are_appended_and_embedded_a_few_pages_at_a_time(
+    setup: Setup, tmp_path, monkeypatch
+):
+    filepath = tmp_path / "doc.pdf"
+    filepath.write_bytes(b"%PDF")
+    setup.extractor.get_mimetype.return_value = "application/pdf"
+    pages = [f"page {i}" for i in range(PDF_PAGES_PER_PART + 1)]
+
+    async def run(func, filepath, start, count):
+        return pages[start : start + count]
+
+    monkeypatch.setattr("intric.info_blobs.text_processor.extraction_executor.run", run)
+
+    embedded = []
+
+    async def add_stream(*, info_blob_id, texts, embedding_model):
+        embedded.extend([text async for text in texts])
+
+    setup.datastore.add_stream = add_stream
+    embedding_model = MagicMock(id=uuid4())
+
+    await setup.text_processor.process_file(
+        filepath=filepath, filename="doc.pdf", embedding_model=embedding_model, group_id=uuid4()
+    )
+
+    first_part = " ".join(pages[:PDF_PAGES_PER_PART])
+    last_part = pages[PDF_PAGES_PER_PART]
+    assert embedded == [first_part, last_part]
+
+    info_blob = setup.info_blob_service.add_info_blob_without_validation.return_value
+    appended = [call.args for call in setup.info_blob_service.append_text.call_args_list]
+    assert appended == [(info_blob.id, first_part), (info_blob.id, f" {last_part}")]
+
+    # The same key as if the whole text had been processed at once
+    text = " ".join(pages)
+    setup.info_blob_service.set_embedding_key.assert_awaited_once_with(
+        info_blob.id,
+        Datastore.embedding_key(content_cache.hash_text(text), embedding_model),
+    )
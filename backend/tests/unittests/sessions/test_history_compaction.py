@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.sessions.history_compaction import HistoryCompactionService
+from intric.sessions.session import SessionInDB
+from tests.fixtures import TEST_USER
+
+START = datetime(2025, 5, 21, 10, tzinfo=timezone.utc)
+
+
+def _questions(count: int, length: int = 100):
+    return [
+        MagicMock(
+            id=uuid4(),
+            question=f"Question {i}".ljust(length, "."),
+            answer=f"Answer {i}".ljust(length, "."),
+            created_at=START + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def _session(questions, history_summary=None):
+    session = SessionInDB(
+        id=uuid4(), name="session", user_id=TEST_USER.id, history_summary=history_summary
+    )
+    session.questions = questions
+    return session
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    settings = MagicMock(
+        history_compaction_threshold_tokens=100,
+        history_compaction_keep_questions=2,
+        history_compaction_model=None,
+    )
+    monkeypatch.setattr("intric.sessions.history_compaction.get_settings", lambda: settings)
+    monkeypatch.setattr(
+        "intric.sessions.history_compaction.count_tokens", lambda text: len(text or "") // 4
+    )
+    return settings
+
+
+@pytest.fixture
+def service():
+    service = HistoryCompactionService(
+        user=TEST_USER,
+        session_repo=AsyncMock(),
+        completion_service=AsyncMock(),
+        completion_model_crud_service=AsyncMock(),
+    )
+    service.completion_model_crud_service.get_completion_model.return_value = MagicMock(
+        token_limit=8000
+    )
+    service.completion_service.get_response.return_value.completion.text = "Summary"
+    return service
+
+
+def test_needs_compaction_past_the_threshold(settings):
+    [*history, question] = _questions(3)
+
+    assert HistoryCompactionService.needs_compaction(_session(history), question)
+
+
+def test_no_compaction_of_short_histories(settings):
+    [*history, question] = _questions(3, length=20)
+
+    assert not HistoryCompactionService.needs_compaction(_session(history), question)
+
+
+def test_recent_questions_are_not_compacted(settings):
+    [question] = _questions(1, length=1000)
+
+    assert not HistoryCompactionService.needs_compaction(_session([]), question)
+
+
+async def test_compact_summarizes_all_but_the_recent_questions(
+    service: HistoryCompactionService, settings
+):
+    questions = _questions(5)
+    session = _session(questions, history_summary="Earlier summary")
+    service.session_repo.get_with_history.return_value = session
+
+    await service.compact(session.id, completion_model_id=uuid4())
+
+    service.session_repo.get_with_history.assert_awaited_once_with(id=session.id)
+    service.completion_service.get_response.assert_awaited_once()
+    text_input = service.completion_service.get_response.call_args.kwargs["text_input"]
+    assert "Earlier summary" in text_input
+    assert "Question 2" in text_input
+    assert "Question 3" not in text_input
+
+    service.session_repo.update_history_summary.assert_awaited_once_with(
+        id=session.id,
+        summary="Summary",
+        summary_tokens=1,
+        summarized_until=questions[2].created_at,
+    )
+
+
+async def test_compact_does_nothing_below_the_threshold(
+    service: HistoryCompactionService, settings
+):
+    session = _session(_questions(5, length=10))
+    service.session_repo.get_with_history.return_value = session
+
+    await service.compact(session.id, completion_model_id=uuid4())
+
+    service.completion_service.get_response.assert_not_awaited()
+    service.session_repo.update_history_summary.assert_not_awaited()
+
+
+async def test_compact_with_the_configured_model(service: HistoryCompactionService, settings):
+    settings.history_compaction_model = "small-model"
+    small_model = MagicMock(token_limit=8000)
+    small_model.name = "small-model"
+    service.completion_model_crud_service.get_available_completion_models.return_value = [
+        MagicMock(),
+        small_model,
+    ]
+    service.session_repo.get_with_history.return_value = _session(_questions(5))
+
+    await service.compact(uuid4(), completion_model_id=uuid4())
+
+    assert service.completion_service.get_response.call_args.kwargs["model"] is small_model
+    service.completion_model_crud_service.get_completion_model.assert_not_awaited()
+
+
+def _summarize_in_order(service: HistoryCompactionService):
+    summaries = iter(f"Summary {i}" for i in range(100))
+
+    async def get_response(**kwargs):
+        return MagicMock(completion=MagicMock(text=next(summaries)))
+
+    service.completion_service.get_response.side_effect = get_response
+
+
+async def test_compact_summarizes_long_histories_a_part_at_a_time(
+    service: HistoryCompactionService, settings
+):
+    # 50 tokens per question, so two fit in the 125 tokens of each part
+    service.completion_model_crud_service.get_completion_model.return_value = MagicMock(
+        token_limit=250
+    )
+    _summarize_in_order(service)
+    questions = _questions(7)
+    session = _session(questions)
+    service.session_repo.get_with_history.return_value = session
+
+    await service.compact(session.id, completion_model_id=uuid4())
+
+    text_inputs = [
+        c.kwargs["text_input"] for c in service.completion_service.get_response.call_args_list
+    ]
+    assert len(text_inputs) == 3
+    assert "Question 0" in text_inputs[0] and "Question 1" in text_inputs[0]
+    assert "Summary 0" in text_inputs[1] and "Question 2" in text_inputs[1]
+    assert "Summary 1" in text_inputs[2] and "Question 4" in text_inputs[2]
+    assert "Question 5" not in "".join(text_inputs)
+
+    service.session_repo.update_history_summary.assert_awaited_once_with(
+        id=session.id,
+        summary="Summary 2",
+        summary_tokens=2,
+        summarized_until=questions[4].created_at,
+    )
+
+
+async def test_compact_cuts_questions_that_do_not_fit_on_their_own(
+    service: HistoryCompactionService, settings
+):
+    service.completion_model_crud_service.get_completion_model.return_value = MagicMock(
+        token_limit=250
+    )
+    session = _session(_questions(3, length=2000))
+    service.session_repo.get_with_history.return_value = session
+
+    await service.compact(session.id, completion_model_id=uuid4())
+
+    text_input = service.completion_service.get_response.call_args.kwargs["text_input"]
+    assert len(text_input.strip('"')) // 4 <= 125
+    assert text_input.startswith('"""user: Question 0')
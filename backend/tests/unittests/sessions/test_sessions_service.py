@@ -79,6 +79,21 @@ async def test_succeeds_with_assistant_id(service: SessionService):
     assert session_in_db == session
 
 
+async def test_get_with_history_checks_the_session(service: SessionService):
+    service.session_repo.get_with_history.return_value = SessionInDB(
+        user_id=uuid4(),
+        name="test_session",
+        id=TEST_UUID,
+    )
+
+    with pytest.raises(UnauthorizedException, match="belongs to other user"):
+        await service.get_session_with_history(TEST_UUID, max_history_tokens=8000)
+
+    service.session_repo.get_with_history.assert_awaited_once_with(
+        id=TEST_UUID, max_tokens=8000
+    )
+
+
 async def test_update_error_when_session_does_not_exist(service: SessionService):
     service.session_repo.update.return_value = None
     session_upsert = SessionUpdate(name="new_test_name", id=TEST_UUID)
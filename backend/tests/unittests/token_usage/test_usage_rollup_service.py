@@ -0,0 +1,103 @@
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, call
+
+import pytest
+
+from intric.token_usage.application.usage_rollup_service import (
+    MAX_DAYS_PER_BATCH,
+    UsageRollupService,
+)
+from intric.token_usage.domain.token_usage_models import UsageSource
+
+NOW = datetime(2025, 5, 13, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def repo():
+    repo = AsyncMock()
+    repo.pop_stale_days.return_value = []
+    return repo
+
+
+@pytest.fixture
+def service(repo: AsyncMock):
+    return UsageRollupService(repo=repo)
+
+
+async def test_refresh_rolls_up_closed_days_since_watermark(
+    service: UsageRollupService, repo: AsyncMock
+):
+    repo.get_watermark.return_value = date(2025, 5, 10)
+
+    more_left = await service.refresh_next_batch(now=NOW)
+
+    assert not more_left
+    for source in UsageSource:
+        repo.rollup_days.assert_any_call(
+            source, from_day=date(2025, 5, 10), to_day=date(2025, 5, 13)
+        )
+        repo.set_watermark.assert_any_call(source, rolled_up_until=date(2025, 5, 13))
+
+
+async def test_refresh_backfills_from_first_day_in_batches(
+    service: UsageRollupService, repo: AsyncMock
+):
+    repo.get_watermark.return_value = None
+    repo.get_first_day.return_value = date(2025, 1, 1)
+
+    more_left = await service.refresh_next_batch(now=NOW)
+
+    assert more_left
+    repo.set_watermark.assert_any_call(
+        UsageSource.QUESTIONS, rolled_up_until=date(2025, 2, 1)
+    )
+
+
+async def test_refresh_waits_before_closing_the_day(
+    service: UsageRollupService, repo: AsyncMock
+):
+    repo.get_watermark.return_value = date(2025, 5, 12)
+
+    # Shortly after midnight the previous day is not considered closed yet
+    more_left = await service.refresh_next_batch(
+        now=datetime(2025, 5, 13, 0, 30, tzinfo=timezone.utc)
+    )
+
+    assert not more_left
+    repo.rollup_days.assert_not_called()
+
+
+async def test_refresh_starts_sources_without_data_at_the_last_closed_day(
+    service: UsageRollupService, repo: AsyncMock
+):
+    repo.get_watermark.return_value = None
+    repo.get_first_day.return_value = None
+
+    await service.refresh_next_batch(now=NOW)
+
+    repo.rollup_days.assert_not_called()
+    for source in UsageSource:
+        repo.set_watermark.assert_any_call(source, rolled_up_until=date(2025, 5, 13))
+
+
+async def test_refresh_rolls_up_stale_days_again(service: UsageRollupService, repo: AsyncMock):
+    repo.get_watermark.return_value = date(2025, 5, 13)
+    repo.pop_stale_days.side_effect = [[date(2025, 3, 1), date(2025, 4, 2)], []]
+
+    more_left = await service.refresh_next_batch(now=NOW)
+
+    assert not more_left
+    assert repo.rollup_days.call_args_list == [
+        call(UsageSource.QUESTIONS, from_day=date(2025, 3, 1), to_day=date(2025, 3, 2)),
+        call(UsageSource.QUESTIONS, from_day=date(2025, 4, 2), to_day=date(2025, 4, 3)),
+    ]
+    repo.set_watermark.assert_not_called()
+
+
+async def test_refresh_continues_with_many_stale_days(
+    service: UsageRollupService, repo: AsyncMock
+):
+    repo.get_watermark.return_value = date(2025, 5, 13)
+    repo.pop_stale_days.return_value = [date(2025, 1, 1)] * MAX_DAYS_PER_BATCH
+
+    assert await service.refresh_next_batch(now=NOW)
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.crawler.crawler import CrawlStream
+from intric.crawler.parse_html import CrawledPage, KnownPage, UnchangedPage
+from intric.main.exceptions import CrawlerException
+from intric.websites.crawl_dependencies.crawl_ingester import CrawlIngester
+
+
+def _page(url: str):
+    return CrawledPage(url=url, title=url, content=f"content of {url}")
+
+
+async def _feed(crawl_stream: CrawlStream, items: list, error: Exception = None):
+    for item in items:
+        await crawl_stream._put(item)
+        crawl_stream._num_items += 1
+
+    await crawl_stream.finish(error=error)
+
+
+@pytest.fixture
+def text_processor():
+    text_processor = MagicMock()
+    text_processor.prepare_text = AsyncMock()
+    text_processor.prepare_file = AsyncMock()
+    text_processor.store = AsyncMock()
+
+    return text_processor
+
+
+@pytest.fixture
+def ingester(text_processor):
+    session = MagicMock()
+    session.begin_nested.return_value.__aenter__ = AsyncMock()
+    session.begin_nested.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    return CrawlIngester(
+        text_processor=text_processor,
+        info_blob_repo=AsyncMock(),
+        session=session,
+        website_id=uuid4(),
+        embedding_model=MagicMock(),
+        num_workers=3,
+        on_progress=AsyncMock(),
+        progress_interval=2,
+    )
+
+
+async def test_stream_yields_pages_and_files(tmp_path: Path):
+    crawl_stream = CrawlStream(files_dir=str(tmp_path), max_queued_items=10)
+    page = _page("https://example.com")
+    file_item = {"file_urls": ["https://example.com/a.pdf"], "files": [{"path": "a.pdf"}]}
+
+    await _feed(crawl_stream, [page, file_item])
+
+    assert await crawl_stream.get() == page
+    assert await crawl_stream.get() == tmp_path / "a.pdf"
+    assert await crawl_stream.get() is None
+    # Every consumer sees the end of the crawl
+    assert await crawl_stream.get() is None
+
+
+async def test_stream_without_items_fails(tmp_path: Path):
+    crawl_stream = CrawlStream(files_dir=str(tmp_path), max_queued_items=10)
+
+    await crawl_stream.finish()
+
+    with pytest.raises(CrawlerException):
+        await crawl_stream.get()
+
+
+async def test_stream_applies_backpressure(tmp_path: Path):
+    crawl_stream = CrawlStream(files_dir=str(tmp_path), max_queued_items=1)
+
+    await crawl_stream._put(_page("https://example.com/1"))
+    blocked = asyncio.create_task(crawl_stream._put(_page("https://example.com/2")))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+
+    await crawl_stream.get()
+    await asyncio.wait_for(blocked, timeout=1)
+
+
+async def test_close_releases_waiting_producers(tmp_path: Path):
+    crawl_stream = CrawlStream(files_dir=str(tmp_path), max_queued_items=1)
+
+    await crawl_stream._put(_page("https://example.com/1"))
+    blocked = asyncio.create_task(crawl_stream._put(_page("https://example.com/2")))
+    await asyncio.sleep(0)
+
+    crawl_stream.close()
+    await asyncio.wait_for(blocked, timeout=1)
+
+    # Nothing is queued after the consumers are gone
+    queued = crawl_stream._queue.qsize()
+    await crawl_stream._put(_page("https://example.com/3"))
+    assert crawl_stream._queue.qsize() == queued
+
+
+async def test_ingest_stores_every_item(
+    ingester: CrawlIngester, text_processor: MagicMock, tmp_path: Path
+):
+    crawl_stream = CrawlStream(files_dir=str(tmp_path), max_queued_items=2)
+    pages = [_page(f"https://example.com/{i}") for i in range(5)]
+    (tmp_path / "report.pdf").write_bytes(b"%PDF")
+    file_item = {"files": [{"path": "report.pdf"}]}
+
+    feeder = asyncio.create_task(_feed(crawl_stream, [*pages, file_item]))
+    result = await ingester.ingest(crawl_stream)
+    await feeder
+
+    assert result.num_pages == 5
+    assert result.num_files == 1
+    assert sorted(result.titles) == sorted([page.url for page in pages] + ["report"])
+    assert text_processor.store.await_count == 6
+    assert ingester.on_progress.await_count == 3
+
+
+async def test_ingest_counts_failures(
+    ingester: CrawlIngester, text_processor: MagicMock, tmp_path: Path
+):
+    crawl_stream = CrawlStream(files_dir=str(tmp_path), max_queued_items=10)
+    text_processor.prepare_text.side_effect = [Exception("embedding failed"), MagicMock()]
+
+    await _feed(crawl_stream, [_page("https://example.com/1"), _page("https://example.com/2")])
+    result = await ingester.ingest(crawl_stream)
+
+    assert result.num_pages == 2
+    assert result.num_failed_pages == 1
+    assert len(result.titles) == 1
+
+
+async def test_ingest_raises_on_crawl_error(ingester: CrawlIngester, tmp_path: Path):
+    crawl_stream = CrawlStream(files_dir=str(tmp_path), max_queued_items=10)
+
+    await _feed(crawl_stream, [_page("https://example.com")], error=Exception("spider crashed"))
+
+    with pytest.raises(CrawlerException):
+        await ingester.ingest(crawl_stream)
+
+
+async def test_ingest_skips_unchanged_content(
+    ingester: CrawlIngester, text_processor: MagicMock, tmp_path: Path
+):
+    crawl_stream = CrawlStream(files_dir=str(tmp_path), max_queued_items=10)
+    unchanged, changed = _page("https://example.com/1"), _page("https://example.com/2")
+    unchanged.etag = '"v2"'
+    ingester.known_pages = {
+        page.url: KnownPage(
+            content_hash=hashlib.sha256(unchanged.content.encode()).hexdigest(),
+            etag='"v1"',
+            last_modified=None,
+            crawled_at=datetime.now(timezone.utc),
+        )
+        for page in [unchanged, changed]
+    }
+
+    await _feed(crawl_stream, [unchanged, changed, UnchangedPage(url="https://example.com/3")])
+    result = await ingester.ingest(crawl_stream)
+
+    assert result.num_pages == 3
+    assert result.num_unchanged == 2
+    assert sorted(result.titles) == [f"https://example.com/{i}" for i in range(1, 4)]
+    assert sorted(result.unchanged_titles) == ["https://example.com/1", "https://example.com/3"]
+    text_processor.prepare_text.assert_awaited_once()
+    ingester.info_blob_repo.update_crawl_metadata.assert_awaited_once_with(
+        title=unchanged.url, website_id=ingester.website_id, etag='"v2"', last_modified=None
+    )